@@ -0,0 +1,127 @@
+"""
+인메모리 카탈로그(src/catalog.py) 벤치마크임.
+bench_tourist_query랑 같은 가짜 관광 정보 N건 넣고, 같은 지역/관심사/기간 조회를
+
+- orm: db.get_tourist_info_from_db (복합 인덱스 타는 SQL + ORM 객체 + to_dict)
+- catalog: CatalogSnapshot.filter (컬럼 배열 + 카테고리 비트맵)
+
+으로 돌려서 지연시간 비교하고, 결과가 같은지(순서까지) 확인함.
+메모리는 스냅샷 배열 크기(nbytes)랑 tracemalloc으로 잰 실제 할당량을, 전체 행을 ORM 객체로 들고 있을때랑 비교해서 10만건당으로 출력함.
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_catalog --rows 100000 --queries 500
+"""
+
+import argparse
+import gc
+import logging
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from bench.bench_tourist_query import INTERESTS, REGIONS, make_rows
+from bench.common import format_latency, setup_env
+
+
+def _per_100k(value: float, rows: int) -> str:
+    return f"{value / 1024 / 1024:7.1f}MiB ({value / 1024 / 1024 * 100_000 / max(rows, 1):6.1f}MiB/10만건)"
+
+
+def measure_retained(build):
+    """`build()` 결과를 들고 있는 동안 남아있는 할당량(바이트)이랑 걸린 시간 재는거."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return value, retained, elapsed
+
+
+def make_queries(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    today = date.today()
+    queries = []
+    for _ in range(count):
+        start = today + timedelta(days=rng.randint(0, 200))
+        queries.append((rng.choice(REGIONS), rng.sample(INTERESTS, rng.randint(1, 2)), start, start + timedelta(days=2)))
+    return queries
+
+
+def same_rows(expected: dict, actual: dict) -> bool:
+    # 카탈로그 좌표는 float32라 1m 안쪽 차이는 같은걸로 봄
+    coords_close = all(abs(expected[name] - actual[name]) < 1e-5 for name in ("latitude", "longitude"))
+    others = {key: value for key, value in expected.items() if key not in ("latitude", "longitude")}
+    return coords_close and others == {key: actual[key] for key in others}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--database-url", default=None, help="기본값은 임시 SQLite 파일")
+    args = parser.parse_args()
+
+    database_url = setup_env(args.database_url)
+    logging.disable(logging.INFO)
+
+    from src.catalog import CatalogSnapshot, build_regions
+    from src.db import SessionLocal, engine, get_tourist_info_from_db, upsert_tourist_info
+    from src.migrations import run_migrations
+    from src.openapi import TouristInfo
+
+    print(f"DB: {database_url}")
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        upsert_tourist_info(db, make_rows(args.rows))
+        db.commit()
+    finally:
+        db.close()
+
+    # --- 메모리 ---
+    snapshot, catalog_bytes, load_seconds = measure_retained(lambda: CatalogSnapshot(build_regions(SessionLocal)))
+    print(f"카탈로그 로드: {len(snapshot)}건 지역 {len(snapshot.regions)}개 {load_seconds:.2f}s")
+    print(f"  카탈로그 배열 크기(nbytes)   {_per_100k(snapshot.nbytes, len(snapshot))}")
+    print(f"  카탈로그 실제 할당량         {_per_100k(catalog_bytes, len(snapshot))}")
+
+    def _load_orm():
+        session = SessionLocal()
+        try:
+            return session.query(TouristInfo).all()
+        finally:
+            session.close()
+
+    orm_rows, orm_bytes, orm_seconds = measure_retained(_load_orm)
+    print(f"  ORM 객체로 전부 들고 있을때  {_per_100k(orm_bytes, len(orm_rows))} (로드 {orm_seconds:.2f}s)")
+    del orm_rows
+
+    # --- 조회 지연시간 ---
+    queries = make_queries(args.queries)
+    orm_samples, catalog_samples, mismatches = [], [], 0
+    db = SessionLocal()
+    try:
+        for region, interests, start, end in queries:
+            began = time.perf_counter()
+            expected = get_tourist_info_from_db(db, region, interests, start, end)
+            orm_samples.append(time.perf_counter() - began)
+
+            began = time.perf_counter()
+            actual = snapshot.filter(region, interests, start, end)
+            catalog_samples.append(time.perf_counter() - began)
+
+            if len(expected) != len(actual) or not all(same_rows(e, a) for e, a in zip(expected, actual)):
+                mismatches += 1
+    finally:
+        db.close()
+    print(format_latency("조회 (ORM, 복합 인덱스)", orm_samples))
+    print(format_latency("조회 (카탈로그)", catalog_samples))
+    print(f"결과 다른 조회: {mismatches}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
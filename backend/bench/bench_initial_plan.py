@@ -0,0 +1,132 @@
+"""
+초기 일정 생성 방식별 벤치마크임 (DB 후보 없는 웹 검색 경로).
+
+- agent: Agent가 LLM -> 검색 -> ... -> LLM 반복 (검색 결과가 다음 LLM 호출 프롬프트에 계속 쌓임, 최대 25번 반복)
+- structured: 검색 STRUCTURED_PLAN_MAX_SEARCHES번 병렬로 하고 구조화 출력 LLM 한번
+
+bench/fakes.py 가짜 LLM/검색 쓰고, 요청마다 UsageTracker로 LLM 호출 수/검색 수/토큰/걸린 시간 모아서 비교함.
+Agent 반복 횟수는 실제로 매번 다르니까 --agent-searches에 여러개 줘서 같이 봄 (24면 25번 반복 상한까지 다 쓴 경우).
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_initial_plan --requests 20 --agent-searches 3,8,24 --structured-searches 2
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from bench.common import percentiles, setup_env
+
+
+def build_user_requests(count: int, trip_days: int):
+    from src.models import UserRequest
+
+    requests = []
+    for i in range(count):
+        start = date(2025, 11, 1) + timedelta(days=i % 20)
+        requests.append(UserRequest(
+            region="서울" if i % 2 == 0 else "부산",
+            start_date=start,
+            end_date=start + timedelta(days=trip_days - 1),
+            age=30,
+            gender="여성",
+            interests=["문화", "음식", "축제"],
+        ))
+    return requests
+
+
+async def run_mode(user_requests, concurrency: int) -> Tuple[list, List[float], int]:
+    """요청들 `_generate_initial_plan`으로 돌리고 (사용량 요약들, 걸린 시간들, 실패 수) 돌려주는거."""
+    from src import llm
+    from src.usage import UsageTracker
+
+    semaphore = asyncio.Semaphore(concurrency)
+    summaries, wall_times, failures = [], [], 0
+
+    async def one(user_request):
+        nonlocal failures
+        async with semaphore:
+            usage = UsageTracker(budget=0)
+            started = time.perf_counter()
+            result = await llm._generate_initial_plan(user_request, None, [], usage)
+            wall_times.append(time.perf_counter() - started)
+            summaries.append(usage.summary())
+            if not isinstance(result, dict) or not any(day["recommendations"] for day in result["daily_recommendations"]):
+                failures += 1
+
+    await asyncio.gather(*(one(user_request) for user_request in user_requests))
+    return summaries, wall_times, failures
+
+
+def report(label: str, summaries, wall_times: List[float], failures: int) -> None:
+    count = len(summaries)
+    llm_calls = sum(summary.llm_calls for summary in summaries) / count
+    tool_calls = sum(summary.tool_calls for summary in summaries) / count
+    tokens = percentiles([summary.total_tokens for summary in summaries])
+    cost = sum(summary.estimated_cost_usd for summary in summaries) / count
+    wall = percentiles(wall_times)
+    print(f"{label:<22} llm={llm_calls:5.1f} search={tool_calls:5.1f} round_trips={llm_calls + tool_calls:5.1f} "
+          f"tokens p50={tokens['p50']:8.0f} mean={tokens['mean']:8.0f} cost=${cost:.5f} "
+          f"wall p50={wall['p50'] * 1000:8.1f}ms p95={wall['p95'] * 1000:8.1f}ms failed={failures}/{count}")
+
+
+async def main_async(args, fakes):
+    from src import llm
+    from src.db import engine
+    from src.migrations import run_migrations
+
+    # 임시 DB라서 테이블 만들어둬야 검색 캐시(search_cache)가 제대로 돎
+    run_migrations(engine)
+
+    user_requests = build_user_requests(args.requests, args.trip_days)
+    print(f"requests={args.requests} concurrency={args.concurrency} trip_days={args.trip_days} "
+          f"latency(llm={fakes.latency.llm * 1000:.0f}ms search={fakes.latency.search * 1000:.0f}ms) "
+          f"search_result_tokens={args.search_result_tokens}")
+
+    llm.INITIAL_PLAN_MODE = "agent"
+    for searches in args.agent_searches:
+        llm.agent_executor.searches_per_run = searches
+        report(f"agent (검색 {searches}회)", *await run_mode(user_requests, args.concurrency))
+
+    llm.INITIAL_PLAN_MODE = "structured"
+    for searches in args.structured_searches:
+        llm.STRUCTURED_PLAN_MAX_SEARCHES = searches
+        report(f"structured (검색 {searches}회)", *await run_mode(user_requests, args.concurrency))
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="초기 일정 생성 방식(agent/structured) 벤치마크")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--trip-days", type=int, default=3)
+    parser.add_argument("--agent-searches", type=_int_list, default=[3, 8, 24], help="Agent 한번 돌때 검색 횟수들 (쉼표로 구분)")
+    parser.add_argument("--structured-searches", type=_int_list, default=[0, 2], help="structured 모드 검색 횟수들 (쉼표로 구분)")
+    parser.add_argument("--search-result-tokens", type=int, default=400, help="검색 결과 하나가 프롬프트에서 차지하는 토큰 수")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--search-latency-ms", type=float, default=400.0)
+    args = parser.parse_args()
+
+    setup_env()
+    for upstream in ("OPENAI", "DUCKDUCKGO", "KAKAO"):
+        os.environ[f"{upstream}_RATE_PER_SECOND"] = "0"
+
+    from bench.fakes import FakeLatency, install_fakes
+
+    fakes = install_fakes(
+        FakeLatency(llm=args.llm_latency_ms / 1000, search=args.search_latency_ms / 1000),
+        search_result_tokens=args.search_result_tokens,
+    )
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main_async(args, fakes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+동선 최적화 벤치마크임 (LLM 호출 없이 최적화 단계만 따로 잼).
+여행 하나에 장소 5~30개를 무작위로 뿌려서 optimize_itinerary 실행 시간이랑
+LLM이 준 순서(입력 순서) 대비 이동거리 감소량을 보여줌.
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_itinerary --trips 200
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from bench.common import format_latency, setup_env
+
+HOURS = [None, "09:00-18:00", "10:30-21:30", "매일 18:00-24:00", "24시간", "화-일 10:00-18:00 (월요일 휴관)"]
+
+
+def make_trip(rng: random.Random, item_count: int, day_count: int):
+    from src.models import DailyRecommendation, RecommendationItem
+
+    # 부산 시내 정도 범위 (약 20km x 20km)
+    days = [DailyRecommendation(date=date(2025, 11, 1) + timedelta(days=i), recommendations=[]) for i in range(day_count)]
+    for i in range(item_count):
+        days[i % day_count].recommendations.append(RecommendationItem(
+            name=f"장소 {i}", description="", activity="", address="", image_url=None,
+            latitude=35.05 + rng.random() * 0.2, longitude=128.95 + rng.random() * 0.25,
+            operating_hours=rng.choice(HOURS),
+        ))
+    return days
+
+
+def travelled_km(days) -> float:
+    from src.itinerary import distance_matrix
+
+    total = 0.0
+    for day in days:
+        items = day.recommendations
+        if len(items) > 1:
+            dist = distance_matrix([item.latitude for item in items], [item.longitude for item in items])
+            total += sum(dist[i, i + 1] for i in range(len(items) - 1))
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trips", type=int, default=200)
+    parser.add_argument("--rebalance", action="store_true", help="날짜 재배정까지 같이 실행")
+    args = parser.parse_args()
+
+    setup_env()
+    from src.itinerary import optimize_itinerary
+
+    rng = random.Random(42)
+    for item_count in (5, 10, 20, 30):
+        samples, before_km, after_km = [], 0.0, 0.0
+        for _ in range(args.trips):
+            days = make_trip(rng, item_count, day_count=max(1, item_count // 3))
+            before_km += travelled_km(days)
+            began = time.perf_counter()
+            optimize_itinerary(days, rebalance_days=args.rebalance)
+            samples.append(time.perf_counter() - began)
+            after_km += travelled_km(days)
+        print(format_latency(f"{item_count} items/trip", samples)
+              + f"  km {before_km / args.trips:6.1f} -> {after_km / args.trips:6.1f}")
+
+    # 하루에 몰린 최악의 경우
+    samples = []
+    for _ in range(max(1, args.trips // 10)):
+        days = make_trip(rng, 30, day_count=1)
+        began = time.perf_counter()
+        optimize_itinerary(days, rebalance_days=args.rebalance)
+        samples.append(time.perf_counter() - began)
+    print(format_latency("30 items in one day", samples))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+ai_log 기록 방식별 핸들러 지연시간 벤치마크임.
+같은 응답 반환하는 FastAPI 핸들러 두개를 만들어서 동시 요청 보내고 비교함.
+
+- sync: 요청 처리 중에 세션으로 add/commit/refresh (예전 `log_ai_interaction` 방식, 이벤트 루프 막힘)
+- sink: `ai_log_sink.submit`으로 큐에 넣기만 함 (DB 쓰기는 백그라운드 배치)
+
+DB가 느린 상황 흉내내려고 SQL 실행마다 --db-latency-ms 만큼 쉬게 함.
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_log_sink --requests 500 --concurrency 50 --db-latency-ms 5
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, datetime
+
+from bench.common import format_latency, setup_env
+
+
+def log_ai_interaction(db, **values):
+    """예전 src/db.py에 있던 동기 기록 방식 그대로임 (비교 기준용). add/commit/refresh까지 요청 안에서 다 함."""
+    from src.openapi import AiLog
+
+    ai_log_entry = AiLog(**values)
+    db.add(ai_log_entry)
+    db.commit()
+    db.refresh(ai_log_entry)
+
+
+def build_app(SessionLocal, sink, ai_log_record, response, user_request):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    samples = {"sync": [], "sink": []}
+
+    @app.post("/sync")
+    async def sync_handler():
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            log_ai_interaction(
+                db=db,
+                request_time=datetime.now(),
+                user_input_json=user_request.model_dump_json(),
+                ai_response_json=response.model_dump_json(),
+                total_tokens=response.total_tokens,
+                agent_search_log=response.agent_search_log,
+                is_verified_success=response.is_verified_success,
+                cache_status="hit",
+            )
+        finally:
+            db.close()
+        samples["sync"].append(time.perf_counter() - started)
+        return response
+
+    @app.post("/sink")
+    async def sink_handler():
+        started = time.perf_counter()
+        await sink.submit(ai_log_record(user_request, response, "hit"))
+        samples["sink"].append(time.perf_counter() - started)
+        return response
+
+    return app, samples
+
+
+async def drive(app, path: str, request_count: int, concurrency: int):
+    """동시 요청 보내고 클라이언트 기준 지연시간 모으는거."""
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    client_samples = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(path)
+                response.raise_for_status()
+                client_samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(request_count)))
+        elapsed = time.perf_counter() - started
+    return client_samples, elapsed
+
+
+def count_rows(engine) -> int:
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM ai_log")).scalar()
+
+
+async def main_async(args):
+    from sqlalchemy import event
+
+    from src.db import engine, SessionLocal
+    from src.log_sink import AiLogSink, ai_log_record
+    from src.migrations import run_migrations
+    from src.models import UserRequest, RecommendationResponse, DailyRecommendation, RecommendationItem
+
+    run_migrations(engine)
+
+    latency = args.db_latency_ms / 1000.0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _slow_db(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(latency)
+
+    user_request = UserRequest(region="서울", start_date=date(2025, 11, 1), end_date=date(2025, 11, 3),
+                               age=27, gender="여성", interests=["문화", "음식"])
+    item = RecommendationItem(name="국립중앙박물관", description="설명", activity="관람",
+                              address="서울 용산구 서빙고로 137", image_url=None)
+    response = RecommendationResponse(
+        daily_recommendations=[DailyRecommendation(date=date(2025, 11, 1), recommendations=[item] * 3)],
+        is_verified_success=True, agent_search_log="bench", total_tokens=0,
+    )
+    sink = AiLogSink(engine=engine, max_queue=args.max_queue, batch_size=args.batch_size, flush_interval=0.2)
+    app, handler_samples = build_app(SessionLocal, sink, ai_log_record, response, user_request)
+
+    for path in ("/sync", "/sink"):
+        before = count_rows(engine)
+        client_samples, elapsed = await drive(app, path, args.requests, args.concurrency)
+        flush_started = time.perf_counter()
+        if path == "/sink":
+            await sink.aclose()
+        flush_seconds = time.perf_counter() - flush_started
+        written = count_rows(engine) - before
+        name = path.strip("/")
+        print(format_latency(f"{name} handler", handler_samples[name]))
+        print(format_latency(f"{name} client", client_samples))
+        print(f"{name:<28} throughput={args.requests / elapsed:8.1f} req/s rows written={written}"
+              + (f" (final flush {flush_seconds * 1000:.1f}ms, {sink.stats()})" if path == "/sink" else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ai_log 기록 방식별 핸들러 지연시간 벤치마크")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="SQL 실행마다 추가로 쉬는 시간")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--max-queue", type=int, default=1000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    setup_env(args.database_url)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
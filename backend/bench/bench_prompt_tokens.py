@@ -0,0 +1,180 @@
+"""
+프롬프트 토큰 회귀 벤치마크임. 같은 요청들로 예전 프롬프트(bench/fixtures/legacy_prompts.json)랑
+지금 프롬프트(src/llm.py, 안 바뀌는 앞부분 + 바뀌는 뒷부분)를 만들어서 단계별로
+
+- 호출당 입력 토큰
+- 호출당 캐시 토큰: 같은 단계에서 앞서 보낸 프롬프트들이랑 공통 앞부분이 제일 긴 것 기준으로
+  OpenAI 프롬프트 캐시 규칙(1024토큰부터 128 단위) 적용한 값
+- 캐시 반영 입력 비용 (캐시 토큰은 OPENAI_CACHED_PROMPT_PRICE_PER_1M 단가)
+
+비교함. 요청은 --distinct 종류의 지역/관심사/기간 중에서 앞쪽 종류가 더 자주 나오게 뽑고, 나이/성별은 매번 랜덤임
+(같은 지역/기간 요청이라도 사람마다 달라서 응답 캐시엔 안 걸리는 경우).
+요청 하나는 기본 경로대로 DB 후보 일정 생성 1번 + 변동 항목 --items개 중 검증 캐시에 없는(처음 나온) 항목 검증
+(묶음 검증 VERIFICATION_BATCH_SIZE개씩, 묶음 실패하면 항목별 Agent 검증)으로 셈. DB 후보 없을때 쓰는 agent/structured 일정 생성 프롬프트도 같이 잼.
+
+tiktoken 인코딩 파일 못 받는 환경이면 어림잡은 토큰 수로 비교함 (출력에 표시됨).
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_prompt_tokens --requests 300 --distinct 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List
+
+from bench.bench_tourist_query import INTERESTS, REGIONS, make_rows
+from bench.common import setup_env
+
+LEGACY_PROMPTS_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "legacy_prompts.json")
+# 단계마다 공통 앞부분 비교할 최근 프롬프트 수 (캐시 유지 시간 안에 들어온 요청 흉내)
+CACHE_WINDOW = 64
+
+
+def _search_results(keys: List[str], chars: int) -> str:
+    """`_search_context`랑 같은 모양의 가짜 검색 결과. 같은 검색어면 같은 결과."""
+    return "\n\n".join(f"검색어: {key}\n" + f"검색 결과: {key} 관련 최신 정보입니다. " * (chars // (len(key) + 20) + 1) for key in keys)
+
+
+def _candidates(rows_by_region: Dict[str, List[dict]], region: str, interests: List[str], start: date, end: date) -> List[dict]:
+    """`get_tourist_info_from_db`랑 같은 조건/순서로 메모리에서 후보 고르는거."""
+    from src.db import MAX_CANDIDATES, interest_prefix_groups, share_by_interest
+
+    in_period = [
+        (position, row) for position, row in enumerate(rows_by_region.get(region, []))
+        if (row["start_date"] is None or row["start_date"] <= end) and (row["end_date"] is None or row["end_date"] >= start)
+    ]
+    in_period.sort(key=lambda entry: (entry[1]["start_date"] is None, entry[0]))
+    groups = [[entry for entry in in_period if entry[1]["category_tag"].startswith(tuple(prefixes))][:MAX_CANDIDATES]
+              for prefixes in interest_prefix_groups(interests)]
+    picked = share_by_interest(groups, MAX_CANDIDATES, ident=lambda entry: entry[0],
+                               key=lambda entry: (entry[1]["start_date"] is None, entry[0]))
+    return [
+        {**row, "start_date": row["start_date"] and row["start_date"].isoformat(), "end_date": row["end_date"] and row["end_date"].isoformat()}
+        for _, row in picked
+    ]
+
+
+class CacheSimulator:
+    """단계별로 최근 프롬프트 들고 있다가, 새 프롬프트가 캐시에서 읽을 토큰 수 계산하는거."""
+
+    def __init__(self):
+        self.recent: Dict[str, List[str]] = defaultdict(list)
+
+    def send(self, stage: str, prompt: str) -> int:
+        from src.prompt_tokens import cacheable_tokens, common_prefix_tokens
+
+        recent = self.recent[stage]
+        longest = max(recent, key=lambda previous: len(os.path.commonprefix([previous, prompt])), default="")
+        cached = cacheable_tokens(common_prefix_tokens(longest, prompt)) if longest else 0
+        recent.append(prompt)
+        del recent[:-CACHE_WINDOW]
+        return cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--distinct", type=int, default=20, help="지역/관심사/기간 종류 수")
+    parser.add_argument("--rows", type=int, default=20_000, help="후보 뽑을 가짜 관광 정보 수")
+    parser.add_argument("--trip-days", type=int, default=3)
+    parser.add_argument("--items", type=int, default=6, help="요청당 검증할 변동 항목 수")
+    args = parser.parse_args()
+
+    setup_env()
+    logging.disable(logging.WARNING)
+
+    from src import llm
+    from src.models import RecommendationItem, UserRequest
+    from src.prompt_tokens import count_tokens, tokens_are_exact
+    from src.usage import OPENAI_CACHED_PROMPT_PRICE_PER_1M, OPENAI_PROMPT_PRICE_PER_1M
+
+    with open(LEGACY_PROMPTS_PATH, encoding="utf-8") as f:
+        legacy = json.load(f)
+
+    rows_by_region = defaultdict(list)
+    for row in make_rows(args.rows):
+        rows_by_region[row["region"]].append(row)
+
+    rng = random.Random(11)
+    kinds = []
+    for _ in range(args.distinct):
+        start = date.today() + timedelta(days=rng.randint(7, 120))
+        kinds.append((rng.choice(REGIONS), rng.sample(INTERESTS, rng.randint(1, 2)), start, start + timedelta(days=args.trip_days - 1)))
+    weights = [1 / (rank + 1) for rank in range(len(kinds))]
+
+    simulators = {"before": CacheSimulator(), "after": CacheSimulator()}
+    totals = {version: defaultdict(lambda: [0, 0, 0]) for version in simulators}  # 단계 -> [호출 수, 입력 토큰, 캐시 토큰]
+
+    def send(version: str, stage: str, prompt: str) -> None:
+        stage_totals = totals[version][stage]
+        stage_totals[0] += 1
+        stage_totals[1] += count_tokens(prompt)
+        stage_totals[2] += simulators[version].send(stage, prompt)
+
+    verified = set()
+    for _ in range(args.requests):
+        region, interests, start, end = rng.choices(kinds, weights)[0]
+        request = UserRequest(region=region, start_date=start, end_date=end, age=rng.randint(20, 60),
+                              gender=rng.choice(["여성", "남성"]), interests=interests)
+        candidates = _candidates(rows_by_region, region, interests, start, end)
+        variable = [candidate for candidate in candidates if candidate["is_variable"]][:args.items]
+        variable = [candidate for candidate in variable if candidate["content_id"] not in verified]
+        verified.update(candidate["content_id"] for candidate in variable)
+        items = [RecommendationItem(name=candidate["name_ko"], description="", address=candidate["address"], image_url=None,
+                                    activity="", start_date=candidate["start_date"], end_date=candidate["end_date"],
+                                    operating_hours=candidate["operating_hours"]) for candidate in variable]
+        fields = dict(region=region, duration=(end - start).days + 1, start_date=start.isoformat(), end_date=end.isoformat(),
+                      age=request.age, gender=request.gender, interests=", ".join(interests))
+        plan_search = _search_results([f"{region} {start.year}년 {start.month}월 축제 행사", f"{region} {interests[0]} 추천 장소 주소"],
+                                      llm.STRUCTURED_SEARCH_RESULT_CHARS)
+
+        send("before", "initial:grounded", legacy["GROUNDED_RECOMMENDATION_PROMPT_TEMPLATE"].format(
+            candidates=llm._format_candidates(candidates), **fields))
+        send("after", "initial:grounded", llm.build_grounded_prompt(request, candidates))
+        send("before", "initial:agent", legacy["INITIAL_RECOMMENDATION_PROMPT_TEMPLATE"].format(**fields))
+        send("after", "initial:agent", llm.build_initial_prompt(request))
+        send("before", "initial:structured", legacy["STRUCTURED_RECOMMENDATION_PROMPT_TEMPLATE"].format(search_results=plan_search, **fields))
+        send("after", "initial:structured", llm.build_structured_prompt(request, plan_search))
+
+        for batch_start in range(0, len(items), llm.VERIFICATION_BATCH_SIZE):
+            batch = items[batch_start:batch_start + llm.VERIFICATION_BATCH_SIZE]
+            batch_search = _search_results([f"{item.name} 운영 시간 가격 최신 정보" for item in batch], llm.STRUCTURED_SEARCH_RESULT_CHARS)
+            send("before", "verify_batch", legacy["BATCH_VERIFICATION_PROMPT_TEMPLATE"].format(
+                items=llm._format_batch_items(batch), search_results=batch_search))
+            send("after", "verify_batch", llm.build_batch_verification_prompt(batch, batch_search))
+        for item in items:
+            legacy_fields = dict(item_name=item.name, start_date=item.start_date or "N/A", end_date=item.end_date or "N/A",
+                                 operating_hours=item.operating_hours or "N/A")
+            send("before", "verify", legacy["VERIFICATION_PROMPT_TEMPLATE"].format(**legacy_fields))
+            send("after", "verify", llm.build_verification_prompt(item.name, item.start_date, item.end_date, item.operating_hours))
+
+    cached_ratio = OPENAI_CACHED_PROMPT_PRICE_PER_1M / OPENAI_PROMPT_PRICE_PER_1M
+    print(f"requests={args.requests} distinct={args.distinct} plan_mode={llm.INITIAL_PLAN_MODE} "
+          f"토큰={'tiktoken' if tokens_are_exact() else '어림값 (tiktoken 인코딩 없음)'}")
+    print(f"{'단계':<20} {'호출':>6} {'입력/호출 전':>12} {'입력/호출 후':>12} {'캐시/호출 전':>12} {'캐시/호출 후':>12} {'비용 환산 전→후':>18}")
+    request_totals = {version: [0, 0.0] for version in simulators}
+    for stage in totals["after"]:
+        row = []
+        for version in ("before", "after"):
+            calls, prompt_tokens, cached_tokens = totals[version][stage]
+            billed = prompt_tokens - cached_tokens + cached_tokens * cached_ratio
+            row.append((prompt_tokens / calls, cached_tokens / calls, billed / calls))
+            if stage in ("initial:grounded", "verify_batch"):
+                request_totals[version][0] += prompt_tokens
+                request_totals[version][1] += billed
+        (before_prompt, before_cached, before_billed), (after_prompt, after_cached, after_billed) = row
+        print(f"{stage:<20} {totals['after'][stage][0]:>6} {before_prompt:>12.0f} {after_prompt:>12.0f} "
+              f"{before_cached:>12.0f} {after_cached:>12.0f} {before_billed:>8.0f} → {after_billed:<8.0f}")
+    before_tokens, before_billed = (value / args.requests for value in request_totals["before"])
+    after_tokens, after_billed = (value / args.requests for value in request_totals["after"])
+    print(f"요청당 입력 토큰 (DB 후보 일정 + 묶음 검증): {before_tokens:.0f} → {after_tokens:.0f} ({after_tokens / before_tokens - 1:+.1%}), "
+          f"캐시 반영 {before_billed:.0f} → {after_billed:.0f} ({after_billed / before_billed - 1:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
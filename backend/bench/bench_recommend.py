@@ -0,0 +1,217 @@
+"""
+/recommend 전체 흐름 오프라인 벤치마크임. OpenAI, DuckDuckGo, 카카오는 bench/fakes.py의 가짜로 바꾸고
+(저장된 응답 + 정해진 지연시간), FastAPI 앱에 동시 요청 보내서 처리량/지연시간/이벤트 루프 지연/메모리 잼.
+다른 성능 개선할때 전후 비교하는 기준으로 씀.
+
+- 요청마다 날짜/나이를 바꿔서 응답 캐시(plan_cache)에 안 걸리게 함 (--distinct로 종류 수 조절).
+- --mode grounded: 더미 관광 데이터 넣어서 DB 후보 기반 경로 탐. --mode agent: DB 비워서 Agent 경로 탐.
+- 레이트 리밋은 기본으로 끔 (--keep-rate-limits 주면 .env 설정 그대로 씀).
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_recommend --requests 200 --concurrency 50 --llm-latency-ms 800 --search-latency-ms 400
+    python -m bench.bench_recommend --endpoint /recommend/stream --mode agent
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import time
+import tracemalloc
+from collections import Counter
+from datetime import date, timedelta
+from typing import List
+
+from bench.common import format_latency, percentiles, setup_env
+
+REGIONS = ["서울", "부산"]
+INTERESTS = [["문화", "음식"], ["자연", "축제"], ["음식", "쇼핑"], ["문화", "축제", "자연"]]
+
+
+def build_request_bodies(count: int, distinct: int, trip_days: int) -> List[dict]:
+    """요청 본문 만드는거. `distinct`개 종류를 돌려가며 씀 (같은 종류끼리는 캐시 적중)."""
+    bodies = []
+    for i in range(count):
+        variant = i % distinct
+        start = date(2025, 11, 1) + timedelta(days=variant % 300)
+        bodies.append({
+            "region": REGIONS[variant % len(REGIONS)],
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=trip_days - 1)).isoformat(),
+            # 나이 구간이랑 관심사까지 바꿔서 300개 넘어도 키 겹치지 않게 함
+            "age": 20 + (variant // 300) % 5 * 10,
+            "gender": "여성" if variant % 2 else "남성",
+            "interests": INTERESTS[(variant // 2) % len(INTERESTS)],
+        })
+    return bodies
+
+
+class LoopLagMonitor:
+    """일정 간격으로 깨어나서 예정보다 얼마나 늦게 깼는지 재는거 (이벤트 루프 막힘 정도)."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+async def asgi_post(app, path: str, body: dict):
+    """
+    ASGI 앱 직접 불러서 POST 하나 보내는거. httpx.ASGITransport는 응답 본문을 다 모은 다음 돌려줘서
+    스트리밍 첫 줄 도착 시간을 못 재길래 직접 만듦.
+
+    Returns:
+        (상태 코드, 본문 bytes, 첫 본문 조각 도착까지 걸린 시간(초))
+    """
+    payload = json.dumps(body).encode("utf-8")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    sent = False
+    started = time.perf_counter()
+    result = {"status": 0, "chunks": [], "first": None}
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.Event().wait()  # 클라이언트 안 끊김
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if result["first"] is None:
+                result["first"] = time.perf_counter() - started
+            result["chunks"].append(message["body"])
+
+    await app(scope, receive, send)
+    return result["status"], b"".join(result["chunks"]), result["first"]
+
+
+async def drive(app, endpoint: str, bodies: List[dict], concurrency: int):
+    """동시 요청 보내고 (지연시간, 첫 응답 조각까지 시간, 상태 코드, 캐시 상태) 모으는거."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, first_byte, statuses, cache_statuses = [], [], Counter(), Counter()
+
+    async def one(body: dict):
+        async with semaphore:
+            started = time.perf_counter()
+            status_code, content, first = await asgi_post(app, endpoint, body)
+            latencies.append(time.perf_counter() - started)
+            first_byte.append(first if first is not None else latencies[-1])
+            statuses[status_code] += 1
+            if status_code == 200:
+                lines = content.decode("utf-8").strip().splitlines()
+                last = json.loads(lines[-1]) if lines else {}
+                cache_statuses[last.get("cache_status", "?")] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(body) for body in bodies))
+    return latencies, first_byte, statuses, cache_statuses, time.perf_counter() - started
+
+
+def seed_tourist_info():
+    from src.db import SessionLocal
+    from src.seed_data import insert_dummy_tour_data
+
+    db = SessionLocal()
+    try:
+        insert_dummy_tour_data(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def main_async(args, fakes):
+    from src.app import app, startup_event, shutdown_event
+    from src.metrics import RECOMMEND_STAGE_SECONDS
+
+    await startup_event()
+    if args.mode == "grounded":
+        seed_tourist_info()
+
+    bodies = build_request_bodies(args.requests, args.distinct or args.requests, args.trip_days)
+    monitor = LoopLagMonitor()
+    if args.trace_memory:
+        tracemalloc.start()
+    monitor.start()
+    latencies, first_byte, statuses, cache_statuses, elapsed = await drive(app, args.endpoint, bodies, args.concurrency)
+    await monitor.stop()
+    peak_bytes = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+    tracemalloc.stop()
+    await shutdown_event()
+
+    lag = percentiles(monitor.samples)
+    print(f"endpoint={args.endpoint} mode={args.mode} requests={args.requests} concurrency={args.concurrency} "
+          f"latency(llm={fakes.latency.llm * 1000:.0f}ms search={fakes.latency.search * 1000:.0f}ms geocode={fakes.latency.geocode * 1000:.0f}ms)")
+    print(format_latency("request latency", latencies))
+    print(format_latency("time to first line", first_byte))
+    print(f"{'throughput':<28} {args.requests / elapsed:8.2f} req/s (total {elapsed:.2f}s)")
+    print(f"{'status codes':<28} {dict(statuses)} cache={dict(cache_statuses)}")
+    print(f"{'event loop lag':<28} p50={lag['p50'] * 1000:.2f}ms p99={lag['p99'] * 1000:.2f}ms "
+          f"max={max(monitor.samples, default=0.0) * 1000:.2f}ms")
+    traced = f"tracemalloc peak={peak_bytes / 1024 / 1024:.1f}MiB " if peak_bytes is not None else ""
+    print(f"{'memory':<28} {traced}max rss={resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f}MiB")
+    print(f"{'fake upstream calls':<28} llm={fakes.stats.llm_calls} search={fakes.stats.search_calls} "
+          f"geocode={fakes.stats.geocode_calls} agent_runs={fakes.stats.agent_runs}")
+    for stage, stats in RECOMMEND_STAGE_SECONDS.snapshot().items():
+        print(f"  stage {stage:<22} n={stats['count']:<6} avg={stats['avg'] * 1000:9.2f}ms "
+              f"p95~{(stats['p95'] or 0) * 1000:9.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/recommend 오프라인 벤치마크 (가짜 LLM/검색/카카오)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--endpoint", default="/recommend", choices=["/recommend", "/recommend/stream"])
+    parser.add_argument("--mode", default="grounded", choices=["grounded", "agent"])
+    parser.add_argument("--distinct", type=int, default=0, help="요청 종류 수 (0이면 전부 다른 요청)")
+    parser.add_argument("--trip-days", type=int, default=3)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--search-latency-ms", type=float, default=400.0)
+    parser.add_argument("--geocode-latency-ms", type=float, default=50.0)
+    parser.add_argument("--searches-per-run", type=int, default=2, help="가짜 Agent 한번 돌때 검색 횟수")
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc으로 최대 할당량 잼 (느려져서 지연시간 비교할땐 끄기)")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="upstream 레이트 리밋 끄지 않음")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    setup_env(args.database_url)
+    if not args.keep_rate_limits:
+        for upstream in ("OPENAI", "DUCKDUCKGO", "KAKAO"):
+            os.environ[f"{upstream}_RATE_PER_SECOND"] = "0"
+    logging.basicConfig(level=logging.WARNING)
+
+    from bench.fakes import FakeLatency, install_fakes
+
+    fakes = install_fakes(
+        FakeLatency(llm=args.llm_latency_ms / 1000, search=args.search_latency_ms / 1000, geocode=args.geocode_latency_ms / 1000),
+        searches_per_run=args.searches_per_run,
+    )
+    # src 모듈들이 import할때 INFO로 다시 맞춰놔서 벤치마크 출력 묻히지 않게 내림
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main_async(args, fakes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+웹 검색 캐시(src/search_cache.py) 벤치마크임. 검증 Agent들이 보내는 검색어처럼
+같은 장소를 여러 사용자가 조금씩 다르게("경복궁 운영시간", "경복궁 운영 시간?") 동시에 검색하는 부하 만들어서 비교함.
+
+- uncached: 가짜 검색 도구 그대로 씀 (레이트 리밋은 콜백으로 매번 기다림)
+- cached: CachedSearchTool로 감쌈 (정규화 + in-flight dedup + 실제 검색할때만 레이트 리밋)
+- restarted: cached 돌린 다음 인메모리 캐시만 새로 만든거 (재시작 흉내, DB에서 읽음)
+
+DuckDuckGo 레이트 리밋은 기본으로 켜둠 (.env 기본값이랑 같은 초당 1개, 버스트 3개). 검색 캐시가 제일 크게 줄이는게 이 대기 시간임.
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_search_cache --searches 120 --concurrency 20 --places 20
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import List
+
+from bench.common import percentiles, setup_env
+
+# 같은 의도를 조금씩 다르게 쓴 검색어 모양들
+QUERY_VARIANTS = [
+    "{place} 운영시간",
+    "{place} 운영 시간",
+    "{place}  운영시간?",
+    "{PLACE} 운영시간",
+    "{place} 운영시간 2025",
+    "{place} 휴무일",
+]
+
+
+def build_queries(places: List[str], count: int, seed: int) -> List[str]:
+    """장소들 중 인기 있는 곳이 더 자주 나오게(지프 분포 비슷하게) 검색어 `count`개 만드는거."""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(places))]
+    queries = []
+    for _ in range(count):
+        place = rng.choices(places, weights=weights)[0]
+        variant = rng.choice(QUERY_VARIANTS)
+        queries.append(variant.format(place=place, PLACE=place.upper()))
+    return queries
+
+
+async def run_mode(label: str, tool, queries: List[str], concurrency: int, fakes, bucket) -> None:
+    from src.rate_limit import rate_limit_callback
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    calls_before = fakes.stats.search_calls
+    throttled_before, wait_before = bucket.throttled, bucket.total_wait_seconds
+
+    async def one(query: str):
+        async with semaphore:
+            started = time.perf_counter()
+            await tool.ainvoke(query, config={"callbacks": [rate_limit_callback]})
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(query) for query in queries))
+    elapsed = time.perf_counter() - started
+
+    latency = percentiles(latencies)
+    print(f"{label:<10} upstream={fakes.stats.search_calls - calls_before:<5} "
+          f"throttled={bucket.throttled - throttled_before:<5} wait={bucket.total_wait_seconds - wait_before:8.1f}s "
+          f"latency p50={latency['p50'] * 1000:8.1f}ms p95={latency['p95'] * 1000:8.1f}ms total={elapsed:6.2f}s")
+
+
+async def main_async(args, fakes):
+    from bench.fakes import build_search_tool
+    from src.db import engine
+    from src.migrations import run_migrations
+    from src.rate_limit import get_rate_limiter
+    from src.search_cache import CachedSearchTool, SearchResultCache
+
+    run_migrations(engine)
+    places = [place["name"] for region in fakes.fixtures["initial_plans"].values() for place in region]
+    places += [f"장소{i}" for i in range(max(0, args.places - len(places)))]
+    places = places[:args.places]
+    queries = build_queries(places, args.searches, args.seed)
+
+    bucket = get_rate_limiter("duckduckgo")
+    print(f"searches={args.searches} places={len(places)} concurrency={args.concurrency} "
+          f"search_latency={fakes.latency.search * 1000:.0f}ms rate_limit={bucket.rate}/s burst={bucket.capacity:.0f}")
+
+    raw_tool = build_search_tool(fakes.fixtures, fakes.latency, fakes.stats)
+    await run_mode("uncached", raw_tool, queries, args.concurrency, fakes, bucket)
+
+    cache = SearchResultCache()
+    await run_mode("cached", CachedSearchTool(raw_tool, cache=cache), queries, args.concurrency, fakes, bucket)
+    print(f"           {cache.stats()}")
+
+    restarted = SearchResultCache()
+    await run_mode("restarted", CachedSearchTool(raw_tool, cache=restarted), queries, args.concurrency, fakes, bucket)
+    print(f"           {restarted.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="웹 검색 캐시 벤치마크")
+    parser.add_argument("--searches", type=int, default=120)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--places", type=int, default=20, help="검색 대상 장소 수")
+    parser.add_argument("--search-latency-ms", type=float, default=400.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-rate-limit", action="store_true", help="DuckDuckGo 레이트 리밋 끔")
+    args = parser.parse_args()
+
+    setup_env()
+    os.environ["DUCKDUCKGO_RATE_PER_SECOND"] = "0" if args.no_rate_limit else os.getenv("DUCKDUCKGO_RATE_PER_SECOND", "1")
+
+    from bench.fakes import FakeLatency, install_fakes
+
+    fakes = install_fakes(FakeLatency(search=args.search_latency_ms / 1000))
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main_async(args, fakes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+관심사 임베딩 인덱스(src/semantic_index.py) 벤치마크임.
+bench_tourist_query랑 같은 가짜 관광 정보 N건 넣고 인덱스 만든 다음
+
+- 만들기: 걸린 시간, 디스크 크기, 불러오기(메모리 매핑) 시간
+- 매칭 정확도: 고정 매핑(INTEREST_CATEGORY_PREFIXES)에 없는 자유 입력 관심사가 기대한 대분류 태그로 가는지
+- 조회: 지역 + 관심사 1~3개를 한번에 매칭하는 지연시간 (태그 + 그 지역 장소 구간 행렬곱)
+- 후보: 자유 입력 관심사로 조회했을때 DB 후보 찾은 조회 수 (인덱스 없으면 Agent 웹 검색으로 넘어감)
+
+출력함.
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_semantic_index --rows 100000 --queries 500
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from bench.bench_tourist_query import REGIONS, make_rows
+from bench.common import format_latency, setup_env
+
+# 자유 입력 관심사 -> 매칭돼야 하는 category_tag 대분류
+FREE_TEXT_INTERESTS = {
+    "맛집": "음식_", "먹거리": "음식_", "해산물": "음식_", "회": "음식_", "한정식": "음식_",
+    "바다": "자연_", "해수욕장": "자연_", "등산": "자연_", "산책": "자연_", "트레킹": "자연_",
+    "역사": "문화_", "전시": "문화_", "미술관": "문화_", "한옥": "문화_", "벽화": "문화_",
+    "백화점": "쇼핑_", "아울렛": "쇼핑_", "기념품": "쇼핑_",
+    "야경": "축제_", "불꽃놀이": "축제_", "페스티벌": "축제_",
+}
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--database-url", default=None, help="기본값은 임시 SQLite 파일")
+    args = parser.parse_args()
+
+    database_url = setup_env(args.database_url)
+    logging.disable(logging.INFO)
+
+    from src.db import SessionLocal, engine, get_tourist_info_from_db, upsert_tourist_info
+    from src.migrations import run_migrations
+    from src.semantic_index import HashingEmbedder, SemanticIndex, build_index, semantic_index_store
+
+    print(f"DB: {database_url}")
+    run_migrations(engine)
+    db = SessionLocal()
+    try:
+        upsert_tourist_info(db, make_rows(args.rows))
+        db.commit()
+    finally:
+        db.close()
+
+    # --- 만들기 / 불러오기 ---
+    index_dir = os.path.join(tempfile.mkdtemp(prefix="bench_semantic_"), "index")
+    started = time.perf_counter()
+    build_index(SessionLocal, index_dir, HashingEmbedder(dim=args.dim))
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    index = SemanticIndex(index_dir)
+    load_seconds = time.perf_counter() - started
+    print(f"인덱스: 태그 {len(index.categories)}개 장소 {len(index)}건 dim={args.dim} "
+          f"만들기 {build_seconds:.2f}s 디스크 {_dir_size(index_dir) / 1024 / 1024:.1f}MiB 불러오기 {load_seconds * 1000:.1f}ms")
+
+    # --- 매칭 정확도 ---
+    region = REGIONS[0]
+    resolved = index.resolve_interests(list(FREE_TEXT_INTERESTS), region)
+    correct = sum(1 for interest, expected in FREE_TEXT_INTERESTS.items()
+                  if resolved[interest] and resolved[interest][0].startswith(expected))
+    print(f"매칭 정확도 (첫번째 태그 대분류): {correct}/{len(FREE_TEXT_INTERESTS)}")
+    for interest, tags in resolved.items():
+        if not tags or not tags[0].startswith(FREE_TEXT_INTERESTS[interest]):
+            print(f"  틀림: {interest} -> {tags or '매칭 없음'} (기대 {FREE_TEXT_INTERESTS[interest]})")
+
+    # --- 조회 지연시간 ---
+    rng = random.Random(7)
+    queries = [(rng.choice(REGIONS), rng.sample(list(FREE_TEXT_INTERESTS), rng.randint(1, 3))) for _ in range(args.queries)]
+    index.resolve_interests(*reversed(queries[0]))
+    samples = []
+    for query_region, interests in queries:
+        began = time.perf_counter()
+        index.resolve_interests(interests, query_region)
+        samples.append(time.perf_counter() - began)
+    print(format_latency("관심사 매칭 (지역 + 1~3개)", samples))
+
+    # --- 후보 찾은 조회 수 ---
+    today = date.today()
+    db = SessionLocal()
+    try:
+        for label, loaded in (("인덱스 없음", False), ("인덱스 있음", True)):
+            if loaded:
+                semantic_index_store.load(index_dir)
+            found, total = 0, 0
+            for query_region, interests in queries[:100]:
+                candidates = get_tourist_info_from_db(db, query_region, interests, today, today + timedelta(days=2))
+                found += bool(candidates)
+                total += len(candidates)
+            print(f"후보 있는 조회 ({label}): {found}/100 (평균 후보 {total / 100:.1f}건)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
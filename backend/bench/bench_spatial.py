@@ -0,0 +1,64 @@
+"""
+공간 인덱스 벤치마크임.
+점 개수(기본 1만/10만/100만)별로 인덱스 생성 시간, 반경 검색, k-최근접 검색 지연시간을
+전체 배열 haversine 계산(인덱스 없음)이랑 비교해서 보여줌.
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_spatial --sizes 10000 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from bench.common import format_latency, setup_env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--radius-km", type=float, default=3.0)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_env()
+    from src.spatial import SpatialIndex, haversine_km
+
+    rng = np.random.default_rng(42)
+    for size in args.sizes:
+        # 한반도 남쪽 범위에 고르게 뿌림
+        latitudes = 33.0 + rng.random(size) * 5.5
+        longitudes = 126.0 + rng.random(size) * 3.5
+        ids = [f"P{i}" for i in range(size)]
+
+        began = time.perf_counter()
+        index = SpatialIndex(ids, latitudes, longitudes)
+        build_seconds = time.perf_counter() - began
+
+        queries = [(33.0 + rng.random() * 5.5, 126.0 + rng.random() * 3.5) for _ in range(args.queries)]
+        radius_samples, knn_samples, brute_samples = [], [], []
+        for lat, lon in queries:
+            began = time.perf_counter()
+            index.within_radius(lat, lon, args.radius_km)
+            radius_samples.append(time.perf_counter() - began)
+
+            began = time.perf_counter()
+            index.nearest(lat, lon, args.k)
+            knn_samples.append(time.perf_counter() - began)
+
+        for lat, lon in queries[:min(len(queries), 100)]:
+            began = time.perf_counter()
+            distances = haversine_km(lat, lon, latitudes, longitudes)
+            np.flatnonzero(distances <= args.radius_km)
+            brute_samples.append(time.perf_counter() - began)
+
+        print(f"--- {size:,} points (build {build_seconds * 1000:.1f}ms) ---")
+        print(format_latency(f"radius {args.radius_km}km (grid)", radius_samples))
+        print(format_latency(f"knn k={args.k} (grid)", knn_samples))
+        print(format_latency(f"radius {args.radius_km}km (brute)", brute_samples))
+
+
+if __name__ == "__main__":
+    main()
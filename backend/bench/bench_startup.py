@@ -0,0 +1,151 @@
+"""
+앱 시작 시간 벤치마크임. 매번 새 파이썬 프로세스 띄워서 오토스케일링 콜드 스타트처럼 잼.
+
+- import: `import src.app` 걸린 시간
+- startup: startup 이벤트(마이그레이션, 공간 인덱스, 작업 복구) 걸린 시간
+- first response: startup 끝나고 첫 요청(GET /metrics) 응답까지 걸린 시간 = 요청 받을 준비 완료
+- ready total: 프로세스 시작(인터프리터 포함)부터 첫 응답까지
+- warm-up: 백그라운드에서 LLM/Agent 클라이언트 다 만들때까지 (준비 완료엔 안 들어감)
+
+기본으로 프록시를 안 열린 포트로 잡아서 시작하다가 네트워크 타면 바로 실패하게 함 (--allow-network로 끔).
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_startup --runs 5
+    python -m bench.bench_startup --runs 1 --importtime 15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from bench.common import percentiles, setup_env
+
+_PROCESS_STARTED = time.perf_counter()
+
+OFFLINE_PROXY = "http://127.0.0.1:9"
+PHASES = ["import", "startup", "first response", "ready total", "warm-up"]
+
+
+async def asgi_get(app, path: str) -> int:
+    """ASGI 앱에 GET 하나 보내고 상태 코드 돌려주는거."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    result = {"status": 0}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+
+    await app(scope, receive, send)
+    return result["status"]
+
+
+async def child_async(timings: Dict[str, float]) -> None:
+    from src import app as app_module
+
+    started = time.perf_counter()
+    await app_module.startup_event()
+    timings["startup"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    timings["status"] = await asgi_get(app_module.app, "/metrics")
+    timings["first response"] = time.perf_counter() - started
+    timings["ready total"] = time.perf_counter() - _PROCESS_STARTED
+
+    if app_module._warmup_task is not None:
+        started = time.perf_counter()
+        await app_module._warmup_task
+        # 준비 완료 시점부터 클라이언트 다 만들어질때까지 더 걸린 시간
+        timings["warm-up"] = time.perf_counter() - started
+    await app_module.shutdown_event()
+
+
+def child_main() -> None:
+    """자식 프로세스에서 도는 부분. 잰 값을 JSON 한줄로 stdout에 출력함."""
+    import logging
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    import src.app  # noqa: F401
+    timings["import"] = time.perf_counter() - started
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(child_async(timings))
+    print(json.dumps(timings))
+
+
+def run_child(env: Dict[str, str], importtime: bool) -> subprocess.CompletedProcess:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-m", "bench.bench_startup", "--child"]
+    return subprocess.run(command, env=env, capture_output=True, text=True, cwd=os.getcwd())
+
+
+def top_imports(stderr: str, limit: int) -> List[str]:
+    """-X importtime 출력에서 누적 시간 큰 모듈 뽑는거."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line.split(":", 1)[1].split("|")]
+        rows.append((int(cumulative_us), int(self_us), name))
+    rows.sort(reverse=True)
+    return [f"  {cumulative / 1000:9.1f}ms cumulative {self_time / 1000:8.1f}ms self  {name}" for cumulative, self_time, name in rows[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="앱 import/시작 시간 벤치마크 (매번 새 프로세스)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-warmup", action="store_true", help="LLM_WARMUP_ON_STARTUP=0으로 띄움")
+    parser.add_argument("--allow-network", action="store_true", help="프록시 막는거 끔")
+    parser.add_argument("--importtime", type=int, default=0, help="첫 실행에서 import 누적 시간 상위 N개 모듈 출력 (백그라운드 워밍업 import도 포함)")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main()
+        return
+
+    setup_env(args.database_url)
+    env = dict(os.environ)
+    if args.no_warmup:
+        env["LLM_WARMUP_ON_STARTUP"] = "0"
+    if not args.allow_network:
+        for name in ("HTTP_PROXY", "HTTPS_PROXY", "http_proxy", "https_proxy", "ALL_PROXY", "all_proxy"):
+            env[name] = OFFLINE_PROXY
+        env["NO_PROXY"] = env["no_proxy"] = ""
+
+    samples: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+    for run in range(args.runs):
+        completed = run_child(env, importtime=bool(args.importtime) and run == 0)
+        if completed.returncode != 0:
+            print(completed.stderr[-2000:], file=sys.stderr)
+            raise SystemExit(f"{run + 1}번째 실행 실패 (exit {completed.returncode})")
+        timings = json.loads(completed.stdout.strip().splitlines()[-1])
+        for phase in PHASES:
+            if phase in timings:
+                samples[phase].append(timings[phase])
+        if args.importtime and run == 0:
+            print(f"import 누적 시간 상위 {args.importtime}개:")
+            print("\n".join(top_imports(completed.stderr, args.importtime)))
+
+    print(f"runs={args.runs} warmup={'off' if args.no_warmup else 'on'} network={'allowed' if args.allow_network else 'blocked'}")
+    for phase in PHASES:
+        if not samples[phase]:
+            continue
+        stats = percentiles(samples[phase])
+        print(f"{phase:<28} p50={stats['p50'] * 1000:9.1f}ms max={max(samples[phase]) * 1000:9.1f}ms "
+              f"mean={stats['mean'] * 1000:9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
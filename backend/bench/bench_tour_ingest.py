@@ -0,0 +1,190 @@
+"""
+Tour API 수집(src/tour_ingest.py) 벤치마크임. 로컬 스텁 서버가 페이지 단위 Tour API 응답을
+그때그때 만들어서 주고 (전체 목록 메모리에 안 올림), 같은 데이터를 세번 가져와서 비교함.
+
+- 1차: 빈 DB에 전부 새로 넣음 (inserted)
+- 2차: 그대로 다시 가져옴 (전부 unchanged, last_crawled_date만 갱신)
+- 3차: --changed-percent % 행 이름이 바뀐 다음 가져옴 (그만큼만 updated)
+- 4차: 일반 항목 --removed-percent %가 목록에서 빠진 다음 가져옴 (그만큼만 removed)
+
+처리량(건/초)이랑 최대 메모리(--trace-memory면 tracemalloc 최대 할당량, 아니면 max rss) 출력함.
+2차부터는 공간 인덱스 만들어둔 상태로 돌려서, 변경 이벤트 수랑 구독자별(검증 캐시/공간 인덱스/응답 캐시) 처리 시간도 출력함.
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_tour_ingest --rows 300000 --page-size 1000 --batch-size 500
+"""
+
+import argparse
+import json
+import logging
+import resource
+import threading
+import tracemalloc
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bench.common import setup_env
+
+AREA_CODES = ["1", "6", "39", "37", "31", "32"]
+CONTENT_TYPE_IDS = ["12", "14", "28", "32", "38", "39"]
+
+
+class StubTourApi:
+    """
+    areaBasedList2 / searchFestival2 흉내내는 스텁 서버 상태임.
+    `rows`개 일반 항목이랑 `festivals`개 축제를 번호로 만들어서, 요청 들어온 페이지 것만 그때 만듦.
+    `changed_percent`는 이름 바뀐 항목 비율(%)임 (번호 % 100 < changed_percent인 항목).
+    """
+
+    def __init__(self, rows: int, festivals: int):
+        self.rows = rows
+        self.festivals = festivals
+        self.changed_percent = 0
+        self.requests = 0
+
+    def _title(self, index: int, prefix: str) -> str:
+        suffix = " (리뉴얼)" if index % 100 < self.changed_percent else ""
+        return f"{prefix} {index}{suffix}"
+
+    def area_item(self, index: int) -> dict:
+        return {
+            "contentid": str(1_000_000 + index),
+            "contenttypeid": CONTENT_TYPE_IDS[index % len(CONTENT_TYPE_IDS)],
+            "title": self._title(index, "관광정보"),
+            "addr1": f"테스트시 테스트구 벤치로 {index}",
+            "addr2": "",
+            "areacode": AREA_CODES[index % len(AREA_CODES)],
+            "cat1": "A01" if index % 2 else "A02",
+            "cat2": "A0101",
+            "cat3": f"A010101{index % 10:02d}",
+            "firstimage": f"https://example.com/{index}.jpg" if index % 3 else "",
+            "mapx": f"{126.5 + (index % 10_000) / 10_000:.10f}",
+            "mapy": f"{35.0 + (index % 7_919) / 7_919:.10f}",
+            "modifiedtime": "20250101000000",
+        }
+
+    def festival_item(self, index: int) -> dict:
+        start = date(2025, 11, 1) + timedelta(days=index % 60)
+        return {
+            **self.area_item(index),
+            "contentid": str(9_000_000 + index),
+            "contenttypeid": "15",
+            "title": self._title(index, "축제"),
+            "eventstartdate": start.strftime("%Y%m%d"),
+            "eventenddate": (start + timedelta(days=3)).strftime("%Y%m%d"),
+        }
+
+    def page(self, operation: str, params: dict) -> dict:
+        self.requests += 1
+        page_size = int(params.get("numOfRows", 10))
+        page_no = int(params.get("pageNo", 1))
+        if operation == "searchFestival2":
+            total, make = self.festivals, self.festival_item
+        else:
+            # 관광타입 별로 나눠서 줌 (index % 타입 수가 같은 항목들)
+            type_id = params.get("contentTypeId")
+            slot = CONTENT_TYPE_IDS.index(type_id) if type_id in CONTENT_TYPE_IDS else 0
+            indexes = range(slot, self.rows, len(CONTENT_TYPE_IDS)) if type_id in CONTENT_TYPE_IDS else range(0)
+            total = len(indexes)
+
+            def make(i: int) -> dict:
+                return self.area_item(indexes[i])
+        start = (page_no - 1) * page_size
+        items = [make(i) for i in range(start, min(start + page_size, total))]
+        return {
+            "response": {
+                "header": {"resultCode": "0000", "resultMsg": "OK"},
+                "body": {"items": {"item": items} if items else "", "numOfRows": page_size, "pageNo": page_no, "totalCount": total},
+            }
+        }
+
+
+def start_stub_server(api: StubTourApi) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            body = json.dumps(api.page(url.path.strip("/"), params), ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json;charset=UTF-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_pass(label: str, base_url: str, args, today: date) -> None:
+    from src.change_events import tourist_info_changes
+    from src.tour_ingest import TourApiClient, ingest_tour_data
+
+    events_before = tourist_info_changes.stats()
+
+    if args.trace_memory:
+        tracemalloc.start()
+    with TourApiClient("bench-key", base_url=base_url) as client:
+        stats = ingest_tour_data(client, page_size=args.page_size, batch_size=args.batch_size, today=today)
+    peak = ""
+    if args.trace_memory:
+        peak = f"tracemalloc peak={tracemalloc.get_traced_memory()[1] / 1024 / 1024:6.1f}MiB "
+        tracemalloc.stop()
+    print(f"{label:<10} fetched={stats.fetched:<8} inserted={stats.inserted:<8} updated={stats.updated:<7} "
+          f"unchanged={stats.unchanged:<8} removed={stats.removed:<6} skipped={stats.skipped:<4} pages={stats.pages:<5} "
+          f"{stats.rows_per_second:9.0f} rows/s ({stats.elapsed_seconds:6.2f}s) {peak}"
+          f"max rss={resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f}MiB")
+    events = {key: round(value - events_before.get(key, 0), 3) for key, value in tourist_info_changes.stats().items()}
+    print(f"{'':<10} events {events}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tour API 수집 벤치마크 (로컬 스텁 서버)")
+    parser.add_argument("--rows", type=int, default=100_000, help="일반 관광 정보 건수")
+    parser.add_argument("--festivals", type=int, default=2_000, help="축제 건수")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--changed-percent", type=int, default=5, help="3차 수집때 바뀌는 항목 비율(%%)")
+    parser.add_argument("--removed-percent", type=int, default=1, help="4차 수집때 빠지는 일반 항목 비율(%%)")
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc으로 최대 할당량 잼 (느려짐)")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    setup_env(args.database_url)
+    logging.basicConfig(level=logging.WARNING)
+
+    from src.change_events import subscribe_cache_invalidation
+    from src.db import SessionLocal, engine
+    from src.migrations import run_migrations
+    from src.spatial import spatial_index_store
+
+    run_migrations(engine)
+    subscribe_cache_invalidation()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    api = StubTourApi(args.rows, args.festivals)
+    server = start_stub_server(api)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"rows={args.rows} festivals={args.festivals} page_size={args.page_size} batch_size={args.batch_size} "
+          f"db={engine.dialect.name}")
+    # 없어진 행은 last_crawled_date 보고 찾아서 수집마다 날짜 하루씩 넘김
+    today = date.today()
+    try:
+        run_pass("initial", base_url, args, today)
+        spatial_index_store.load_from_db(SessionLocal)
+        run_pass("same", base_url, args, today + timedelta(days=1))
+        api.changed_percent = args.changed_percent
+        run_pass(f"changed {args.changed_percent}%", base_url, args, today + timedelta(days=2))
+        api.rows = args.rows * (100 - args.removed_percent) // 100
+        run_pass(f"removed {args.removed_percent}%", base_url, args, today + timedelta(days=3))
+    finally:
+        server.shutdown()
+    print(f"stub requests={api.requests}")
+
+
+if __name__ == "__main__":
+    main()
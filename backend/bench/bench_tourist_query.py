@@ -0,0 +1,123 @@
+"""
+tourist_info 조회 벤치마크임.
+가짜 관광 정보 N건(기본 10만건)을 upsert로 넣고, 지역/관심사/기간 조회 지연시간을
+복합 인덱스 있을때랑 없을때 비교해서 보여줌.
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_tourist_query --rows 100000 --queries 500
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from bench.common import format_latency, setup_env
+
+REGIONS = ["서울", "부산", "제주", "전주", "강릉", "경주", "여수", "대구", "인천", "광주",
+           "대전", "울산", "수원", "춘천", "속초", "통영", "안동"]
+CATEGORY_TAGS = ["자연_공원", "자연_산", "자연_해변", "문화_박물관", "문화_마을", "문화_전통시장",
+                 "음식_한식", "음식_해산물", "음식_시장", "쇼핑_백화점", "쇼핑_아울렛",
+                 "축제_빛축제", "축제_음식", "축제_불꽃"]
+INTERESTS = ["음식", "문화", "자연", "쇼핑"]
+
+
+def make_rows(count: int, seed: int = 42):
+    """가짜 tourist_info 행 만드는거. 축제_ 태그는 기간 있는 행사로 만듦."""
+    rng = random.Random(seed)
+    today = date.today()
+    rows = []
+    for i in range(count):
+        category_tag = rng.choice(CATEGORY_TAGS)
+        is_festival = category_tag.startswith("축제_")
+        start = today + timedelta(days=rng.randint(-60, 300)) if is_festival else None
+        rows.append({
+            "content_id": f"BENCH{i:07d}",
+            "name_ko": f"장소 {i}",
+            "region": rng.choice(REGIONS),
+            "address": f"가상시 가상구 벤치로 {i}",
+            "latitude": round(33.0 + rng.random() * 5.5, 7),
+            "longitude": round(126.0 + rng.random() * 3.5, 7),
+            "content_type": "축제/행사" if is_festival else "관광지",
+            "category_tag": category_tag,
+            "image_url": None,
+            "is_variable": is_festival or rng.random() < 0.2,
+            "last_crawled_date": today,
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randint(1, 30)) if start else None,
+            "operating_hours": "09:00-18:00",
+        })
+    return rows
+
+
+def run_queries(session_factory, get_tourist_info_from_db, query_count: int, seed: int = 7):
+    rng = random.Random(seed)
+    today = date.today()
+    samples = []
+    db = session_factory()
+    try:
+        for _ in range(query_count):
+            start = today + timedelta(days=rng.randint(0, 200))
+            interests = rng.sample(INTERESTS, rng.randint(1, 2))
+            began = time.perf_counter()
+            get_tourist_info_from_db(db, rng.choice(REGIONS), interests, start, start + timedelta(days=2))
+            samples.append(time.perf_counter() - began)
+    finally:
+        db.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--database-url", default=None, help="기본값은 임시 SQLite 파일")
+    args = parser.parse_args()
+
+    database_url = setup_env(args.database_url)
+
+    import logging
+    logging.disable(logging.INFO)
+
+    from src.db import SessionLocal, engine, get_tourist_info_from_db, upsert_tourist_info
+    from src.migrations import run_migrations
+    from src.openapi import TouristInfo
+
+    print(f"DB: {database_url}")
+    run_migrations(engine)
+
+    rows = make_rows(args.rows)
+    began = time.perf_counter()
+    db = SessionLocal()
+    try:
+        upsert_tourist_info(db, rows)
+        db.commit()
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - began
+    print(f"적재: {len(rows)}건 {elapsed:.2f}s ({len(rows) / elapsed:,.0f} rows/s)")
+
+    # 같은 데이터 다시 upsert해도 행 수 안 늘어나는지 확인 (content_id unique)
+    db = SessionLocal()
+    try:
+        upsert_tourist_info(db, rows[:1000])
+        db.commit()
+        total = db.query(TouristInfo).count()
+    finally:
+        db.close()
+    print(f"재적재 후 행 수: {total}")
+
+    print(format_latency("조회 (복합 인덱스 사용)", run_queries(SessionLocal, get_tourist_info_from_db, args.queries)))
+
+    composite_indexes = [index for index in TouristInfo.__table__.indexes if not index.unique]
+    for index in composite_indexes:
+        index.drop(bind=engine)
+    try:
+        print(format_latency("조회 (복합 인덱스 없음)", run_queries(SessionLocal, get_tourist_info_from_db, args.queries)))
+    finally:
+        for index in composite_indexes:
+            index.create(bind=engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+검증 방식별 벤치마크임. 여행 하나의 검증 대상 항목들을 항목마다 Agent 따로(per-item) 돌리는거랑
+VERIFICATION_BATCH_SIZE개씩 묶어서 한번에(batch) 검증하는거 비교함.
+
+bench/fakes.py 가짜 LLM/검색 쓰고, 요청마다 UsageTracker로 LLM 호출 수/검색 수/토큰/걸린 시간 모음.
+모드마다 검증 캐시 비우고, 요청끼리 캐시 안 겹치게 운영 시간에 요청 번호 붙임.
+저장된 응답에서 검증 못하는 항목(성수동 카페거리)은 묶음에서 빠져서 항목별 검증으로 넘어감.
+
+실행 방법 (backend 폴더에서):
+    python -m bench.bench_verification --requests 20 --batch-sizes 1,3,5,9
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import List
+
+from bench.common import percentiles, setup_env
+
+
+def build_trip_items(fixtures: dict, region: str, request_index: int):
+    from src.models import RecommendationItem
+
+    items = []
+    for place in fixtures["initial_plans"][region]:
+        items.append(RecommendationItem(
+            name=place["name"],
+            description=place["description"],
+            activity=place["activity"],
+            address=place["address"],
+            image_url=place.get("image_url"),
+            start_date=place.get("start_date"),
+            end_date=place.get("end_date"),
+            operating_hours=f"{place.get('operating_hours') or ''} #{request_index}",
+        ))
+    return items
+
+
+async def run_mode(fixtures: dict, args) -> None:
+    from sqlalchemy import text
+
+    from src import llm
+    from src.db import engine
+    from src.usage import UsageTracker
+    from src.verification_cache import VerificationResultCache
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM verification_cache"))
+    llm.verification_cache = VerificationResultCache()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    summaries, wall_times, item_counts = [], [], []
+    outcome_kinds = {"batch": 0, "per-item": 0, "failed": 0}
+
+    async def one(request_index: int):
+        items = build_trip_items(fixtures, args.region, request_index)
+        async with semaphore:
+            usage = UsageTracker(budget=0)
+            started = time.perf_counter()
+            async for item, outcome in llm._verify_as_completed(items, usage):
+                if not outcome.is_success:
+                    outcome_kinds["failed"] += 1
+                elif "(묶음 검증)" in outcome.log_message:
+                    outcome_kinds["batch"] += 1
+                else:
+                    outcome_kinds["per-item"] += 1
+            wall_times.append(time.perf_counter() - started)
+            summaries.append(usage.summary())
+            item_counts.append(len(items))
+
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+
+    count = len(summaries)
+    tokens = percentiles([summary.total_tokens for summary in summaries])
+    wall = percentiles(wall_times)
+    label = "per-item" if llm.VERIFICATION_BATCH_SIZE <= 1 else f"batch (k={llm.VERIFICATION_BATCH_SIZE})"
+    print(f"{label:<16} items={item_counts[0]} llm={sum(s.llm_calls for s in summaries) / count:5.1f} "
+          f"search={sum(s.tool_calls for s in summaries) / count:5.1f} tokens p50={tokens['p50']:8.0f} "
+          f"cost=${sum(s.estimated_cost_usd for s in summaries) / count:.5f} "
+          f"wall p50={wall['p50'] * 1000:8.1f}ms p95={wall['p95'] * 1000:8.1f}ms "
+          f"resolved(batch={outcome_kinds['batch']} per-item={outcome_kinds['per-item']} failed={outcome_kinds['failed']})")
+
+
+async def main_async(args, fakes):
+    from src import llm
+    from src.db import engine
+    from src.migrations import run_migrations
+
+    run_migrations(engine)
+    print(f"requests={args.requests} concurrency={args.concurrency} region={args.region} "
+          f"latency(llm={fakes.latency.llm * 1000:.0f}ms search={fakes.latency.search * 1000:.0f}ms) "
+          f"agent_searches={args.agent_searches} search_result_tokens={args.search_result_tokens} "
+          f"scheduler_concurrency={llm.verification_scheduler.max_concurrency}")
+    for batch_size in args.batch_sizes:
+        llm.VERIFICATION_BATCH_SIZE = batch_size
+        await run_mode(fakes.fixtures, args)
+    await llm.verification_scheduler.aclose()
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="항목별 vs 묶음 검증 벤치마크")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--region", default="서울", choices=["서울", "부산"])
+    parser.add_argument("--batch-sizes", type=_int_list, default=[1, 3, 5, 9], help="묶음 크기들 (1이면 항목별 검증)")
+    parser.add_argument("--agent-searches", type=int, default=2, help="항목별 검증 Agent 한번 돌때 검색 횟수")
+    parser.add_argument("--search-result-tokens", type=int, default=400, help="검색 결과 하나가 프롬프트에서 차지하는 토큰 수")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--search-latency-ms", type=float, default=400.0)
+    args = parser.parse_args()
+
+    setup_env()
+    for upstream in ("OPENAI", "DUCKDUCKGO", "KAKAO"):
+        os.environ[f"{upstream}_RATE_PER_SECOND"] = "0"
+
+    from bench.fakes import FakeLatency, install_fakes
+
+    fakes = install_fakes(
+        FakeLatency(llm=args.llm_latency_ms / 1000, search=args.search_latency_ms / 1000),
+        searches_per_run=args.agent_searches,
+        search_result_tokens=args.search_result_tokens,
+    )
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main_async(args, fakes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+벤치마크 스크립트들이 같이 쓰는 헬퍼 모아둔 파일임.
+"""
+
+import os
+import statistics
+import tempfile
+from typing import Dict, List
+
+
+def setup_env(database_url: str = None) -> str:
+    """
+    src 모듈 import 전에 불러야 하는 환경 변수 세팅하는거.
+    DB 주소 안 주면 임시 SQLite 파일 씀. API 키는 벤치마크에서 실제로 안 쓰니까 더미값 넣음.
+    """
+    if database_url is None:
+        database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench_"), "bench.db")
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("OPENAI_API_KEY", "bench-dummy-key")
+    os.environ.setdefault("KAKAO_API_KEY", "bench-dummy-key")
+    return database_url
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/평균 계산하는거."""
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    ordered = sorted(samples)
+
+    def _pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {"p50": _pick(0.50), "p95": _pick(0.95), "p99": _pick(0.99), "mean": statistics.fmean(ordered)}
+
+
+def format_latency(label: str, samples_seconds: List[float]) -> str:
+    """지연시간 샘플(초)을 ms 단위 한줄 요약으로 바꾸는거."""
+    stats = percentiles(samples_seconds)
+    return (f"{label:<28} n={len(samples_seconds):<6} "
+            f"p50={stats['p50'] * 1000:8.3f}ms p95={stats['p95'] * 1000:8.3f}ms "
+            f"p99={stats['p99'] * 1000:8.3f}ms mean={stats['mean'] * 1000:8.3f}ms")
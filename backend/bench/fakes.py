@@ -0,0 +1,321 @@
+"""
+벤치마크용 가짜 외부 API 모아둔 파일임. OpenAI, DuckDuckGo, 카카오 안 부르고
+bench/fixtures/recorded_responses.json에 저장해둔 응답을 정해진 지연시간 뒤에 돌려줌.
+
+- RecordedChatModel: `llm_agent` 대신 씀. LangChain 채팅 모델이라 콜백(레이트 리밋, 토큰 집계) 그대로 탐.
+  `with_structured_output()`도 흉내냄 (저장된 응답에서 JSON 잘라서 스키마로 검증).
+- RecordedSearchTool: `search_tool` 대신 씀. LangChain 도구라 on_tool_start 콜백 탐.
+  실제랑 똑같이 SEARCH_CACHE_ENABLED면 CachedSearchTool로 감싸서 끼움.
+- RecordedAgentExecutor: `agent_executor` 대신 씀. 진짜 Agent처럼 LLM -> 검색 -> ... -> LLM 순서로 부르고,
+  앞에서 받은 검색 결과를 다음 LLM 호출 프롬프트에 계속 붙여서 보냄 (중간 기록 누적).
+- recorded_kakao_transport: `geocoder`에 끼우는 httpx.MockTransport (keyword.json 응답 재생).
+
+src.llm은 클라이언트를 처음 쓸때 만들어서, `install_fakes()`로 먼저 끼워두면 진짜 클라이언트는 안 만들어짐.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+import typing
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "recorded_responses.json")
+
+_PERIOD_PATTERN = re.compile(r"\((\d{4}-\d{2}-\d{2}) ~ (\d{4}-\d{2}-\d{2})\)")
+_REGION_PATTERN = re.compile(r"- 지역: (.+)")
+_ITEM_NAME_PATTERN = re.compile(r"- 이름: (.+)")
+_CANDIDATE_PATTERN = re.compile(r"^(\S+) \| ", re.M)
+_BATCH_ITEM_PATTERN = re.compile(r"^(\d+)\. 이름: (.+?) \| ", re.M)
+# 저장된 검색 결과는 전부 이걸로 시작함. 프롬프트에 몇개 들어갔는지 세서 입력 토큰에 더함.
+SEARCH_RESULT_PREFIX = "검색 결과:"
+
+
+@dataclass
+class FakeLatency:
+    """가짜 외부 API별 지연시간(초)."""
+    llm: float = 0.8
+    search: float = 0.4
+    geocode: float = 0.05
+
+
+@dataclass
+class FakeCallStats:
+    """가짜 외부 API 호출 횟수."""
+    llm_calls: int = 0
+    search_calls: int = 0
+    geocode_calls: int = 0
+    agent_runs: int = 0
+
+
+def load_fixtures(path: str = FIXTURE_PATH) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _trip_dates(prompt: str) -> List[str]:
+    match = _PERIOD_PATTERN.search(prompt)
+    if match is None:
+        return [date.today().isoformat()]
+    start, end = date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+class RecordedResponder:
+    """프롬프트 보고 어떤 저장된 응답 돌려줄지 고르는거."""
+
+    def __init__(self, fixtures: dict, items_per_day: int = 3):
+        self.fixtures = fixtures
+        self.items_per_day = items_per_day
+
+    def stage_of(self, prompt: str) -> str:
+        if "[검증 대상 목록]" in prompt:
+            return "verification_batch"
+        if "검증 전문가" in prompt:
+            return "verification"
+        if "content_id" in prompt:
+            return "initial_grounded"
+        if "[웹 검색 결과]" in prompt:
+            return "initial_structured"
+        return "initial_agent"
+
+    def item_count(self, prompt: str) -> int:
+        """묶음 검증 프롬프트면 항목 수, 아니면 1."""
+        return max(1, len(_BATCH_ITEM_PATTERN.findall(prompt)))
+
+    def respond(self, prompt: str) -> str:
+        stage = self.stage_of(prompt)
+        if stage == "verification_batch":
+            return self._verification_batch(prompt)
+        if stage == "verification":
+            return self._verification(prompt)
+        if stage == "initial_grounded":
+            return self._grounded_plan(prompt)
+        return self._agent_plan(prompt)
+
+    def _verification(self, prompt: str) -> str:
+        match = _ITEM_NAME_PATTERN.search(prompt)
+        verifications = self.fixtures["verifications"]
+        recorded = verifications.get(match.group(1).strip() if match else "", verifications["_default"])
+        return recorded if isinstance(recorded, str) else json.dumps(recorded, ensure_ascii=False)
+
+    def _verification_batch(self, prompt: str) -> str:
+        # JSON 아닌 저장 응답(검증 못한 경우)은 found=false로 돌려줘서 항목별 검증으로 넘어가게 함
+        verifications = self.fixtures["verifications"]
+        results = []
+        for index, name in _BATCH_ITEM_PATTERN.findall(prompt):
+            recorded = verifications.get(name.strip(), verifications["_default"])
+            found = isinstance(recorded, dict)
+            data = recorded if found else {}
+            checked = data.get("verification_results", {})
+            results.append({"item_index": int(index), "found": found, "details": {
+                "operating_status": checked.get("operating_status", "정보 없음"),
+                "end_or_cancel_status": checked.get("end_or_cancel_status", "정보 없음"),
+                "latest_price_info": checked.get("latest_price_info", "정보 없음"),
+                "schedule_change_and_notes": checked.get("schedule_change_and_notes", "정보 없음"),
+                "reliability_score": data.get("reliability_score", 0),
+                "reliability_reason": data.get("reliability_reason", "정보 없음"),
+            }})
+        return json.dumps({"results": results}, ensure_ascii=False)
+
+    def _agent_plan(self, prompt: str) -> str:
+        match = _REGION_PATTERN.search(prompt)
+        plans = self.fixtures["initial_plans"]
+        places = plans.get(match.group(1).strip() if match else "", next(iter(plans.values())))
+        days = []
+        for day_index, day in enumerate(_trip_dates(prompt)):
+            picks = [places[(day_index * self.items_per_day + i) % len(places)] for i in range(self.items_per_day)]
+            days.append({"date": day, "recommendations": picks})
+        return "추천 결과입니다.\n```json\n" + json.dumps({"daily_recommendations": days}, ensure_ascii=False) + "\n```"
+
+    def _grounded_plan(self, prompt: str) -> str:
+        # 후보 목록은 요청마다 달라서 저장된 응답 대신 후보 content_id를 순서대로 날짜에 나눠 담음
+        candidate_ids = _CANDIDATE_PATTERN.findall(prompt.split("[후보 장소 목록]")[-1])
+        days = []
+        for day_index, day in enumerate(_trip_dates(prompt)):
+            picks = candidate_ids[day_index * self.items_per_day:(day_index + 1) * self.items_per_day]
+            days.append({"date": day, "recommendations": [
+                {"content_id": content_id, "description": "벤치마크 설명", "activity": "벤치마크 활동"} for content_id in picks
+            ]})
+        return json.dumps({"daily_recommendations": days}, ensure_ascii=False)
+
+
+def _fill_missing_nulls(schema, data):
+    """strict 구조화 출력은 모든 필드를 다 채워서 주니까, 저장된 응답에 빠진 필드는 null로 채우는거."""
+    if not isinstance(data, dict):
+        return data
+    for name, field_info in schema.model_fields.items():
+        data.setdefault(name, None)
+        for arg in typing.get_args(field_info.annotation) or (field_info.annotation,):
+            if isinstance(arg, type) and hasattr(arg, "model_fields"):
+                value = data[name]
+                for child in value if isinstance(value, list) else [value]:
+                    _fill_missing_nulls(arg, child)
+    return data
+
+
+def build_chat_model(responder: RecordedResponder, latency: FakeLatency, stats: FakeCallStats, search_result_tokens: int = 0):
+    """
+    RecordedChatModel 인스턴스 만드는거 (langchain import를 install_fakes 뒤로 미루려고 함수로 뺌).
+    입력 토큰은 저장된 사용량에 프롬프트에 들어간 검색 결과 수 x `search_result_tokens`를 더한 값으로 침.
+    """
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+    from langchain_core.runnables import RunnableLambda
+
+    usage_by_stage = responder.fixtures["usage"]
+
+    class RecordedChatModel(BaseChatModel):
+        @property
+        def _llm_type(self) -> str:
+            return "recorded"
+
+        def _result(self, messages) -> ChatResult:
+            prompt = "\n".join(str(message.content) for message in messages)
+            stage = responder.stage_of(prompt)
+            usage = usage_by_stage[stage]
+            input_tokens = usage["input_tokens"] + prompt.count(SEARCH_RESULT_PREFIX) * search_result_tokens
+            output_tokens = usage["output_tokens"] * responder.item_count(prompt)
+            message = AIMessage(content=responder.respond(prompt), usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            })
+            stats.llm_calls += 1
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+            time.sleep(latency.llm)
+            return self._result(messages)
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+            await asyncio.sleep(latency.llm)
+            return self._result(messages)
+
+        def with_structured_output(self, schema, *, include_raw: bool = False, **kwargs: Any):
+            """json_schema 구조화 출력 흉내내는거. 응답에서 처음 `{`부터 마지막 `}`까지 잘라서 스키마로 검증함."""
+            def _parse(message):
+                parsed, error = None, None
+                try:
+                    text = message.content
+                    data = json.loads(text[text.index("{"):text.rindex("}") + 1])
+                    parsed = schema.model_validate(_fill_missing_nulls(schema, data))
+                except Exception as e:
+                    error = e
+                if include_raw:
+                    return {"raw": message, "parsed": parsed, "parsing_error": error}
+                if error is not None:
+                    raise error
+                return parsed
+
+            return self | RunnableLambda(_parse)
+
+    return RecordedChatModel()
+
+
+def build_search_tool(fixtures: dict, latency: FakeLatency, stats: FakeCallStats):
+    """RecordedSearchTool 인스턴스 만드는거."""
+    from langchain_core.tools import BaseTool
+
+    recorded = fixtures["search"]
+
+    def _lookup(query: str) -> str:
+        stats.search_calls += 1
+        for keyword, result in recorded.items():
+            if keyword != "_default" and keyword in query:
+                return result
+        return recorded["_default"]
+
+    class RecordedSearchTool(BaseTool):
+        name: str = "duckduckgo_search"
+        description: str = "저장된 DuckDuckGo 검색 결과를 돌려주는 벤치마크용 도구"
+
+        def _run(self, query: str, **kwargs: Any) -> str:
+            time.sleep(latency.search)
+            return _lookup(query)
+
+        async def _arun(self, query: str, **kwargs: Any) -> str:
+            await asyncio.sleep(latency.search)
+            return _lookup(query)
+
+    return RecordedSearchTool()
+
+
+class RecordedAgentExecutor:
+    """
+    `AgentExecutor.ainvoke` 흉내내는거. LLM 부르고 검색하는걸 `searches_per_run`번 반복한 다음
+    마지막 LLM 응답을 output으로 돌려줌 (LLM 호출 수 = searches_per_run + 1).
+    """
+
+    def __init__(self, chat_model, search_tool, stats: FakeCallStats, searches_per_run: int = 2):
+        self.chat_model = chat_model
+        self.search_tool = search_tool
+        self.stats = stats
+        self.searches_per_run = searches_per_run
+
+    async def ainvoke(self, inputs: Dict[str, Any], config: Optional[dict] = None, **kwargs: Any) -> Dict[str, Any]:
+        self.stats.agent_runs += 1
+        prompt = inputs["input"]
+        match = _ITEM_NAME_PATTERN.search(prompt) or _REGION_PATTERN.search(prompt)
+        query = match.group(1).strip() if match else "여행지"
+        scratchpad = ""
+        for _ in range(self.searches_per_run):
+            await self.chat_model.ainvoke(prompt + scratchpad, config=config)
+            observation = await self.search_tool.ainvoke(query, config=config)
+            scratchpad += f"\n{observation}"
+        final = await self.chat_model.ainvoke(prompt + scratchpad, config=config)
+        return {"input": prompt, "output": final.content}
+
+
+def recorded_kakao_transport(fixtures: dict, latency: FakeLatency, stats: FakeCallStats):
+    """카카오 keyword.json 응답 재생하는 httpx.MockTransport. 저장 안 된 주소는 결과 없음으로 돌려줌."""
+    import httpx
+
+    recorded = fixtures["geocode"]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        stats.geocode_calls += 1
+        await asyncio.sleep(latency.geocode)
+        query = request.url.params.get("query", "")
+        return httpx.Response(200, json=recorded.get(query, {"documents": []}))
+
+    return httpx.MockTransport(handler)
+
+
+@dataclass
+class InstalledFakes:
+    latency: FakeLatency
+    stats: FakeCallStats = field(default_factory=FakeCallStats)
+    fixtures: dict = field(default_factory=dict)
+
+
+def install_fakes(latency: FakeLatency, fixtures: Optional[dict] = None, searches_per_run: int = 2,
+                  search_result_tokens: int = 0) -> InstalledFakes:
+    """
+    src.llm의 외부 클라이언트들을 가짜로 바꾸는거. 첫 요청 전에 불러야 함.
+    `search_result_tokens`는 검색 결과 하나가 프롬프트에 들어갈때 늘어나는 입력 토큰 수임.
+
+    Returns:
+        InstalledFakes: 지연시간 설정, 호출 횟수, 쓴 저장 응답 (벤치마크 끝나고 출력용).
+    """
+    from src import llm, search_cache
+
+    fixtures = fixtures or load_fixtures()
+    installed = InstalledFakes(latency=latency, fixtures=fixtures)
+    responder = RecordedResponder(fixtures)
+    chat_model = build_chat_model(responder, latency, installed.stats, search_result_tokens)
+    search_tool = build_search_tool(fixtures, latency, installed.stats)
+    if search_cache.SEARCH_CACHE_ENABLED:
+        # 실제 get_search_tool처럼 검색 캐시로 감쌈 (SEARCH_CACHE_ENABLED=0이면 매번 가짜 검색 부름)
+        search_tool = search_cache.CachedSearchTool(search_tool)
+
+    llm.llm_agent = chat_model
+    llm.search_tool = search_tool
+    llm.tools = [search_tool]
+    llm.agent_executor = RecordedAgentExecutor(chat_model, search_tool, installed.stats, searches_per_run)
+    llm.geocoder.transport = recorded_kakao_transport(fixtures, latency, installed.stats)
+    return installed
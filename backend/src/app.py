@@ -2,16 +2,32 @@
 FastAPI 메인 파일임. API 엔드포인트, 앱 시작 이벤트, 의존성 주입 정의하는 곳.
 """
 
+import os
+import asyncio
 import logging
 from datetime import datetime
 
-from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks
+from fastapi import FastAPI, HTTPException, status, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
-from src.models import UserRequest, RecommendationResponse
-from src.llm import get_ai_recommendations
-from src.db import get_db, log_ai_interaction
+from src.models import UserRequest, RecommendationResponse, RecommendationStreamEvent, RecommendationJobStatus
+from src.llm import get_ai_recommendations, stream_ai_recommendations, response_from_events, geocoder, warm_up_clients
+from src.db import engine, SessionLocal, AsyncSessionLocal, dispose_async_engine
+from src.catalog import CATALOG_ENABLED, catalog_store, find_candidates_async
+from src.migrations import run_migrations
+from src.spatial import spatial_index_store
+from src.semantic_index import load_semantic_index, semantic_index_store
+from src.plan_cache import plan_cache
+from src.verification_scheduler import verification_scheduler
+from src.verification_refresh import VERIFICATION_REFRESH_ENABLED, verification_refresher
+from src.tour_ingest import TOUR_INGEST_ENABLED, schedule_tour_data_update
+from src.change_events import subscribe_cache_invalidation, tourist_info_changes
+from src.jobs import job_runner
+from src.log_sink import ai_log_sink, ai_log_record
+from src.rate_limit import rate_limiters
+from src.search_cache import search_cache
+from src.metrics import METRICS_ENABLED, registry, span, HTTP_REQUEST_SECONDS
 
 # 로거 설정하는거
 logger = logging.getLogger(__name__)
@@ -33,28 +49,129 @@ app.add_middleware(
     allow_headers=["*"],  # 모든 HTTP 헤더 허용
 )
 
+# 시작할때 LLM/Agent 클라이언트를 백그라운드에서 미리 만들지 (0이면 첫 요청때 만듦)
+LLM_WARMUP_ON_STARTUP = os.getenv("LLM_WARMUP_ON_STARTUP", "1") != "0"
+_warmup_task = None
+_tour_ingest_scheduler = None
 
-# @app.on_event("startup")
-# async def startup_event():
-#     """
-#     앱 시작될 때 실행되는 이벤트 핸들러임.
-#     - DB 스키마는 db.py에서 초기화됨.
-#     - 매주 데이터 업데이트 스케줄링 햇음.
-#     - 앱 시작할 때 데이터 바로 채워넣음.
-#     """
-#     logger.info("[App] 애플리케이션 시작 이벤트가 트리거되었습니다.")
-    
-#     # 1. 매주 데이터 업데이트 스케줄링 하는거
-#     # schedule_tour_data_update()
-    
-#     # 2. 시작할때 바로 데이터 채움
-#     # (db.py에서 테이블 맨날 지우고 다시 만드니까, 항상 최신 더미 데이터로 채워지는거임)
-#     # fetch_and_store_tour_data()
-#     logger.info("[App] 애플리케이션 시작 준비가 완료되었습니다.")
+
+# 이미 `stats()` 있는 컴포넌트들 값도 /metrics에 같이 내보냄
+registry.register_stats("verification_scheduler", "검증 스케줄러 상태", verification_scheduler.stats)
+registry.register_stats("ai_log_sink", "AI 로그 싱크 상태", ai_log_sink.stats)
+registry.register_stats("search_cache", "웹 검색 캐시 상태", search_cache.stats)
+registry.register_stats("verification_refresh", "미리 검증 작업 상태", verification_refresher.stats)
+registry.register_stats("catalog", "tourist_info 인메모리 카탈로그 상태", catalog_store.stats)
+registry.register_stats("semantic_index", "관심사 임베딩 인덱스 상태", semantic_index_store.stats)
+registry.register_stats("tourist_info_changes", "tourist_info 변경 이벤트 상태", tourist_info_changes.stats)
+for _upstream, _bucket in rate_limiters.items():
+    registry.register_stats("rate_limiter", "upstream별 토큰 버킷 상태", _bucket.stats, upstream=_upstream)
+registry.register_stats("kakao_geocoder", "카카오 지오코더 상태",
+                        lambda: {"requests": geocoder.request_count, "cache_size": len(geocoder.cache)})
+registry.register_stats("db_pool", "동기 DB 커넥션 풀 상태",
+                        lambda: {"checked_out": engine.pool.checkedout()} if hasattr(engine.pool, "checkedout") else {})
+
+
+@app.on_event("startup")
+async def startup_event():
+    """
+    앱 시작될 때 실행되는 이벤트 핸들러임.
+    - DB 스키마 마이그레이션 적용함 (DB_AUTO_MIGRATE=0이면 건너뜀).
+    - tourist_info 좌표로 공간 인덱스 만들어둠.
+    - CATALOG_ENABLED면 tourist_info 지역별 카탈로그 만들어둠 (추천 후보를 DB 대신 메모리에서 거름).
+    - SEMANTIC_INDEX_DIR 있으면 관심사 임베딩 인덱스 메모리 매핑함 (고정 매핑에 없는 관심사 태그 찾는 용도).
+    - 지난번에 안 끝난 백그라운드 추천 작업 다시 돌림.
+    - 만료된 웹 검색 캐시 지움.
+    - VERIFICATION_REFRESH_ENABLED면 변동 항목/축제 미리 검증하는 주기 작업 등록함.
+    - TOUR_INGEST_ENABLED면 매주 Tour API 수집 작업 등록함 (바뀐 행 이벤트로 캐시들 부분 무효화).
+    - LLM/Agent 클라이언트는 백그라운드 스레드에서 만들기 시작만 하고 안 기다림 (준비 완료 안 늦춤).
+    """
+    global _warmup_task, _tour_ingest_scheduler
+    logger.info("[App] 애플리케이션 시작 이벤트가 트리거되었습니다.")
+    if os.getenv("DB_AUTO_MIGRATE", "1") != "0":
+        run_migrations(engine)
+
+    # 공간 인덱스: DB 후보를 가까운 권역으로 묶어서 일정 생성 프롬프트에 넣을때 씀
+    try:
+        await asyncio.to_thread(spatial_index_store.load_from_db, SessionLocal)
+    except Exception as e:
+        logger.error(f"[App] 공간 인덱스 생성 실패: {e}", exc_info=True)
+
+    if CATALOG_ENABLED:
+        try:
+            await asyncio.to_thread(catalog_store.load_from_db, SessionLocal)
+        except Exception as e:
+            # 못 만들면 요청마다 DB 조회로 감
+            logger.error(f"[App] 카탈로그 생성 실패: {e}", exc_info=True)
+
+    try:
+        load_semantic_index()
+    except Exception as e:
+        # 못 읽으면 관심사는 INTEREST_CATEGORY_PREFIXES로만 매칭함
+        logger.error(f"[App] 관심사 임베딩 인덱스 로드 실패: {e}", exc_info=True)
+
+    try:
+        await job_runner.resume_unfinished()
+    except Exception as e:
+        logger.error(f"[App] 추천 작업 복구 실패: {e}", exc_info=True)
+
+    try:
+        purged = await asyncio.to_thread(search_cache.purge_expired)
+        if purged:
+            logger.info(f"[App] 만료된 웹 검색 캐시 {purged}건을 지웠습니다.")
+    except Exception as e:
+        logger.error(f"[App] 웹 검색 캐시 정리 실패: {e}", exc_info=True)
+
+    if LLM_WARMUP_ON_STARTUP:
+        _warmup_task = asyncio.create_task(_warm_up_llm_clients())
+
+    if VERIFICATION_REFRESH_ENABLED:
+        verification_refresher.start()
+
+    # 매주 Tour API 데이터 갱신 (바뀐 행만 upsert라 지우고 다시 넣지 않음)
+    subscribe_cache_invalidation()
+    if TOUR_INGEST_ENABLED:
+        _tour_ingest_scheduler = schedule_tour_data_update(run_now=os.getenv("TOUR_INGEST_ON_STARTUP", "0") != "0")
+    logger.info("[App] 애플리케이션 시작 준비가 완료되었습니다.")
+
+
+async def _warm_up_llm_clients() -> None:
+    try:
+        elapsed = await asyncio.to_thread(warm_up_clients)
+        logger.info(f"[App] LLM/Agent 클라이언트 준비 완료 ({elapsed:.2f}초)")
+    except Exception as e:
+        # 여기서 실패해도 첫 요청때 다시 만들어봄
+        logger.error(f"[App] LLM/Agent 클라이언트 미리 만들기 실패: {e}", exc_info=True)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """앱 꺼질때 추천 작업/미리 검증/검증 워커 멈추고, 남은 AI 로그 다 쓰고, 공유 HTTP/DB 커넥션 풀 정리하는거."""
+    if _warmup_task is not None:
+        await asyncio.gather(_warmup_task, return_exceptions=True)
+    if _tour_ingest_scheduler is not None:
+        _tour_ingest_scheduler.shutdown(wait=False)
+    await job_runner.aclose()
+    await verification_refresher.aclose()
+    await verification_scheduler.aclose()
+    await ai_log_sink.aclose()
+    await dispose_async_engine()
+    await geocoder.aclose()
+
+
+async def _save_interaction(user_request: UserRequest, ai_response: RecommendationResponse, cache_status: str) -> None:
+    """
+    AI 상호작용 결과 기록하는거. 로그 싱크 큐에 넣기만 하고 DB 쓰기는 안 기다림.
+    에러 발생해도 사용자한테 추천 결과 그냥 반환하게 예외 삼킴.
+    """
+    try:
+        await ai_log_sink.submit(ai_log_record(user_request, ai_response, cache_status))
+    except Exception as e:
+        logger.error(f"[App] AI 상호작용 로그 저장 실패: {e}", exc_info=True)
+        # 로깅 실패가 메인 기능에 영향 안주게 예외 처리하는거
 
 
 @app.post("/recommend", response_model=RecommendationResponse)
-async def recommend(user_request: UserRequest, db: Session = Depends(get_db)):
+async def recommend(user_request: UserRequest):
     """
     사용자 요청 받아서 AI 여행 추천 반환하는 메인 API 엔드포인트임.
 
@@ -66,26 +183,18 @@ async def recommend(user_request: UserRequest, db: Session = Depends(get_db)):
     """
     logger.info(f"[App] /recommend 엔드포인트 호출됨. 요청: {user_request.model_dump_json()}")
 
-    # 1. DB에서 조건 맞는 관광 정보 조회하는거
-    # tourist_info_data = get_tourist_info_from_db(
-    #     db=db,
-    #     region=user_request.region,
-    #     interests=user_request.interests,
-    #     start_date=user_request.start_date,
-    #     end_date=user_request.end_date
-    # )
-
-    # 조회된 정보 없으면 404 에러 반환하는거
-    # if not tourist_info_data:
-    #     logger.warning("[App] 사용자의 요청에 맞는 관광 정보를 DB에서 찾을 수 없습니다.")
-    #     raise HTTPException(
-    #         status_code=status.HTTP_404_NOT_FOUND,
-    #         detail="요청하신 지역과 관심사에 맞는 관광 정보를 찾을 수 없습니다."
-    #     )
-
-    # 2. LLM 불러서 AI 추천 만드는거
+    async def compute_recommendations():
+        # 1. DB에서 조건 맞는 관광 정보 조회하는거
+        # 같은 요청들이 같이 기다리는 태스크라서 요청 범위 세션 말고 여기서 세션 엶 (처음 요청이 끊겨도 안 닫힘)
+        # 조회 끝나면 커넥션은 바로 풀에 돌려줌 (Agent 도는 동안 안 잡고 있음)
+        async with AsyncSessionLocal() as db:
+            tourist_info_data = await find_candidates_async(db, user_request)
+        return await get_ai_recommendations(user_request, candidates=tourist_info_data)
+
+    # 2. LLM 불러서 AI 추천 만드는거 (같은 요청은 캐시된 결과 쓰고, 동시 요청은 한번만 계산함)
     try:
-        ai_response = await get_ai_recommendations(user_request)
+        with span(HTTP_REQUEST_SECONDS, endpoint="/recommend"):
+            ai_response, cache_status = await plan_cache.get_or_compute(user_request, compute_recommendations)
     except Exception as e:
         logger.error(f"[App] AI 추천 생성 중 심각한 오류 발생: {e}", exc_info=True)
         raise HTTPException(
@@ -94,20 +203,115 @@ async def recommend(user_request: UserRequest, db: Session = Depends(get_db)):
         )
 
     # 3. AI 상호작용 결과 기록하는거
-    # 에러 발생해도 사용자한테 추천 결과 그냥 반환하는거
-    try:
-        log_ai_interaction(
-            db=db,
-            request_time=datetime.now(),
-            user_input_json=user_request.model_dump_json(),
-            ai_response_json=ai_response.model_dump_json(),
-            total_tokens=ai_response.total_tokens,
-            agent_search_log=ai_response.agent_search_log,
-            is_verified_success=ai_response.is_verified_success
-        )
-    except Exception as e:
-        logger.error(f"[App] AI 상호작용 로그 저장 실패: {e}", exc_info=True)
-        # 로깅 실패가 메인 기능에 영향 안주게 예외 처리하는거
+    await _save_interaction(user_request, ai_response, cache_status)
 
     logger.info("[App] 성공적으로 AI 추천 응답을 반환합니다.")
-    return ai_response
\ No newline at end of file
+    return ai_response
+
+
+async def _replay_response(ai_response: RecommendationResponse, cache_status: str):
+    """캐시된 응답을 스트리밍 이벤트로 풀어서 보내는거 (검증 결과 이미 들어있음)."""
+    for day_index, daily_recommendation in enumerate(ai_response.daily_recommendations):
+        yield RecommendationStreamEvent(type="day", day_index=day_index, day=daily_recommendation, pending_verifications=0)
+    yield RecommendationStreamEvent(
+        type="done",
+        is_verified_success=ai_response.is_verified_success,
+        agent_search_log=ai_response.agent_search_log,
+        total_tokens=ai_response.total_tokens,
+        cache_status=cache_status,
+        usage=ai_response.usage,
+    )
+
+
+@app.post("/recommend/stream")
+async def recommend_stream(user_request: UserRequest):
+    """
+    `/recommend` 스트리밍 버전임. 응답은 NDJSON (한줄에 RecommendationStreamEvent 하나).
+
+    - "day": 일정 생성이랑 지오코딩 끝나면 일자별 추천 바로 보냄 (검증 결과 없음)
+    - "verification": 항목 검증 끝나는 순서대로 보냄 (day_index, item_index 위치에 채우면 됨)
+    - "done": 전체 결과 요약. 캐시된 응답이거나 같은 요청이 처리 중이었으면(그 결과 기다림) "day"에 검증 결과까지 들어있고 바로 "done" 옴.
+    - "error": 추천 생성 실패.
+    """
+    logger.info(f"[App] /recommend/stream 엔드포인트 호출됨. 요청: {user_request.model_dump_json()}")
+
+    async def ndjson_lines():
+        with span(HTTP_REQUEST_SECONDS, endpoint="/recommend/stream"):
+            async for line in _ndjson_lines():
+                yield line
+
+    async def _ndjson_lines():
+        try:
+            found = await plan_cache.lookup(user_request)
+            if found is not None:
+                async for event in _replay_response(*found):
+                    yield event.model_dump_json(exclude_none=True) + "\n"
+                await _save_interaction(user_request, found[0], found[1])
+                return
+
+            # 생성은 plan_cache에 처리 중으로 등록해서 돌림 (같은 요청이 동시에 오면 위 lookup에서 이 결과 기다렸다가 풀어서 보냄).
+            # 이벤트는 큐로 받아서 바로 내보내고, 끝나면 같은 이벤트로 만든 전체 응답이 캐시에 저장됨
+            queue: asyncio.Queue = asyncio.Queue()
+
+            async def compute_streaming():
+                try:
+                    async with AsyncSessionLocal() as db:
+                        tourist_info_data = await find_candidates_async(db, user_request)
+                    events = []
+                    async for event in stream_ai_recommendations(user_request, candidates=tourist_info_data):
+                        if event.type == "done":
+                            event.cache_status = "miss"
+                        events.append(event)
+                        queue.put_nowait(event)
+                    return response_from_events(events)
+                finally:
+                    queue.put_nowait(None)
+
+            task = plan_cache.start(user_request, compute_streaming)
+            while (event := await queue.get()) is not None:
+                yield event.model_dump_json(exclude_none=True) + "\n"
+            ai_response = RecommendationResponse.model_validate_json(await asyncio.shield(task))
+        except Exception as e:
+            logger.error(f"[App] AI 추천 스트리밍 중 심각한 오류 발생: {e}", exc_info=True)
+            error_event = RecommendationStreamEvent(type="error", is_verified_success=False, agent_search_log=f"AI 추천 생성에 실패했습니다: {e}")
+            yield error_event.model_dump_json(exclude_none=True) + "\n"
+            return
+
+        ai_response.cache_status = "miss"
+        await _save_interaction(user_request, ai_response, "miss")
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@app.post("/recommend/jobs", response_model=RecommendationJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def create_recommendation_job(user_request: UserRequest):
+    """
+    `/recommend`를 백그라운드 작업으로 돌리는 API 엔드포인트임.
+    작업 ID 담긴 queued 상태 바로 돌려주고, 결과는 GET /recommend/jobs/{job_id}로 폴링하면 됨.
+    """
+    logger.info(f"[App] /recommend/jobs 엔드포인트 호출됨. 요청: {user_request.model_dump_json()}")
+    return await job_runner.submit(user_request)
+
+
+@app.get("/recommend/jobs/{job_id}", response_model=RecommendationJobStatus)
+async def get_recommendation_job(job_id: str):
+    """
+    백그라운드 추천 작업 상태 조회하는 API 엔드포인트임.
+    running이면 `result`에 지금까지 나온 부분 결과(검증 끝난 항목만 verification_details 있음), 끝나면 최종 결과 들어있음.
+    """
+    job = await job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="추천 작업을 찾을 수 없습니다.")
+    return job
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus 형식 지표 내보내는 엔드포인트임.
+    단계별 걸린 시간 히스토그램(recommend_stage_seconds 등), 타임아웃/파싱 실패/지오코딩 실패 횟수,
+    검증 스케줄러/로그 싱크/토큰 버킷 상태 들어있음. METRICS_ENABLED=0이면 404.
+    """
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="지표 수집이 꺼져 있습니다.")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
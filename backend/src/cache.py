@@ -0,0 +1,101 @@
+"""
+여러 모듈에서 같이 쓰는 인메모리 캐시 유틸 모아둔 파일임.
+지오코딩 결과 같은거 프로세스 안에서 재사용할때 쓰는거.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+def normalize_text(text: str) -> str:
+    """
+    캐시 키 만들때 쓰는 문자열 정규화 함수임.
+    전각/반각 통일(NFKC), 대소문자 무시, 공백 전부 제거해서 "명동교자 본점"이랑 "명동교자본점"을 같은 키로 봄.
+    """
+    normalized = unicodedata.normalize("NFKC", text or "").casefold()
+    return re.sub(r"\s+", "", normalized)
+
+
+class TTLCache:
+    """
+    LRU 정책 + 항목별 만료시간(TTL) 가진 인메모리 캐시임.
+
+    - 최대 크기 넘으면 제일 오래 안 쓴 항목부터 버림.
+    - 항목마다 TTL 따로 줄 수 있어서 부정 결과(못 찾은 결과)는 짧게 캐시하는 식으로 씀.
+    - 스레드 여러개에서 불러도 안전하게 락 걸어둠.
+
+    Args:
+        maxsize (int): 최대 항목 수.
+        ttl (float): 기본 만료 시간(초).
+        timer (Callable[[], float]): 현재 시각 돌려주는 함수 (테스트할때 바꿔끼우는 용도).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0, timer: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize는 1 이상이어야 합니다.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """키에 해당하는 값 돌려주는거. 없거나 만료됐으면 default 반환함."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= self._timer():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """값 저장하는거. ttl 안 주면 기본 TTL 씀."""
+        expires_at = self._timer() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """항목 지우고 값 돌려주는거."""
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """키가 `predicate` 만족하는 항목 전부 지우는거. 지운 개수 돌려줌."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """전체 비우는거."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[1] > self._timer()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
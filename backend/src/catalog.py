@@ -0,0 +1,424 @@
+"""
+tourist_info를 지역별 컬럼 배열로 들고 있는 인메모리 카탈로그 파일임.
+지역 데이터는 길어야 일주일에 한번 바뀌는데 /recommend마다 DB에서 후보 조회하던거를,
+앱 시작할때 한번 읽어서 만든 스냅샷으로 메모리에서 바로 거름 (ORM 객체/Decimal 안 만듦).
+
+- 좌표: float32 배열
+- category_tag / content_type: 지역마다 정렬된 문자열 표 + 코드 배열 (같은 문자열 한번만 들고 있음)
+- 날짜: date ordinal int32 배열 (없는 시작일/종료일은 양 끝 값으로 둬서 기간 비교 그대로 됨)
+- category_tag별 비트맵 (np.packbits): 관심사 접두어에 걸리는 태그들 비트맵 OR해서 후보 고름
+- 이름/주소 같은 문자열: UTF-8 바이트 하나 + 오프셋 배열 (돌려줄 행만 디코딩함)
+
+스냅샷은 만든 다음 안 바뀜. 갱신할땐 새로 만들어서 참조만 바꿔끼워서 읽는 쪽은 락 없이 씀.
+주간 수집 변경 이벤트(change_events.py) 받으면 바뀐 지역만 DB에서 다시 읽음.
+스냅샷에 없는 지역 요청 오면 그 지역만 DB에서 읽어서 끼워넣음 (read-through).
+DB에도 없는 지역은 스냅샷에 없는 지역으로 적어둬서 다시 안 읽음 (그 지역 행 들어오면 변경 이벤트로 지워짐).
+"""
+
+import asyncio
+import bisect
+import functools
+import itertools
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.change_events import TouristInfoChange
+from src.db import MAX_CANDIDATES, find_candidates_for_request, find_candidates_for_request_async, interest_prefix_groups, share_by_interest
+from src.models import UserRequest
+from src.openapi import TouristInfo
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+# 0이면 카탈로그 안 만들고 매 요청 DB 조회함
+CATALOG_ENABLED = os.getenv("CATALOG_ENABLED", "1") != "0"
+# DB에 없다고 적어둘 지역 최대 개수 (지역은 자유 입력이라 넘으면 오래된 것부터 버림)
+CATALOG_MAX_MISSING_REGIONS = int(os.getenv("CATALOG_MAX_MISSING_REGIONS", "4096"))
+
+# 시작일 없으면 아주 옛날, 종료일 없으면 아주 먼 미래로 둬서 기간 겹침 비교를 그대로 씀
+_NO_START = np.iinfo(np.int32).min
+_NO_END = np.iinfo(np.int32).max
+
+_COLUMNS = (
+    TouristInfo.content_id, TouristInfo.name_ko, TouristInfo.region, TouristInfo.address,
+    TouristInfo.latitude, TouristInfo.longitude, TouristInfo.content_type, TouristInfo.category_tag,
+    TouristInfo.image_url, TouristInfo.is_variable, TouristInfo.last_crawled_date,
+    TouristInfo.start_date, TouristInfo.end_date, TouristInfo.operating_hours,
+)
+
+
+class StringColumn:
+    """
+    문자열 목록을 UTF-8 바이트 하나 + 오프셋 배열로 들고 있는거 (파이썬 str 객체 수십만개 대신).
+    None은 따로 표시해둠.
+    """
+
+    __slots__ = ("_data", "_offsets", "_nulls")
+
+    def __init__(self, values: Sequence[Optional[str]]):
+        encoded = [(value or "").encode("utf-8") for value in values]
+        lengths = np.fromiter((len(value) for value in encoded), dtype=np.int64, count=len(encoded))
+        self._data = b"".join(encoded)
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        self._offsets = offsets.astype(np.uint32) if len(self._data) < 2 ** 32 else offsets
+        nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+        self._nulls = np.packbits(nulls) if nulls.any() else None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position: int) -> Optional[str]:
+        if self._nulls is not None and self._nulls[position >> 3] & (0x80 >> (position & 7)):
+            return None
+        return self._data[self._offsets[position]:self._offsets[position + 1]].decode("utf-8")
+
+    def take(self, positions: np.ndarray) -> List[Optional[str]]:
+        """여러 위치 문자열 한번에 꺼내는거 (오프셋을 한번에 파이썬 값으로 바꿔서 하나씩 꺼내는거보다 빠름)."""
+        data = self._data
+        values = [data[start:end].decode("utf-8") for start, end in
+                  zip(self._offsets[positions].tolist(), self._offsets[positions + 1].tolist())]
+        if self._nulls is not None:
+            nulls = np.unpackbits(self._nulls, count=len(self)).astype(bool)[positions].tolist()
+            values = [None if null else value for value, null in zip(values, nulls)]
+        return values
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._data) + self._offsets.nbytes + (self._nulls.nbytes if self._nulls is not None else 0)
+
+
+def _ordinal(value: Optional[date], missing: int) -> int:
+    return value.toordinal() if value else missing
+
+
+@functools.lru_cache(maxsize=4096)
+def _from_ordinal(value: int) -> Optional[str]:
+    if value in (_NO_START, _NO_END):
+        return None
+    return date.fromordinal(int(value)).isoformat()
+
+
+class RegionSnapshot:
+    """
+    지역 하나 관광 정보 컬럼 배열임. 행 순서는 DB 조회랑 같음 (기간 있는 항목 먼저, 그 안에선 id 순).
+
+    Args:
+        region (str): 지역 이름.
+        rows (Sequence): `_COLUMNS` 순서 값 가진 행들 (이미 정렬된거).
+    """
+
+    def __init__(self, region: str, rows: Sequence[Any]):
+        self.region = region
+        count = len(rows)
+        self.content_ids = StringColumn([row.content_id for row in rows])
+        self.names = StringColumn([row.name_ko for row in rows])
+        self.addresses = StringColumn([row.address for row in rows])
+        self.image_urls = StringColumn([row.image_url for row in rows])
+        self.operating_hours = StringColumn([row.operating_hours for row in rows])
+        self.latitudes = np.fromiter((float(row.latitude) for row in rows), dtype=np.float32, count=count)
+        self.longitudes = np.fromiter((float(row.longitude) for row in rows), dtype=np.float32, count=count)
+        self.is_variable = np.fromiter((bool(row.is_variable) for row in rows), dtype=bool, count=count)
+        self.last_crawled = np.fromiter((_ordinal(row.last_crawled_date, _NO_START) for row in rows), dtype=np.int32, count=count)
+        self.start_ordinals = np.fromiter((_ordinal(row.start_date, _NO_START) for row in rows), dtype=np.int32, count=count)
+        self.end_ordinals = np.fromiter((_ordinal(row.end_date, _NO_END) for row in rows), dtype=np.int32, count=count)
+
+        # 문자열 표는 정렬해둬서 접두어 찾을때 이진 탐색함
+        self.category_tags = tuple(sorted({row.category_tag for row in rows}))
+        self.content_types = tuple(sorted({row.content_type for row in rows}))
+        tag_codes = {tag: code for code, tag in enumerate(self.category_tags)}
+        type_codes = {content_type: code for code, content_type in enumerate(self.content_types)}
+        self.category_codes = np.fromiter((tag_codes[row.category_tag] for row in rows), dtype=np.uint16, count=count)
+        self.content_type_codes = np.fromiter((type_codes[row.content_type] for row in rows), dtype=np.uint8, count=count)
+        self.category_bitmaps = [np.packbits(self.category_codes == code) for code in range(len(self.category_tags))]
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    @property
+    def nbytes(self) -> int:
+        """배열/문자열 표/비트맵이 차지하는 바이트 수 (대략)."""
+        arrays = (self.latitudes, self.longitudes, self.is_variable, self.last_crawled, self.start_ordinals,
+                  self.end_ordinals, self.category_codes, self.content_type_codes, *self.category_bitmaps)
+        strings = (self.content_ids, self.names, self.addresses, self.image_urls, self.operating_hours)
+        tables = sum(len(value.encode("utf-8")) for value in (*self.category_tags, *self.content_types))
+        return sum(array.nbytes for array in arrays) + sum(column.nbytes for column in strings) + tables
+
+    def _category_codes_for(self, prefixes: Iterable[str]) -> List[int]:
+        codes = set()
+        for prefix in prefixes:
+            position = bisect.bisect_left(self.category_tags, prefix)
+            while position < len(self.category_tags) and self.category_tags[position].startswith(prefix):
+                codes.add(position)
+                position += 1
+        return sorted(codes)
+
+    def positions_for(self, prefixes: Sequence[str], start_date: date, end_date: date, limit: int) -> List[int]:
+        """category_tag 접두어 하나라도 맞고 여행 기간이랑 겹치는 행 위치 앞에서부터 `limit`개."""
+        codes = self._category_codes_for(prefixes)
+        if not codes or limit <= 0:
+            return []
+        bits = self.category_bitmaps[codes[0]] if len(codes) == 1 else np.bitwise_or.reduce([self.category_bitmaps[code] for code in codes])
+        positions = np.flatnonzero(np.unpackbits(bits, count=len(self)))
+        in_period = (self.start_ordinals[positions] <= end_date.toordinal()) & (self.end_ordinals[positions] >= start_date.toordinal())
+        return positions[in_period][:limit].tolist()
+
+    def filter(self, prefix_groups: Sequence[Sequence[str]], start_date: date, end_date: date, limit: int) -> List[dict]:
+        """
+        관심사별 접두어 묶음마다 후보 찾아서 관심사마다 `limit` 나눠 고른 행 돌려주는거 (`db.share_by_interest`랑 같은 방식).
+        행은 (축제/행사 먼저, id) 순서로 들고 있어서 위치 순서가 곧 DB 조회 순서임.
+        """
+        groups = [self.positions_for(prefixes, start_date, end_date, limit) for prefixes in prefix_groups]
+        return self.rows(share_by_interest(groups, limit, ident=lambda position: position, key=lambda position: position))
+
+    def rows(self, positions: Sequence[int]) -> List[dict]:
+        """`TouristInfo.to_dict()`랑 같은 모양 딕셔너리들 만드는거. 숫자 컬럼은 한번에 꺼내서 파이썬 값으로 바꿈."""
+        positions = np.asarray(positions, dtype=np.int64)
+        # float32라 찌꺼기 자리수 생겨서 소수점 6자리(약 10cm)까지만 씀
+        latitudes = np.round(self.latitudes[positions].astype(np.float64), 6).tolist()
+        longitudes = np.round(self.longitudes[positions].astype(np.float64), 6).tolist()
+        columns = zip(
+            self.content_ids.take(positions), self.names.take(positions), self.addresses.take(positions),
+            self.image_urls.take(positions), self.operating_hours.take(positions), latitudes, longitudes,
+            self.content_type_codes[positions].tolist(), self.category_codes[positions].tolist(),
+            self.is_variable[positions].tolist(), self.last_crawled[positions].tolist(),
+            self.start_ordinals[positions].tolist(), self.end_ordinals[positions].tolist(),
+        )
+        return [
+            {
+                "content_id": content_id,
+                "name_ko": name,
+                "region": self.region,
+                "address": address,
+                "latitude": latitude,
+                "longitude": longitude,
+                "content_type": self.content_types[content_type_code],
+                "category_tag": self.category_tags[category_code],
+                "image_url": image_url,
+                "is_variable": is_variable,
+                "last_crawled_date": _from_ordinal(last_crawled),
+                "start_date": _from_ordinal(start_ordinal),
+                "end_date": _from_ordinal(end_ordinal),
+                "operating_hours": operating_hours,
+            }
+            for (content_id, name, address, image_url, operating_hours, latitude, longitude,
+                 content_type_code, category_code, is_variable, last_crawled, start_ordinal, end_ordinal) in columns
+        ]
+
+
+class CatalogSnapshot:
+    """
+    지역 이름 -> RegionSnapshot 묶음임. 만든 다음엔 안 바뀜.
+
+    Args:
+        regions (Dict[str, RegionSnapshot]): 지역별 스냅샷.
+        missing_regions (Optional[Dict[str, None]]): DB에도 없다고 확인한 지역 (넣은 순서대로).
+    """
+
+    def __init__(self, regions: Dict[str, RegionSnapshot], missing_regions: Optional[Dict[str, None]] = None):
+        self.regions = regions
+        self.missing_regions = missing_regions or {}
+        self.built_at = datetime.now()
+
+    def knows(self, region: str) -> bool:
+        """스냅샷에 있거나 DB에 없다고 확인한 지역인지 (아니면 DB에서 한번 읽어봐야 함)."""
+        region = region.strip()
+        return region in self.regions or region in self.missing_regions
+
+    def __len__(self) -> int:
+        return sum(len(region) for region in self.regions.values())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(region.nbytes for region in self.regions.values())
+
+    def filter(self, region: str, interests: List[str], start_date: date, end_date: date,
+               limit: int = MAX_CANDIDATES) -> List[dict]:
+        """`db.get_tourist_info_from_db`랑 같은 조건/순서/모양으로 메모리에서 거르는거."""
+        snapshot = self.regions.get(region.strip())
+        if snapshot is None:
+            return []
+        prefix_groups = interest_prefix_groups(interests, region)
+        if not prefix_groups:
+            return []
+        return snapshot.filter(prefix_groups, start_date, end_date, limit)
+
+    def with_regions(self, replaced: Dict[str, Optional[RegionSnapshot]]) -> "CatalogSnapshot":
+        """일부 지역만 바꾼 새 스냅샷 만드는거 (None이면 그 지역 빼고 없는 지역으로 적어둠). 안 바뀐 지역은 같이 씀."""
+        regions = dict(self.regions)
+        missing_regions = dict(self.missing_regions)
+        for region, snapshot in replaced.items():
+            missing_regions.pop(region, None)
+            if snapshot is None:
+                regions.pop(region, None)
+                missing_regions[region] = None
+            else:
+                regions[region] = snapshot
+        for region in list(itertools.islice(missing_regions, max(len(missing_regions) - CATALOG_MAX_MISSING_REGIONS, 0))):
+            del missing_regions[region]
+        return CatalogSnapshot(regions, missing_regions)
+
+
+def build_regions(session_factory, regions: Optional[Iterable[str]] = None, yield_per: int = 5000) -> Dict[str, RegionSnapshot]:
+    """
+    tourist_info 지역 순서로 흘려 읽으면서 지역별 스냅샷 만드는거.
+    한번에 지역 하나 분량 행만 메모리에 올림.
+    """
+    stmt = select(*_COLUMNS).order_by(TouristInfo.region, TouristInfo.start_date.is_(None), TouristInfo.id)
+    if regions is not None:
+        stmt = stmt.where(TouristInfo.region.in_(list(regions)))
+    built: Dict[str, RegionSnapshot] = {}
+    db = session_factory()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=yield_per))
+        for region, rows in itertools.groupby(result, key=lambda row: row.region):
+            built[region] = RegionSnapshot(region, list(rows))
+    finally:
+        db.close()
+    return built
+
+
+class CatalogStore:
+    """
+    프로세스 전체에서 같이 쓰는 카탈로그 스냅샷 보관하는거 (spatial.SpatialIndexStore랑 같은 방식).
+    변경 이벤트는 `queue_changes`로 바뀐 지역만 모아뒀다가 수집 끝나면 `apply_queued_changes`에서 그 지역만 다시 읽음.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._build_lock = threading.Lock()
+        self._session_factory = None
+        self._pending_regions: Set[str] = set()
+        self._pending_lock = threading.Lock()
+        # 지표
+        self.hits = 0
+        self.region_loads = 0
+        self.fallbacks = 0
+        self.load_seconds = 0.0
+
+    def get(self) -> Optional[CatalogSnapshot]:
+        """현재 스냅샷 돌려주는거. 아직 안 만들었으면 None."""
+        return self._snapshot
+
+    def swap(self, snapshot: CatalogSnapshot) -> None:
+        self._snapshot = snapshot
+
+    def load_from_db(self, session_factory) -> CatalogSnapshot:
+        """tourist_info 전부 읽어서 스냅샷 새로 만들고 바꿔끼우는거."""
+        self._session_factory = session_factory
+        with self._build_lock:
+            started = time.perf_counter()
+            snapshot = CatalogSnapshot(build_regions(session_factory))
+            self.load_seconds = time.perf_counter() - started
+            self.swap(snapshot)
+        logger.info(f"[Catalog] 카탈로그를 새로 만들었습니다 ({len(snapshot)}건, 지역 {len(snapshot.regions)}개, "
+                    f"{snapshot.nbytes / 1024 / 1024:.1f}MiB, {self.load_seconds:.2f}초).")
+        return snapshot
+
+    def queue_changes(self, changes: Sequence[TouristInfoChange]) -> None:
+        """바뀐 행 있는 지역 모아두는거. 스냅샷 아직 안 만들었으면 무시함."""
+        if self._snapshot is None:
+            return
+        with self._pending_lock:
+            for change in changes:
+                self._pending_regions.update(change.regions)
+
+    def load_regions(self, regions: Iterable[str]) -> Optional[CatalogSnapshot]:
+        """지역 몇개만 DB에서 다시 읽어서 스냅샷 바꿔끼우는거 (DB에 없는 지역은 스냅샷에서도 뺌)."""
+        regions = set(regions)
+        with self._build_lock:
+            if self._snapshot is None or self._session_factory is None:
+                return None
+            rebuilt = build_regions(self._session_factory, regions)
+            snapshot = self._snapshot.with_regions({region: rebuilt.get(region) for region in regions})
+            self.swap(snapshot)
+        return snapshot
+
+    def load_missing_region(self, region: str) -> Optional[CatalogSnapshot]:
+        """
+        스냅샷이 모르는 지역 하나 DB에서 읽어서 끼워넣는거 (요청 처리용 read-through).
+        락 기다리는 동안 다른 요청이 먼저 읽었으면 DB 안 가고 그 스냅샷 씀.
+        """
+        with self._build_lock:
+            if self._snapshot is None or self._session_factory is None:
+                return None
+            if self._snapshot.knows(region):
+                return self._snapshot
+            self.region_loads += 1
+            rebuilt = build_regions(self._session_factory, [region])
+            snapshot = self._snapshot.with_regions({region: rebuilt.get(region)})
+            self.swap(snapshot)
+        return snapshot
+
+    def apply_queued_changes(self) -> Optional[CatalogSnapshot]:
+        """모아둔 지역만 DB에서 다시 읽어서 스냅샷 바꿔끼우는거. 바뀐 지역 없으면 None."""
+        with self._pending_lock:
+            regions, self._pending_regions = self._pending_regions, set()
+        if not regions:
+            return None
+        snapshot = self.load_regions(regions)
+        if snapshot is not None:
+            logger.info(f"[Catalog] 바뀐 지역({', '.join(sorted(regions))})만 다시 읽었습니다 ({len(snapshot)}건).")
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        """스냅샷 크기랑 메모리 조회/DB 조회 횟수 돌려주는거."""
+        snapshot = self._snapshot
+        return {
+            "rows": len(snapshot) if snapshot is not None else 0,
+            "regions": len(snapshot.regions) if snapshot is not None else 0,
+            "missing_regions": len(snapshot.missing_regions) if snapshot is not None else 0,
+            "bytes": snapshot.nbytes if snapshot is not None else 0,
+            "hits": self.hits,
+            "region_loads": self.region_loads,
+            "fallbacks": self.fallbacks,
+            "load_seconds": round(self.load_seconds, 3),
+        }
+
+
+# 프로세스 전체에서 같이 쓰는 카탈로그 보관소
+catalog_store = CatalogStore()
+
+
+def _from_snapshot(snapshot: CatalogSnapshot, user_request: UserRequest) -> List[dict]:
+    catalog_store.hits += 1
+    candidates = snapshot.filter(user_request.region, user_request.interests, user_request.start_date, user_request.end_date)
+    logger.info(f"[Catalog] {user_request.region} 지역 관광 정보 {len(candidates)}건 조회 완료 (관심사: {user_request.interests}).")
+    if not candidates:
+        logger.warning("[Catalog] 사용자의 요청에 맞는 관광 정보를 찾을 수 없어 Agent 추천으로 진행합니다.")
+    return candidates
+
+
+def find_candidates(db: Session, user_request: UserRequest) -> List[dict]:
+    """
+    추천 후보 조회하는거. 카탈로그 있으면 메모리에서 거르고 (없는 지역이면 그 지역만 DB에서 읽어 끼워넣음),
+    카탈로그 아직 없으면 `db.find_candidates_for_request`로 DB 조회함.
+    """
+    snapshot = catalog_store.get()
+    if snapshot is None:
+        catalog_store.fallbacks += 1
+        return find_candidates_for_request(db, user_request)
+    # 스냅샷 만든 다음에 들어온 지역일 수도 있어서 모르는 지역은 DB에서 한번 읽어봄
+    if not snapshot.knows(user_request.region):
+        snapshot = catalog_store.load_missing_region(user_request.region.strip()) or snapshot
+    return _from_snapshot(snapshot, user_request)
+
+
+async def find_candidates_async(db: AsyncSession, user_request: UserRequest) -> List[dict]:
+    """`find_candidates`의 비동기 세션 버전임. 스냅샷에 있는 지역이면 DB 커넥션 아예 안 씀."""
+    snapshot = catalog_store.get()
+    if snapshot is None:
+        catalog_store.fallbacks += 1
+        return await find_candidates_for_request_async(db, user_request)
+    if not snapshot.knows(user_request.region):
+        snapshot = await asyncio.to_thread(catalog_store.load_missing_region, user_request.region.strip()) or snapshot
+    return _from_snapshot(snapshot, user_request)
@@ -0,0 +1,159 @@
+"""
+tourist_info 행 변경 이벤트 주고받는 파일임.
+주간 Tour API 수집(tour_ingest.py)이 묶음마다 새로 생긴/바뀐/없어진 행을 이벤트로 내보내면,
+tourist_info 위에 만든 캐시들(검증 캐시, 공간 인덱스, /recommend 응답 캐시)이 받아서
+바뀐 행에 해당하는 것만 지움 (전체 비우기/전체 다시 만들기 안함).
+
+- `publish(changes)`: 커밋 끝난 묶음 하나 분량 이벤트 보냄
+- `complete()`: 수집 한번 끝났다고 알림 (모아뒀다 한번에 처리하는 구독자용, 예: 공간 인덱스)
+- 구독자 하나가 실패해도 나머지 구독자랑 수집은 계속 감 (로그만 남김)
+
+구독자 콜백은 수집 돌고 있는 스레드에서 바로 불려서, 스레드 여러개에서 불러도 안전해야 함.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Set
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+CHANGE_NEW = "new"
+CHANGE_CHANGED = "changed"
+CHANGE_REMOVED = "removed"
+
+
+@dataclass(frozen=True)
+class TouristInfoChange:
+    """
+    tourist_info 행 하나 바뀐거.
+
+    Attributes:
+        kind (str): CHANGE_NEW | CHANGE_CHANGED | CHANGE_REMOVED
+        content_id (str): 바뀐 행 content_id.
+        before (dict): 바뀌기 전 컬럼 값들 (새 행이면 None).
+        after (dict): 바뀐 후 컬럼 값들 (없어진 행이면 None).
+            둘다 tour_ingest에서 비교용으로 정규화한 값이라 (좌표는 Decimal 7자리) 그대로 == 비교해도 됨.
+    """
+    kind: str
+    content_id: str
+    before: Optional[Dict[str, Any]] = None
+    after: Optional[Dict[str, Any]] = None
+
+    @property
+    def regions(self) -> Set[str]:
+        """바뀌기 전/후 지역 (지역 옮긴 행이면 둘다)."""
+        return {row["region"] for row in (self.before, self.after) if row is not None}
+
+    def touches(self, columns: Iterable[str]) -> bool:
+        """`columns` 중 하나라도 바뀌었는지 (새 행/없어진 행이면 항상 True)."""
+        if self.before is None or self.after is None:
+            return True
+        return any(self.before.get(name) != self.after.get(name) for name in columns)
+
+    @property
+    def coords_changed(self) -> bool:
+        """공간 인덱스 손봐야 하는지 (새 행/없어진 행이거나 좌표 바뀜)."""
+        return self.touches(("latitude", "longitude"))
+
+
+ChangeHandler = Callable[[Sequence[TouristInfoChange]], None]
+CompleteHandler = Callable[[], None]
+
+
+@dataclass
+class _Subscriber:
+    on_changes: ChangeHandler
+    on_complete: Optional[CompleteHandler] = None
+    calls: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+
+class ChangeEventBus:
+    """구독자 이름 -> 콜백 들고 변경 이벤트 나눠주는거."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, _Subscriber] = {}
+        self._lock = threading.Lock()
+        self.published: Dict[str, int] = {CHANGE_NEW: 0, CHANGE_CHANGED: 0, CHANGE_REMOVED: 0}
+
+    def subscribe(self, name: str, on_changes: ChangeHandler, on_complete: Optional[CompleteHandler] = None) -> None:
+        """
+        구독자 등록하는거. 같은 이름으로 또 부르면 바꿔끼움 (여러번 불러도 한번만 받음).
+        콜백은 등록한 순서대로 불림 (바꿔끼워도 처음 등록한 자리 그대로).
+        """
+        with self._lock:
+            self._subscribers[name] = _Subscriber(on_changes, on_complete)
+
+    def unsubscribe(self, name: str) -> None:
+        with self._lock:
+            self._subscribers.pop(name, None)
+
+    def _call(self, name: str, subscriber: _Subscriber, callback: Callable, *args) -> None:
+        started = time.perf_counter()
+        try:
+            callback(*args)
+        except Exception as e:
+            subscriber.errors += 1
+            logger.error(f"[Changes] 구독자 {name} 처리 중 오류 발생: {e}", exc_info=True)
+        finally:
+            subscriber.calls += 1
+            subscriber.seconds += time.perf_counter() - started
+
+    def publish(self, changes: Sequence[TouristInfoChange]) -> None:
+        """변경 이벤트 구독자들한테 보내는거. DB 커밋 끝난 다음에 불러야 함."""
+        if not changes:
+            return
+        for change in changes:
+            self.published[change.kind] += 1
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for name, subscriber in subscribers:
+            self._call(name, subscriber, subscriber.on_changes, changes)
+
+    def complete(self) -> None:
+        """수집 한번 끝났다고 구독자들한테 알리는거."""
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for name, subscriber in subscribers:
+            if subscriber.on_complete is not None:
+                self._call(name, subscriber, subscriber.on_complete)
+
+    def stats(self) -> Dict[str, Any]:
+        """종류별 보낸 이벤트 수랑 구독자별 호출 수/오류 수/걸린 시간 돌려주는거."""
+        with self._lock:
+            subscribers = dict(self._subscribers)
+        return {
+            **{f"published_{kind}": count for kind, count in self.published.items()},
+            **{f"{name}_calls": subscriber.calls for name, subscriber in subscribers.items()},
+            **{f"{name}_errors": subscriber.errors for name, subscriber in subscribers.items()},
+            **{f"{name}_seconds": round(subscriber.seconds, 3) for name, subscriber in subscribers.items()},
+        }
+
+
+# 프로세스 전체에서 같이 쓰는 tourist_info 변경 이벤트 버스
+tourist_info_changes = ChangeEventBus()
+
+
+def subscribe_cache_invalidation(bus: ChangeEventBus = tourist_info_changes) -> None:
+    """
+    tourist_info 위에 만든 캐시들 변경 이벤트 받게 등록하는거. 앱 시작할때랑 수집 CLI에서 부름.
+
+    - verification_cache: 바뀐/없어진 행 검증 결과 지움 (LRU + DB)
+    - spatial_index: 좌표 바뀐 행 모아뒀다가 수집 끝나면 기존 인덱스에 반영
+    - catalog: 바뀐 행 있는 지역 모아뒀다가 수집 끝나면 그 지역만 다시 읽음
+    - plan_cache: 바뀐 행 있는 지역의 /recommend 응답만 지움 (카탈로그 바뀐 다음이라 맨 뒤에 등록)
+    """
+    # 쓰는 쪽에서만 무거운 모듈 import하게 여기서 import함
+    from src.catalog import catalog_store
+    from src.plan_cache import plan_cache
+    from src.spatial import spatial_index_store
+    from src.verification_cache import verification_cache
+
+    bus.subscribe("verification_cache", verification_cache.invalidate_tourist_info)
+    bus.subscribe("spatial_index", spatial_index_store.queue_changes, spatial_index_store.apply_queued_changes)
+    bus.subscribe("catalog", catalog_store.queue_changes, catalog_store.apply_queued_changes)
+    bus.subscribe("plan_cache", plan_cache.queue_changes, plan_cache.apply_queued_changes)
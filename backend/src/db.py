@@ -4,15 +4,18 @@ DB 상호작용 핵심 로직 파일임.
 """
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, or_, text, and_
+from sqlalchemy import create_engine, or_, text, and_, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator, List, Optional
-from datetime import date, datetime
-from apscheduler.schedulers.background import BackgroundScheduler
+from typing import Any, AsyncGenerator, Callable, Generator, List, Optional, Sequence, TypeVar
+from datetime import date
 
 import logging
 
-from src.openapi import Base, TouristInfo, AiLog # ORM 모델 가져오는거
+from src.openapi import Base, TouristInfo # ORM 모델 가져오는거
+from src.metrics import span, DB_OPERATION_SECONDS
+from src.semantic_index import semantic_index_store
 from src.models import UserRequest, VerificationDetails, RecommendationItem, DailyRecommendation, RecommendationResponse
 
 # 로거 설정하는거
@@ -32,17 +35,82 @@ if not DATABASE_URL:
 
 logger.info(f"[DB] 데이터베이스 연결 URL을 사용합니다: {DATABASE_URL}")
 
+# 커넥션 풀 설정 (환경 변수로 조절함)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # MySQL wait_timeout 전에 커넥션 새로 맺게 하는거
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+
+# 비동기 드라이버 매핑 (DATABASE_URL 드라이버 -> 같은 DB의 asyncio 드라이버). 의존성에 있는 드라이버만 넣음
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def _pool_options(url: str) -> dict:
+    """DB 주소에 맞는 커넥션 풀 옵션 만드는거. 메모리 SQLite는 풀 크기 개념이 없어서 빼줌."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def async_database_url(url: str) -> str:
+    """동기 DB 주소(mysql+pymysql://...)를 asyncio 드라이버 주소(mysql+aiomysql://...)로 바꾸는거."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"{parsed.get_backend_name()} DB는 비동기 드라이버 매핑이 없습니다. ASYNC_DATABASE_URL을 직접 설정해주세요.")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
 # SQLAlchemy 엔진이랑 세션 만드는거
-engine = create_engine(DATABASE_URL)
+# 동기 엔진은 마이그레이션, 스크립트, 스레드에서 도는 작업(캐시 저장, 로그 싱크 등)이 씀
+engine = create_engine(DATABASE_URL, **_pool_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# --- DB 스키마 관리하는거 ---
+# 비동기 엔진은 FastAPI 핸들러에서 씀. 드라이버 import를 처음 쓸때로 미루려고 늦게 만듦.
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
 
-# 앱 시작할때 테이블 스키마 초기화하는거.
-# checkfirst=True: 테이블 잇을때만 삭제해서 필요없는 에러 막는거.
+def get_async_engine() -> AsyncEngine:
+    """비동기 엔진 돌려주는거. 처음 부를때 만듦."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_options(ASYNC_DATABASE_URL))
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
 
-logger.info("[DB] 모든 테이블을 ORM 모델 정의에 따라 생성합니다.")
-Base.metadata.create_all(bind=engine)
+
+def AsyncSessionLocal() -> AsyncSession:
+    """비동기 세션 만드는거 (SessionLocal의 비동기 버전)."""
+    get_async_engine()
+    return _async_sessionmaker()
+
+
+async def dispose_async_engine() -> None:
+    """앱 꺼질때 비동기 커넥션 풀 정리하는거."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
+
+# --- DB 스키마 관리하는거 ---
+
+# 스키마는 import할때 만들지 않고 src/migrations.py의 마이그레이션으로 관리함.
+# 앱 시작 이벤트에서 `run_migrations(engine)` 부르거나 `python -m src.migrations`로 직접 적용하면 됨.
 
 
 # --- DB 세션 의존성 주입하는거 ---
@@ -62,43 +130,253 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI 의존성 주입용 비동기 DB 세션 생성기임.
+    세션은 처음 쿼리할때 커넥션 가져가고, 트랜잭션 끝나면(`async with db.begin()` 블록 끝) 바로 풀에 돌려줌.
+    그래서 Agent 도는 몇분 동안 커넥션 잡고 있지 않음. 요청 끝나면 세션 닫음.
+
+    Yields:
+        AsyncSession: SQLAlchemy 비동기 DB 세션 객체
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
 
 # --- 데이터 조회랑 로깅하는거 ---
 
-def log_ai_interaction(
+# 사용자 관심사 -> tourist_info.category_tag 접두어 매핑. 여기 없는 관심사는 관심사 자체를 접두어로 씀.
+INTEREST_CATEGORY_PREFIXES = {
+    "음식": ["음식_", "축제_음식"],
+    "문화": ["문화_", "축제_"],
+    "자연": ["자연_"],
+    "쇼핑": ["쇼핑_", "문화_전통시장", "음식_시장"],
+}
+
+# LLM한테 넘기는 후보 목록 최대 개수 (프롬프트 너무 길어지는거 막는거)
+MAX_CANDIDATES = 60
+
+
+def interest_prefix_groups(interests: List[str], region: Optional[str] = None) -> List[List[str]]:
+    """
+    관심사마다 category_tag 접두어 목록 만드는거 (관심사 순서대로, 같은 관심사 두번 나오면 한번만).
+    `INTEREST_CATEGORY_PREFIXES`에 없는 관심사는 관심사 자체 + 임베딩 인덱스(semantic_index.py)로 찾은 태그들로 매칭함.
+    """
+    interests = list(dict.fromkeys(interest.strip() for interest in interests if interest.strip()))
+    resolved = semantic_index_store.resolve([interest for interest in interests if interest not in INTEREST_CATEGORY_PREFIXES], region)
+    return [
+        list(dict.fromkeys(INTEREST_CATEGORY_PREFIXES.get(interest) or [interest, *resolved.get(interest, [])]))
+        for interest in interests
+    ]
+
+
+def interest_category_prefixes(interests: List[str], region: Optional[str] = None) -> List[str]:
+    """관심사 목록을 category_tag 접두어 목록 하나로 합치는거 (중복 빼고 관심사 순서대로)."""
+    return list(dict.fromkeys(prefix for group in interest_prefix_groups(interests, region) for prefix in group))
+
+
+T = TypeVar("T")
+
+
+def share_by_interest(groups: Sequence[Sequence[T]], limit: int, ident: Callable[[T], Any], key: Callable[[T], Any]) -> List[T]:
+    """
+    관심사별 후보 목록(각각 앞에서부터 우선)에서 관심사마다 돌아가며 하나씩 골라 `limit`개 채우는거.
+    그래서 관심사마다 몫이 같고, 후보 모자란 관심사 몫은 다른 관심사가 씀. 여러 관심사에 걸리는 행은 한번만 넣음.
+    고른 결과는 `key` 순서(전체 조회 순서)로 돌려줌.
+    """
+    chosen: dict = {}
+    cursors = [0] * len(groups)
+    while len(chosen) < limit:
+        progressed = False
+        for index, group in enumerate(groups):
+            while cursors[index] < len(group) and ident(group[cursors[index]]) in chosen:
+                cursors[index] += 1
+            if cursors[index] < len(group) and len(chosen) < limit:
+                item = group[cursors[index]]
+                chosen[ident(item)] = item
+                cursors[index] += 1
+                progressed = True
+        if not progressed:
+            break
+    return sorted(chosen.values(), key=key)
+
+
+def _category_prefix_filter(prefix: str):
+    """
+    category_tag 접두어 조건 만드는거.
+    LIKE 대신 범위 비교로 써야 (region, category_tag) 인덱스를 DB 종류 상관없이 범위 스캔으로 탐.
+    """
+    return and_(TouristInfo.category_tag >= prefix, TouristInfo.category_tag < prefix + "\U0010ffff")
+
+
+def get_tourist_info_from_db(
     db: Session,
-    request_time: datetime,
-    user_input_json: str,
-    ai_response_json: str,
-    total_tokens: Optional[int],
-    agent_search_log: Optional[str],
-    is_verified_success: bool
-):
+    region: str,
+    interests: List[str],
+    start_date: date,
+    end_date: date,
+    limit: int = MAX_CANDIDATES
+) -> List[dict]:
     """
-    AI 상호작용 로그(사용자 요청, AI 응답, 검증 결과 등)를 ai_log 테이블에 저장함.
+    tourist_info 테이블에서 지역, 관심사, 여행 기간에 맞는 관광 정보 조회하는거.
+
+    - 관심사는 `INTEREST_CATEGORY_PREFIXES`로 category_tag 접두어 매칭함.
+    - `limit`은 관심사마다 나눠서 씀 (한 관심사 행이 id 앞쪽에 몰려있어도 다른 관심사 후보가 빠지지 않게).
+    - 축제/행사처럼 기간 있는 항목은 여행 기간이랑 겹치는 것만 가져옴.
 
     Args:
         db (Session): DB 세션.
-        request_time (datetime): 요청 시간.
-        user_input_json (str): JSON 형식의 사용자 입력.
-        ai_response_json (str): JSON 형식의 AI 응답.
-        total_tokens (Optional[int]): 사용된 총 토큰 수.
-        agent_search_log (Optional[str]): Agent의 검색 과정 로그.
-        is_verified_success (bool): 최종 검증 성공 여부.
+        region (str): 여행 지역.
+        interests (List[str]): 사용자 관심사 목록.
+        start_date (date): 여행 시작일.
+        end_date (date): 여행 종료일.
+        limit (int): 최대 조회 개수.
+
+    Returns:
+        List[dict]: `TouristInfo.to_dict()` 형태의 관광 정보 목록.
     """
+    stmts = _tourist_info_queries(region, interests, start_date, end_date, limit)
+    if not stmts:
+        return []
+    with span(DB_OPERATION_SECONDS, operation="tourist_info_query"):
+        groups = [db.execute(stmt).scalars().all() for stmt in stmts]
+    rows = share_by_interest(groups, limit, ident=lambda row: row.id, key=_candidate_order)
+    logger.info(f"[DB] {region} 지역 관광 정보 {len(rows)}건 조회 완료 (관심사: {interests}).")
+    return [row.to_dict() for row in rows]
+
+
+async def get_tourist_info_from_db_async(
+    db: AsyncSession,
+    region: str,
+    interests: List[str],
+    start_date: date,
+    end_date: date,
+    limit: int = MAX_CANDIDATES
+) -> List[dict]:
+    """`get_tourist_info_from_db`의 비동기 세션 버전임. 조건이랑 반환값은 같음."""
+    stmts = _tourist_info_queries(region, interests, start_date, end_date, limit)
+    if not stmts:
+        return []
+    with span(DB_OPERATION_SECONDS, operation="tourist_info_query"):
+        groups = [(await db.execute(stmt)).scalars().all() for stmt in stmts]
+    rows = share_by_interest(groups, limit, ident=lambda row: row.id, key=_candidate_order)
+    logger.info(f"[DB] {region} 지역 관광 정보 {len(rows)}건 조회 완료 (관심사: {interests}).")
+    return [row.to_dict() for row in rows]
+
+
+def _candidate_order(row: TouristInfo):
+    # 쿼리 ORDER BY랑 같은 순서 (기간 있는 축제/행사 먼저, 그 다음 id)
+    return row.start_date is None, row.id
+
+
+def _tourist_info_queries(region: str, interests: List[str], start_date: date, end_date: date, limit: int) -> list:
+    """
+    관심사마다 지역/관심사/기간 조건 SELECT 구문 만드는거. 매칭할 관심사 없으면 빈 목록.
+    관심사마다 `limit`개까지 읽어둬야 모자란 관심사 몫을 다른 관심사로 채울 수 있음.
+    """
+    return [
+        select(TouristInfo)
+        .where(
+            TouristInfo.region == region.strip(),
+            or_(*[_category_prefix_filter(prefix) for prefix in prefixes]),
+            or_(TouristInfo.start_date.is_(None), TouristInfo.start_date <= end_date),
+            or_(TouristInfo.end_date.is_(None), TouristInfo.end_date >= start_date),
+        )
+        .order_by(TouristInfo.start_date.is_(None), TouristInfo.id)
+        .limit(limit)
+        for prefixes in interest_prefix_groups(interests, region)
+    ]
+
+
+def find_candidates_for_request(db: Session, user_request: UserRequest) -> List[dict]:
+    """사용자 요청(지역, 관심사, 날짜)에 맞는 추천 후보 조회하는거. 조회 실패하면 빈 목록 돌려줌."""
     try:
-        ai_log_entry = AiLog(
-            request_time=request_time,
-            user_input_json=user_input_json,
-            ai_response_json=ai_response_json,
-            total_tokens=total_tokens,
-            agent_search_log=agent_search_log,
-            is_verified_success=is_verified_success
+        tourist_info_data = get_tourist_info_from_db(
+            db=db,
+            region=user_request.region,
+            interests=user_request.interests,
+            start_date=user_request.start_date,
+            end_date=user_request.end_date
         )
-        db.add(ai_log_entry)
-        db.commit()
-        db.refresh(ai_log_entry)
-        logger.info(f"[DB] AI 상호작용 로그가 성공적으로 저장되었습니다 (ID: {ai_log_entry.log_id}).")
     except Exception as e:
-        db.rollback()
-        logger.error(f"[DB] AI 상호작용 로그 저장 중 오류 발생: {e}")
+        logger.error(f"[DB] 관광 정보 DB 조회 실패: {e}", exc_info=True)
+        tourist_info_data = []
+    return _warn_if_no_candidates(tourist_info_data)
+
+
+async def find_candidates_for_request_async(db: AsyncSession, user_request: UserRequest) -> List[dict]:
+    """
+    `find_candidates_for_request`의 비동기 세션 버전임.
+    조회 트랜잭션 끝나자마자 커넥션 풀에 돌려줌 (세션은 요청 끝날때까지 남아있어도 커넥션은 안 잡음).
+    """
+    try:
+        async with db.begin():
+            tourist_info_data = await get_tourist_info_from_db_async(
+                db=db,
+                region=user_request.region,
+                interests=user_request.interests,
+                start_date=user_request.start_date,
+                end_date=user_request.end_date
+            )
+    except Exception as e:
+        logger.error(f"[DB] 관광 정보 DB 조회 실패: {e}", exc_info=True)
+        tourist_info_data = []
+    return _warn_if_no_candidates(tourist_info_data)
+
+
+def _warn_if_no_candidates(tourist_info_data: List[dict]) -> List[dict]:
+    # 조회된 정보 없으면 Agent가 웹 검색으로 추천하게 넘기는거
+    if not tourist_info_data:
+        logger.warning("[DB] 사용자의 요청에 맞는 관광 정보를 DB에서 찾을 수 없어 Agent 추천으로 진행합니다.")
+    return tourist_info_data
+
+
+def _dialect_insert(db: Session):
+    """DB 종류에 맞는 insert 구문 생성자 고르는거 (upsert 문법이 DB마다 달라서)."""
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"{dialect_name} DB는 upsert를 지원하지 않습니다.")
+    return dialect_name, dialect_insert
+
+
+def upsert_tourist_info(db: Session, rows: List[dict], batch_size: int = 500) -> int:
+    """
+    관광 정보를 content_id 기준으로 upsert하는거 (없으면 추가, 있으면 갱신).
+    여러 행을 한번에 넣는 multi-row INSERT ... ON CONFLICT(ON DUPLICATE KEY) 구문 씀.
+
+    - 이 함수는 실행만 하고 커밋은 안함. 트랜잭션은 부르는 쪽에서 관리하는거.
+
+    Args:
+        db (Session): DB 세션.
+        rows (List[dict]): `TouristInfo` 컬럼 이름을 키로 가진 딕셔너리 목록 (id 제외).
+        batch_size (int): 한번에 보낼 행 수.
+
+    Returns:
+        int: 처리한 행 수.
+    """
+    if not rows:
+        return 0
+
+    dialect_name, dialect_insert = _dialect_insert(db)
+    update_columns = [column.name for column in TouristInfo.__table__.columns if column.name not in ("id", "content_id")]
+
+    stmt = dialect_insert(TouristInfo)
+    if dialect_name == "mysql":
+        stmt = stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in update_columns})
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["content_id"],
+            set_={name: stmt.excluded[name] for name in update_columns}
+        )
+
+    # executemany로 넘기면 SQLAlchemy가 알아서 multi-row VALUES로 묶어서 보냄
+    with span(DB_OPERATION_SECONDS, operation="upsert_tourist_info"):
+        for offset in range(0, len(rows), batch_size):
+            db.execute(stmt, rows[offset:offset + batch_size])
+    return len(rows)
@@ -0,0 +1,277 @@
+"""
+지오코딩 끝난 일자별 추천 목록을 동선 짧게 다시 정렬하는 파일임.
+LLM이 준 순서대로 가면 부산 감천문화마을 <-> 해운대 왔다갔다 하는 일이 생겨서,
+하루치 장소들끼리 거리 행렬(NumPy haversine) 구하고 TSP 휴리스틱(최근접 이웃 + 2-opt)으로
+운영 시간 안 넘기는 순서 찾음. 원하면 날짜 없는 항목은 다른 날로 옮기기도 함.
+"""
+
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.models import DailyRecommendation, RecommendationItem
+from src.spatial import haversine_km
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+DAY_START_MINUTES = 9 * 60  # 하루 일정 시작 시각 (09:00)
+VISIT_MINUTES = 90  # 장소 한곳에 머무는 시간
+TRAVEL_KMH = 30.0  # 이동 평균 속도 (도심 대중교통/차량 기준)
+WINDOW_VIOLATION_PENALTY_KM = 50.0  # 운영 시간 밖 도착 한번당 벌점 (거리 km로 환산)
+MAX_STARTS = 4  # 최근접 이웃 시작점 후보 수
+WINDOW_AWARE_MAX_ITEMS = 12  # 이 개수 이하일때만 운영 시간까지 보는 2-opt 돌림 (그 이상은 거리만 봄)
+
+ITINERARY_REBALANCE_DAYS = os.getenv("ITINERARY_REBALANCE_DAYS", "0") == "1"
+
+_ALWAYS_OPEN = (0, 48 * 60)
+_HOURS_PATTERN = re.compile(r"(\d{1,2}):(\d{2})\s*[-~]\s*(\d{1,2}):(\d{2})")
+
+
+def parse_operating_hours(operating_hours: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    "매일 10:30-21:30" 같은 운영 시간 문자열에서 (여는 시각, 닫는 시각)을 분 단위로 뽑는거.
+    자정 넘어서 닫는 곳(18:00-02:00)은 닫는 시각에 24시간 더함. 못 읽으면 None.
+    """
+    if not operating_hours:
+        return None
+    if "24시간" in operating_hours:
+        return _ALWAYS_OPEN
+    match = _HOURS_PATTERN.search(operating_hours)
+    if not match:
+        return None
+    open_h, open_m, close_h, close_m = (int(group) for group in match.groups())
+    opens, closes = open_h * 60 + open_m, close_h * 60 + close_m
+    if closes <= opens:
+        closes += 24 * 60
+    return opens, closes
+
+
+def distance_matrix(latitudes: Sequence[float], longitudes: Sequence[float]) -> np.ndarray:
+    """장소들 사이 거리(km) 행렬을 한번에 계산하는거."""
+    lat = np.asarray(latitudes, dtype=np.float64)
+    lon = np.asarray(longitudes, dtype=np.float64)
+    return haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+
+
+def route_cost(order: Sequence[int], dist: np.ndarray, windows: Sequence[Tuple[int, int]]) -> float:
+    """
+    방문 순서 비용 계산하는거. 이동거리(km) + 운영 시간 밖 도착 횟수 * 벌점.
+    여는 시간 전에 도착하면 열때까지 기다린다고 봄.
+    """
+    clock = DAY_START_MINUTES
+    travelled = 0.0
+    violations = 0
+    previous = None
+    for index in order:
+        if previous is not None:
+            leg = dist[previous, index]
+            travelled += leg
+            clock += leg / TRAVEL_KMH * 60.0
+        opens, closes = windows[index]
+        if clock < opens:
+            clock = opens
+        if clock + VISIT_MINUTES > closes:
+            violations += 1
+        clock += VISIT_MINUTES
+        previous = index
+    return travelled + WINDOW_VIOLATION_PENALTY_KM * violations
+
+
+def _nearest_neighbour(start: int, dist: np.ndarray) -> List[int]:
+    remaining = set(range(len(dist)))
+    remaining.remove(start)
+    order = [start]
+    while remaining:
+        current = order[-1]
+        following = min(remaining, key=lambda candidate: dist[current, candidate])
+        remaining.remove(following)
+        order.append(following)
+    return order
+
+
+def _two_opt_distance(order: List[int], dist: np.ndarray) -> List[int]:
+    """
+    이동거리만 보는 2-opt. 구간 [i, j] 뒤집을때 바뀌는 간선 두개만 보면 돼서 j 전체를 한번에 계산함.
+    """
+    n = len(order)
+    route = np.asarray(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n - 1):
+            js = np.arange(i + 1, n)
+            delta = np.zeros(len(js))
+            if i > 0:
+                delta += dist[route[i - 1], route[js]] - dist[route[i - 1], route[i]]
+            inner = js < n - 1
+            nxt = route[np.minimum(js + 1, n - 1)]
+            delta += np.where(inner, dist[route[i], nxt] - dist[route[js], nxt], 0.0)
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-9:
+                j = int(js[best])
+                route[i:j + 1] = route[i:j + 1][::-1].copy()
+                improved = True
+    return route.tolist()
+
+
+def _two_opt(order: List[int], dist: np.ndarray, windows: Sequence[Tuple[int, int]]) -> Tuple[List[int], float]:
+    """거리 2-opt로 먼저 다듬고, 장소 수 적으면 운영 시간 포함한 비용으로 한번 더 다듬는거."""
+    order = _two_opt_distance(order, dist)
+    best_cost = route_cost(order, dist, windows)
+    if len(order) > WINDOW_AWARE_MAX_ITEMS:
+        return order, best_cost
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                cost = route_cost(candidate, dist, windows)
+                if cost < best_cost - 1e-9:
+                    order, best_cost = candidate, cost
+                    improved = True
+    return order, best_cost
+
+
+def solve_route(dist: np.ndarray, windows: Sequence[Tuple[int, int]]) -> Tuple[List[int], float]:
+    """
+    하루치 방문 순서 구하는거 (출발지로 안 돌아오는 경로).
+    원래 순서(0, 1, 2, ...)랑 최근접 이웃 몇개를 2-opt로 다듬어서 제일 싼걸 고름.
+
+    Returns:
+        Tuple[List[int], float]: (방문 순서, 비용)
+    """
+    n = len(windows)
+    identity = list(range(n))
+    if n <= 1:
+        return identity, 0.0
+
+    # 시작점 후보: LLM이 첫번째로 둔 곳 + 일찍 닫는 곳들
+    starts = [0] + sorted(range(n), key=lambda index: windows[index][1])[:MAX_STARTS]
+    best_order, best_cost = _two_opt(identity, dist, windows)
+    for start in dict.fromkeys(starts):
+        order, cost = _two_opt(_nearest_neighbour(start, dist), dist, windows)
+        if cost < best_cost - 1e-9:
+            best_order, best_cost = order, cost
+    return best_order, best_cost
+
+
+def _has_coords(item: RecommendationItem) -> bool:
+    return item.latitude is not None and item.longitude is not None
+
+
+def _order_items(items: List[RecommendationItem], dist: np.ndarray, positions: Dict[int, int],
+                 windows: List[Tuple[int, int]]) -> Tuple[List[RecommendationItem], float]:
+    """좌표 있는 항목만 순서 최적화하고 좌표 없는 항목은 원래 순서대로 뒤에 붙이는거."""
+    located = [item for item in items if _has_coords(item)]
+    unlocated = [item for item in items if not _has_coords(item)]
+    if len(located) <= 1:
+        return located + unlocated, 0.0
+    indices = [positions[id(item)] for item in located]
+    sub_dist = dist[np.ix_(indices, indices)]
+    order, cost = solve_route(sub_dist, [windows[index] for index in indices])
+    return [located[i] for i in order] + unlocated, cost
+
+
+def _is_movable(item: RecommendationItem) -> bool:
+    """날짜 정해진 축제/행사가 아니고 좌표 있는 항목만 다른 날로 옮길 수 있음."""
+    return _has_coords(item) and item.start_date is None and item.end_date is None
+
+
+def _rebalance_days(days: List[List[RecommendationItem]], dist: np.ndarray, positions: Dict[int, int],
+                    iterations: int = 5) -> List[List[RecommendationItem]]:
+    """
+    옮길 수 있는 항목들을 가까운 날짜 묶음으로 다시 나누는거 (하루 항목 수는 그대로 유지).
+    날짜별 중심점에 가까운 순서대로 자리 남은 날에 배정하는 식으로 몇번 반복함.
+    """
+    fixed = [[item for item in day if not _is_movable(item)] for day in days]
+    movable = [item for day in days for item in day if _is_movable(item)]
+    if not movable or len(days) < 2:
+        return days
+    capacity = [len(day) - len(fixed_items) for day, fixed_items in zip(days, fixed)]
+    assignment = [list(fixed_items) + [item for item in day if _is_movable(item)] for day, fixed_items in zip(days, fixed)]
+
+    for _ in range(iterations):
+        medoids = []
+        for day in assignment:
+            located = [positions[id(item)] for item in day if _has_coords(item)]
+            if not located:
+                medoids.append(None)
+                continue
+            # 날짜 묶음 안에서 다른 곳들이랑 거리 합이 제일 작은 곳을 중심으로 씀
+            sub = dist[np.ix_(located, located)]
+            medoids.append(located[int(np.argmin(sub.sum(axis=1)))])
+
+        pairs = sorted(
+            (dist[positions[id(item)], medoid], item_index, day_index)
+            for item_index, item in enumerate(movable)
+            for day_index, medoid in enumerate(medoids)
+            if medoid is not None and capacity[day_index] > 0
+        )
+        remaining = list(capacity)
+        placed: Dict[int, int] = {}
+        for _, item_index, day_index in pairs:
+            if item_index in placed or remaining[day_index] == 0:
+                continue
+            placed[item_index] = day_index
+            remaining[day_index] -= 1
+        if len(placed) < len(movable):
+            return days
+
+        new_assignment = [list(fixed_items) for fixed_items in fixed]
+        for item_index, item in enumerate(movable):
+            new_assignment[placed[item_index]].append(item)
+        if [[id(item) for item in day] for day in new_assignment] == [[id(item) for item in day] for day in assignment]:
+            break
+        assignment = new_assignment
+    return assignment
+
+
+def optimize_itinerary(daily_recommendations: List[DailyRecommendation],
+                       rebalance_days: bool = ITINERARY_REBALANCE_DAYS) -> List[DailyRecommendation]:
+    """
+    일자별 추천 목록 동선 최적화하는 메인 함수. DailyRecommendation 안의 목록을 바로 바꿈.
+
+    Args:
+        daily_recommendations (List[DailyRecommendation]): 지오코딩 끝난 일자별 추천 목록.
+        rebalance_days (bool): True면 날짜 없는 항목을 다른 날로 옮기는 것도 허용함.
+            총 비용이 줄어들때만 옮긴 결과를 씀.
+
+    Returns:
+        List[DailyRecommendation]: 같은 리스트 (순서만 바뀜).
+    """
+    all_items = [item for day in daily_recommendations for item in day.recommendations]
+    located = [item for item in all_items if _has_coords(item)]
+    if len(located) < 2:
+        return daily_recommendations
+
+    positions = {id(item): index for index, item in enumerate(located)}
+    dist = distance_matrix([item.latitude for item in located], [item.longitude for item in located])
+    windows = [parse_operating_hours(item.operating_hours) or _ALWAYS_OPEN for item in located]
+
+    days = [list(day.recommendations) for day in daily_recommendations]
+    ordered_days, total_cost = [], 0.0
+    for items in days:
+        ordered, cost = _order_items(items, dist, positions, windows)
+        ordered_days.append(ordered)
+        total_cost += cost
+
+    if rebalance_days:
+        rebalanced = _rebalance_days(days, dist, positions)
+        if rebalanced is not days:
+            candidate_days, candidate_cost = [], 0.0
+            for items in rebalanced:
+                ordered, cost = _order_items(items, dist, positions, windows)
+                candidate_days.append(ordered)
+                candidate_cost += cost
+            if candidate_cost < total_cost - 1e-9:
+                logger.info(f"[Itinerary] 날짜 재배정으로 동선 비용이 {total_cost:.1f} -> {candidate_cost:.1f}로 줄었습니다.")
+                ordered_days, total_cost = candidate_days, candidate_cost
+
+    for day, ordered in zip(daily_recommendations, ordered_days):
+        day.recommendations = ordered
+    return daily_recommendations
@@ -0,0 +1,242 @@
+"""
+오래 걸리는 /recommend를 백그라운드 작업으로 돌리는 파일임.
+POST는 작업 ID만 바로 돌려주고, 워커가 추천 만들면서 진행 상황/부분 결과를 recommendation_job 테이블에 저장함.
+클라이언트는 GET으로 폴링해서 부분 결과나 최종 결과 받아감.
+HTTP 커넥션이랑 요청 DB 세션을 Agent 도는 동안 안 잡고 있게 하려고 만든거.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.catalog import find_candidates
+from src.db import SessionLocal
+from src.llm import stream_ai_recommendations, response_from_events
+from src.log_sink import ai_log_sink, ai_log_record
+from src.models import UserRequest, RecommendationResponse, RecommendationJobStatus, RecommendationStreamEvent
+from src.openapi import RecommendationJob
+from src.plan_cache import plan_cache
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+RECOMMEND_JOB_WORKERS = int(os.getenv("RECOMMEND_JOB_WORKERS", "2"))
+# 부분 결과 DB에 쓰는 최소 간격(초). 검증 끝날때마다 쓰면 DB 부담 커서 묶어서 씀.
+RECOMMEND_JOB_PROGRESS_INTERVAL = float(os.getenv("RECOMMEND_JOB_PROGRESS_INTERVAL", "1.0"))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+# --- DB 접근 (동기 세션이라 스레드에서 돌림) ---
+
+def _insert_job(db: Session, job_id: str, user_request: UserRequest) -> RecommendationJobStatus:
+    job = RecommendationJob(
+        job_id=job_id,
+        status=JOB_QUEUED,
+        user_input_json=user_request.model_dump(mode="json"),
+        verified_items=0,
+        total_items=0,
+        created_at=datetime.now(),
+    )
+    db.add(job)
+    db.commit()
+    return _to_status(job)
+
+
+def _update_job(db: Session, job_id: str, values: dict) -> None:
+    try:
+        db.query(RecommendationJob).filter(RecommendationJob.job_id == job_id).update(values)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _load_job(db: Session, job_id: str) -> Optional[RecommendationJobStatus]:
+    job = db.get(RecommendationJob, job_id)
+    return _to_status(job) if job is not None else None
+
+
+def _load_unfinished_jobs(db: Session) -> List[Tuple[str, dict]]:
+    rows = (
+        db.query(RecommendationJob.job_id, RecommendationJob.user_input_json)
+        .filter(RecommendationJob.status.in_([JOB_QUEUED, JOB_RUNNING]))
+        .order_by(RecommendationJob.created_at)
+        .all()
+    )
+    return [(row.job_id, row.user_input_json) for row in rows]
+
+
+def _to_status(job: RecommendationJob) -> RecommendationJobStatus:
+    return RecommendationJobStatus(
+        job_id=job.job_id,
+        status=job.status,
+        verified_items=job.verified_items or 0,
+        total_items=job.total_items or 0,
+        result=RecommendationResponse(**job.result_json) if job.result_json else None,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+def _partial_response(events: List[RecommendationStreamEvent]) -> dict:
+    """지금까지 받은 이벤트로 부분 결과 만드는거. 검증 결과는 항목 객체에 이미 채워져 있음."""
+    response = RecommendationResponse(
+        daily_recommendations=[event.day for event in events if event.type == "day"],
+        is_verified_success=False,
+        agent_search_log="",
+    )
+    return response.model_dump(mode="json")
+
+
+class RecommendationJobRunner:
+    """
+    추천 작업 큐 + 워커 풀임. 워커는 처음 작업 들어올때 현재 이벤트 루프에 만들어짐.
+
+    Args:
+        session_factory: DB 세션 만드는 함수. 기본은 db.py의 SessionLocal.
+        max_workers (int): 동시에 돌릴 추천 작업 수.
+        progress_interval (float): 부분 결과 DB에 쓰는 최소 간격(초).
+    """
+
+    def __init__(self, session_factory=SessionLocal, max_workers: int = RECOMMEND_JOB_WORKERS,
+                 progress_interval: float = RECOMMEND_JOB_PROGRESS_INTERVAL):
+        self._session_factory = session_factory
+        self.max_workers = max_workers
+        self.progress_interval = progress_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list = []
+
+    async def _db(self, func, *args):
+        """스레드에서 DB 세션 열어서 `func(db, *args)` 돌리는거."""
+        def _run():
+            db = self._session_factory()
+            try:
+                return func(db, *args)
+            finally:
+                db.close()
+        return await asyncio.to_thread(_run)
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.max_workers)]
+
+    async def submit(self, user_request: UserRequest) -> RecommendationJobStatus:
+        """작업 저장하고 큐에 넣는거. 바로 queued 상태 돌려줌."""
+        self._ensure_workers()
+        job_id = uuid.uuid4().hex
+        status = await self._db(_insert_job, job_id, user_request)
+        self._queue.put_nowait((job_id, user_request))
+        logger.info(f"[Job] 추천 작업 {job_id}를 등록했습니다 (대기 {self._queue.qsize()}건).")
+        return status
+
+    async def get(self, job_id: str) -> Optional[RecommendationJobStatus]:
+        """작업 상태랑 부분/최종 결과 조회하는거. 없는 작업이면 None."""
+        return await self._db(_load_job, job_id)
+
+    async def resume_unfinished(self) -> int:
+        """앱 재시작 전에 안 끝난 작업(queued, running) 다시 큐에 넣는거."""
+        self._ensure_workers()
+        unfinished = await self._db(_load_unfinished_jobs)
+        for job_id, user_input in unfinished:
+            await self._db(_update_job, job_id, {"status": JOB_QUEUED, "started_at": None})
+            self._queue.put_nowait((job_id, UserRequest(**user_input)))
+        if unfinished:
+            logger.info(f"[Job] 안 끝난 추천 작업 {len(unfinished)}건을 다시 등록했습니다.")
+        return len(unfinished)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, user_request = await self._queue.get()
+            try:
+                await self._run_job(job_id, user_request)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Job] 추천 작업 {job_id} 실패: {e}", exc_info=True)
+                try:
+                    await self._db(_update_job, job_id, {"status": JOB_FAILED, "error": str(e), "finished_at": datetime.now()})
+                except Exception as db_error:
+                    logger.error(f"[Job] 추천 작업 {job_id} 상태 저장 실패: {db_error}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str, user_request: UserRequest) -> None:
+        await self._db(_update_job, job_id, {"status": JOB_RUNNING, "started_at": datetime.now()})
+        logger.info(f"[Job] 추천 작업 {job_id}를 시작합니다.")
+
+        found = await plan_cache.lookup(user_request)
+        if found is not None:
+            ai_response, cache_status = found
+        else:
+            # plan_cache에 처리 중으로 등록해서 돌림 (같은 요청 /recommend, 스트리밍, 다른 작업은 이 결과 기다림). 끝나면 캐시에 저장됨
+            task = plan_cache.start(user_request, lambda: self._generate(job_id, user_request))
+            ai_response = RecommendationResponse.model_validate_json(await asyncio.shield(task))
+            cache_status = "miss"
+            ai_response.cache_status = cache_status
+
+        await ai_log_sink.submit(ai_log_record(user_request, ai_response, cache_status))
+
+        failed = not ai_response.daily_recommendations
+        await self._db(_update_job, job_id, {
+            "status": JOB_FAILED if failed else JOB_SUCCEEDED,
+            "result_json": ai_response.model_dump(mode="json"),
+            "error": ai_response.agent_search_log if failed else None,
+            "finished_at": datetime.now(),
+        })
+        logger.info(f"[Job] 추천 작업 {job_id}가 끝났습니다 ({'실패' if failed else '성공'}, 캐시: {cache_status}).")
+
+    async def _generate(self, job_id: str, user_request: UserRequest) -> RecommendationResponse:
+        """스트리밍 이벤트 받으면서 진행 상황이랑 부분 결과 DB에 쓰는거."""
+        candidates = await self._db(find_candidates, user_request)
+
+        events: List[RecommendationStreamEvent] = []
+        total_items = verified_items = 0
+        last_written = None
+        async for event in stream_ai_recommendations(user_request, candidates=candidates):
+            events.append(event)
+            if event.type == "day":
+                total_items += event.pending_verifications or 0
+                continue
+            if event.type != "verification":
+                continue
+            verified_items += 1
+            # 일자별 추천은 한꺼번에 나오니까 첫 검증 결과 올때 같이 쓰고, 그 뒤로는 간격 두고 씀
+            now = time.monotonic()
+            if last_written is None or now - last_written >= self.progress_interval:
+                last_written = now
+                await self._db(_update_job, job_id, {
+                    "result_json": _partial_response(events),
+                    "verified_items": verified_items,
+                    "total_items": total_items,
+                })
+
+        await self._db(_update_job, job_id, {"verified_items": verified_items, "total_items": total_items})
+        return response_from_events(events)
+
+    async def aclose(self) -> None:
+        """워커 전부 멈추는거. 도는 중이던 작업은 다음 시작때 `resume_unfinished`로 다시 돌림."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+# 프로세스 전체에서 같이 쓰는 작업 실행기
+job_runner = RecommendationJobRunner()
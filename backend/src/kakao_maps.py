@@ -1,50 +1,188 @@
-import requests
+import asyncio
+import os
+import re
+import time
+import unicodedata
+import httpx
 import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.cache import TTLCache
+from src.metrics import GEOCODE_MISSES, KAKAO_GEOCODE_SECONDS
 
 logger = logging.getLogger(__name__)
 
-def get_coords_for_location(api_key, location):
+KAKAO_LOCAL_BASE_URL = os.getenv("KAKAO_LOCAL_BASE_URL", "https://dapi.kakao.com")
+KEYWORD_SEARCH_PATH = "/v2/local/search/keyword.json"
+
+Coords = Tuple[Optional[str], Optional[str]]
+
+def get_static_map_url(api_key, lat, lon, width=600, height=450):
     """
-    Get coordinates (latitude and longitude) for a given location using the Kakao Local Search API.
+    Get a static map image URL from the Kakao Maps API.
     """
-    url = f"https://dapi.kakao.com/v2/local/search/keyword.json?query={location}"
-    headers = {"Authorization": f"KakaoAK {api_key}"}
-    
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-        documents = response.json().get('documents')
+    if not lat or not lon:
+        return None
         
+    map_url = f"https://dapi.kakao.com/v2/map/staticmap?center={lat},{lon}&level=3&marker=true&markerpos={lat},{lon}&width={width}&height={height}"
+    
+    return map_url
+
+
+def normalize_address(address: str) -> str:
+    """
+    Normalize an address into a cache key so trivially different spellings
+    ("서울  용산구 남산공원길 105 ", full-width digits, ...) share one entry.
+    """
+    normalized = unicodedata.normalize("NFKC", address or "")
+    return re.sub(r"\s+", " ", normalized).strip()
+
+
+class AsyncKakaoGeocoder:
+    """
+    Non-blocking geocoder on top of the Kakao Local keyword search API.
+
+    - One shared ``httpx.AsyncClient`` (keep-alive connection pool) per geocoder.
+    - At most ``max_concurrency`` requests in flight at the same time.
+    - Results are cached by normalized address. Addresses Kakao has no match for
+      are cached too (for ``negative_cache_ttl``) so they are not retried on
+      every request; transport errors are never cached.
+    - Concurrent lookups of the same address share a single request.
+    - If ``rate_limiter`` (anything with an async ``acquire()``, e.g. a
+      ``TokenBucket``) is given, every API call waits on it first.
+
+    ``base_url`` can point at a local stub server for testing, or ``transport``
+    (e.g. ``httpx.MockTransport``) can replace the network entirely.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = KAKAO_LOCAL_BASE_URL,
+        max_concurrency: int = 8,
+        timeout: float = 5.0,
+        cache_ttl: float = 24 * 60 * 60,
+        negative_cache_ttl: float = 60 * 60,
+        cache_size: int = 10_000,
+        rate_limiter=None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.negative_cache_ttl = negative_cache_ttl
+        self.rate_limiter = rate_limiter
+        self.transport = transport
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.request_count = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool is bound to the running event loop.
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"KakaoAK {self.api_key}"},
+                timeout=self.timeout,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _fetch(self, location: str) -> Tuple[Coords, bool]:
+        """Call the API once. Returns the coordinates and whether the result is cacheable."""
+        started = time.perf_counter()
+        coords, cacheable = await self._request(location)
+        # Cache hits and shared in-flight lookups never get here, so this times real API calls
+        # (including the wait for a semaphore slot / rate limiter token).
+        outcome = "error" if not cacheable else ("found" if coords[0] is not None else "no_match")
+        KAKAO_GEOCODE_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+        if outcome != "found":
+            GEOCODE_MISSES.inc(reason=outcome)
+        return coords, cacheable
+
+    async def _request(self, location: str) -> Tuple[Coords, bool]:
+        client = self._get_client()
+        async with self._semaphore:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            self.request_count += 1
+            try:
+                response = await client.get(KEYWORD_SEARCH_PATH, params={"query": location})
+                response.raise_for_status()
+                documents = response.json().get('documents')
+            except httpx.HTTPStatusError as http_err:
+                logger.error(f"[KakaoMap API] HTTP error occurred for location {location}: {http_err} - Response: {http_err.response.text}")
+                return (None, None), False
+            except httpx.HTTPError as req_err:
+                logger.error(f"[KakaoMap API] Request error occurred for location {location}: {req_err}")
+                return (None, None), False
+            except Exception as e:
+                logger.error(f"[KakaoMap API] An unexpected error occurred for location {location}: {e}")
+                return (None, None), False
+
         if not documents:
             logger.warning(f"[KakaoMap API] No documents found for location: {location}")
-            return None, None
-        
-        # Extract latitude and longitude from the first result
+            return (None, None), True
+
         lon = documents[0].get('x')
         lat = documents[0].get('y')
-        
         if lat is None or lon is None:
             logger.warning(f"[KakaoMap API] Latitude or longitude not found in the first document for location: {location}")
+            return (None, None), True
+        return (lat, lon), True
+
+    async def geocode(self, location: str) -> Coords:
+        """Get (latitude, longitude) for a location, or (None, None) if it cannot be resolved."""
+        key = normalize_address(location)
+        if not key:
             return None, None
-            
-        return lat, lon
-    except requests.exceptions.HTTPError as http_err:
-        logger.error(f"[KakaoMap API] HTTP error occurred for location {location}: {http_err} - Response: {response.text}")
-        return None, None
-    except requests.exceptions.RequestException as req_err:
-        logger.error(f"[KakaoMap API] Request error occurred for location {location}: {req_err}")
-        return None, None
-    except Exception as e:
-        logger.error(f"[KakaoMap API] An unexpected error occurred for location {location}: {e}")
-        return None, None
 
-def get_static_map_url(api_key, lat, lon, width=600, height=450):
-    """
-    Get a static map image URL from the Kakao Maps API.
-    """
-    if not lat or not lon:
-        return None
-        
-    map_url = f"https://dapi.kakao.com/v2/map/staticmap?center={lat},{lon}&level=3&marker=true&markerpos={lat},{lon}&width={width}&height={height}"
-    
-    return map_url
\ No newline at end of file
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            coords, cacheable = await self._fetch(key)
+            if cacheable:
+                ttl = None if coords[0] is not None else self.negative_cache_ttl
+                self.cache.set(key, coords, ttl=ttl)
+            future.set_result(coords)
+            return coords
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception as retrieved.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def geocode_many(self, locations: Iterable[str]) -> List[Coords]:
+        """Geocode several locations concurrently, preserving input order."""
+        locations = list(locations)
+        unique = list(dict.fromkeys(normalize_address(loc) for loc in locations))
+        results = await asyncio.gather(*(self.geocode(loc) for loc in unique))
+        by_key = dict(zip(unique, results))
+        return [by_key[normalize_address(loc)] for loc in locations]
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -7,6 +7,8 @@ import os
 import json
 import asyncio
 import logging
+import threading
+import time
 
 # 로거 설정
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -14,18 +16,21 @@ logging.getLogger("ddgs").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-from typing import Optional, List, Tuple
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional, List, Tuple, NamedTuple
 from datetime import date, datetime
 
 from dotenv import load_dotenv
-from openai import OpenAI
-from langchain_community.tools import DuckDuckGoSearchRun
-from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_openai_tools_agent, Tool
-from langchain import hub
 
-from src.models import UserRequest, RecommendationResponse, RecommendationItem, VerificationDetails, DailyRecommendation
-from src.kakao_maps import get_coords_for_location
+from src.models import UserRequest, RecommendationResponse, RecommendationItem, VerificationDetails, DailyRecommendation, RecommendationStreamEvent, PlannedTrip, GroundedPlan, BatchVerificationResult
+from src.kakao_maps import AsyncKakaoGeocoder
+from src.verification_cache import verification_cache, make_verification_key, infer_content_type
+from src.verification_scheduler import verification_scheduler, PRIORITY_EVENT, PRIORITY_VARIABLE
+from src.rate_limit import get_rate_limiter, rate_limit_callback
+from src.usage import UsageTracker, STAGE_INITIAL_GROUNDED, STAGE_INITIAL_AGENT, STAGE_INITIAL_STRUCTURED, STAGE_VERIFY_PREFIX, STAGE_VERIFY_BATCH_PREFIX
+from src.metrics import span, RECOMMEND_STAGE_SECONDS, AGENT_TIMEOUTS, LLM_PARSE_FAILURES
+from src.itinerary import optimize_itinerary
+from src.spatial import spatial_index_store
 
 
 # --- 초기 설정 ---
@@ -49,106 +54,337 @@ if not KAKAO_API_KEY:
     raise ValueError("KAKAO_API_KEY 환경 변수가 .env 파일에 설정되지 않았습니다.")
 
 # --- 클라이언트랑 Agent 초기화 ---
+# import할때는 아무것도 안 만들고 처음 쓸때(또는 앱 시작 후 백그라운드 워밍업때) 만듦.
+# openai/langchain 무거운 import도 같이 미뤄서 import 시간이랑 reload 재시작 빨라지게 함.
+# 벤치마크 가짜들이 `llm.llm_agent = ...` 식으로 바꿔 끼울 수 있게 모듈 변수는 그대로 둠.
 
-# OpenAI 클라이언트 초기화
-client = OpenAI(api_key=OPENAI_API_KEY)
+AGENT_MODEL_NAME = os.getenv("AGENT_MODEL_NAME", "gpt-5-mini")
+AGENT_MAX_ITERATIONS = 25
 
-# LangChain Agent 설정
-search_tool = DuckDuckGoSearchRun()
-llm_agent = ChatOpenAI(model_name="gpt-5-mini", temperature=0, stop_sequences=[], streaming=False)
-tools = [search_tool]
-prompt_hub_template = hub.pull("hwchase17/openai-tools-agent")
-agent = create_openai_tools_agent(llm_agent, tools, prompt_hub_template)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=False, handle_parsing_errors=True, max_iterations=25)
+# 초기 일정 생성 방식. "structured": 웹 검색 정해진 횟수만 하고 구조화 출력(JSON 스키마) LLM 한번,
+# "agent": 예전처럼 Agent가 검색 반복하고 자유 텍스트에서 JSON 잘라냄.
+INITIAL_PLAN_MODE = os.getenv("INITIAL_PLAN_MODE", "structured")
+if INITIAL_PLAN_MODE not in ("structured", "agent"):
+    raise ValueError(f"INITIAL_PLAN_MODE는 structured 또는 agent여야 합니다: {INITIAL_PLAN_MODE}")
+# structured 모드에서 일정 생성 전에 돌리는 웹 검색 수 (DB 후보 있으면 검색 안함)
+STRUCTURED_PLAN_MAX_SEARCHES = int(os.getenv("STRUCTURED_PLAN_MAX_SEARCHES", "2"))
+# 검색 결과 하나당 프롬프트에 넣는 최대 글자 수
+STRUCTURED_SEARCH_RESULT_CHARS = int(os.getenv("STRUCTURED_SEARCH_RESULT_CHARS", "1500"))
+# DB 후보를 공간 인덱스로 권역 묶을때 반경(km). 같은 권역 장소는 같은 날 넣으라고 프롬프트에 알려줌
+CANDIDATE_AREA_RADIUS_KM = float(os.getenv("CANDIDATE_AREA_RADIUS_KM", "3"))
+# 캐시에 없는 검증 항목을 몇개씩 묶어서 한번에 검증할지 (1 이하면 예전처럼 항목마다 Agent 따로 돌림)
+VERIFICATION_BATCH_SIZE = int(os.getenv("VERIFICATION_BATCH_SIZE", "5"))
+# Agent 검증 한번(또는 묶음 검증 한번) 최대 시간(초)
+VERIFICATION_TIMEOUT_SECONDS = 120
 
+client = None  # OpenAI 클라이언트
+search_tool = None
+llm_agent = None
+tools = None
+agent_executor = None
+_clients_lock = threading.Lock()
 
-# --- 프롬프트 템플릿 정의 ---
 
-INITIAL_RECOMMENDATION_PROMPT_TEMPLATE = """
-당신은 한국 여행 전문가 AI Agent입니다.
-사용자 정보를 기반으로, DuckDuckGoSearchRun 도구를 사용하여 최적의 여행지를 추천해주세요.
+def build_agent_prompt():
+    """
+    Agent 프롬프트 만드는거. 예전엔 import할때 hub.pull("hwchase17/openai-tools-agent")로
+    받아왔는데, 네트워크 없으면 앱이 아예 안 떠서 같은 내용을 코드에 옮겨둠.
+    """
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+    return ChatPromptTemplate.from_messages([
+        ("system", "You are a helpful assistant"),
+        MessagesPlaceholder("chat_history", optional=True),
+        ("human", "{input}"),
+        MessagesPlaceholder("agent_scratchpad"),
+    ])
+
+
+def get_openai_client():
+    """OpenAI 클라이언트 돌려주는거 (처음 부를때 만듦)."""
+    global client
+    if client is None:
+        with _clients_lock:
+            if client is None:
+                from openai import OpenAI
+                client = OpenAI(api_key=OPENAI_API_KEY)
+    return client
+
+
+def get_llm_agent():
+    """일정 생성/검증에 쓰는 ChatOpenAI 돌려주는거 (처음 부를때 만듦)."""
+    global llm_agent
+    if llm_agent is None:
+        with _clients_lock:
+            if llm_agent is None:
+                from langchain_openai import ChatOpenAI
+                llm_agent = ChatOpenAI(model_name=AGENT_MODEL_NAME, temperature=0, stop_sequences=[], streaming=False)
+    return llm_agent
+
+
+def get_search_tool():
+    """Agent가 쓰는 DuckDuckGo 검색 도구 돌려주는거 (처음 부를때 만듦, SEARCH_CACHE_ENABLED면 캐시로 감쌈)."""
+    global search_tool, tools
+    if search_tool is None:
+        with _clients_lock:
+            if search_tool is None:
+                from langchain_community.tools import DuckDuckGoSearchRun
+                from src.search_cache import SEARCH_CACHE_ENABLED, CachedSearchTool
+                search_tool = DuckDuckGoSearchRun()
+                if SEARCH_CACHE_ENABLED:
+                    # 같은 검색어는 캐시에서 돌려주고 동시에 같은 검색어 오면 한번만 검색함
+                    search_tool = CachedSearchTool(search_tool)
+    if tools is None:
+        tools = [search_tool]
+    return search_tool
+
+
+def get_agent_executor():
+    """웹 검색 Agent 실행기 돌려주는거 (처음 부를때 만듦)."""
+    global agent_executor
+    if agent_executor is None:
+        chat_model = get_llm_agent()
+        get_search_tool()
+        with _clients_lock:
+            if agent_executor is None:
+                from langchain.agents import AgentExecutor, create_openai_tools_agent
+                agent = create_openai_tools_agent(chat_model, tools, build_agent_prompt())
+                agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=False, handle_parsing_errors=True,
+                                               max_iterations=AGENT_MAX_ITERATIONS)
+    return agent_executor
+
+
+_structured_runnables = {}
+
+
+def get_structured_llm(schema):
+    """
+    `schema`(Pydantic 모델) 모양으로만 답하게 강제한 LLM 돌려주는거 (OpenAI json_schema strict).
+    결과는 {"raw": 메시지, "parsed": 모델 또는 None, "parsing_error": 예외 또는 None} 형태임.
+    """
+    chat_model = get_llm_agent()
+    key = (id(chat_model), schema)
+    runnable = _structured_runnables.get(key)
+    if runnable is None:
+        runnable = chat_model.with_structured_output(schema, method="json_schema", strict=True, include_raw=True)
+        _structured_runnables[key] = runnable
+    return runnable
+
+
+def warm_up_clients() -> float:
+    """
+    Agent 실행기까지 미리 다 만들어두는거. 앱 시작 후 백그라운드 스레드에서 불러서
+    첫 요청이 import/생성 시간 안 기다리게 함.
+
+    Returns:
+        float: 걸린 시간(초)
+    """
+    started = time.perf_counter()
+    get_agent_executor()
+    if INITIAL_PLAN_MODE == "structured":
+        get_structured_llm(PlannedTrip)
+        get_structured_llm(GroundedPlan)
+    if VERIFICATION_BATCH_SIZE > 1:
+        get_structured_llm(BatchVerificationResult)
+    return time.perf_counter() - started
+
+
+# 카카오맵 지오코딩 클라이언트 (커넥션 풀이랑 주소 캐시를 요청끼리 같이 씀)
+geocoder = AsyncKakaoGeocoder(
+    KAKAO_API_KEY,
+    max_concurrency=int(os.getenv("KAKAO_MAX_CONCURRENCY", "8")),
+    rate_limiter=get_rate_limiter("kakao"),
+)
+
+# LLM/웹 검색 호출마다 upstream별 토큰 버킷 기다리게 하는 설정 (rate_limit.py)
+RATE_LIMITED_CONFIG = {"callbacks": [rate_limit_callback]}
+
 
----
+def _run_config(callbacks: Optional[list] = None) -> dict:
+    """레이트 리밋 콜백에 단계별 사용량 콜백(usage.py) 같은거 더 붙인 실행 설정 만드는거."""
+    if not callbacks:
+        return RATE_LIMITED_CONFIG
+    return {"callbacks": [rate_limit_callback, *callbacks]}
+
+
+@contextmanager
+def _track_stage(usage: Optional[UsageTracker], stage_name: str) -> Iterator[list]:
+    """`usage` 있으면 그 단계 사용량 모으는 콜백 목록 돌려주는거. 없으면 빈 목록."""
+    if usage is None:
+        yield []
+        return
+    with usage.track(stage_name) as callback:
+        yield [callback]
+
+
+# --- 프롬프트 템플릿 정의 ---
+# 프롬프트는 [안 바뀌는 앞부분(*_PROMPT_PREFIX)] + [요청마다 바뀌는 뒷부분(*_PROMPT_SUFFIX)] 순서로 붙임.
+# OpenAI는 앞부분이 똑같은 요청끼리 입력 토큰을 캐시해서(공통 앞부분 1024토큰부터) 싸고 빠르게 처리하니까
+# 지시사항/JSON 형식 예시는 앞에 두고, 뒷부분 안에서도 여러 사용자가 같이 쓰는 것(후보 목록, 검색 결과)을 먼저,
+# 사람마다 다른 것(나이, 성별)을 맨 마지막에 둠. 앞부분엔 {} 자리 표시 넣으면 안 됨 (format 안 함).
+# 프롬프트별 토큰 수랑 실제 캐시된 토큰 수는 python -m src.prompt_tokens 로 봄.
+
+USER_INFO_SUFFIX = """
 [사용자 정보]
 - 지역: {region}
 - 여행 기간: {duration}일 ({start_date} ~ {end_date})
-- 나이: {age}
-- 성별: {gender}
 - 관심사: {interests}
+- 나이/성별: {age} / {gender}
+"""
+
+INITIAL_RECOMMENDATION_PROMPT_PREFIX = """당신은 한국 여행 전문가 AI Agent입니다.
+맨 아래 [사용자 정보]를 기반으로, DuckDuckGoSearchRun 도구를 사용하여 최적의 여행지를 추천해주세요.
 
---- 
 [지시사항]
-1. 사용자 정보를 바탕으로 각 날짜별로 2~3개의 여행지를 추천해주세요.
-2. 각 여행지에 대한 간략한 설명과 추천 이유를 포함해주세요.
-3. 각 여행지에서의 활동을 제안해주세요.
-4. 각 여행지의 정확하고 지오코딩 가능한 주소를 포함해주세요. (예: '서울특별시 강남구 테헤란로 123'). 만약 정확한 주소를 모른다면, DuckDuckGoSearchRun 도구를 사용하여 찾아주세요.
-5. 각 여행지의 대표 이미지 URL을 포함해주세요. (예: 'https://example.com/image.jpg')
-6. 축제/행사 정보가 있다면, 시작일과 종료일을 포함해주세요.
-7. 운영 시간이 있다면, 운영 시간을 포함해주세요.
-8. 추천 결과는 다음 JSON 형식으로 반환해주세요:
-```json
-{{
-    "daily_recommendations": [
-        {{
-            "date": "YYYY-MM-DD",
-            "recommendations": [
-                {{
-                    "name": "추천 여행지 1 이름",
-                    "description": "추천 이유 및 간략 설명",
-                    "activity": "AI가 제안하는 해당 장소에서의 활동",
-                    "address": "장소 주소",
-                    "image_url": "대표 이미지 URL (예: https://example.com/image.jpg)",
-                    "start_date": "YYYY-MM-DD (축제/행사 시)",
-                    "end_date": "YYYY-MM-DD (축제/행사 시)",
-                    "operating_hours": "운영 시간 (예: 09:00-18:00)"
-                }}
-            ]
-        }}
-    ]
-}}
-```
+1. 각 날짜별로 2~3개의 여행지를 추천하고, 여행지마다 추천 이유와 간략한 설명, 해당 장소에서의 활동을 작성해주세요.
+2. 각 여행지의 정확하고 지오코딩 가능한 주소를 작성해주세요 (예: '서울특별시 강남구 테헤란로 123'). 모르면 DuckDuckGoSearchRun 도구로 찾아주세요.
+3. 대표 이미지 URL과 운영 시간(예: 09:00-18:00)을 알면 작성하고, 모르면 null로 두세요.
+4. 축제/행사는 시작일과 종료일을 YYYY-MM-DD로 작성하고, 아니면 null로 두세요.
+5. 결과는 다음 JSON 형식으로만 반환해주세요:
+{"daily_recommendations":[{"date":"YYYY-MM-DD","recommendations":[{"name":"여행지 이름","description":"추천 이유 및 간략 설명","activity":"해당 장소에서의 활동","address":"장소 주소","image_url":"대표 이미지 URL","start_date":"YYYY-MM-DD","end_date":"YYYY-MM-DD","operating_hours":"운영 시간"}]}]}
 """
 
-VERIFICATION_PROMPT_TEMPLATE = """
-당신은 여행 정보 검증 전문가 AI Agent입니다.
-주어진 여행지 정보에 대해 실시간 웹 검색을 통해 다음 항목들을 검증하고, 그 결과와 함께 정보의 신뢰도를 평가하여 JSON 형식으로 보고해야 합니다.
+STRUCTURED_RECOMMENDATION_PROMPT_PREFIX = """당신은 한국 여행 전문가입니다.
+아래 [웹 검색 결과]를 참고해서 맨 아래 [사용자 정보]에 맞는 최적의 여행 일정을 만들어주세요.
 
----
-[검증 대상 여행지 정보]
-- 이름: {item_name}
-- 기존 정보:
-  - 시작일: {start_date}
-  - 종료일: {end_date}
-  - 운영 시간: {operating_hours}
+[지시사항]
+1. 여행 기간의 각 날짜마다 2~3개의 여행지를 추천해주세요. 같은 장소는 한번만 사용하세요.
+2. 각 여행지에 대한 간략한 설명과 추천 이유, 해당 장소에서의 활동을 작성해주세요.
+3. 각 여행지의 정확하고 지오코딩 가능한 주소를 작성해주세요. (예: '서울특별시 강남구 테헤란로 123')
+4. 축제/행사는 시작일과 종료일을 YYYY-MM-DD로 작성하고, 기간 안에 있는 날짜에만 배치해주세요.
+5. 대표 이미지 URL, 운영 시간을 모르면 null로 두세요. 검색 결과에 없는 정보를 지어내지 마세요.
+"""
+
+STRUCTURED_RECOMMENDATION_PROMPT_SUFFIX = """
+[웹 검색 결과]
+{search_results}
+""" + USER_INFO_SUFFIX
+
+GROUNDED_RECOMMENDATION_PROMPT_PREFIX = """당신은 한국 여행 전문가입니다.
+아래 [후보 장소 목록]에 있는 장소만 사용해서 맨 아래 [사용자 정보]에 맞는 여행 일정을 만들어주세요. 목록에 없는 장소는 추가하지 마세요.
 
----
-[검증 항목]
+[지시사항]
+1. 각 날짜별로 후보 목록에서 2~3개의 장소를 골라 content_id로 적어주세요. 같은 장소는 한번만 사용하세요.
+2. 축제/행사는 행사 기간 안에 있는 날짜에만 배치해주세요.
+3. 운영 시간을 고려해서 방문 가능한 날짜에 배치해주세요.
+4. 같은 날에는 가능하면 권역 번호가 같은 (서로 가까운) 장소들을 묶어서 이동 거리를 줄여주세요.
+5. 각 장소에 대한 추천 이유, 간략한 설명, 해당 장소에서의 활동을 작성해주세요.
+"""
+
+# 구조화 출력(json_schema) 안 쓰는 agent 모드에서만 앞부분 끝에 붙이는 JSON 형식 예시
+GROUNDED_RECOMMENDATION_JSON_FORMAT = """6. 결과는 다음 JSON 형식으로만 반환해주세요:
+{"daily_recommendations":[{"date":"YYYY-MM-DD","recommendations":[{"content_id":"후보 목록의 content_id","description":"추천 이유 및 간략 설명","activity":"해당 장소에서의 활동"}]}]}
+"""
+
+GROUNDED_RECOMMENDATION_PROMPT_SUFFIX = """
+[후보 장소 목록]
+(형식: content_id | 이름 | 분류 | 운영 시간 | 행사 기간 | 권역 번호)
+{candidates}
+""" + USER_INFO_SUFFIX
+
+_VERIFICATION_CHECKLIST = """[검증 항목]
 1. 현재 운영 여부 (예: 영업 중, 폐업, 임시 휴업 등) 및 실제 존재 여부
 2. 행사/축제의 종료 또는 취소 여부 (예: 이미 종료됨, 취소됨)
-3. 최신 가격 정보 (입장료, 주요 서비스 서비스 가격 등)
+3. 최신 가격 정보 (입장료, 주요 서비스 가격 등)
 4. 일정 변경 여부 및 특이사항 (예: 예약 필수, 특정 요일 휴무, 특별 행사 등)
+"""
 
----
+VERIFICATION_PROMPT_PREFIX = """당신은 여행 정보 검증 전문가 AI Agent입니다.
+맨 아래 [검증 대상 여행지 정보]의 여행지에 대해 실시간 웹 검색을 통해 다음 항목들을 검증하고, 그 결과와 함께 정보의 신뢰도를 평가하여 JSON 형식으로 보고해야 합니다.
+
+""" + _VERIFICATION_CHECKLIST + """
 [지시사항]
-1. DuckDuckGoSearchRun 도구를 사용하여 `{item_name}`에 대한 최신 정보를 검색하세요.
+1. DuckDuckGoSearchRun 도구를 사용하여 검증 대상 여행지의 최신 정보를 검색하세요.
 2. 검색 결과를 바탕으로 위에 명시된 검증 항목들에 대한 답변을 찾으세요.
 3. 모든 검증 항목에 대한 정보를 찾을 수 없는 경우, "정보 없음"으로 표시하세요.
 4. 검색된 정보의 출처(공식 웹사이트, 최신 뉴스 등)를 바탕으로 신뢰도를 0(매우 낮음)부터 100(매우 높음)까지의 점수로 평가하고, 평가 근거를 간략하게 작성하세요.
-5. 검증 결과는 다음 JSON 형식으로 반환해주세요:
-```json
-{{
-    "verification_results": {{
-        "operating_status": "검색된 운영 여부",
-        "end_or_cancel_status": "검색된 종료/취소 여부",
-        "latest_price_info": "검색된 최신 가격 정보",
-        "schedule_change_and_notes": "검색된 일정 변경 및 특이사항"
-    }},
-    "reliability_score": 100,
-    "reliability_reason": "신뢰도 평가 근거"
-}}
-```
+5. 검증 결과는 다음 JSON 형식으로만 반환해주세요:
+{"verification_results":{"operating_status":"검색된 운영 여부","end_or_cancel_status":"검색된 종료/취소 여부","latest_price_info":"검색된 최신 가격 정보","schedule_change_and_notes":"검색된 일정 변경 및 특이사항"},"reliability_score":100,"reliability_reason":"신뢰도 평가 근거"}
+"""
+
+VERIFICATION_PROMPT_SUFFIX = """
+[검증 대상 여행지 정보]
+- 이름: {item_name}
+- 기존 정보: 시작일 {start_date} | 종료일 {end_date} | 운영 시간 {operating_hours}
 """
 
+BATCH_VERIFICATION_PROMPT_PREFIX = """당신은 여행 정보 검증 전문가입니다.
+아래 [검증 대상 목록]의 여행지들을 [웹 검색 결과]를 근거로 한꺼번에 검증하고, 항목마다 정보의 신뢰도를 평가해주세요.
+
+""" + _VERIFICATION_CHECKLIST + """
+[지시사항]
+1. 목록의 모든 항목마다 번호(item_index)를 붙여서 결과를 하나씩 작성하세요.
+2. 검색 결과에서 해당 항목 정보를 찾지 못했으면 found를 false로 두세요. 추측해서 채우지 마세요.
+3. 찾지 못한 세부 항목은 "정보 없음"으로 표시하세요.
+4. 출처(공식 웹사이트, 최신 뉴스 등)를 바탕으로 신뢰도를 0(매우 낮음)부터 100(매우 높음)까지 점수로 평가하고, 평가 근거를 간략하게 작성하세요.
+"""
+
+BATCH_VERIFICATION_PROMPT_SUFFIX = """
+[검증 대상 목록]
+(형식: 번호. 이름: 장소 | 시작일 | 종료일 | 운영 시간)
+{items}
+
+[웹 검색 결과]
+{search_results}
+"""
+
+
+def _user_info(user_request: UserRequest) -> dict:
+    """USER_INFO_SUFFIX 채울 값들."""
+    return {
+        "region": user_request.region,
+        "duration": (user_request.end_date - user_request.start_date).days + 1,
+        "start_date": user_request.start_date.strftime("%Y-%m-%d"),
+        "end_date": user_request.end_date.strftime("%Y-%m-%d"),
+        "interests": ", ".join(user_request.interests),
+        "age": user_request.age,
+        "gender": user_request.gender,
+    }
+
+
+def grounded_prompt_prefix(plan_mode: str = None) -> str:
+    """DB 후보 일정 생성 프롬프트 앞부분. 구조화 출력이면 스키마가 형식 강제하니까 JSON 예시 안 넣음."""
+    if (plan_mode or INITIAL_PLAN_MODE) == "structured":
+        return GROUNDED_RECOMMENDATION_PROMPT_PREFIX
+    return GROUNDED_RECOMMENDATION_PROMPT_PREFIX + GROUNDED_RECOMMENDATION_JSON_FORMAT
+
+
+def build_initial_prompt(user_request: UserRequest) -> str:
+    """Agent 초기 일정 생성 프롬프트."""
+    return INITIAL_RECOMMENDATION_PROMPT_PREFIX + USER_INFO_SUFFIX.format(**_user_info(user_request))
+
+
+def build_structured_prompt(user_request: UserRequest, search_results: str) -> str:
+    """웹 검색 결과 넣은 구조화 출력 일정 생성 프롬프트."""
+    return STRUCTURED_RECOMMENDATION_PROMPT_PREFIX + STRUCTURED_RECOMMENDATION_PROMPT_SUFFIX.format(
+        search_results=search_results, **_user_info(user_request)
+    )
+
+
+def build_grounded_prompt(user_request: UserRequest, candidates: List[dict], plan_mode: str = None) -> str:
+    """DB 후보 목록 넣은 일정 생성 프롬프트 (후보마다 공간 인덱스로 묶은 권역 번호 붙임)."""
+    return grounded_prompt_prefix(plan_mode) + GROUNDED_RECOMMENDATION_PROMPT_SUFFIX.format(
+        candidates=_format_candidates(candidates, candidate_areas(candidates)), **_user_info(user_request)
+    )
+
+
+def build_verification_prompt(item_name: str, start_date: Optional[str], end_date: Optional[str], operating_hours: Optional[str]) -> str:
+    """항목 하나 검증하는 Agent 프롬프트."""
+    return VERIFICATION_PROMPT_PREFIX + VERIFICATION_PROMPT_SUFFIX.format(
+        item_name=item_name,
+        start_date=start_date or "N/A",
+        end_date=end_date or "N/A",
+        operating_hours=operating_hours or "N/A"
+    )
+
+
+def build_batch_verification_prompt(items: List[RecommendationItem], search_results: str) -> str:
+    """항목 여러개 한번에 검증하는 구조화 출력 프롬프트."""
+    return BATCH_VERIFICATION_PROMPT_PREFIX + BATCH_VERIFICATION_PROMPT_SUFFIX.format(
+        items=_format_batch_items(items), search_results=search_results
+    )
+
+
 # --- 헬퍼 함수 ---
 
 def _create_error_verification_details(reason: str, notes: str) -> VerificationDetails:
@@ -162,84 +398,406 @@ def _create_error_verification_details(reason: str, notes: str) -> VerificationD
         reliability_reason=reason
     )
 
+class VerificationOutcome(NamedTuple):
+    """검증 결과 하나 해석한거. cacheable은 에러 없이 Agent가 정상 응답했는지 여부임."""
+    details: VerificationDetails
+    is_success: bool
+    log_message: str
+    cacheable: bool
+
+def _outcome_from_details(item_name: str, details: VerificationDetails, suffix: str = "") -> VerificationOutcome:
+    """검증 결과 신뢰도 보고 성공/실패 판단하는거."""
+    if details.reliability_score < 50:
+        return VerificationOutcome(details, False, f"{item_name}: 검증 실패 - 신뢰도 점수 낮음 ({details.reliability_score}) - {details.reliability_reason}{suffix}", True)
+    return VerificationOutcome(details, True, f"{item_name}: 검증 성공{suffix}", True)
+
+def _interpret_verification_result(item_name: str, result) -> VerificationOutcome:
+    """Agent가 돌려준 검증 결과(문자열 또는 예외)를 VerificationDetails로 바꾸는거."""
+    if isinstance(result, Exception):
+        error_message = f"Agent 검증 중 예외 발생: {result}"
+        return VerificationOutcome(_create_error_verification_details("Agent 검증 중 예외 발생", str(result)), False, f"{item_name}: 검증 실패 - {error_message}", False)
+
+    verification_result_str = result
+    try:
+        verification_json = json.loads(verification_result_str)
+        if "error" in verification_json:
+            return VerificationOutcome(_create_error_verification_details("Agent 검증 중 오류 발생", verification_json['error']), False, f"{item_name}: 검증 실패 - {verification_json['error']}", False)
+        verification_data = verification_json.get("verification_results", {})
+        details = VerificationDetails(
+            operating_status=verification_data.get("operating_status", "정보 없음"),
+            end_or_cancel_status=verification_data.get("end_or_cancel_status", "정보 없음"),
+            latest_price_info=verification_data.get("latest_price_info", "정보 없음"),
+            schedule_change_and_notes=verification_data.get("schedule_change_and_notes", "정보 없음"),
+            reliability_score=verification_json.get("reliability_score", 0),
+            reliability_reason=verification_json.get("reliability_reason", "정보 없음")
+        )
+        return _outcome_from_details(item_name, details)
+    except json.JSONDecodeError:
+        LLM_PARSE_FAILURES.inc(stage="verification")
+        return VerificationOutcome(_create_error_verification_details("Agent 응답 JSON 파싱 오류", verification_result_str), False, f"{item_name}: 검증 실패 - Agent가 반환한 JSON 파싱 오류", False)
+    except Exception as e:
+        return VerificationOutcome(_create_error_verification_details("Agent 검증 결과 처리 중 오류", str(e)), False, f"{item_name}: 검증 실패 - 예상치 못한 오류: {e}", False)
+
+def _extract_json_object(text: str) -> dict:
+    """LLM 응답 텍스트에서 처음 `{`부터 마지막 `}`까지 잘라서 JSON으로 파싱하는거."""
+    json_start = text.find('{')
+    json_end = text.rfind('}') + 1
+    if json_start == -1 or json_end == 0:
+        raise json.JSONDecodeError("No JSON object found", text, 0)
+    return json.loads(text[json_start:json_end])
+
+def _collect_addresses(initial_recommendations_data: dict) -> List[str]:
+    """초기 추천 결과에서 좌표 없는 항목 주소들 전부 뽑는거. 지오코딩 한번에 돌리려고 씀."""
+    addresses = []
+    for daily_plan_data in initial_recommendations_data.get("daily_recommendations", []):
+        if not isinstance(daily_plan_data, dict):
+            continue
+        for item_data in daily_plan_data.get("recommendations", []):
+            if isinstance(item_data, dict) and item_data.get("address") and item_data.get("latitude") is None:
+                addresses.append(item_data["address"])
+    return addresses
+
+def candidate_areas(candidates: List[dict], radius_km: float = CANDIDATE_AREA_RADIUS_KM) -> Dict[str, int]:
+    """
+    후보들을 공간 인덱스로 radius_km 안에 있는 것끼리 권역 묶는거 (content_id -> 권역 번호).
+    공간 인덱스 아직 없으면 빈 dict.
+    """
+    index = spatial_index_store.get()
+    if index is None or radius_km <= 0:
+        return {}
+    return index.group_nearby([candidate["content_id"] for candidate in candidates], radius_km)
+
+def _format_candidates(candidates: List[dict], areas: Optional[Dict[str, int]] = None) -> str:
+    """DB 후보 목록을 프롬프트에 넣을 한줄짜리 텍스트로 바꾸는거. `areas` 주면 끝에 권역 번호 붙임."""
+    lines = []
+    for candidate in candidates:
+        period = ""
+        if candidate.get("start_date") or candidate.get("end_date"):
+            period = f"{candidate.get('start_date') or ''}~{candidate.get('end_date') or ''}"
+        fields = [
+            candidate["content_id"],
+            candidate["name_ko"],
+            candidate["category_tag"],
+            candidate.get("operating_hours") or "",
+            period,
+        ]
+        if areas is not None:
+            area = areas.get(candidate["content_id"])
+            fields.append(str(area) if area else "")
+        lines.append(" | ".join(fields))
+    return "\n".join(lines)
+
+def _format_batch_items(items: List[RecommendationItem]) -> str:
+    """묶음 검증할 항목들을 번호 붙인 한줄짜리 텍스트로 바꾸는거 (번호는 1부터)."""
+    return "\n".join(
+        f"{index}. 이름: {item.name} | {item.start_date or 'N/A'} | {item.end_date or 'N/A'} | {item.operating_hours or 'N/A'}"
+        for index, item in enumerate(items, start=1)
+    )
+
 # --- 핵심 로직 ---
 
-async def verify_recommendation_with_agent(item_name: str, start_date: Optional[str], end_date: Optional[str], operating_hours: Optional[str], timeout: int = 120) -> str:
+async def verify_recommendation_with_agent(item_name: str, start_date: Optional[str], end_date: Optional[str], operating_hours: Optional[str], timeout: int = VERIFICATION_TIMEOUT_SECONDS, callbacks: Optional[list] = None) -> str:
     """
     정보 변동성 높은 항목(`is_variable=True`)은 LangChain Agent 불러서 실시간 정보 검증하는거.
+    `callbacks`는 사용량 집계 같은 추가 LangChain 콜백임.
     """
-    prompt = VERIFICATION_PROMPT_TEMPLATE.format(
-        item_name=item_name,
-        start_date=start_date or "N/A",
-        end_date=end_date or "N/A",
-        operating_hours=operating_hours or "N/A"
-    )
+    prompt = build_verification_prompt(item_name, start_date, end_date, operating_hours)
 
     try:
         logger.info(f"[Agent] {item_name}")
-        response = await asyncio.wait_for(
-            agent_executor.ainvoke({"input": prompt}),
-            timeout=timeout
-        )
+        with span(RECOMMEND_STAGE_SECONDS, stage="verification_agent"):
+            response = await asyncio.wait_for(
+                get_agent_executor().ainvoke({"input": prompt}, config=_run_config(callbacks)),
+                timeout=timeout
+            )
         logger.info(f"[Agent] {item_name}검증 완료.")
         return response.get("output", "")
     except asyncio.TimeoutError:
         logger.warning(f"[Agent] {item_name} 검증 시간 초과.")
+        AGENT_TIMEOUTS.inc(stage="verification")
         return json.dumps({"error": "Agent verification timed out"})
     except Exception as e:
         logger.error(f"[Agent] {item_name} 검증 중 오류 발생: {e}")
         return json.dumps({"error": str(e)})
 
-async def get_ai_recommendations(user_request: UserRequest) -> RecommendationResponse:
+async def verify_item_with_cache(item: RecommendationItem, usage: Optional[UsageTracker] = None) -> VerificationOutcome:
     """
-    AI 추천 생성 및 검증을 수행하는 메인 함수.
-    - 최적화: 정보 변동성이 높은 항목들의 실시간 정보 검증을 순차적이 아닌 병렬로 수행하여 응답 시간을 단축.
+    검증 결과 캐시 먼저 보고, 없을때만 Agent로 검증하는거.
+    오래된 캐시 결과는 바로 돌려주고 백그라운드에서 다시 검증함.
+    Agent 검증은 전역 스케줄러 통해서 돌림 (동시 실행 수 제한, 축제 먼저, 같은 항목 중복 실행 안함).
+    `usage` 있으면 Agent 사용량을 "verify:이름" 단계로 모으고, 토큰 예산 넘었으면 캐시에 있는 결과만 씀.
     """
-    # 1. LangChain Agent를 통해 초기 추천 목록 생성
-    start_date_obj = user_request.start_date
-    end_date_obj = user_request.end_date
-    duration_days = (end_date_obj - start_date_obj).days + 1
-
-    initial_recommendation_prompt = INITIAL_RECOMMENDATION_PROMPT_TEMPLATE.format(
-        region=user_request.region,
-        duration=duration_days,
-        start_date=start_date_obj.strftime("%Y-%m-%d"),
-        end_date=end_date_obj.strftime("%Y-%m-%d"),
-        age=user_request.age,
-        gender=user_request.gender,
-        interests=", ".join(user_request.interests),
+    fresh_outcome: Optional[VerificationOutcome] = None
+    key = make_verification_key(item.name, item.start_date, item.end_date, item.operating_hours)
+    priority = PRIORITY_EVENT if item.start_date or item.end_date else PRIORITY_VARIABLE
+
+    async def _agent_run() -> str:
+        args = (
+            item.name,
+            item.start_date.isoformat() if item.start_date else None,
+            item.end_date.isoformat() if item.end_date else None,
+            item.operating_hours,
+        )
+        # 줄 서서 기다린 시간 말고 실제로 도는 시간만 잼
+        with _track_stage(usage, f"{STAGE_VERIFY_PREFIX}{item.name}") as callbacks:
+            return await verify_recommendation_with_agent(*args, callbacks=callbacks)
+
+    async def _run_agent() -> Optional[VerificationDetails]:
+        nonlocal fresh_outcome
+        if usage is not None and usage.budget_exceeded:
+            # 예산 넘었으면 Agent 안 돌리고 검증 생략 (캐시에도 안 남김)
+            usage.skip_verification(item.name)
+            fresh_outcome = VerificationOutcome(
+                _create_error_verification_details("토큰 예산 초과로 검증 생략", "요청당 토큰 예산을 넘어서 실시간 검증을 하지 않았습니다."),
+                False, f"{item.name}: 검증 생략 - 토큰 예산 초과", False,
+            )
+            return None
+        result = await verification_scheduler.submit(key, _agent_run, priority=priority)
+        fresh_outcome = _interpret_verification_result(item.name, result)
+        return fresh_outcome.details if fresh_outcome.cacheable else None
+
+    details, cache_status = await verification_cache.get_or_verify(
+        item.name, item.start_date, item.end_date, item.operating_hours, verify=_run_agent, content_type=item.content_type
     )
+    if cache_status == "miss":
+        return fresh_outcome
+    return _outcome_from_details(item.name, details, suffix=" (캐시)" if cache_status == "hit" else " (캐시, 재검증 중)")
 
-    agent_search_logs = []
-    total_tokens_used = 0 # Agent 사용 시 토큰 계산은 복잡하므로 일단 0으로 설정
+async def verify_items_batch(items: List[RecommendationItem], callbacks: Optional[list] = None) -> Dict[int, VerificationDetails]:
+    """
+    항목 여러개를 한번에 검증하는거. 항목마다 웹 검색 한번씩 병렬로 돌리고, 구조화 출력 LLM 한번으로 결과 받음.
+    Agent 검증처럼 항목마다 시스템 프롬프트/도구 설명/추론 반복을 따로 안 보냄.
+
+    Returns:
+        Dict[int, VerificationDetails]: {items 인덱스: 검증 결과}. 검색으로 못 찾은 항목은 빠져있음.
+    """
+    queries = [f"{item.name} 운영 시간 가격 최신 정보" for item in items]
+    search_results = await _search_context(queries, callbacks, [])
+    prompt = build_batch_verification_prompt(items, search_results)
+    parsed = await _invoke_structured(prompt, BatchVerificationResult, callbacks, stage="verification_batch")
+
+    resolved: Dict[int, VerificationDetails] = {}
+    for result in parsed["results"]:
+        index = result["item_index"] - 1
+        if result["found"] and 0 <= index < len(items) and index not in resolved:
+            resolved[index] = VerificationDetails(**result["details"])
+    return resolved
+
+async def _run_verification_batch(items: List[RecommendationItem], usage: Optional[UsageTracker] = None) -> Dict[int, VerificationDetails]:
+    """
+    묶음 검증 하나를 검증 스케줄러 통해서 돌리고, 찾은 결과는 검증 캐시에 저장하는거.
+    실패하거나 토큰 예산 넘었으면 빈 dict 돌려줌 (항목별 검증으로 넘어감).
+    """
+    if usage is not None and usage.budget_exceeded:
+        return {}
+    keys = [make_verification_key(item.name, item.start_date, item.end_date, item.operating_hours) for item in items]
+    priority = PRIORITY_EVENT if any(item.start_date or item.end_date for item in items) else PRIORITY_VARIABLE
+
+    async def _run() -> Dict[int, VerificationDetails]:
+        with _track_stage(usage, STAGE_VERIFY_BATCH_PREFIX + ", ".join(item.name for item in items)) as callbacks:
+            with span(RECOMMEND_STAGE_SECONDS, stage="verification_batch"):
+                return await asyncio.wait_for(verify_items_batch(items, callbacks), timeout=VERIFICATION_TIMEOUT_SECONDS)
+
+    try:
+        logger.info(f"[Agent] {len(items)}개 항목 묶음 검증을 시작합니다.")
+        resolved = await verification_scheduler.submit("batch:" + "|".join(keys), _run, priority=priority)
+    except asyncio.TimeoutError:
+        logger.warning(f"[Agent] {len(items)}개 항목 묶음 검증 시간 초과.")
+        AGENT_TIMEOUTS.inc(stage="verification_batch")
+        return {}
+    except Exception as e:
+        logger.error(f"[Agent] 묶음 검증 중 오류 발생: {e}")
+        return {}
+
+    await asyncio.gather(*(
+        verification_cache.put(keys[index], item.name, item.content_type or infer_content_type(item.start_date, item.end_date),
+                               item.start_date, item.end_date, item.operating_hours, resolved[index])
+        for index, item in enumerate(items) if index in resolved
+    ))
+    logger.info(f"[Agent] 묶음 검증 완료 ({len(resolved)}/{len(items)}개 확인).")
+    return resolved
+
+async def _start_batched_verification(items_to_verify: List[RecommendationItem], usage: Optional[UsageTracker], verify_one) -> Tuple[List[asyncio.Task], List[asyncio.Task]]:
+    """
+    캐시에 없는 항목들을 VERIFICATION_BATCH_SIZE개씩 묶어서 검증 시작하는거.
+    캐시에 있는 항목이랑 묶음에서 결과 못 받은 항목은 `verify_one`(항목별 검증)으로 보냄.
+
+    Returns:
+        (항목마다 (항목, 결과) 돌려주는 작업들, 묶음 검증 작업들)
+    """
+    entries = await asyncio.gather(*(
+        verification_cache.get(make_verification_key(item.name, item.start_date, item.end_date, item.operating_hours))
+        for item in items_to_verify
+    ))
+    # 캐시에 있는건 항목별 경로로 보내도 Agent 안 돌고 캐시 결과(오래됐으면 백그라운드 재검증) 씀
+    tasks = [asyncio.create_task(verify_one(item)) for item, entry in zip(items_to_verify, entries) if entry is not None]
+    # 축제/행사 먼저 묶음 (스케줄러 우선순위랑 맞춤)
+    misses = sorted((item for item, entry in zip(items_to_verify, entries) if entry is None),
+                    key=lambda item: PRIORITY_EVENT if item.start_date or item.end_date else PRIORITY_VARIABLE)
+
+    async def _batch_member(batch_task: asyncio.Task, index: int, item: RecommendationItem) -> Tuple[RecommendationItem, VerificationOutcome]:
+        with span(RECOMMEND_STAGE_SECONDS, stage="verification"):
+            details = (await asyncio.shield(batch_task)).get(index)
+        if details is None:
+            logger.info(f"[Agent] {item.name} 묶음 검증에서 결과를 못 받아서 따로 검증합니다.")
+            return await verify_one(item)
+        return item, _outcome_from_details(item.name, details, suffix=" (묶음 검증)")
+
+    batch_tasks = []
+    for start in range(0, len(misses), VERIFICATION_BATCH_SIZE):
+        group = misses[start:start + VERIFICATION_BATCH_SIZE]
+        if len(group) == 1:
+            tasks.append(asyncio.create_task(verify_one(group[0])))
+            continue
+        batch_task = asyncio.create_task(_run_verification_batch(group, usage))
+        batch_tasks.append(batch_task)
+        tasks.extend(asyncio.create_task(_batch_member(batch_task, index, item)) for index, item in enumerate(group))
+    return tasks, batch_tasks
+
+async def _invoke_structured(prompt: str, schema, callbacks: list, stage: str) -> dict:
+    """구조화 출력 LLM 한번 부르고 dict로 돌려주는거. 스키마 안 맞거나 답 거절하면 ValueError."""
+    result = await get_structured_llm(schema).ainvoke(prompt, config=_run_config(callbacks))
+    parsed = result.get("parsed")
+    if parsed is None:
+        LLM_PARSE_FAILURES.inc(stage=stage)
+        raise ValueError(f"구조화 출력 파싱 실패: {result.get('parsing_error') or '응답 없음'}")
+    return parsed.model_dump()
+
+def _plan_search_queries(user_request: UserRequest) -> List[str]:
+    """structured 모드에서 일정 만들기 전에 돌릴 검색어 만드는거. 기간 중 축제/행사 먼저, 그다음 관심사별."""
+    start_date_obj = user_request.start_date
+    queries = [f"{user_request.region} {start_date_obj.year}년 {start_date_obj.month}월 축제 행사"]
+    queries += [f"{user_request.region} {interest} 추천 장소 주소" for interest in user_request.interests]
+    return queries[:STRUCTURED_PLAN_MAX_SEARCHES]
+
+async def _search_context(queries: List[str], callbacks: list, agent_search_logs: List[str]) -> str:
+    """검색어들 병렬로 검색해서 프롬프트에 넣을 텍스트로 합치는거. 실패한 검색은 빼고 진행함."""
+    async def _search(query: str) -> Optional[str]:
+        try:
+            result = await get_search_tool().ainvoke(query, config=_run_config(callbacks))
+            return f"검색어: {query}\n{str(result)[:STRUCTURED_SEARCH_RESULT_CHARS]}"
+        except Exception as e:
+            logger.warning(f"[Search] '{query}' 검색 실패: {e}")
+            agent_search_logs.append(f"웹 검색 실패: {query} ({e})")
+            return None
+
+    results = await asyncio.gather(*(_search(query) for query in queries))
+    return "\n\n".join(result for result in results if result) or "(검색 결과 없음)"
+
+async def generate_grounded_plan(user_request: UserRequest, candidates: List[dict], usage: Optional[UsageTracker] = None) -> dict:
+    """
+    DB에서 뽑은 후보 목록만 가지고 LLM 한번 불러서 일정 짜는거 (웹 검색이랑 지오코딩 없음).
+    LLM은 content_id만 고르고, 주소/좌표/운영시간 같은건 DB 값 그대로 채움.
+
+    Returns:
+        dict: Agent 초기 추천이랑 같은 형식의 추천 데이터. 항목마다 좌표랑 `is_variable`이 들어있음.
+    """
+    prompt = build_grounded_prompt(user_request, candidates)
+
+    logger.info(f"[LLM] DB 후보 {len(candidates)}건으로 일정 생성을 요청합니다.")
+    if INITIAL_PLAN_MODE == "structured":
+        with span(RECOMMEND_STAGE_SECONDS, stage="initial_grounded"), _track_stage(usage, STAGE_INITIAL_GROUNDED) as callbacks:
+            plan_data = await _invoke_structured(prompt, GroundedPlan, callbacks, stage="initial_grounded")
+    else:
+        with span(RECOMMEND_STAGE_SECONDS, stage="initial_grounded"), _track_stage(usage, STAGE_INITIAL_GROUNDED) as callbacks:
+            response = await get_llm_agent().ainvoke(prompt, config=_run_config(callbacks))
+        try:
+            with span(RECOMMEND_STAGE_SECONDS, stage="json_extract"):
+                plan_data = _extract_json_object(response.content)
+        except json.JSONDecodeError:
+            LLM_PARSE_FAILURES.inc(stage="initial_grounded")
+            raise
+
+    candidates_by_id = {candidate["content_id"]: candidate for candidate in candidates}
+    daily_recommendations = []
+    for daily_plan_data in plan_data.get("daily_recommendations", []):
+        items = []
+        for pick in daily_plan_data.get("recommendations", []):
+            candidate = candidates_by_id.get(str(pick.get("content_id")))
+            if candidate is None:
+                logger.warning(f"[LLM] 후보 목록에 없는 content_id를 반환했습니다: {pick.get('content_id')}")
+                continue
+            items.append({
+                "name": candidate["name_ko"],
+                "description": pick.get("description") or "AI가 생성한 설명이 없습니다.",
+                "activity": pick.get("activity") or "AI가 제안한 활동이 없습니다.",
+                "address": candidate["address"],
+                "latitude": candidate["latitude"],
+                "longitude": candidate["longitude"],
+                "image_url": candidate.get("image_url"),
+                "start_date": candidate.get("start_date"),
+                "end_date": candidate.get("end_date"),
+                "operating_hours": candidate.get("operating_hours"),
+                "content_type": candidate.get("content_type"),
+                "is_variable": candidate["is_variable"],
+            })
+        daily_recommendations.append({"date": daily_plan_data.get("date"), "recommendations": items})
+    return {"daily_recommendations": daily_recommendations}
+
+async def _generate_agent_plan(user_request: UserRequest, agent_search_logs: List[str], usage: Optional[UsageTracker] = None):
+    """
+    LangChain Agent(웹 검색)로 초기 추천 목록 만드는거.
+
+    Returns:
+        파싱된 추천 데이터(dict). 실패하면 에러 담은 RecommendationResponse.
+    """
+    # 1. LangChain Agent를 통해 초기 추천 목록 생성
+    initial_recommendation_prompt = build_initial_prompt(user_request)
 
     try:
         logger.info("[Agent] 초기 추천 생성을 위해 LangChain Agent를 호출합니다.")
-        agent_response = await agent_executor.ainvoke({"input": initial_recommendation_prompt})
+        with span(RECOMMEND_STAGE_SECONDS, stage="initial_agent"), _track_stage(usage, STAGE_INITIAL_AGENT) as callbacks:
+            agent_response = await get_agent_executor().ainvoke({"input": initial_recommendation_prompt}, config=_run_config(callbacks))
         initial_recommendations_str = agent_response.get("output", "")
-        # TODO: LangChain Agent의 토큰 사용량 추적 로직 추가 필요
         logger.info("[Agent] LangChain Agent 호출 완료.")
         try:
-            # Find the start and end of the JSON block
-            json_start = initial_recommendations_str.find('{')
-            json_end = initial_recommendations_str.rfind('}') + 1
-            if json_start != -1 and json_end != 0:
-                json_str = initial_recommendations_str[json_start:json_end]
-                initial_recommendations_data = json.loads(json_str)
-            else:
-                raise json.JSONDecodeError("No JSON object found", initial_recommendations_str, 0)
+            with span(RECOMMEND_STAGE_SECONDS, stage="json_extract"):
+                return _extract_json_object(initial_recommendations_str)
         except (json.JSONDecodeError, KeyError) as e:
+            LLM_PARSE_FAILURES.inc(stage="initial_agent")
             logger.error(f"[Agent] 초기 추천 결과 파싱 실패: {e} (응답: {initial_recommendations_str})", exc_info=True)
             return RecommendationResponse(daily_recommendations=[], is_verified_success=False, agent_search_log=f"Agent 응답 파싱 오류: {e}", total_tokens=0)
     except Exception as e:
         logger.error(f"[Agent] 초기 추천 생성 중 오류 발생: {e}", exc_info=True)
         return RecommendationResponse(daily_recommendations=[], is_verified_success=False, agent_search_log=f"Agent 호출 오류: {e}", total_tokens=0)
 
+async def _generate_structured_plan(user_request: UserRequest, agent_search_logs: List[str], usage: Optional[UsageTracker] = None):
+    """
+    웹 검색은 STRUCTURED_PLAN_MAX_SEARCHES번만 병렬로 돌리고, 그 결과 넣어서 구조화 출력 LLM 한번으로 일정 만드는거.
+    Agent처럼 LLM/검색 왕복을 반복하지 않아서 왕복 수랑 토큰이 요청마다 거의 일정함.
+
+    Returns:
+        파싱된 추천 데이터(dict). 실패하면 에러 담은 RecommendationResponse.
+    """
+    queries = _plan_search_queries(user_request)
+
+    try:
+        with span(RECOMMEND_STAGE_SECONDS, stage="initial_structured"), _track_stage(usage, STAGE_INITIAL_STRUCTURED) as callbacks:
+            search_results = "(검색 안함)"
+            if queries:
+                with span(RECOMMEND_STAGE_SECONDS, stage="plan_search"):
+                    search_results = await _search_context(queries, callbacks, agent_search_logs)
+            prompt = build_structured_prompt(user_request, search_results)
+            logger.info(f"[LLM] 웹 검색 {len(queries)}건 참고해서 구조화 출력으로 일정 생성을 요청합니다.")
+            plan_data = await _invoke_structured(prompt, PlannedTrip, callbacks, stage="initial_structured")
+        agent_search_logs.append(f"웹 검색 {len(queries)}건 참고해서 일정 생성")
+        return plan_data
+    except Exception as e:
+        logger.error(f"[LLM] 구조화 출력 일정 생성 중 오류 발생: {e}", exc_info=True)
+        return RecommendationResponse(daily_recommendations=[], is_verified_success=False, agent_search_log=f"일정 생성 오류: {e}", total_tokens=0)
+
+def _parse_daily_plans(initial_recommendations_data: dict, coords_by_address: dict, agent_search_logs: List[str]) -> Tuple[List[DailyRecommendation], List[RecommendationItem], bool]:
+    """
+    초기 추천 데이터를 DailyRecommendation 목록으로 바꾸는거 (지오코딩 결과 채워넣음).
+
+    Returns:
+        Tuple[List[DailyRecommendation], List[RecommendationItem], bool]: (일자별 추천, 검증할 항목들, 지금까지 성공 여부)
+    """
     final_daily_recommendations: List[DailyRecommendation] = []
     overall_is_verified_success = True
 
     # 2. 추천 항목 파싱 및 검증 대기 목록 생성
-    items_to_verify = [] # (RecommendationItem, original_item_data) 튜플을 저장할 리스트
+    items_to_verify: List[RecommendationItem] = []
 
     for daily_plan_data in initial_recommendations_data.get("daily_recommendations", []):
         current_date_str = daily_plan_data.get("date")
@@ -260,10 +818,11 @@ async def get_ai_recommendations(user_request: UserRequest) -> RecommendationRes
         for item_data in daily_plan_data.get("recommendations", []):
             try:
                 # 카카오맵 API를 통해 위도, 경도 가져오기 (AI가 주소를 제공했다고 가정)
-                latitude, longitude = None, None
-                should_verify = True
-                if item_data.get("address"):
-                    latitude, longitude = get_coords_for_location(KAKAO_API_KEY, item_data["address"])
+                # DB 후보에서 온 항목은 좌표가 이미 있고, `is_variable`인 것만 검증함
+                latitude, longitude = item_data.get("latitude"), item_data.get("longitude")
+                should_verify = item_data.get("is_variable", True)
+                if latitude is None and item_data.get("address"):
+                    latitude, longitude = coords_by_address.get(item_data["address"], (None, None))
                     if latitude is None or longitude is None:
                         logger.warning(f"[KakaoMap] {item_data['address']}에 대한 좌표를 찾을 수 없습니다.")
                         agent_search_logs.append(f"KakaoMap: {item_data['address']} 좌표 찾기 실패")
@@ -284,14 +843,15 @@ async def get_ai_recommendations(user_request: UserRequest) -> RecommendationRes
                     image_url=item_data.get("image_url"),
                     start_date=datetime.strptime(item_data["start_date"], "%Y-%m-%d").date() if item_data.get("start_date") else None,
                     end_date=datetime.strptime(item_data["end_date"], "%Y-%m-%d").date() if item_data.get("end_date") else None,
-                    operating_hours=item_data.get("operating_hours")
+                    operating_hours=item_data.get("operating_hours"),
+                    content_type=item_data.get("content_type"),
                 )
 
                 if "verification_details" in item_data:
                     recommendation_item.verification_details = VerificationDetails(**item_data["verification_details"])
 
                 if should_verify:
-                    items_to_verify.append((recommendation_item, item_data))
+                    items_to_verify.append(recommendation_item)
                 daily_recommendation_items.append(recommendation_item)
 
             except Exception as e:
@@ -303,68 +863,166 @@ async def get_ai_recommendations(user_request: UserRequest) -> RecommendationRes
 
         final_daily_recommendations.append(DailyRecommendation(date=current_date, recommendations=daily_recommendation_items))
 
-    # 3. 병렬로 정보 검증 실행
-    if items_to_verify:
-        logger.info(f"[Agent] 총 {len(items_to_verify)}개의 항목에 대한 병렬 정보 검증을 시작합니다.")
-        verification_tasks = []
-        for item, original_item_data in items_to_verify:
-            # Agent 검증 시 필요한 정보만 전달
-            verification_tasks.append(
-                verify_recommendation_with_agent(
-                    item.name,
-                    item.start_date.isoformat() if item.start_date else None,
-                    item.end_date.isoformat() if item.end_date else None,
-                    item.operating_hours
-                )
-            )
-        verification_results = await asyncio.gather(*verification_tasks, return_exceptions=True)
-        logger.info("[Agent] 모든 병렬 정보 검증이 완료되었습니다.")
+    return final_daily_recommendations, items_to_verify, overall_is_verified_success
 
-        # 4. 검증 결과 처리
-        for i, (item, _) in enumerate(items_to_verify):
-            result = verification_results[i]
+async def _build_daily_plans(initial_recommendations_data: dict, agent_search_logs: List[str]) -> Tuple[List[DailyRecommendation], List[RecommendationItem], bool]:
+    """초기 추천 데이터를 지오코딩하고 파싱한 다음 하루 동선까지 정렬하는거 (검증 전 단계)."""
+    # 모든 주소를 한번에 병렬로 지오코딩함 (이벤트 루프 안 막게 비동기로)
+    addresses = _collect_addresses(initial_recommendations_data)
+    with span(RECOMMEND_STAGE_SECONDS, stage="geocode"):
+        coords_by_address = dict(zip(addresses, await geocoder.geocode_many(addresses)))
 
-            if isinstance(result, Exception):
-                overall_is_verified_success = False
-                error_message = f"Agent 검증 중 예외 발생: {result}"
-                agent_search_logs.append(f"{item.name}: 검증 실패 - {error_message}")
-                item.verification_details = _create_error_verification_details("Agent 검증 중 예외 발생", str(result))
-                continue
+    daily_recommendations, items_to_verify, is_success = _parse_daily_plans(initial_recommendations_data, coords_by_address, agent_search_logs)
 
-            verification_result_str = result
-            try:
-                verification_json = json.loads(verification_result_str)
-                if "error" in verification_json:
-                    overall_is_verified_success = False
-                    agent_search_logs.append(f"{item.name}: 검증 실패 - {verification_json['error']}")
-                    item.verification_details = _create_error_verification_details("Agent 검증 중 오류 발생", verification_json['error'])
-                else:
-                    verification_data = verification_json.get("verification_results", {})
-                    item.verification_details = VerificationDetails(
-                        operating_status=verification_data.get("operating_status", "정보 없음"),
-                        end_or_cancel_status=verification_data.get("end_or_cancel_status", "정보 없음"),
-                        latest_price_info=verification_data.get("latest_price_info", "정보 없음"),
-                        schedule_change_and_notes=verification_data.get("schedule_change_and_notes", "정보 없음"),
-                        reliability_score=verification_json.get("reliability_score", 0),
-                        reliability_reason=verification_json.get("reliability_reason", "정보 없음")
-                    )
-                    if item.verification_details.reliability_score < 50:
-                        overall_is_verified_success = False
-                        agent_search_logs.append(f"{item.name}: 검증 실패 - 신뢰도 점수 낮음 ({item.verification_details.reliability_score}) - {item.verification_details.reliability_reason}")
-                    else:
-                        agent_search_logs.append(f"{item.name}: 검증 성공")
-            except json.JSONDecodeError:
-                overall_is_verified_success = False
-                agent_search_logs.append(f"{item.name}: 검증 실패 - Agent가 반환한 JSON 파싱 오류")
-                item.verification_details = _create_error_verification_details("Agent 응답 JSON 파싱 오류", verification_result_str)
-            except Exception as e:
-                overall_is_verified_success = False
-                agent_search_logs.append(f"{item.name}: 검증 실패 - 예상치 못한 오류: {e}")
-                item.verification_details = _create_error_verification_details("Agent 검증 결과 처리 중 오류", str(e))
+    # 좌표 기준으로 하루 동선 다시 정렬함 (운영 시간 고려)
+    try:
+        with span(RECOMMEND_STAGE_SECONDS, stage="itinerary"):
+            optimize_itinerary(daily_recommendations)
+    except Exception as e:
+        logger.error(f"[Itinerary] 동선 최적화 중 오류 발생: {e}", exc_info=True)
+    return daily_recommendations, items_to_verify, is_success
 
-    return RecommendationResponse(
-        daily_recommendations=final_daily_recommendations,
+async def _verify_as_completed(items_to_verify: List[RecommendationItem], usage: Optional[UsageTracker] = None) -> AsyncIterator[Tuple[RecommendationItem, VerificationOutcome]]:
+    """
+    항목들 병렬로 검증하고 끝나는 순서대로 (항목, 결과) 내보내는거. 결과는 항목에 바로 채워넣음.
+    캐시에 있는 항목은 Agent 안 부름. VERIFICATION_BATCH_SIZE > 1이면 캐시에 없는 항목들은 묶어서 한번에 검증함.
+    """
+    if not items_to_verify:
+        return
+    logger.info(f"[Agent] 총 {len(items_to_verify)}개의 항목에 대한 병렬 정보 검증을 시작합니다.")
+
+    async def _verify(item: RecommendationItem) -> Tuple[RecommendationItem, VerificationOutcome]:
+        try:
+            # 캐시 조회 + 스케줄러 대기 + Agent 실행까지 항목 하나 검증에 걸린 전체 시간
+            with span(RECOMMEND_STAGE_SECONDS, stage="verification"):
+                return item, await verify_item_with_cache(item, usage)
+        except Exception as e:
+            return item, _interpret_verification_result(item.name, e)
+
+    batch_tasks: List[asyncio.Task] = []
+    if VERIFICATION_BATCH_SIZE > 1 and len(items_to_verify) > 1:
+        tasks, batch_tasks = await _start_batched_verification(items_to_verify, usage, _verify)
+    else:
+        tasks = [asyncio.create_task(_verify(item)) for item in items_to_verify]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            item, outcome = await next_done
+            item.verification_details = outcome.details
+            yield item, outcome
+    finally:
+        # 받는 쪽이 중간에 끊으면 남은 검증 취소함
+        for task in tasks + batch_tasks:
+            task.cancel()
+    logger.info("[Agent] 모든 병렬 정보 검증이 완료되었습니다.")
+
+async def _generate_initial_plan(user_request: UserRequest, candidates: Optional[List[dict]], agent_search_logs: List[str], usage: Optional[UsageTracker] = None):
+    """
+    DB 후보 있으면 그걸로 먼저 일정 생성하고, 실패하거나 후보 없으면 웹 검색 기반으로 만드는거
+    (INITIAL_PLAN_MODE에 따라 구조화 출력 한번 또는 Agent).
+
+    Returns:
+        추천 데이터(dict). Agent까지 실패하면 에러 담은 RecommendationResponse.
+    """
+    # 1-1. DB 후보 있으면 그걸로 먼저 일정 생성 (실패하면 Agent로 넘어감)
+    if candidates:
+        try:
+            initial_recommendations_data = await generate_grounded_plan(user_request, candidates, usage)
+            if not any(day["recommendations"] for day in initial_recommendations_data["daily_recommendations"]):
+                raise ValueError("추천 항목이 없습니다.")
+            agent_search_logs.append(f"DB 후보 {len(candidates)}건 기반으로 일정 생성")
+            return initial_recommendations_data
+        except Exception as e:
+            logger.warning(f"[LLM] DB 기반 일정 생성 실패, 웹 검색 기반으로 대체합니다: {e}")
+            agent_search_logs.append(f"DB 기반 일정 생성 실패, 웹 검색 기반으로 대체: {e}")
+
+    if INITIAL_PLAN_MODE == "agent":
+        return await _generate_agent_plan(user_request, agent_search_logs, usage)
+    return await _generate_structured_plan(user_request, agent_search_logs, usage)
+
+async def stream_ai_recommendations(user_request: UserRequest, candidates: Optional[List[dict]] = None, usage: Optional[UsageTracker] = None) -> AsyncIterator[RecommendationStreamEvent]:
+    """
+    `get_ai_recommendations`의 스트리밍 버전. 결과 나오는대로 이벤트 하나씩 내보내는거.
+
+    순서:
+    1. "day": 일정 생성 + 지오코딩 + 동선 정렬 끝나면 일자별 추천 하나씩 (검증 결과는 아직 없음)
+    2. "verification": 검증 끝나는 순서대로 항목 하나씩 (day_index, item_index로 위치 알려줌)
+    3. "done": 전체 성공 여부, 로그, 토큰 수, 단계별 사용량
+    일정 생성 자체가 실패하면 "error" 하나만 내보냄.
+    `usage` 안 넘기면 요청마다 새로 만들어서 씀 (토큰 예산은 REQUEST_TOKEN_BUDGET).
+    """
+    agent_search_logs = []
+    usage = usage or UsageTracker()
+
+    initial_recommendations_data = await _generate_initial_plan(user_request, candidates, agent_search_logs, usage)
+    if isinstance(initial_recommendations_data, RecommendationResponse):
+        yield RecommendationStreamEvent(type="error", agent_search_log=initial_recommendations_data.agent_search_log, is_verified_success=False,
+                                        total_tokens=usage.total_tokens, usage=usage.summary())
+        return
+
+    daily_recommendations, items_to_verify, overall_is_verified_success = await _build_daily_plans(initial_recommendations_data, agent_search_logs)
+
+    positions = {}
+    verify_ids = {id(item) for item in items_to_verify}
+    for day_index, daily_recommendation in enumerate(daily_recommendations):
+        for item_index, item in enumerate(daily_recommendation.recommendations):
+            positions[id(item)] = (day_index, item_index)
+        pending = sum(1 for item in daily_recommendation.recommendations if id(item) in verify_ids)
+        yield RecommendationStreamEvent(type="day", day_index=day_index, day=daily_recommendation, pending_verifications=pending)
+
+    # 3. 병렬 검증 결과는 끝나는 순서대로 보냄 (로그는 원래 항목 순서로 남김)
+    outcomes = {}
+    async for item, outcome in _verify_as_completed(items_to_verify, usage):
+        outcomes[id(item)] = outcome
+        day_index, item_index = positions[id(item)]
+        yield RecommendationStreamEvent(
+            type="verification",
+            day_index=day_index,
+            item_index=item_index,
+            verification_details=outcome.details,
+            is_verified_success=outcome.is_success,
+        )
+
+    # 4. 검증 결과 처리
+    for item in items_to_verify:
+        outcome = outcomes[id(item)]
+        agent_search_logs.append(outcome.log_message)
+        if not outcome.is_success:
+            overall_is_verified_success = False
+
+    summary = usage.summary()
+    logger.info(f"[Usage] 토큰 {summary.total_tokens} (LLM {summary.llm_calls}회, 검색 {summary.tool_calls}회, "
+                f"약 ${summary.estimated_cost_usd:.4f}, {summary.wall_seconds:.1f}초)")
+    yield RecommendationStreamEvent(
+        type="done",
         is_verified_success=overall_is_verified_success,
         agent_search_log="\n".join(agent_search_logs),
-        total_tokens=total_tokens_used
+        total_tokens=summary.total_tokens,
+        usage=summary,
+    )
+
+async def get_ai_recommendations(user_request: UserRequest, candidates: Optional[List[dict]] = None) -> RecommendationResponse:
+    """
+    AI 추천 생성 및 검증을 수행하는 메인 함수.
+    - 최적화: 정보 변동성이 높은 항목들의 실시간 정보 검증을 순차적이 아닌 병렬로 수행하여 응답 시간을 단축.
+    - 최적화: DB 후보(`candidates`)가 있으면 Agent 대신 LLM 한번으로 일정 짜고, `is_variable`인 항목만 검증함.
+    스트리밍 이벤트(`stream_ai_recommendations`) 다 모아서 응답 하나로 만드는거.
+    """
+    events = [event async for event in stream_ai_recommendations(user_request, candidates)]
+    return response_from_events(events)
+
+def response_from_events(events: List[RecommendationStreamEvent]) -> RecommendationResponse:
+    """
+    스트리밍 이벤트들을 RecommendationResponse 하나로 합치는거.
+    검증 결과는 "day" 이벤트로 받은 항목 객체에 이미 채워져 있음.
+    """
+    daily_recommendations = [event.day for event in events if event.type == "day"]
+    last_event = events[-1] if events else None
+    if last_event is None or last_event.type not in ("done", "error"):
+        raise RuntimeError("추천 스트림이 done 이벤트 없이 끝났습니다.")
+    return RecommendationResponse(
+        daily_recommendations=daily_recommendations if last_event.type == "done" else [],
+        is_verified_success=bool(last_event.is_verified_success),
+        agent_search_log=last_event.agent_search_log or "",
+        total_tokens=last_event.total_tokens,
+        usage=last_event.usage,
     )
@@ -0,0 +1,184 @@
+"""
+ai_log 기록을 요청 처리 흐름 밖에서 모아서 쓰는 로그 싱크 파일임.
+핸들러에서 add/commit/refresh 하던걸 메모리 큐에 넣기만 하고,
+백그라운드 writer가 일정 개수/시간마다 여러 행 한번에 INSERT 함.
+
+- 큐 크기 제한 있음. 가득 차면 잠깐(enqueue_timeout) 기다려보고 그래도 자리 없으면 버리고 dropped 셈.
+- DB 쓰기 실패한 배치는 failed로 셈 (요청 처리엔 영향 없음).
+- 앱 꺼질때 `aclose()`로 남은거 다 쓰고 끝냄.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from src.db import engine as default_engine
+from src.metrics import span, DB_OPERATION_SECONDS
+from src.models import UserRequest, RecommendationResponse
+from src.openapi import AiLog
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+LOG_SINK_MAX_QUEUE = int(os.getenv("LOG_SINK_MAX_QUEUE", "1000"))
+LOG_SINK_BATCH_SIZE = int(os.getenv("LOG_SINK_BATCH_SIZE", "100"))
+LOG_SINK_FLUSH_INTERVAL = float(os.getenv("LOG_SINK_FLUSH_INTERVAL", "1.0"))
+LOG_SINK_ENQUEUE_TIMEOUT = float(os.getenv("LOG_SINK_ENQUEUE_TIMEOUT", "0.05"))
+
+_STOP = object()
+
+
+def ai_log_record(user_request: UserRequest, ai_response: RecommendationResponse, cache_status: Optional[str],
+                  request_time: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    ai_log 한 행에 들어갈 값 만드는거.
+    토큰/사용량은 이 요청에서 실제로 쓴 것만 기록함 (캐시 응답은 토큰 0, 사용량 없음).
+    """
+    spent = cache_status in (None, "miss")
+    return {
+        "request_time": request_time or datetime.now(),
+        "user_input_json": user_request.model_dump_json(),
+        "ai_response_json": ai_response.model_dump_json(),
+        "total_tokens": ai_response.total_tokens if spent else 0,
+        "agent_search_log": ai_response.agent_search_log,
+        "is_verified_success": ai_response.is_verified_success,
+        "cache_status": cache_status,
+        "usage_json": ai_response.usage.model_dump(mode="json") if spent and ai_response.usage else None,
+    }
+
+
+class AiLogSink:
+    """
+    ai_log 행 모아서 배치로 INSERT 하는 백그라운드 writer임.
+    writer 태스크는 처음 기록 들어올때 현재 이벤트 루프에 만들어짐.
+
+    Args:
+        engine (Engine): 기록할 DB 엔진. 기본은 db.py의 engine.
+        max_queue (int): 메모리 큐 최대 크기.
+        batch_size (int): 한번에 INSERT 할 최대 행 수.
+        flush_interval (float): 배치 안 차도 첫 행 들어오고 이 시간(초) 지나면 씀.
+        enqueue_timeout (float): 큐 가득 찼을때 자리 날때까지 기다리는 최대 시간(초). 0이면 바로 버림.
+    """
+
+    def __init__(self, engine: Engine = default_engine, max_queue: int = LOG_SINK_MAX_QUEUE,
+                 batch_size: int = LOG_SINK_BATCH_SIZE, flush_interval: float = LOG_SINK_FLUSH_INTERVAL,
+                 enqueue_timeout: float = LOG_SINK_ENQUEUE_TIMEOUT):
+        self._engine = engine
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._closing = False
+        # 지표
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def _ensure_writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._writer is not None and not self._writer.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._closing = False
+        self._writer = loop.create_task(self._run())
+
+    async def submit(self, record: Dict[str, Any]) -> bool:
+        """
+        기록 하나 큐에 넣는거. DB는 안 기다림.
+
+        Returns:
+            bool: 큐에 들어갔으면 True, 가득 차서 버렸으면 False.
+        """
+        if self._closing:
+            self.dropped += 1
+            return False
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            # DB가 느려서 밀리는 중이면 잠깐 기다려봄 (backpressure). 그래도 안되면 버림.
+            try:
+                await asyncio.wait_for(self._queue.put(record), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    logger.warning(f"[LogSink] 큐가 가득 차서 AI 로그를 버렸습니다 (누적 {self.dropped}건).")
+                return False
+        self.enqueued += 1
+        return True
+
+    def _insert_rows(self, rows: List[Dict[str, Any]]) -> None:
+        with span(DB_OPERATION_SECONDS, operation="ai_log_insert_batch"), self._engine.begin() as conn:
+            conn.execute(insert(AiLog.__table__), rows)
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            await asyncio.to_thread(self._insert_rows, rows)
+            self.written += len(rows)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(rows)
+            logger.error(f"[LogSink] AI 로그 {len(rows)}건 저장 중 오류 발생: {e}")
+
+    async def _run(self) -> None:
+        queue = self._queue
+        stopping = False
+        while not stopping:
+            first = await queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            # 배치 찰때까지 또는 flush_interval 지날때까지 더 모음
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    record = queue.get_nowait() if remaining <= 0 else await asyncio.wait_for(queue.get(), timeout=remaining)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+            await self._write(batch)
+
+    async def aclose(self, timeout: float = 10.0) -> None:
+        """새 기록 안 받고 큐에 남은거 다 쓴 다음 writer 끝내는거."""
+        if self._writer is None or self._writer.done():
+            return
+        self._closing = True
+        # 큐가 가득 차있어도 STOP은 넣어야 해서 기다려서 넣음
+        await self._queue.put(_STOP)
+        try:
+            await asyncio.wait_for(asyncio.shield(self._writer), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._writer.cancel()
+            logger.error(f"[LogSink] 종료 시간 초과. 남은 AI 로그 {self._queue.qsize()}건을 버립니다.")
+        logger.info(f"[LogSink] 종료 완료 (저장 {self.written}건, 버림 {self.dropped}건, 실패 {self.failed}건).")
+
+    def stats(self) -> Dict[str, int]:
+        """큐 길이랑 누적 지표 돌려주는거."""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+# 프로세스 전체에서 같이 쓰는 로그 싱크
+ai_log_sink = AiLogSink()
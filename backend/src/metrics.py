@@ -0,0 +1,299 @@
+"""
+요청 처리 단계별 걸린 시간/실패 횟수 모아서 Prometheus 텍스트 형식으로 내보내는 파일임.
+/recommend 한번에 어디서 시간 쓰는지(초기 일정 생성, JSON 파싱, 지오코딩, 검증, DB 기록) 보려고 만든거.
+
+- `span(histogram, **labels)`: with 블록 걸린 시간을 히스토그램에 기록함 (async 코드 안에서도 그냥 with로 씀)
+- `Counter.inc(**labels)`: 타임아웃, 파싱 실패, 지오코딩 실패 같은거 셈
+- `register_stats(prefix, stats)`: 스케줄러/로그 싱크/토큰 버킷처럼 이미 `stats()` 있는 애들 값 그대로 gauge로 내보냄
+- METRICS_ENABLED=0 이면 span/inc가 바로 리턴해서 거의 비용 없음
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+# 초 단위 히스토그램 구간. JSON 파싱(1ms 안쪽)부터 Agent 검증(수십 초)까지 커버함.
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+# 수집기가 돌려주는 값: (이름, 설명, 종류, [(라벨, 값), ...])
+CollectedMetric = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple([str(labels[name]) for name in self.labelnames])
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} 라벨은 {self.labelnames}이어야 합니다 (받은거: {tuple(labels)}).")
+
+    def _labels_dict(self, values: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """계속 늘어나기만 하는 값 (실패 횟수 등)."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels_dict(key))} {_format_value(value)}" for key, value in items]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """
+    구간별 개수 세는 히스토그램. Prometheus에선 histogram_quantile로 p50/p95/p99 구하고,
+    프로세스 안에서는 `quantile()`로 대략적인 값 볼 수 있음 (구간 안에서 선형 보간).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    def quantile(self, q: float, **labels: str) -> Optional[float]:
+        """구간 개수로 q 분위수(0~1) 추정하는거. 기록된게 없으면 None."""
+        series = self._series.get(self._label_values(labels))
+        if series is None or series.count == 0:
+            return None
+        rank = q * series.count
+        cumulative = 0
+        for index, count in enumerate(series.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index >= len(self.buckets):
+                    return lower  # +Inf 구간이면 마지막 경계로 침
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """라벨별 개수, 평균, p50/p95/p99 돌려주는거 (벤치마크, 디버깅용)."""
+        result = {}
+        for key, series in list(self._series.items()):
+            labels = self._labels_dict(key)
+            result[",".join(key) or self.name] = {
+                "count": series.count,
+                "avg": series.sum / series.count if series.count else 0.0,
+                "p50": self.quantile(0.5, **labels),
+                "p95": self.quantile(0.95, **labels),
+                "p99": self.quantile(0.99, **labels),
+            }
+        return result
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = [(key, list(series.counts), series.sum, series.count) for key, series in self._series.items()]
+        for key, counts, total, count in items:
+            labels = self._labels_dict(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class _Span:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(histogram: Histogram, **labels: str):
+    """
+    with 블록 걸린 시간(초)을 `histogram`에 기록하는거. 예외 나도 기록함.
+
+    사용 예:
+        with span(RECOMMEND_STAGE_SECONDS, stage="geocode"):
+            coords = await geocoder.geocode_many(addresses)
+    """
+    if not METRICS_ENABLED:
+        return _NOOP_SPAN
+    return _Span(histogram, labels)
+
+
+class MetricsRegistry:
+    """지표랑 수집기 모아서 Prometheus 텍스트로 만드는거."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[CollectedMetric]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[CollectedMetric]]) -> None:
+        """`/metrics` 만들때마다 불리는 함수 등록하는거. 다른 모듈 `stats()` 값 내보낼때 씀."""
+        self._collectors.append(collector)
+
+    def register_stats(self, prefix: str, documentation: str, stats: Callable[[], Dict[str, float]], **labels: str) -> None:
+        """
+        `stats()` 딕셔너리의 숫자 값들을 `<prefix>_<키>` gauge로 내보내는거.
+        같은 prefix를 라벨만 바꿔서 여러번 등록해도 됨 (예: upstream별 토큰 버킷).
+        """
+        def _collect() -> Iterable[CollectedMetric]:
+            for key, value in stats().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                yield f"{prefix}_{key}", f"{documentation} ({key})", "gauge", [(labels, value)]
+        self.register_collector(_collect)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식(text/plain; version=0.0.4)으로 전부 내보내는거."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+
+        # 수집기 값은 이름별로 모아서 HELP/TYPE 한번만 씀
+        collected: Dict[str, Tuple[str, str, List[Tuple[Dict[str, str], float]]]] = {}
+        for collector in self._collectors:
+            try:
+                for name, documentation, kind, samples in collector():
+                    collected.setdefault(name, (documentation, kind, []))[2].extend(samples)
+            except Exception as e:
+                logger.error(f"[Metrics] 지표 수집 중 오류 발생: {e}")
+        for name, (documentation, kind, samples) in collected.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전체에서 같이 쓰는 레지스트리
+registry = MetricsRegistry()
+
+# --- 지표 정의 ---
+
+RECOMMEND_STAGE_SECONDS = registry.histogram(
+    "recommend_stage_seconds", "추천 생성 단계별 걸린 시간(초)", ["stage"])
+KAKAO_GEOCODE_SECONDS = registry.histogram(
+    "kakao_geocode_seconds", "카카오 지오코딩 API 호출 한번 걸린 시간(초)", ["outcome"])
+DB_OPERATION_SECONDS = registry.histogram(
+    "db_operation_seconds", "DB 작업별 걸린 시간(초)", ["operation"])
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_seconds", "엔드포인트별 응답 시간(초)", ["endpoint"])
+
+AGENT_TIMEOUTS = registry.counter(
+    "agent_timeouts_total", "Agent 호출 시간 초과 횟수", ["stage"])
+LLM_PARSE_FAILURES = registry.counter(
+    "llm_parse_failures_total", "LLM 응답 JSON 파싱 실패 횟수", ["stage"])
+GEOCODE_MISSES = registry.counter(
+    "geocode_misses_total", "좌표 못 찾은 주소 수", ["reason"])
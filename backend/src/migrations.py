@@ -0,0 +1,152 @@
+"""
+DB 스키마 마이그레이션 관리하는 파일임.
+import할때 create_all 하던거 대신, 버전 붙은 마이그레이션을 순서대로 한번씩만 적용함.
+적용된 버전은 schema_migrations 테이블에 기록함.
+
+실행 방법 (backend 폴더에서):
+    python -m src.migrations
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from src.openapi import Base
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+_migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+# --- 헬퍼 함수 ---
+
+def _create_table_if_missing(conn: Connection, table_name: str) -> None:
+    """ORM 모델 정의대로 테이블 없으면 만드는거 (인덱스 포함)."""
+    Base.metadata.tables[table_name].create(bind=conn, checkfirst=True)
+
+
+def _add_column_if_missing(conn: Connection, table_name: str, column_name: str) -> None:
+    """ORM 모델에 정의된 컬럼이 실제 테이블에 없으면 추가하는거."""
+    existing = {column["name"] for column in inspect(conn).get_columns(table_name)}
+    if column_name in existing:
+        return
+    column = Base.metadata.tables[table_name].columns[column_name]
+    column_type = column.type.compile(dialect=conn.dialect)
+    nullable = "" if column.nullable else " NOT NULL"
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}{nullable}"))
+
+
+def _create_indexes_if_missing(conn: Connection, table_name: str) -> None:
+    """ORM 모델에 정의된 인덱스 중 없는거 만드는거."""
+    existing = {index["name"] for index in inspect(conn).get_indexes(table_name)}
+    for index in Base.metadata.tables[table_name].indexes:
+        if index.name not in existing:
+            index.create(bind=conn)
+
+
+# --- 마이그레이션 정의 ---
+
+def _0001_create_base_tables(conn: Connection) -> None:
+    for table_name in ("tourist_info", "ai_log", "verification_cache"):
+        _create_table_if_missing(conn, table_name)
+
+
+def _0002_ai_log_cache_status(conn: Connection) -> None:
+    _add_column_if_missing(conn, "ai_log", "cache_status")
+
+
+def _0003_tourist_info_indexes(conn: Connection) -> None:
+    # unique 인덱스 만들기 전에 content_id 중복 행 정리함 (제일 최근에 들어온 행만 남김)
+    duplicates = conn.execute(text(
+        "SELECT content_id, MAX(id) FROM tourist_info GROUP BY content_id HAVING COUNT(*) > 1"
+    )).all()
+    for content_id, keep_id in duplicates:
+        conn.execute(
+            text("DELETE FROM tourist_info WHERE content_id = :content_id AND id <> :keep_id"),
+            {"content_id": content_id, "keep_id": keep_id},
+        )
+    if duplicates:
+        logger.warning(f"[Migration] 중복된 content_id {len(duplicates)}건을 정리했습니다.")
+    _create_indexes_if_missing(conn, "tourist_info")
+
+
+def _0004_recommendation_job(conn: Connection) -> None:
+    _create_table_if_missing(conn, "recommendation_job")
+
+
+def _0005_ai_log_usage(conn: Connection) -> None:
+    _add_column_if_missing(conn, "ai_log", "usage_json")
+
+
+def _0006_search_cache(conn: Connection) -> None:
+    _create_table_if_missing(conn, "search_cache")
+
+
+def _0007_verification_cache_content_id(conn: Connection) -> None:
+    _add_column_if_missing(conn, "verification_cache", "content_id")
+    _create_indexes_if_missing(conn, "verification_cache")
+
+
+def _0008_tourist_info_content_hash(conn: Connection) -> None:
+    # 기존 행은 NULL로 두고 다음 수집때 값 비교해서 채움
+    _add_column_if_missing(conn, "tourist_info", "content_hash")
+
+
+# (버전, 이름, 함수) 순서대로 적용됨. 새 마이그레이션은 항상 맨 뒤에 추가해야 함.
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create_base_tables", _0001_create_base_tables),
+    (2, "ai_log_cache_status", _0002_ai_log_cache_status),
+    (3, "tourist_info_indexes", _0003_tourist_info_indexes),
+    (4, "recommendation_job", _0004_recommendation_job),
+    (5, "ai_log_usage", _0005_ai_log_usage),
+    (6, "search_cache", _0006_search_cache),
+    (7, "verification_cache_content_id", _0007_verification_cache_content_id),
+    (8, "tourist_info_content_hash", _0008_tourist_info_content_hash),
+]
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    아직 적용 안 된 마이그레이션 순서대로 적용하는거. 마이그레이션 하나당 트랜잭션 하나임.
+
+    Args:
+        engine (Engine): 마이그레이션 적용할 DB 엔진.
+
+    Returns:
+        List[int]: 이번에 새로 적용된 버전 목록.
+    """
+    schema_migrations.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        applied_versions = set(conn.execute(schema_migrations.select().with_only_columns(schema_migrations.c.version)).scalars())
+
+    newly_applied = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied_versions:
+            continue
+        logger.info(f"[Migration] {version:04d}_{name} 적용을 시작합니다.")
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(schema_migrations.insert().values(version=version, name=name, applied_at=datetime.now()))
+        newly_applied.append(version)
+
+    if newly_applied:
+        logger.info(f"[Migration] 마이그레이션 {len(newly_applied)}건 적용 완료.")
+    return newly_applied
+
+
+if __name__ == "__main__":
+    from src.db import engine
+
+    logging.basicConfig(level=logging.INFO)
+    run_migrations(engine)
@@ -1,5 +1,5 @@
-from datetime import date
-from pydantic import BaseModel
+from datetime import date, datetime
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class UserRequest(BaseModel):
@@ -54,6 +54,7 @@ class RecommendationItem(BaseModel):
         image_url (Optional[str]): 추천 장소 이미지 URL (tourist_info.image_url)
         activity (str): AI가 제안하는 해당 장소에서의 활동
         verification_details (Optional[VerificationDetails]): 검증 결과에 대한 상세 내용
+        content_type (Optional[str]): 콘텐츠 종류 (tourist_info.content_type, 검증 캐시 TTL 정할때 씀)
     """
     name: str
     description: str
@@ -66,6 +67,7 @@ class RecommendationItem(BaseModel):
     start_date: Optional[date] = None # 축제/행사 시작일
     end_date: Optional[date] = None # 축제/행사 종료일
     operating_hours: Optional[str] = None # 운영 시간 (예: "09:00-18:00", "24시간", "매일", "주말 휴무")
+    content_type: Optional[str] = None # 콘텐츠 종류 (DB 후보에서 온 항목만 있음)
 
 class DailyRecommendation(BaseModel):
     """
@@ -74,6 +76,112 @@ class DailyRecommendation(BaseModel):
     date: date # 해당 일자의 날짜
     recommendations: List[RecommendationItem] # 해당 일자에 추천되는 장소 목록
 
+class PlannedItem(BaseModel):
+    """
+    LLM이 일정 만들때 채우는 추천 항목 하나임 (구조화 출력 JSON 스키마용).
+    RecommendationItem에서 좌표랑 검증 결과 빼고 LLM이 채우는 필드만 둔거.
+    OpenAI strict 모드는 필드가 전부 required여야 해서 Optional도 기본값 안 줌 (모르면 null로 옴).
+    날짜는 스키마 호환되게 문자열(YYYY-MM-DD)로 받아서 파싱할때 바꿈.
+    """
+    name: str = Field(description="장소 이름")
+    description: str = Field(description="추천 이유 및 간략 설명")
+    activity: str = Field(description="해당 장소에서 할만한 활동")
+    address: str = Field(description="지오코딩 가능한 도로명/지번 주소")
+    image_url: Optional[str] = Field(description="대표 이미지 URL")
+    start_date: Optional[str] = Field(description="축제/행사 시작일 (YYYY-MM-DD)")
+    end_date: Optional[str] = Field(description="축제/행사 종료일 (YYYY-MM-DD)")
+    operating_hours: Optional[str] = Field(description="운영 시간 (예: 09:00-18:00)")
+
+class PlannedDay(BaseModel):
+    """LLM이 만드는 하루 일정 (DailyRecommendation 구조화 출력용)."""
+    date: str = Field(description="날짜 (YYYY-MM-DD)")
+    recommendations: List[PlannedItem]
+
+class PlannedTrip(BaseModel):
+    """웹 검색 기반 일정 생성 구조화 출력 스키마."""
+    daily_recommendations: List[PlannedDay]
+
+class BatchVerificationItem(BaseModel):
+    """묶음 검증에서 항목 하나 결과 (구조화 출력용)."""
+    item_index: int = Field(description="[검증 대상 목록]의 번호")
+    found: bool = Field(description="검색 결과에서 이 항목 정보를 찾았는지 여부")
+    details: VerificationDetails
+
+class BatchVerificationResult(BaseModel):
+    """항목 여러개 한번에 검증하는 구조화 출력 스키마."""
+    results: List[BatchVerificationItem]
+
+class GroundedPick(BaseModel):
+    """DB 후보 기반 일정에서 LLM이 고른 장소 하나. 나머지 정보는 DB 값으로 채움."""
+    content_id: str = Field(description="후보 목록의 content_id")
+    description: str = Field(description="추천 이유 및 간략 설명")
+    activity: str = Field(description="해당 장소에서 할만한 활동")
+
+class GroundedDay(BaseModel):
+    """DB 후보 기반 하루 일정."""
+    date: str = Field(description="날짜 (YYYY-MM-DD)")
+    recommendations: List[GroundedPick]
+
+class GroundedPlan(BaseModel):
+    """DB 후보 기반 일정 생성 구조화 출력 스키마."""
+    daily_recommendations: List[GroundedDay]
+
+class StageUsage(BaseModel):
+    """
+    추천 만드는 단계 하나(초기 일정 생성, 항목 하나 검증)의 LLM 사용량 나타내는 Pydantic 모델임.
+
+    Attributes:
+        name (str): 단계 이름 ("initial:grounded", "initial:agent", "verify:장소 이름")
+        prompt_tokens (int): 입력 토큰 수
+        completion_tokens (int): 출력 토큰 수
+        total_tokens (int): 입력 + 출력 토큰 수
+        cached_prompt_tokens (int): 입력 토큰 중 프롬프트 캐시에서 읽은 토큰 수
+        llm_calls (int): LLM 호출 수
+        tool_calls (int): 도구(웹 검색) 호출 수
+        wall_seconds (float): 걸린 시간(초)
+        aborted (bool): 토큰 예산 넘어서 중간에 끊겼는지 여부
+    """
+    name: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    llm_calls: int = 0
+    tool_calls: int = 0
+    wall_seconds: float = 0.0
+    aborted: bool = False
+
+class RecommendationUsage(BaseModel):
+    """
+    요청 하나의 전체 LLM 사용량이랑 단계별 사용량 나타내는 Pydantic 모델임.
+
+    Attributes:
+        prompt_tokens (int): 입력 토큰 수 합계
+        completion_tokens (int): 출력 토큰 수 합계
+        total_tokens (int): 전체 토큰 수
+        cached_prompt_tokens (int): 입력 토큰 중 프롬프트 캐시에서 읽은 토큰 수 합계
+        llm_calls (int): LLM 호출 수 합계
+        tool_calls (int): 도구(웹 검색) 호출 수 합계
+        wall_seconds (float): 추천 생성 시작부터 끝까지 걸린 시간(초)
+        estimated_cost_usd (float): 토큰 단가로 계산한 대략적인 비용(USD)
+        budget (Optional[int]): 요청당 토큰 예산 (없으면 None)
+        budget_exceeded (bool): 토큰 예산 넘었는지 여부
+        skipped_verifications (int): 예산 넘어서 검증 Agent 안 돌린 항목 수
+        stages (List[StageUsage]): 단계별 사용량
+    """
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    llm_calls: int = 0
+    tool_calls: int = 0
+    wall_seconds: float = 0.0
+    estimated_cost_usd: float = 0.0
+    budget: Optional[int] = None
+    budget_exceeded: bool = False
+    skipped_verifications: int = 0
+    stages: List[StageUsage] = []
+
 class RecommendationResponse(BaseModel):
     """
     최종 API 응답 나타내는 Pydantic 모델임.
@@ -83,8 +191,67 @@ class RecommendationResponse(BaseModel):
         is_verified_success (bool): 모든 변동 항목이 성공적으로 검증되었는지 여부
         agent_search_log (str): LangChain Agent의 웹 검색 기록 및 결과
         total_tokens (Optional[int]): AI 추천 생성에 사용된 총 토큰 수
+        cache_status (Optional[str]): 응답 캐시 상태 ("hit", "miss", "coalesced")
+        usage (Optional[RecommendationUsage]): 단계별 토큰/호출 수/시간 (새로 만든 응답만 있음)
     """
     daily_recommendations: List[DailyRecommendation]
     is_verified_success: bool
     agent_search_log: str
     total_tokens: Optional[int] = None # AI 추천 생성에 사용된 총 토큰 수
+    cache_status: Optional[str] = None # 응답 캐시 상태 (hit: 캐시 적중, miss: 새로 생성, coalesced: 동시 요청 결과 공유)
+    usage: Optional[RecommendationUsage] = None # 단계별 LLM 사용량
+
+class RecommendationStreamEvent(BaseModel):
+    """
+    /recommend/stream 에서 한줄씩(NDJSON) 보내는 이벤트 나타내는 Pydantic 모델임.
+    이벤트 종류마다 쓰는 필드만 채워짐.
+
+    Attributes:
+        type (str): 이벤트 종류 ("day", "verification", "done", "error")
+        day_index (Optional[int]): 몇번째 날인지 ("day", "verification")
+        item_index (Optional[int]): 그날 몇번째 항목인지 ("verification")
+        day (Optional[DailyRecommendation]): 일자별 추천 ("day", 검증 결과는 아직 없음)
+        pending_verifications (Optional[int]): 그날 항목 중 "verification" 이벤트가 올 항목 수 ("day")
+        verification_details (Optional[VerificationDetails]): 항목 검증 결과 ("verification")
+        is_verified_success (Optional[bool]): 항목 검증 성공 여부 또는 전체 성공 여부 ("verification", "done", "error")
+        agent_search_log (Optional[str]): 전체 검색 기록 ("done", "error")
+        total_tokens (Optional[int]): 사용된 총 토큰 수 ("done", "error")
+        cache_status (Optional[str]): 응답 캐시 상태 ("done")
+        usage (Optional[RecommendationUsage]): 단계별 LLM 사용량 ("done", "error")
+    """
+    type: str
+    day_index: Optional[int] = None
+    item_index: Optional[int] = None
+    day: Optional[DailyRecommendation] = None
+    pending_verifications: Optional[int] = None
+    verification_details: Optional[VerificationDetails] = None
+    is_verified_success: Optional[bool] = None
+    agent_search_log: Optional[str] = None
+    total_tokens: Optional[int] = None
+    cache_status: Optional[str] = None
+    usage: Optional[RecommendationUsage] = None
+
+class RecommendationJobStatus(BaseModel):
+    """
+    백그라운드 추천 작업 상태 나타내는 Pydantic 모델임 (/recommend/jobs).
+
+    Attributes:
+        job_id (str): 작업 ID
+        status (str): 작업 상태 ("queued", "running", "succeeded", "failed")
+        verified_items (int): 검증 끝난 항목 수
+        total_items (int): 검증해야 하는 전체 항목 수 (일정 나오기 전엔 0)
+        result (Optional[RecommendationResponse]): 도는 중이면 지금까지 나온 부분 결과, 끝났으면 최종 결과
+        error (Optional[str]): 실패 사유
+        created_at (datetime): 작업 만든 시각
+        started_at (Optional[datetime]): 작업 시작 시각
+        finished_at (Optional[datetime]): 작업 끝난 시각
+    """
+    job_id: str
+    status: str
+    verified_items: int = 0
+    total_items: int = 0
+    result: Optional[RecommendationResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
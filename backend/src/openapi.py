@@ -1,7 +1,7 @@
 """
 외부 openapi(tourapi)에서 정보 가져오는 파이썬 파일임
 """
-from sqlalchemy import Column, Integer, String, DECIMAL, Boolean, Date, DateTime, JSON, TEXT
+from sqlalchemy import Column, Integer, String, DECIMAL, Boolean, Date, DateTime, JSON, TEXT, Index
 from sqlalchemy.ext.declarative import declarative_base
 
 from src.models import UserRequest, VerificationDetails, RecommendationItem, DailyRecommendation, RecommendationResponse
@@ -33,8 +33,17 @@ class TouristInfo(Base):
         start_date (Date): 축제/행사 시작일 (nullable)
         end_date (Date): 축제/행사 종료일 (nullable)
         operating_hours (String): 운영 시간 (nullable)
+        content_hash (String): 수집한 값들 해시 (주간 갱신때 바뀌었는지 비교용, nullable)
     """
     __tablename__ = 'tourist_info'
+    __table_args__ = (
+        # content_id 중복 막는거 (주간 갱신때 upsert 기준 키)
+        Index('uq_tourist_info_content_id', 'content_id', unique=True),
+        # 지역 + 관심사(category_tag 접두어) 조회용
+        Index('ix_tourist_info_region_category', 'region', 'category_tag'),
+        # 지역 + 축제/행사 기간 조회용
+        Index('ix_tourist_info_region_dates', 'region', 'start_date', 'end_date'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     content_id = Column(String(50), nullable=False)
@@ -51,6 +60,7 @@ class TouristInfo(Base):
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
     operating_hours = Column(String(255), nullable=True)
+    content_hash = Column(String(64), nullable=True)
 
     def to_dict(self):
         """ORM 객체를 딕셔너리로 바꾸는거."""
@@ -84,6 +94,8 @@ class AiLog(Base):
         total_tokens (int): 요청에 사용된 총 토큰 수
         agent_search_log (TEXT): LangChain Agent의 웹 검색 기록 및 결과
         is_verified_success (bool): Agent 검증 성공 여부
+        cache_status (str): 응답 캐시 상태 (hit, miss, coalesced) (nullable)
+        usage_json (JSON): 단계별 토큰/LLM 호출/웹 검색/시간 사용량 (nullable, 캐시 응답은 없음)
     """
     __tablename__ = 'ai_log'
 
@@ -94,3 +106,89 @@ class AiLog(Base):
     total_tokens = Column(Integer, nullable=True)
     agent_search_log = Column(TEXT, nullable=True)
     is_verified_success = Column(Boolean, nullable=False)
+    cache_status = Column(String(20), nullable=True)
+    usage_json = Column(JSON(none_as_null=True), nullable=True)
+
+class VerificationCache(Base):
+    """
+    verification_cache 테이블이랑 매핑되는 SQLAlchemy ORM 모델임.
+    Agent 실시간 검증 결과를 장소+날짜+운영시간 단위로 저장해두고 여러 요청이 같이 쓰는거.
+
+    Attributes:
+        cache_key (str): 정규화된 이름/시작일/종료일/운영시간으로 만든 해시 키
+        content_id (str): 미리 검증한 tourist_info 행의 content_id (요청 중에 검증한 결과면 nullable)
+        item_name (str): 검증한 장소 이름
+        content_type (str): 콘텐츠 종류 (TTL 정할때 씀, nullable)
+        start_date (Date): 축제/행사 시작일 (nullable)
+        end_date (Date): 축제/행사 종료일 (nullable)
+        operating_hours (String): 운영 시간 (nullable)
+        details_json (JSON): VerificationDetails 직렬화한 값
+        verified_at (DateTime): 검증한 시각
+        expires_at (DateTime): 이 시각 지나면 오래된 결과로 보고 백그라운드로 다시 검증함
+    """
+    __tablename__ = 'verification_cache'
+
+    cache_key = Column(String(64), primary_key=True)
+    content_id = Column(String(50), nullable=True, index=True)
+    item_name = Column(String(255), nullable=False)
+    content_type = Column(String(50), nullable=True)
+    start_date = Column(Date, nullable=True)
+    end_date = Column(Date, nullable=True)
+    operating_hours = Column(String(255), nullable=True)
+    details_json = Column(JSON, nullable=False)
+    verified_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+class SearchCache(Base):
+    """
+    search_cache 테이블이랑 매핑되는 SQLAlchemy ORM 모델임.
+    웹 검색(DuckDuckGo) 결과를 정규화된 검색어 단위로 저장해두고 재시작 후에도 같이 쓰는거.
+
+    Attributes:
+        query_key (str): 정규화된 검색어로 만든 해시 키
+        query (str): 처음 검색한 원래 검색어
+        result (TEXT): 검색 결과 문자열
+        created_at (DateTime): 검색한 시각
+        expires_at (DateTime): 이 시각 지나면 다시 검색함
+    """
+    __tablename__ = 'search_cache'
+
+    query_key = Column(String(64), primary_key=True)
+    query = Column(String(500), nullable=False)
+    result = Column(TEXT, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class RecommendationJob(Base):
+    """
+    recommendation_job 테이블이랑 매핑되는 SQLAlchemy ORM 모델임.
+    백그라운드로 돌리는 /recommend 작업 상태랑 중간/최종 결과 저장하는거.
+
+    Attributes:
+        job_id (str): 작업 ID (uuid4 hex)
+        status (str): 작업 상태 (queued, running, succeeded, failed)
+        user_input_json (JSON): 사용자 입력 정보
+        result_json (JSON): RecommendationResponse 직렬화한 값. 도는 중이면 지금까지 나온 부분 결과 (nullable)
+        verified_items (int): 검증 끝난 항목 수
+        total_items (int): 검증해야 하는 전체 항목 수
+        error (TEXT): 실패 사유 (nullable)
+        created_at (DateTime): 작업 만든 시각
+        started_at (DateTime): 워커가 작업 시작한 시각 (nullable)
+        finished_at (DateTime): 작업 끝난 시각 (nullable)
+    """
+    __tablename__ = 'recommendation_job'
+    __table_args__ = (
+        # 앱 재시작할때 안 끝난 작업 다시 찾는 용도
+        Index('ix_recommendation_job_status', 'status'),
+    )
+
+    job_id = Column(String(32), primary_key=True)
+    status = Column(String(20), nullable=False)
+    user_input_json = Column(JSON, nullable=False)
+    result_json = Column(JSON, nullable=True)
+    verified_items = Column(Integer, nullable=False, default=0)
+    total_items = Column(Integer, nullable=False, default=0)
+    error = Column(TEXT, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
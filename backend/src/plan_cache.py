@@ -0,0 +1,197 @@
+"""
+/recommend 전체 응답 캐시하는 파일임.
+사용자 요청을 정규화(관심사 정렬, 나이 10살 단위로 묶기, 날짜 통일)해서 키로 쓰고,
+같은 키로 동시에 들어온 요청은 Agent 한번만 돌려서 결과 같이 씀 (single-flight).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from src.cache import TTLCache, normalize_text
+from src.change_events import TouristInfoChange
+from src.models import UserRequest, RecommendationResponse
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+PLAN_CACHE_TTL_SECONDS = float(os.getenv("PLAN_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+PLAN_CACHE_MAX_SIZE = int(os.getenv("PLAN_CACHE_MAX_SIZE", "512"))
+# 검증 실패/생략/시간 초과된 응답 유지 시간(초). 0이면 저장 안함
+PLAN_CACHE_DEGRADED_TTL_SECONDS = float(os.getenv("PLAN_CACHE_DEGRADED_TTL_SECONDS", "60"))
+
+# (정규화된 지역, 요청 해시)
+PlanKey = Tuple[str, str]
+
+
+def age_bucket(age: int) -> str:
+    """나이를 10살 단위 구간으로 바꾸는거 (예: 27 -> "20s")."""
+    return f"{max(age, 0) // 10 * 10}s"
+
+
+def canonicalize_request(user_request: UserRequest) -> dict:
+    """캐시 키 만들려고 사용자 요청 정규화하는거."""
+    return {
+        "region": normalize_text(user_request.region),
+        "start_date": user_request.start_date.isoformat(),
+        "end_date": user_request.end_date.isoformat(),
+        "age": age_bucket(user_request.age),
+        "gender": normalize_text(user_request.gender),
+        "interests": sorted({normalize_text(interest) for interest in user_request.interests if interest.strip()}),
+    }
+
+
+def make_plan_key(user_request: UserRequest) -> str:
+    """정규화된 요청으로 캐시 키(sha256) 만드는거."""
+    canonical = json.dumps(canonicalize_request(user_request), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _cache_key(user_request: UserRequest) -> PlanKey:
+    # 지역 바뀐 행 있을때 그 지역 응답만 지우려고 키 앞에 정규화된 지역 붙여둠
+    return normalize_text(user_request.region), make_plan_key(user_request)
+
+
+class PlanCache:
+    """
+    직렬화된 RecommendationResponse 저장하는 캐시임.
+
+    - 추천 결과 없는 응답(에러 응답)은 캐시 안함.
+    - 검증 실패/생략된 응답은 `degraded_ttl` 동안만 캐시함 (같은 요청 몰릴때 한번만 계산하는 정도).
+    - 같은 키 요청이 동시에 여러개 오면 첫 요청만 계산하고 나머지는 그 결과 기다림.
+    - tourist_info 바뀌면 그 지역 응답만 지움 (`invalidate_regions`).
+
+    Args:
+        ttl (float): 캐시 유지 시간(초).
+        maxsize (int): 최대 항목 수.
+        degraded_ttl (float): 검증 실패/생략된 응답 유지 시간(초). 0이면 저장 안함.
+    """
+
+    def __init__(self, ttl: float = PLAN_CACHE_TTL_SECONDS, maxsize: int = PLAN_CACHE_MAX_SIZE,
+                 degraded_ttl: float = PLAN_CACHE_DEGRADED_TTL_SECONDS):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.degraded_ttl = degraded_ttl
+        self._inflight: Dict[PlanKey, asyncio.Task] = {}
+        self._pending_regions: Set[str] = set()
+        self._pending_lock = threading.Lock()
+
+    async def get_or_compute(
+        self,
+        user_request: UserRequest,
+        compute: Callable[[], Awaitable[RecommendationResponse]],
+    ) -> Tuple[RecommendationResponse, str]:
+        """
+        캐시에 있으면 꺼내주고, 없으면 `compute` 돌려서 저장하는거.
+
+        Returns:
+            Tuple[RecommendationResponse, str]: (응답, 캐시 상태 "hit" | "miss" | "coalesced")
+            응답은 호출마다 새 객체라서 받은 쪽에서 고쳐도 캐시엔 영향 없음.
+        """
+        key = _cache_key(user_request)
+
+        found = await self._lookup_key(key)
+        if found is not None:
+            return found
+
+        serialized = await asyncio.shield(self._start(key, compute))
+        return self._load(serialized, "miss"), "miss"
+
+    def start(self, user_request: UserRequest, compute: Callable[[], Awaitable[RecommendationResponse]]) -> "asyncio.Task[str]":
+        """
+        `compute`를 같은 요청 처리 중으로 등록하고 돌리는거. `lookup`이 None 돌려준 다음 바로 불러야 함.
+        스트리밍처럼 계산 도중 결과를 직접 내보내는 쪽에서 씀. 같은 요청은 `lookup`에서 이 결과 기다리고, 끝나면 캐시에 저장됨.
+
+        Returns:
+            직렬화된 응답 돌려주는 태스크.
+        """
+        return self._start(_cache_key(user_request), compute)
+
+    def _start(self, key: PlanKey, compute: Callable[[], Awaitable[RecommendationResponse]]) -> "asyncio.Task[str]":
+        # 계산은 따로 태스크로 돌려서 처음 요청한 쪽이 끊겨도 기다리는 요청들은 결과 받게 함
+        task = asyncio.create_task(self._compute_and_store(key, compute))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def lookup(self, user_request: UserRequest) -> Optional[Tuple[RecommendationResponse, str]]:
+        """
+        캐시에 있거나 같은 요청이 계산 중이면 그 결과 돌려주는거. 둘다 아니면 None.
+        직접 계산하는 쪽에서 씀 (None이면 `start`로 등록하거나 계산 끝나고 `store`로 저장).
+        """
+        return await self._lookup_key(_cache_key(user_request))
+
+    async def _lookup_key(self, key: PlanKey) -> Optional[Tuple[RecommendationResponse, str]]:
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.info("[PlanCache] 캐시 적중. Agent 호출 없이 응답합니다.")
+            return self._load(cached, "hit"), "hit"
+
+        task = self._inflight.get(key)
+        if task is not None:
+            logger.info("[PlanCache] 같은 요청이 처리 중이라 결과를 기다립니다.")
+            serialized = await asyncio.shield(task)
+            return self._load(serialized, "coalesced"), "coalesced"
+        return None
+
+    def store(self, user_request: UserRequest, response: RecommendationResponse) -> None:
+        """밖에서 계산한 응답 저장하는거. 추천 결과 없는 응답은 저장 안함."""
+        self._store(_cache_key(user_request), response, response.model_dump_json())
+
+    def _store(self, key: PlanKey, response: RecommendationResponse, serialized: str) -> None:
+        if not response.daily_recommendations:
+            return
+        skipped = response.usage.skipped_verifications if response.usage is not None else 0
+        if response.is_verified_success and not skipped:
+            self._cache.set(key, serialized)
+        elif self.degraded_ttl > 0:
+            # 검증 안 된 일정이 몇시간씩 나가지 않게 짧게만 들고 있음
+            self._cache.set(key, serialized, ttl=self.degraded_ttl)
+
+    async def _compute_and_store(self, key: PlanKey, compute: Callable[[], Awaitable[RecommendationResponse]]) -> str:
+        response = await compute()
+        serialized = response.model_dump_json()
+        self._store(key, response, serialized)
+        return serialized
+
+    @staticmethod
+    def _load(serialized: str, cache_status: str) -> RecommendationResponse:
+        response = RecommendationResponse.model_validate_json(serialized)
+        response.cache_status = cache_status
+        return response
+
+    def invalidate_regions(self, regions: Iterable[str]) -> int:
+        """해당 지역 응답들만 지우는거 (tourist_info 변경 이벤트 받을때 씀). 지운 개수 돌려줌."""
+        normalized = {normalize_text(region) for region in regions}
+        if not normalized:
+            return 0
+        removed = self._cache.pop_where(lambda key: key[0] in normalized)
+        if removed:
+            logger.info(f"[PlanCache] 관광 정보가 바뀐 지역({', '.join(sorted(normalized))}) 응답 {removed}건을 지웠습니다.")
+        return removed
+
+    def queue_changes(self, changes: Sequence[TouristInfoChange]) -> None:
+        """바뀐 행 있는 지역 모아두는거 (change_events 구독용)."""
+        with self._pending_lock:
+            for change in changes:
+                self._pending_regions.update(change.regions)
+
+    def apply_queued_changes(self) -> int:
+        """
+        모아둔 지역 응답 지우는거. 수집 끝났을때 불림.
+        카탈로그가 새 데이터로 바뀐 다음에 지워야 옛날 후보로 만든 응답이 다시 안 들어가서 구독 순서상 맨 뒤에 둠.
+        """
+        with self._pending_lock:
+            regions, self._pending_regions = self._pending_regions, set()
+        return self.invalidate_regions(regions)
+
+    def clear(self) -> None:
+        """캐시 전부 비우는거."""
+        self._cache.clear()
+
+
+# 프로세스 전체에서 같이 쓰는 캐시 인스턴스
+plan_cache = PlanCache()
@@ -0,0 +1,222 @@
+"""
+프롬프트 토큰 재는 도구 파일임.
+
+- 프롬프트별 토큰 수: 안 바뀌는 앞부분(프롬프트 캐시 대상) / 요청마다 바뀌는 뒷부분 나눠서 셈 (tiktoken)
+- 실제 캐시 적중: ai_log.usage_json에 저장된 단계별 입력 토큰 / 캐시에서 읽은 입력 토큰 모아서 보여줌
+
+OpenAI 프롬프트 캐시는 앞부분이 똑같은 요청끼리만 걸리고, 공통 앞부분이 1024토큰 넘어야 그 뒤로 128토큰 단위로 캐시함.
+tiktoken 인코딩 파일은 처음 쓸때 인터넷에서 받아서 (TIKTOKEN_CACHE_DIR에 저장), 못 받으면 글자 종류로 어림잡은 값 씀 (출력에 표시함).
+
+실행 방법 (backend 폴더에서):
+    python -m src.prompt_tokens prompts --region 서울 --interests 문화 음식
+    python -m src.prompt_tokens usage --limit 200
+"""
+
+import argparse
+import logging
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.llm import (
+    AGENT_MODEL_NAME, BATCH_VERIFICATION_PROMPT_PREFIX, INITIAL_RECOMMENDATION_PROMPT_PREFIX,
+    STRUCTURED_RECOMMENDATION_PROMPT_PREFIX, VERIFICATION_PROMPT_PREFIX, build_batch_verification_prompt,
+    build_grounded_prompt, build_initial_prompt, build_structured_prompt, build_verification_prompt,
+    grounded_prompt_prefix,
+)
+from src.models import RecommendationItem, UserRequest
+from src.openapi import AiLog
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_INCREMENT = 128
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+# 어림잡을때 쓰는 조각 (한글 덩어리 / 영문 단어 / 숫자 / 공백 / 기호 하나)
+_ESTIMATE_PIECES = re.compile(r"[가-힣]+|[A-Za-z]+|\d+|\s+|[^\sA-Za-z\d가-힣]")
+
+
+def get_encoding():
+    """모델에 맞는 tiktoken 인코딩 돌려주는거. 인코딩 파일 못 받으면 None (한번만 시도함)."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    try:
+                        _encoding = tiktoken.encoding_for_model(AGENT_MODEL_NAME)
+                    except KeyError:
+                        _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    logger.warning(f"[Tokens] tiktoken 인코딩을 못 불러와서 어림잡은 토큰 수를 씁니다: {e}")
+                _encoding_loaded = True
+    return _encoding
+
+
+def tokens_are_exact() -> bool:
+    return get_encoding() is not None
+
+
+def estimate_tokens(text: str) -> int:
+    """tiktoken 없을때 쓰는 어림값. 한글은 음절당 0.8, 영문은 4글자당 1, 숫자는 3자리당 1, 공백/기호는 1."""
+    total = 0
+    for piece in _ESTIMATE_PIECES.findall(text):
+        first = piece[0]
+        if "가" <= first <= "힣":
+            total += math.ceil(len(piece) * 0.8)
+        elif first.isascii() and first.isalpha():
+            total += math.ceil(len(piece) / 4)
+        elif first.isdigit():
+            total += math.ceil(len(piece) / 3)
+        else:
+            total += 1
+    return total
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def common_prefix_tokens(first: str, second: str) -> int:
+    """두 프롬프트 공통 앞부분 토큰 수."""
+    return count_tokens(os.path.commonprefix([first, second]))
+
+
+def cacheable_tokens(prefix_tokens: int) -> int:
+    """공통 앞부분 토큰 수로 OpenAI 프롬프트 캐시가 실제로 캐시해주는 토큰 수 (1024부터 128 단위)."""
+    if prefix_tokens < PROMPT_CACHE_MIN_TOKENS:
+        return 0
+    return prefix_tokens - (prefix_tokens - PROMPT_CACHE_MIN_TOKENS) % PROMPT_CACHE_INCREMENT
+
+
+@dataclass
+class PromptStats:
+    """프롬프트 하나 토큰 수 (앞부분 = 요청마다 안 바뀌는 부분)."""
+    stage: str
+    prefix_tokens: int
+    total_tokens: int
+
+    @property
+    def suffix_tokens(self) -> int:
+        return self.total_tokens - self.prefix_tokens
+
+
+def measure_prompts(user_request: UserRequest, candidates: List[dict], items: List[RecommendationItem],
+                    search_results: str) -> List[PromptStats]:
+    """단계별 프롬프트 만들어서 앞부분/전체 토큰 수 재는거."""
+    prompts = [
+        ("initial:agent", INITIAL_RECOMMENDATION_PROMPT_PREFIX, build_initial_prompt(user_request)),
+        ("initial:structured", STRUCTURED_RECOMMENDATION_PROMPT_PREFIX, build_structured_prompt(user_request, search_results)),
+        ("initial:grounded", grounded_prompt_prefix(), build_grounded_prompt(user_request, candidates)),
+    ]
+    if items:
+        item = items[0]
+        prompts += [
+            ("verify", VERIFICATION_PROMPT_PREFIX,
+             build_verification_prompt(item.name, item.start_date, item.end_date, item.operating_hours)),
+            ("verify_batch", BATCH_VERIFICATION_PROMPT_PREFIX, build_batch_verification_prompt(items, search_results)),
+        ]
+    return [PromptStats(stage, count_tokens(prefix), count_tokens(prompt)) for stage, prefix, prompt in prompts]
+
+
+def stage_group(stage_name: str) -> str:
+    """단계 이름에서 장소 이름 뺀 종류 ("verify:경복궁" -> "verify")."""
+    return stage_name if stage_name.startswith("initial:") else stage_name.split(":", 1)[0]
+
+
+def summarize_usage(usages: Iterable[dict]) -> Dict[str, Dict[str, int]]:
+    """RecommendationUsage dict 목록을 단계 종류별 LLM 호출 수 / 입력 토큰 / 캐시 토큰으로 합치는거."""
+    summary: Dict[str, Dict[str, int]] = {}
+    for usage in usages:
+        for stage in usage.get("stages") or []:
+            totals = summary.setdefault(stage_group(stage["name"]), {"llm_calls": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0})
+            totals["llm_calls"] += stage.get("llm_calls", 0)
+            totals["prompt_tokens"] += stage.get("prompt_tokens", 0)
+            totals["cached_prompt_tokens"] += stage.get("cached_prompt_tokens", 0)
+    return summary
+
+
+def load_recent_usage(db: Session, limit: int = 200) -> List[dict]:
+    """ai_log에 저장된 최근 요청들 사용량 (캐시 응답은 사용량 없어서 빠짐)."""
+    stmt = select(AiLog.usage_json).where(AiLog.usage_json.is_not(None)).order_by(AiLog.log_id.desc()).limit(limit)
+    return [usage for usage in db.execute(stmt).scalars() if usage]
+
+
+def _sample_items(candidates: List[dict], count: int) -> List[RecommendationItem]:
+    variable = [candidate for candidate in candidates if candidate["is_variable"]] or candidates
+    return [
+        RecommendationItem(name=candidate["name_ko"], description="", address=candidate["address"], image_url=None, activity="",
+                           start_date=candidate.get("start_date"), end_date=candidate.get("end_date"),
+                           operating_hours=candidate.get("operating_hours"))
+        for candidate in variable[:count]
+    ]
+
+
+def _print_prompts(args) -> None:
+    from src.db import SessionLocal, find_candidates_for_request
+    from src.llm import STRUCTURED_PLAN_MAX_SEARCHES, STRUCTURED_SEARCH_RESULT_CHARS, VERIFICATION_BATCH_SIZE
+
+    start = date.today() + timedelta(days=7)
+    user_request = UserRequest(region=args.region, start_date=start, end_date=start + timedelta(days=args.days - 1),
+                               age=30, gender="여성", interests=args.interests)
+    db = SessionLocal()
+    try:
+        candidates = find_candidates_for_request(db, user_request)
+    finally:
+        db.close()
+    # 검색 결과는 실제 길이 상한만큼 채운 더미 텍스트 (검색마다 달라서 앞부분 캐시엔 영향 없음)
+    search_results = "\n\n".join(f"검색어: 더미 {i}\n" + "가" * STRUCTURED_SEARCH_RESULT_CHARS for i in range(STRUCTURED_PLAN_MAX_SEARCHES))
+    stats = measure_prompts(user_request, candidates, _sample_items(candidates, VERIFICATION_BATCH_SIZE), search_results)
+    print(f"후보 {len(candidates)}건, 토큰 {'tiktoken' if tokens_are_exact() else '어림값'}")
+    print(f"{'단계':<20} {'전체':>7} {'앞부분':>7} {'뒷부분':>7}")
+    for stat in stats:
+        print(f"{stat.stage:<20} {stat.total_tokens:>7} {stat.prefix_tokens:>7} {stat.suffix_tokens:>7}")
+
+
+def _print_usage(args) -> None:
+    from src.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        usages = load_recent_usage(db, args.limit)
+    finally:
+        db.close()
+    print(f"최근 요청 {len(usages)}건")
+    print(f"{'단계':<20} {'LLM 호출':>8} {'입력 토큰':>10} {'캐시 토큰':>10} {'캐시율':>7}")
+    for stage, totals in sorted(summarize_usage(usages).items()):
+        ratio = totals["cached_prompt_tokens"] / totals["prompt_tokens"] if totals["prompt_tokens"] else 0.0
+        print(f"{stage:<20} {totals['llm_calls']:>8} {totals['prompt_tokens']:>10} {totals['cached_prompt_tokens']:>10} {ratio:>7.1%}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="프롬프트 토큰 수 / 프롬프트 캐시 적중 보기")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    prompts_parser = subparsers.add_parser("prompts", help="단계별 프롬프트 토큰 수 (앞부분/뒷부분)")
+    prompts_parser.add_argument("--region", default="서울")
+    prompts_parser.add_argument("--interests", nargs="+", default=["문화", "음식"])
+    prompts_parser.add_argument("--days", type=int, default=3)
+    usage_parser = subparsers.add_parser("usage", help="ai_log에 저장된 단계별 입력 토큰 / 캐시 토큰")
+    usage_parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == "prompts":
+        _print_prompts(args)
+    else:
+        _print_usage(args)
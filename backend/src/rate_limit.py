@@ -0,0 +1,145 @@
+"""
+외부 API(OpenAI, DuckDuckGo, 카카오)별 호출 속도 제한하는 토큰 버킷 모아둔 파일임.
+동시 사용자 많아지면 검증 Agent들이 검색이랑 LLM 호출을 한꺼번에 쏴서 레이트 리밋/검색 차단 걸리길래,
+프로세스 전체에서 upstream마다 버킷 하나씩 같이 씀.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    초당 `rate`개씩 채워지고 최대 `capacity`개까지 쌓이는 토큰 버킷임.
+
+    토큰 모자라면 미리 예약(잔량을 음수로)해두고 그만큼 기다리는 방식이라 먼저 온 순서대로 통과함.
+    기다리다 취소되면 예약한 토큰 돌려놓음.
+
+    Args:
+        rate (float): 초당 채워지는 토큰 수. 0 이하면 제한 안함.
+        capacity (float): 한번에 몰아 쓸 수 있는 최대 토큰 수 (버스트).
+        timer (Callable[[], float]): 현재 시각 돌려주는 함수 (테스트할때 바꿔끼우는 용도).
+    """
+
+    def __init__(self, rate: float, capacity: float, timer: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._timer = timer
+        self._tokens = self.capacity
+        self._updated_at = timer()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _reserve(self, tokens: float) -> float:
+        """토큰 예약하고 얼마나 기다려야 하는지(초) 돌려주는거."""
+        with self._lock:
+            self._refill(self._timer())
+            self._tokens -= tokens
+            self.acquired += 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def _refund(self, tokens: float) -> None:
+        with self._lock:
+            self._tokens += tokens
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        토큰 받을때까지 기다리는거.
+
+        Returns:
+            float: 실제로 기다린 시간(초).
+        """
+        if self.rate <= 0:
+            return 0.0
+        wait = self._reserve(tokens)
+        if wait <= 0:
+            return 0.0
+        self.throttled += 1
+        self.total_wait_seconds += wait
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self._refund(tokens)
+            raise
+        return wait
+
+    def stats(self) -> Dict[str, float]:
+        """지금까지 통과/대기 횟수랑 남은 토큰 수."""
+        with self._lock:
+            self._refill(self._timer())
+            available = self._tokens
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "available": round(available, 3),
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+        }
+
+
+def _bucket_from_env(prefix: str, default_rate: float, default_burst: float) -> TokenBucket:
+    rate = float(os.getenv(f"{prefix}_RATE_PER_SECOND", str(default_rate)))
+    burst = float(os.getenv(f"{prefix}_BURST", str(default_burst)))
+    return TokenBucket(rate=rate, capacity=burst)
+
+
+# upstream별 버킷. 환경 변수로 조절함 (RATE_PER_SECOND=0이면 제한 안함).
+rate_limiters: Dict[str, TokenBucket] = {
+    "openai": _bucket_from_env("OPENAI", default_rate=5.0, default_burst=10.0),
+    "duckduckgo": _bucket_from_env("DUCKDUCKGO", default_rate=1.0, default_burst=3.0),
+    "kakao": _bucket_from_env("KAKAO", default_rate=20.0, default_burst=20.0),
+}
+
+
+# 도구 metadata에 이 키가 True면 도구가 알아서 버킷 기다린다는 뜻이라 콜백에서는 건너뜀 (캐시 적중은 안 기다리게)
+SELF_RATE_LIMITED = "self_rate_limited"
+
+
+def get_rate_limiter(name: str) -> TokenBucket:
+    """upstream 이름("openai", "duckduckgo", "kakao")으로 버킷 꺼내는거."""
+    return rate_limiters[name]
+
+
+class RateLimitCallbackHandler(AsyncCallbackHandler):
+    """
+    LangChain 콜백으로 LLM 호출 직전엔 openai 버킷, 도구(웹 검색) 호출 직전엔 duckduckgo 버킷 기다리게 하는거.
+    Agent 안에서 몇번 호출하든 호출마다 토큰 하나씩 씀.
+    """
+
+    def __init__(self, llm_bucket: Optional[TokenBucket] = None, tool_bucket: Optional[TokenBucket] = None):
+        self.llm_bucket = llm_bucket or get_rate_limiter("openai")
+        self.tool_bucket = tool_bucket or get_rate_limiter("duckduckgo")
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs: Any) -> None:
+        await self.llm_bucket.acquire()
+
+    async def on_llm_start(self, serialized: Dict[str, Any], prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        await self.llm_bucket.acquire()
+
+    async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        if (kwargs.get("metadata") or {}).get(SELF_RATE_LIMITED):
+            return
+        await self.tool_bucket.acquire()
+
+
+# 프로세스 전체에서 같이 쓰는 콜백 (상태 없어서 하나만 있으면 됨)
+rate_limit_callback = RateLimitCallbackHandler()
@@ -1,3 +1,5 @@
+-- 참고용 MySQL DDL임. 실제 스키마는 src/migrations.py 마이그레이션으로 관리함 (python -m src.migrations).
+
 CREATE TABLE tourist_info (
     id INT AUTO_INCREMENT PRIMARY KEY COMMENT '고유 식별 번호 (DB 자체 관리용)',
     content_id VARCHAR(50) NOT NULL COMMENT 'Tour API의 고유 콘텐츠 ID',
@@ -13,7 +15,11 @@ CREATE TABLE tourist_info (
     last_crawled_date DATE NOT NULL COMMENT 'APScheduler를 통한 최종 업데이트 일자',
     start_date DATE NULL COMMENT '축제/행사 시작일',
     end_date DATE NULL COMMENT '축제/행사 종료일',
-    operating_hours VARCHAR(255) NULL COMMENT '운영 시간 (예: 09:00-18:00, 24시간, 매일, 주말 휴무)'
+    operating_hours VARCHAR(255) NULL COMMENT '운영 시간 (예: 09:00-18:00, 24시간, 매일, 주말 휴무)',
+    content_hash VARCHAR(64) NULL COMMENT '수집한 값들 sha256 (주간 갱신때 바뀐 행만 쓰려고 비교하는 용도)',
+    UNIQUE INDEX uq_tourist_info_content_id (content_id),
+    INDEX ix_tourist_info_region_category (region, category_tag),
+    INDEX ix_tourist_info_region_dates (region, start_date, end_date)
 );
 
 -- 2. ai_log: GPT-5 mini 요청 및 검증 로그 테이블
@@ -24,5 +30,47 @@ CREATE TABLE ai_log (
     ai_response_json JSON NOT NULL COMMENT 'GPT-5 mini가 반환한 최종 추천 결과',
     total_tokens INT NULL COMMENT '해당 요청에 사용된 총 토큰 수 (비용 모니터링용)',
     agent_search_log TEXT NULL COMMENT 'LangChain Agent의 웹 검색 기록 및 결과',
-    is_verified_success BOOLEAN NOT NULL COMMENT 'Agent 검증 성공 여부 (모든 변동 항목이 정상 운영/유효함)'
-);
\ No newline at end of file
+    is_verified_success BOOLEAN NOT NULL COMMENT 'Agent 검증 성공 여부 (모든 변동 항목이 정상 운영/유효함)',
+    cache_status VARCHAR(20) NULL COMMENT '응답 캐시 상태 (hit, miss, coalesced)',
+    usage_json JSON NULL COMMENT '단계별 토큰/LLM 호출/웹 검색/시간 사용량 (캐시 응답은 NULL)'
+);
+
+-- 3. verification_cache: Agent 검증 결과 캐시 테이블
+CREATE TABLE verification_cache (
+    cache_key VARCHAR(64) PRIMARY KEY COMMENT '정규화된 이름/시작일/종료일/운영시간 해시',
+    content_id VARCHAR(50) NULL COMMENT '미리 검증한 tourist_info 행의 content_id (요청 중 검증이면 NULL)',
+    item_name VARCHAR(255) NOT NULL COMMENT '검증한 장소 이름',
+    content_type VARCHAR(50) NULL COMMENT '콘텐츠 종류 (TTL 결정용)',
+    start_date DATE NULL COMMENT '축제/행사 시작일',
+    end_date DATE NULL COMMENT '축제/행사 종료일',
+    operating_hours VARCHAR(255) NULL COMMENT '운영 시간',
+    details_json JSON NOT NULL COMMENT 'VerificationDetails 직렬화 값',
+    verified_at DATETIME NOT NULL COMMENT '검증 시각',
+    expires_at DATETIME NOT NULL COMMENT '이 시각 이후엔 백그라운드 재검증 대상',
+    INDEX ix_verification_cache_content_id (content_id)
+);
+
+-- 4. recommendation_job: 백그라운드 추천 작업 테이블
+CREATE TABLE recommendation_job (
+    job_id VARCHAR(32) PRIMARY KEY COMMENT '작업 ID (uuid4 hex)',
+    status VARCHAR(20) NOT NULL COMMENT '작업 상태 (queued, running, succeeded, failed)',
+    user_input_json JSON NOT NULL COMMENT '사용자 입력 정보',
+    result_json JSON NULL COMMENT '부분/최종 RecommendationResponse',
+    verified_items INT NOT NULL DEFAULT 0 COMMENT '검증 끝난 항목 수',
+    total_items INT NOT NULL DEFAULT 0 COMMENT '검증 대상 전체 항목 수',
+    error TEXT NULL COMMENT '실패 사유',
+    created_at DATETIME NOT NULL COMMENT '작업 생성 시각',
+    started_at DATETIME NULL COMMENT '작업 시작 시각',
+    finished_at DATETIME NULL COMMENT '작업 종료 시각',
+    INDEX ix_recommendation_job_status (status)
+);
+
+-- 5. search_cache: 웹 검색 결과 캐시 테이블
+CREATE TABLE search_cache (
+    query_key VARCHAR(64) PRIMARY KEY COMMENT '정규화된 검색어 해시',
+    query VARCHAR(500) NOT NULL COMMENT '원래 검색어',
+    result TEXT NOT NULL COMMENT '검색 결과 문자열',
+    created_at DATETIME NOT NULL COMMENT '검색 시각',
+    expires_at DATETIME NOT NULL COMMENT '이 시각 이후엔 다시 검색',
+    INDEX ix_search_cache_expires_at (expires_at)
+);
@@ -0,0 +1,237 @@
+"""
+웹 검색(DuckDuckGo) 결과 캐시하는 파일임.
+초기 일정 Agent랑 검증 Agent들이 같거나 거의 같은 검색어("전주 한옥마을 운영시간")를 항목/사용자마다 계속 보내서,
+검색어 정규화한 키로 인메모리 LRU -> DB(search_cache 테이블) 순서로 찾아보고 없을때만 실제로 검색함.
+
+- 정규화: 전각/반각, 대소문자, 공백, 문장부호 무시 ("전주 한옥마을 운영시간?" == "전주한옥마을 운영 시간")
+- 같은 검색어가 동시에 여러개 오면 실제 검색은 한번만 하고 결과 같이 씀 (in-flight dedup)
+- 레이트 리밋(duckduckgo 버킷)은 실제로 검색할때만 기다림. 캐시 적중은 안 기다림.
+- 결과 없음 응답은 짧게만 캐시함
+- `stats()`로 적중률 확인 가능 (/metrics에도 나감)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+from sqlalchemy.exc import IntegrityError
+
+from src.cache import TTLCache, normalize_text
+from src.db import SessionLocal
+from src.openapi import SearchCache
+from src.rate_limit import SELF_RATE_LIMITED, TokenBucket, get_rate_limiter
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "1") != "0"
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+# 결과 없음 응답은 검색 엔진 쪽 일시적인 문제일 수도 있어서 짧게만 캐시함
+SEARCH_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_NEGATIVE_TTL_SECONDS", "1800"))
+SEARCH_CACHE_MAX_SIZE = int(os.getenv("SEARCH_CACHE_MAX_SIZE", "4096"))
+
+# DuckDuckGoSearchRun이 결과 없을때 돌려주는 문구
+_NO_RESULT_MARKER = "No good DuckDuckGo Search Result was found"
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+Searcher = Callable[[], Awaitable[str]]
+
+
+def normalize_query(query: str) -> str:
+    """검색어 정규화하는거. 문장부호 빼고 normalize_text (NFKC, 대소문자, 공백 제거) 적용함."""
+    # 전각 문장부호("？", "，")도 지우려고 NFKC 먼저 적용함
+    return normalize_text(_PUNCTUATION.sub(" ", unicodedata.normalize("NFKC", query or "")))
+
+
+def make_query_key(query: str) -> str:
+    """정규화된 검색어로 캐시 키(sha256) 만드는거."""
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+def is_empty_result(result: str) -> bool:
+    """검색 결과가 비었는지 확인하는거."""
+    return not result.strip() or _NO_RESULT_MARKER in result
+
+
+class SearchResultCache:
+    """
+    웹 검색 결과 2단 캐시임 (인메모리 LRU -> DB).
+
+    Args:
+        session_factory: DB 세션 만드는 함수. 기본은 db.py의 SessionLocal.
+        ttl (float): 검색 결과 유지 시간(초).
+        negative_ttl (float): 결과 없음 응답 유지 시간(초).
+        maxsize (int): 인메모리 LRU 최대 항목 수.
+    """
+
+    def __init__(self, session_factory=SessionLocal, ttl: float = SEARCH_CACHE_TTL_SECONDS,
+                 negative_ttl: float = SEARCH_CACHE_NEGATIVE_TTL_SECONDS, maxsize: int = SEARCH_CACHE_MAX_SIZE):
+        self._session_factory = session_factory
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lru = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # 지표
+        self.requests = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.deduplicated = 0
+        self.searches = 0
+        self.errors = 0
+
+    # --- DB 접근 (동기 세션이라 스레드에서 돌림) ---
+
+    def _load_from_db(self, key: str) -> Optional[Tuple[str, datetime]]:
+        db = self._session_factory()
+        try:
+            row = db.get(SearchCache, key)
+            if row is None:
+                return None
+            return row.result, row.expires_at
+        finally:
+            db.close()
+
+    def _save_to_db(self, key: str, query: str, result: str, expires_at: datetime) -> None:
+        row = dict(query_key=key, query=query[:500], result=result, created_at=datetime.now(), expires_at=expires_at)
+        db = self._session_factory()
+        try:
+            try:
+                db.merge(SearchCache(**row))
+                db.commit()
+            except IntegrityError:
+                # 다른 프로세스가 같은 키를 방금 넣었으면 한번 더 하면 UPDATE로 감
+                db.rollback()
+                db.merge(SearchCache(**row))
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def purge_expired(self) -> int:
+        """만료된 행 DB에서 지우는거. 지운 행 수 돌려줌."""
+        db = self._session_factory()
+        try:
+            deleted = db.query(SearchCache).filter(SearchCache.expires_at < datetime.now()).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # --- 캐시 조회/검색 ---
+
+    async def get_or_search(self, query: str, search: Searcher) -> str:
+        """
+        캐시에 있으면 바로 돌려주고, 없으면 `search` 불러서 검색한 다음 저장하는거.
+        같은 검색어가 이미 검색 중이면 새로 안 부르고 그 결과 기다림.
+        검색 실패(예외)는 캐시 안 하고 그대로 던짐.
+        """
+        self.requests += 1
+        key = make_query_key(query)
+        cached = self._lru.get(key)
+        if cached is not None:
+            self.memory_hits += 1
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.deduplicated += 1
+            return await asyncio.shield(task)
+
+        # 검색은 따로 태스크로 돌려서 처음 요청한 쪽이 끊겨도 기다리는 쪽은 결과 받게 함
+        task = asyncio.create_task(self._load_or_search(key, query, search))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load_or_search(self, key: str, query: str, search: Searcher) -> str:
+        now = datetime.now()
+        try:
+            stored = await asyncio.to_thread(self._load_from_db, key)
+        except Exception as e:
+            logger.error(f"[SearchCache] DB 조회 중 오류 발생: {e}")
+            stored = None
+        if stored is not None and stored[1] > now:
+            result, expires_at = stored
+            self.db_hits += 1
+            self._lru.set(key, result, ttl=(expires_at - now).total_seconds())
+            return result
+
+        self.searches += 1
+        try:
+            result = await search()
+        except Exception:
+            self.errors += 1
+            raise
+        result = str(result)
+        ttl = self.negative_ttl if is_empty_result(result) else self.ttl
+        self._lru.set(key, result, ttl=ttl)
+        try:
+            await asyncio.to_thread(self._save_to_db, key, query, result, now + timedelta(seconds=ttl))
+        except Exception as e:
+            logger.error(f"[SearchCache] DB 저장 중 오류 발생: {e}")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """요청 수, 메모리/DB 적중 수, 실제 검색 수, 적중률 돌려주는거."""
+        hits = self.memory_hits + self.db_hits + self.deduplicated
+        return {
+            "requests": self.requests,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "deduplicated": self.deduplicated,
+            "searches": self.searches,
+            "errors": self.errors,
+            "hit_ratio": round(hits / self.requests, 3) if self.requests else 0.0,
+            "memory_size": len(self._lru),
+        }
+
+
+class CachedSearchTool(BaseTool):
+    """
+    검색 도구 감싸서 SearchResultCache 거치게 하는 LangChain 도구임.
+    이름/설명/입력 스키마는 감싼 도구 그대로 써서 Agent 프롬프트는 안 바뀜.
+    레이트 리밋은 실제로 검색할때만 여기서 기다리고, rate_limit_callback은 metadata 보고 건너뜀.
+    """
+
+    inner: BaseTool
+    cache: Any
+    bucket: Any
+
+    def __init__(self, inner: BaseTool, cache: Optional[SearchResultCache] = None, bucket: Optional[TokenBucket] = None, **kwargs: Any):
+        super().__init__(
+            name=inner.name,
+            description=inner.description,
+            args_schema=inner.args_schema,
+            inner=inner,
+            cache=cache or search_cache,
+            bucket=bucket or get_rate_limiter("duckduckgo"),
+            metadata={SELF_RATE_LIMITED: True},
+            **kwargs,
+        )
+
+    async def _arun(self, query: str, **kwargs: Any) -> str:
+        async def _search() -> str:
+            await self.bucket.acquire()
+            # 안쪽 도구는 콜백 안 물려줌. 물려주면 자식 실행으로 on_tool_start가 한번 더 불려서 버킷/사용량이 두번 잡힘
+            return await self.inner.ainvoke(query, config={"callbacks": []})
+
+        return await self.cache.get_or_search(query, _search)
+
+    def _run(self, query: str, **kwargs: Any) -> str:
+        # 앱은 전부 비동기로 불러서 동기 경로는 캐시/레이트 리밋 없이 그대로 넘김
+        return self.inner.invoke(query, config={"callbacks": []})
+
+
+# 프로세스 전체에서 같이 쓰는 캐시 인스턴스
+search_cache = SearchResultCache()
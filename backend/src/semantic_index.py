@@ -0,0 +1,398 @@
+"""
+관심사(자유 입력) -> tourist_info.category_tag 매칭하는 임베딩 인덱스 파일임.
+UserRequest.interests는 "바다", "맛집", "야경" 같은 아무 말이고 category_tag는 "자연_해변", "음식_한식" 같은 태그라서,
+`db.INTEREST_CATEGORY_PREFIXES`에 없는 관심사는 지금까지 DB 후보를 못 찾고 Agent(웹 검색 + 긴 프롬프트)로 넘어갔음.
+미리 만들어둔 임베딩 인덱스로 그런 관심사를 로컬에서 몇 ms 안에 category_tag로 바꿔서 DB 후보 기반 일정 생성(LLM 한번)으로 가게 하는거.
+
+- 임베딩: 글자 n-gram 해싱 임베딩 (`HashingEmbedder`). CPU만 쓰고 모델 파일 필요 없음.
+  같은 뜻 단어 묶음(`SYNONYM_GROUPS`)은 대표 단어 하나로 같이 넣어서 "바다" <-> "해수욕장"처럼 글자 안 겹쳐도 걸리게 함.
+- 인덱스: category_tag 하나당 벡터 하나 + 장소(이름 + 태그) 하나당 벡터 하나. 장소는 지역별로 붙여서 저장해서
+  지역 하나 조회할땐 그 구간만 읽음.
+- 저장: `python -m src.semantic_index build`로 디렉토리에 .npy(float32 행렬) + meta.json 써두고,
+  앱은 `np.load(mmap_mode="r")`로 메모리 매핑해서 씀 (시작할때 안 읽고 조회한 구간만 페이지 캐시로 올라감).
+- 조회: 관심사 여러개를 한번에 임베딩해서 행렬곱 한번으로 코사인 유사도 top-k 구함.
+
+인덱스는 오프라인으로 만든거라 주간 수집 후 새로 생긴 장소는 다시 만들기 전까지 안 들어감.
+관심사 -> 태그 매칭에만 쓰고 실제 후보는 DB/카탈로그에서 가져오니까 결과가 틀리진 않고 매칭만 덜 됨.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from src.openapi import TouristInfo
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+# 인덱스 디렉토리. 비워두면 안 씀 (관심사는 INTEREST_CATEGORY_PREFIXES만 보고 매칭함)
+SEMANTIC_INDEX_DIR = os.getenv("SEMANTIC_INDEX_DIR", "")
+# 이 점수(코사인 유사도) 밑이면 매칭 안 된걸로 봄
+SEMANTIC_MIN_SCORE = float(os.getenv("SEMANTIC_MIN_SCORE", "0.35"))
+# 관심사 하나당 가져오는 태그 수 / 태그 모을때 보는 장소 수
+SEMANTIC_TOP_K = int(os.getenv("SEMANTIC_TOP_K", "3"))
+SEMANTIC_PLACE_TOP_K = int(os.getenv("SEMANTIC_PLACE_TOP_K", "20"))
+
+INDEX_VERSION = 1
+_EMBED_BATCH = 4096
+
+# 같은 뜻으로 보는 단어 묶음. 맨 앞 단어가 대표 단어임 (category_tag에 실제로 쓰는 말 위주로 맞춤).
+SYNONYM_GROUPS = [
+    ("음식", "맛집", "먹거리", "식당", "요리", "미식", "음식점"),
+    ("한식", "한정식", "국밥", "비빔밥", "백반"),
+    ("해산물", "회", "횟집", "수산", "생선", "조개"),
+    ("카페", "디저트", "커피", "베이커리", "빵집"),
+    ("자연", "풍경", "경치", "힐링", "자연경관"),
+    ("해변", "바다", "해수욕장", "해안", "바닷가", "해변가"),
+    ("산", "등산", "트레킹", "하이킹", "봉우리", "국립공원"),
+    ("공원", "산책", "정원", "수목원", "숲"),
+    ("문화", "역사", "전통", "유적", "문화재", "고궁", "궁궐"),
+    ("박물관", "전시", "미술관", "갤러리", "전시관"),
+    ("마을", "골목", "한옥", "벽화", "민속마을"),
+    ("시장", "전통시장", "장터", "재래시장"),
+    ("쇼핑", "백화점", "아울렛", "기념품", "쇼핑몰", "면세점"),
+    ("축제", "행사", "페스티벌", "공연", "이벤트"),
+    ("빛축제", "야경", "조명", "불빛", "야간"),
+    ("불꽃", "불꽃놀이", "불꽃축제"),
+    ("레포츠", "액티비티", "체험", "스포츠", "서핑", "래프팅"),
+    ("숙박", "호텔", "펜션", "숙소", "게스트하우스", "리조트"),
+]
+
+# Tour API 분류 코드(cat3, 예: A01010100)는 글자 n-gram으로 의미 없어서 임베딩할때 뺌
+_CODE_TOKEN = re.compile(r"\b[A-C]\d{2,}\b")
+_SPLIT = re.compile(r"[\s_/()\[\],.·-]+")
+
+
+def _build_synonyms() -> Tuple[Dict[str, str], "re.Pattern"]:
+    canonical = {}
+    for group in SYNONYM_GROUPS:
+        for word in group:
+            canonical.setdefault(word, group[0])
+    # 두 글자 이상인 단어는 붙여 쓴 이름 안에서도 찾음 (예: 해운대해수욕장). 한 글자는 단어 통째로 같을때만.
+    long_words = sorted((word for word in canonical if len(word) >= 2), key=len, reverse=True)
+    return canonical, re.compile("|".join(map(re.escape, long_words)))
+
+
+_CANONICAL, _SYNONYM_PATTERN = _build_synonyms()
+
+
+def tokenize(text: str) -> List[str]:
+    """임베딩할 단어 목록 만드는거. 원래 단어 + 걸리는 동의어 묶음 대표 단어들."""
+    tokens = [token for token in _SPLIT.split(_CODE_TOKEN.sub(" ", text.lower())) if token]
+    extra = []
+    for token in tokens:
+        if token in _CANONICAL:
+            extra.append(_CANONICAL[token])
+        extra.extend(_CANONICAL[word] for word in _SYNONYM_PATTERN.findall(token))
+    return tokens + [word for word in dict.fromkeys(extra) if word not in tokens]
+
+
+class HashingEmbedder:
+    """
+    글자 n-gram 해싱 임베딩. 단어마다 앞뒤 공백 붙여서 n-gram 뽑고 crc32로 차원/부호 정해서 더한 다음 L2 정규화함.
+    학습 없는 고정 함수라 인덱스 만들때랑 조회할때 같은 설정이면 항상 같은 벡터 나옴.
+    """
+    name = "hashing-char-ngram"
+
+    # 한 글자 n-gram은 너무 많이 겹쳐서 가중치 낮춤
+    NGRAM_WEIGHTS = {1: 0.5, 2: 1.0, 3: 1.0}
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self._token_features = lru_cache(maxsize=65536)(self._features)
+
+    def config(self) -> Dict[str, Any]:
+        return {"name": self.name, "dim": self.dim}
+
+    def _features(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        padded = f" {token} "
+        indexes, weights = [], []
+        for size, weight in self.NGRAM_WEIGHTS.items():
+            for start in range(len(padded) - size + 1):
+                gram = padded[start:start + size]
+                if gram.isspace():
+                    continue
+                hashed = zlib.crc32(f"{size}:{gram}".encode("utf-8"))
+                indexes.append(hashed % self.dim)
+                weights.append(weight if hashed & 0x80000000 else -weight)
+        return np.asarray(indexes, dtype=np.intp), np.asarray(weights, dtype=np.float32)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """문장 목록을 (len(texts), dim) float32 단위 벡터 행렬로 바꾸는거. 걸리는 n-gram 없으면 0 벡터."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                indexes, weights = self._token_features(token)
+                np.add.at(vectors[row], indexes, weights)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+def category_text(category_tag: str) -> str:
+    """category_tag 임베딩할 문장 ("자연_해변" -> "자연 해변")."""
+    return category_tag.replace("_", " ")
+
+
+def place_text(name_ko: str, category_tag: str) -> str:
+    """장소 임베딩할 문장 (이름 + 태그)."""
+    return f"{name_ko} {category_text(category_tag)}"
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """행마다 점수 높은 순 상위 k개 열 번호 (scores: (질의 수, 후보 수))."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    picked = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, picked, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(picked, order, axis=1)
+
+
+def build_index(session_factory, out_dir: str, embedder: Optional[HashingEmbedder] = None, yield_per: int = 5000) -> Dict[str, Any]:
+    """
+    tourist_info 읽어서 인덱스 디렉토리 만드는거. 임시 디렉토리에 다 쓴 다음 바꿔끼워서
+    만드는 도중에 앱이 읽어도 반쯤 쓴 파일 안 봄.
+
+    Returns:
+        dict: meta.json 내용 (태그 수, 장소 수, 지역 구간 등)
+    """
+    embedder = embedder or HashingEmbedder()
+    started = time.perf_counter()
+    db = session_factory()
+    try:
+        stmt = (
+            select(TouristInfo.content_id, TouristInfo.name_ko, TouristInfo.region, TouristInfo.category_tag)
+            .where(TouristInfo.category_tag.is_not(None))
+            .order_by(TouristInfo.region, TouristInfo.id)
+            .execution_options(yield_per=yield_per)
+        )
+        places = [tuple(row) for row in db.execute(stmt)]
+    finally:
+        db.close()
+
+    tag_counts = Counter(place[3] for place in places)
+    categories = sorted(tag_counts)
+    category_codes = {tag: code for code, tag in enumerate(categories)}
+    regions: Dict[str, List[int]] = {}
+    for position, (_, _, region, _) in enumerate(places):
+        regions.setdefault(region, [position, position])[1] = position + 1
+
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".semantic_index-", dir=parent)
+    try:
+        np.save(os.path.join(staging, "categories.npy"), embedder.embed([category_text(tag) for tag in categories]))
+        place_vectors = np.lib.format.open_memmap(
+            os.path.join(staging, "places.npy"), mode="w+", dtype=np.float32, shape=(len(places), embedder.dim)
+        )
+        for start in range(0, len(places), _EMBED_BATCH):
+            chunk = places[start:start + _EMBED_BATCH]
+            place_vectors[start:start + len(chunk)] = embedder.embed([place_text(name, tag) for _, name, _, tag in chunk])
+        place_vectors.flush()
+        del place_vectors
+        tag_dtype = np.uint16 if len(categories) <= np.iinfo(np.uint16).max else np.uint32
+        np.save(os.path.join(staging, "place_tags.npy"), np.asarray([category_codes[place[3]] for place in places], dtype=tag_dtype))
+        meta = {
+            "version": INDEX_VERSION,
+            "embedder": embedder.config(),
+            "built_at": datetime.now().isoformat(timespec="seconds"),
+            "categories": categories,
+            "category_counts": [tag_counts[tag] for tag in categories],
+            "content_ids": [place[0] for place in places],
+            "regions": regions,
+        }
+        with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        _replace_dir(staging, out_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    logger.info(f"[Semantic] 인덱스를 만들었습니다 (태그 {len(categories)}개, 장소 {len(places)}건, "
+                f"{time.perf_counter() - started:.2f}초): {out_dir}")
+    return meta
+
+
+def _replace_dir(staging: str, out_dir: str) -> None:
+    # 기존 인덱스는 옆으로 치웠다가 새거 옮긴 다음 지움 (이미 매핑해서 쓰는 프로세스는 지운 파일 그대로 계속 읽음)
+    previous = None
+    if os.path.exists(out_dir):
+        previous = tempfile.mkdtemp(prefix=".semantic_index-old-", dir=os.path.dirname(os.path.abspath(out_dir)))
+        os.rmdir(previous)
+        os.rename(out_dir, previous)
+    os.rename(staging, out_dir)
+    if previous:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+class SemanticIndex:
+    """디스크에 만들어둔 인덱스 메모리 매핑해서 조회하는거. 만든 다음엔 안 바뀌어서 여러 스레드에서 같이 써도 됨."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"인덱스 버전이 안 맞습니다 ({meta.get('version')} != {INDEX_VERSION}): {path}")
+        config = meta["embedder"]
+        if config.get("name") != HashingEmbedder.name:
+            raise ValueError(f"모르는 임베딩 방식입니다: {config.get('name')}")
+        self.path = path
+        self.built_at = meta["built_at"]
+        self.embedder = HashingEmbedder(dim=config["dim"])
+        self.categories: List[str] = meta["categories"]
+        self.content_ids: List[str] = meta["content_ids"]
+        self.regions: Dict[str, Tuple[int, int]] = {region: tuple(span) for region, span in meta["regions"].items()}
+        self.category_vectors = np.load(os.path.join(path, "categories.npy"), mmap_mode="r")
+        self.place_vectors = np.load(os.path.join(path, "places.npy"), mmap_mode="r")
+        self.place_tags = np.load(os.path.join(path, "place_tags.npy"), mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.content_ids)
+
+    def search_categories(self, queries: Sequence[str], k: int = SEMANTIC_TOP_K) -> List[List[Tuple[str, float]]]:
+        """질의마다 (category_tag, 점수) 상위 k개. 질의 여러개를 행렬곱 한번으로 처리함."""
+        if not queries or not self.categories:
+            return [[] for _ in queries]
+        scores = self.embedder.embed(queries) @ np.asarray(self.category_vectors).T
+        return [
+            [(self.categories[column], float(row_scores[column])) for column in columns]
+            for row_scores, columns in zip(scores, _top_k(scores, k))
+        ]
+
+    def search_places(self, queries: Sequence[str], region: Optional[str] = None,
+                      k: int = SEMANTIC_PLACE_TOP_K) -> List[List[Tuple[str, str, float]]]:
+        """
+        질의마다 (content_id, category_tag, 점수) 상위 k개.
+        지역 주면 그 지역 구간만 읽어서 계산함 (없는 지역이면 빈 목록).
+        """
+        start, end = (0, len(self)) if region is None else self.regions.get(region.strip(), (0, 0))
+        if not queries or end <= start:
+            return [[] for _ in queries]
+        scores = self.embedder.embed(queries) @ np.asarray(self.place_vectors[start:end]).T
+        tags = self.place_tags[start:end]
+        return [
+            [(self.content_ids[start + column], self.categories[tags[column]], float(row_scores[column])) for column in columns]
+            for row_scores, columns in zip(scores, _top_k(scores, k))
+        ]
+
+    def resolve_interests(self, interests: Sequence[str], region: Optional[str] = None,
+                          min_score: float = SEMANTIC_MIN_SCORE) -> Dict[str, List[str]]:
+        """
+        관심사마다 매칭되는 category_tag 목록 (점수 높은 순). 매칭 안 되면 빈 목록.
+
+        - 태그 벡터랑 바로 비교해서 `min_score` 넘는 상위 태그
+        - 지역 장소 벡터랑 비교해서 `min_score` 넘는 장소들의 태그 (예: "한옥" -> 한옥마을이 있는 "문화_마을")
+        """
+        interests = list(interests)
+        by_category = self.search_categories(interests)
+        by_place = self.search_places(interests, region) if region else [[] for _ in interests]
+        resolved = {}
+        for interest, categories, places in zip(interests, by_category, by_place):
+            tags = [tag for tag, score in categories if score >= min_score]
+            tags += [tag for _, tag, score in places if score >= min_score]
+            resolved[interest] = list(dict.fromkeys(tags))
+        return resolved
+
+
+class SemanticIndexStore:
+    """프로세스 전체에서 같이 쓰는 인덱스 보관하는거. 다시 만든 인덱스는 `load`로 참조만 바꿔끼움."""
+
+    def __init__(self):
+        self._index: Optional[SemanticIndex] = None
+        self._lock = threading.Lock()
+        # 지표
+        self.resolved = 0
+        self.unresolved = 0
+        self.seconds = 0.0
+
+    def get(self) -> Optional[SemanticIndex]:
+        return self._index
+
+    def load(self, path: str) -> SemanticIndex:
+        index = SemanticIndex(path)
+        self._index = index
+        logger.info(f"[Semantic] 인덱스를 불러왔습니다 (태그 {len(index.categories)}개, 장소 {len(index)}건, 만든 시각 {index.built_at}).")
+        return index
+
+    def resolve(self, interests: Sequence[str], region: Optional[str] = None) -> Dict[str, List[str]]:
+        """인덱스 있으면 관심사 -> category_tag 목록, 없으면 빈 dict."""
+        index = self._index
+        if index is None or not interests:
+            return {}
+        started = time.perf_counter()
+        resolved = index.resolve_interests(interests, region)
+        with self._lock:
+            self.seconds += time.perf_counter() - started
+            for tags in resolved.values():
+                if tags:
+                    self.resolved += 1
+                else:
+                    self.unresolved += 1
+        return resolved
+
+    def stats(self) -> Dict[str, Any]:
+        index = self._index
+        return {
+            "loaded": index is not None,
+            "categories": len(index.categories) if index else 0,
+            "places": len(index) if index else 0,
+            "resolved": self.resolved,
+            "unresolved": self.unresolved,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+semantic_index_store = SemanticIndexStore()
+
+
+def load_semantic_index(path: str = SEMANTIC_INDEX_DIR) -> Optional[SemanticIndex]:
+    """앱 시작할때 부르는거. 경로 안 정했거나 인덱스 아직 안 만들었으면 None (관심사는 고정 매핑만 씀)."""
+    if not path:
+        return None
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        logger.warning(f"[Semantic] 인덱스가 없어서 관심사 임베딩 매칭 없이 시작합니다 (python -m src.semantic_index build): {path}")
+        return None
+    return semantic_index_store.load(path)
+
+
+def _format_matches(matches: Iterable[Tuple]) -> str:
+    return ", ".join(f"{match[-2]}({match[-1]:.2f})" for match in matches) or "-"
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="관심사 -> category_tag 임베딩 인덱스 만들기/조회")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="tourist_info 읽어서 인덱스 만들기")
+    build_parser.add_argument("--out", default=SEMANTIC_INDEX_DIR or "data/semantic_index")
+    build_parser.add_argument("--dim", type=int, default=256)
+    query_parser = subparsers.add_parser("query", help="관심사 매칭 결과 보기")
+    query_parser.add_argument("interests", nargs="+")
+    query_parser.add_argument("--region", default=None)
+    query_parser.add_argument("--path", default=SEMANTIC_INDEX_DIR or "data/semantic_index")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from src.db import SessionLocal
+        meta = build_index(SessionLocal, args.out, HashingEmbedder(dim=args.dim))
+        print(f"태그 {len(meta['categories'])}개, 장소 {len(meta['content_ids'])}건, 지역 {len(meta['regions'])}개 -> {args.out}")
+    else:
+        index = SemanticIndex(args.path)
+        places = index.search_places(args.interests, args.region, k=5) if args.region else [[] for _ in args.interests]
+        for interest, categories, top_places, (_, tags) in zip(args.interests, index.search_categories(args.interests), places,
+                                                               index.resolve_interests(args.interests, args.region).items()):
+            print(f"{interest}: 태그 {_format_matches(categories)} | 장소 {_format_matches(top_places)} -> {tags or '매칭 없음'}")
@@ -0,0 +1,282 @@
+"""
+tourist_info 좌표로 만든 인메모리 공간 인덱스 파일임.
+위경도를 float 배열로 들고 격자(grid)로 나눠놔서, 반경 검색이랑 k-최근접 검색을
+SQL Decimal 계산 없이 메모리에서 바로 처리함.
+추천 후보 단계에서 후보들을 가까운 권역으로 묶을때 씀 (`group_nearby`).
+"""
+
+import logging
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.change_events import TouristInfoChange
+from src.openapi import TouristInfo
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+# 격자 한칸 크기(도). 위도 0.05도는 약 5.5km라서 반경 몇 km 검색하면 격자 몇칸만 보면 됨.
+DEFAULT_CELL_DEG = 0.05
+
+# 수집 중 쌓인 좌표 변경이 인덱스 크기의 이 비율 넘으면 기존 인덱스 고쳐쓰는 대신 DB에서 새로 만듦
+REBUILD_CHANGE_RATIO = 0.3
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    두 지점 사이 거리(km) 구하는거. numpy 배열 넣으면 브로드캐스팅돼서 한번에 계산됨.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(value) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    """
+    격자 기반 공간 인덱스임. 만든 다음엔 안 바뀜 (갱신할땐 새로 만들어서 통째로 바꿔끼움).
+
+    점들을 격자 칸 번호 순으로 정렬해두고 칸마다 [시작, 끝) 구간만 기억해서,
+    검색할때 주변 칸 구간만 잘라서 거리 계산함.
+
+    Args:
+        ids (Sequence[str]): 점마다 붙는 식별자 (content_id).
+        latitudes: 위도 배열.
+        longitudes: 경도 배열.
+        cell_deg (float): 격자 한칸 크기(도).
+    """
+
+    def __init__(self, ids: Sequence[str], latitudes, longitudes, cell_deg: float = DEFAULT_CELL_DEG):
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        if not (len(ids) == len(latitudes) == len(longitudes)):
+            raise ValueError("ids, latitudes, longitudes 길이가 같아야 합니다.")
+
+        self.cell_deg = cell_deg
+        rows = np.floor(latitudes / cell_deg).astype(np.int64)
+        cols = np.floor(longitudes / cell_deg).astype(np.int64)
+        order = np.lexsort((cols, rows))
+
+        self.ids: List[str] = [ids[i] for i in order]
+        self.latitudes = latitudes[order]
+        self.longitudes = longitudes[order]
+        self._position: Dict[str, int] = {content_id: i for i, content_id in enumerate(self.ids)}
+
+        # 칸 번호 -> 정렬된 배열에서의 [시작, 끝) 구간
+        self._cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        sorted_rows, sorted_cols = rows[order], cols[order]
+        if len(order):
+            boundaries = np.flatnonzero((np.diff(sorted_rows) != 0) | (np.diff(sorted_cols) != 0)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(order)]))
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self._cells[(int(sorted_rows[start]), int(sorted_cols[start]))] = (start, end)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def coords_of(self, content_id: str) -> Optional[Tuple[float, float]]:
+        """content_id 좌표 돌려주는거. 없으면 None."""
+        position = self._position.get(content_id)
+        if position is None:
+            return None
+        return float(self.latitudes[position]), float(self.longitudes[position])
+
+    def _candidate_slices(self, lat: float, lon: float, radius_km: float) -> List[Tuple[int, int]]:
+        """반경을 덮는 격자 칸들의 구간 목록 구하는거."""
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+        dlon = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+        row_min, row_max = math.floor((lat - dlat) / self.cell_deg), math.floor((lat + dlat) / self.cell_deg)
+        col_min, col_max = math.floor((lon - dlon) / self.cell_deg), math.floor((lon + dlon) / self.cell_deg)
+
+        # 칸 수가 실제 칸 개수보다 많으면 그냥 있는 칸들 다 훑음
+        if (row_max - row_min + 1) * (col_max - col_min + 1) > len(self._cells):
+            return [span for (row, col), span in self._cells.items()
+                    if row_min <= row <= row_max and col_min <= col <= col_max]
+        slices = []
+        for row in range(row_min, row_max + 1):
+            for col in range(col_min, col_max + 1):
+                span = self._cells.get((row, col))
+                if span is not None:
+                    slices.append(span)
+        return slices
+
+    def _gather(self, slices: List[Tuple[int, int]]) -> np.ndarray:
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        if len(slices) == 1:
+            return np.arange(slices[0][0], slices[0][1])
+        return np.concatenate([np.arange(start, end) for start, end in slices])
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> List[Tuple[str, float]]:
+        """
+        (lat, lon)에서 radius_km 안에 있는 점들 찾는거.
+
+        Returns:
+            List[Tuple[str, float]]: 가까운 순으로 정렬된 (content_id, 거리km) 목록.
+        """
+        candidates = self._gather(self._candidate_slices(lat, lon, radius_km))
+        if not len(candidates):
+            return []
+        distances = haversine_km(lat, lon, self.latitudes[candidates], self.longitudes[candidates])
+        mask = distances <= radius_km
+        hits, hit_distances = candidates[mask], distances[mask]
+        order = np.argsort(hit_distances, kind="stable")
+        return [(self.ids[i], float(d)) for i, d in zip(hits[order].tolist(), hit_distances[order].tolist())]
+
+    def nearest(self, lat: float, lon: float, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        (lat, lon)에서 가장 가까운 점 k개 찾는거. 검색 반경을 두배씩 늘려가면서 찾음.
+
+        Returns:
+            List[Tuple[str, float]]: 가까운 순으로 정렬된 (content_id, 거리km) 목록.
+        """
+        if k <= 0 or not len(self):
+            return []
+        k = min(k, len(self))
+        radius_km = self.cell_deg * 111.0
+        while True:
+            candidates = self._gather(self._candidate_slices(lat, lon, radius_km))
+            exhausted = len(candidates) == len(self)
+            if len(candidates) >= k:
+                distances = haversine_km(lat, lon, self.latitudes[candidates], self.longitudes[candidates])
+                top = np.argpartition(distances, k - 1)[:k] if len(candidates) > k else np.arange(len(candidates))
+                # k번째 거리가 검색 반경 안이면 반경 밖에 더 가까운 점은 없음
+                if exhausted or distances[top].max() <= radius_km:
+                    top = top[np.argsort(distances[top], kind="stable")]
+                    return [(self.ids[candidates[i]], float(distances[i])) for i in top.tolist()]
+            radius_km *= 2.0
+
+    def with_changes(self, updates: Dict[str, Optional[Tuple[float, float]]]) -> "SpatialIndex":
+        """
+        바뀐 점만 반영한 새 인덱스 만드는거 (DB 다시 안 읽음). 지금 인덱스는 안 바뀜.
+
+        Args:
+            updates: content_id -> 새 (위도, 경도). None이면 그 점 뺌.
+        """
+        keep = np.fromiter((content_id not in updates for content_id in self.ids), dtype=bool, count=len(self.ids))
+        added = [(content_id, coords) for content_id, coords in updates.items() if coords is not None]
+        ids = [content_id for content_id, kept in zip(self.ids, keep.tolist()) if kept] + [content_id for content_id, _ in added]
+        latitudes = np.concatenate((self.latitudes[keep], np.fromiter((coords[0] for _, coords in added), dtype=np.float64, count=len(added))))
+        longitudes = np.concatenate((self.longitudes[keep], np.fromiter((coords[1] for _, coords in added), dtype=np.float64, count=len(added))))
+        return SpatialIndex(ids, latitudes, longitudes, cell_deg=self.cell_deg)
+
+    def around(self, content_id: str, radius_km: float) -> List[Tuple[str, float]]:
+        """특정 장소 주변 radius_km 안의 다른 장소들 찾는거 (예: 한옥마을 3km 이내)."""
+        coords = self.coords_of(content_id)
+        if coords is None:
+            return []
+        return [(other_id, distance) for other_id, distance in self.within_radius(*coords, radius_km) if other_id != content_id]
+
+    def group_nearby(self, content_ids: Sequence[str], radius_km: float) -> Dict[str, int]:
+        """
+        장소들을 가까운 것끼리 권역으로 묶는거. 앞에서부터 아직 안 묶인 장소 하나 잡고,
+        radius_km 안에 있는 (아직 안 묶인) 장소들을 같은 권역으로 넣음.
+        좌표는 인덱스 배열에서 꺼내고 주어진 장소들끼리만 거리 계산함 (주변 전체 점 안 훑음).
+
+        Returns:
+            Dict[str, int]: content_id -> 권역 번호 (1부터). 인덱스에 없는 장소는 빠져있음.
+        """
+        located = list(dict.fromkeys(content_id for content_id in content_ids if content_id in self._position))
+        if not located:
+            return {}
+        positions = np.fromiter((self._position[content_id] for content_id in located), dtype=np.int64, count=len(located))
+        latitudes, longitudes = self.latitudes[positions], self.longitudes[positions]
+        group_of = np.zeros(len(located), dtype=np.int64)
+        group = 0
+        for seed in range(len(located)):
+            if group_of[seed]:
+                continue
+            group += 1
+            free = np.flatnonzero(group_of == 0)
+            near = free[haversine_km(latitudes[seed], longitudes[seed], latitudes[free], longitudes[free]) <= radius_km]
+            group_of[near] = group
+        return dict(zip(located, group_of.tolist()))
+
+
+class SpatialIndexStore:
+    """
+    프로세스 전체에서 같이 쓰는 공간 인덱스 보관하는거.
+    새로 만들때는 다 만든 다음 참조만 바꿔끼워서, 읽는 쪽은 락 없이 항상 완성된 인덱스만 봄.
+
+    tourist_info 변경 이벤트(change_events.py)는 `queue_changes`로 모아뒀다가 수집 끝나면
+    `apply_queued_changes`에서 바뀐 점만 반영함 (너무 많이 바뀌었으면 DB에서 새로 만듦).
+    """
+
+    def __init__(self):
+        self._index: Optional[SpatialIndex] = None
+        self._build_lock = threading.Lock()
+        self._session_factory = None
+        self._pending: Dict[str, Optional[Tuple[float, float]]] = {}
+        self._pending_rebuild = False
+        self._pending_lock = threading.Lock()
+
+    def get(self) -> Optional[SpatialIndex]:
+        """현재 인덱스 돌려주는거. 아직 안 만들었으면 None."""
+        return self._index
+
+    def swap(self, index: SpatialIndex) -> None:
+        self._index = index
+
+    def load_from_db(self, session_factory, cell_deg: float = DEFAULT_CELL_DEG) -> SpatialIndex:
+        """tourist_info 좌표 전부 읽어서 인덱스 새로 만들고 바꿔끼우는거."""
+        self._session_factory = session_factory
+        with self._build_lock:
+            db = session_factory()
+            try:
+                rows = db.query(TouristInfo.content_id, TouristInfo.latitude, TouristInfo.longitude).all()
+            finally:
+                db.close()
+            index = SpatialIndex(
+                [row.content_id for row in rows],
+                np.fromiter((float(row.latitude) for row in rows), dtype=np.float64, count=len(rows)),
+                np.fromiter((float(row.longitude) for row in rows), dtype=np.float64, count=len(rows)),
+                cell_deg=cell_deg,
+            )
+            self.swap(index)
+            logger.info(f"[Spatial] 공간 인덱스를 새로 만들었습니다 ({len(index)}건).")
+            return index
+
+    def queue_changes(self, changes: Sequence[TouristInfoChange]) -> None:
+        """좌표 바뀐 행(새 행/없어진 행 포함) 모아두는거. 인덱스 아직 안 만들었으면 무시함."""
+        index = self._index
+        if index is None:
+            return
+        with self._pending_lock:
+            if self._pending_rebuild:
+                return
+            for change in changes:
+                if not change.coords_changed:
+                    continue
+                after = change.after
+                self._pending[change.content_id] = None if after is None else (float(after["latitude"]), float(after["longitude"]))
+            if len(self._pending) > len(index) * REBUILD_CHANGE_RATIO:
+                # 초기 적재처럼 거의 다 바뀌면 모아두지 말고 끝나고 DB에서 새로 만듦
+                self._pending.clear()
+                self._pending_rebuild = True
+
+    def apply_queued_changes(self) -> Optional[SpatialIndex]:
+        """모아둔 변경 반영해서 인덱스 바꿔끼우는거. 바뀐게 없으면 None."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            rebuild, self._pending_rebuild = self._pending_rebuild, False
+        if rebuild and self._session_factory is not None:
+            return self.load_from_db(self._session_factory)
+        if not pending:
+            return None
+        with self._build_lock:
+            if self._index is None:
+                return None
+            index = self._index.with_changes(pending)
+            self.swap(index)
+        logger.info(f"[Spatial] 공간 인덱스에 바뀐 좌표 {len(pending)}건을 반영했습니다 ({len(index)}건).")
+        return index
+
+
+# 프로세스 전체에서 같이 쓰는 인덱스 보관소
+spatial_index_store = SpatialIndexStore()
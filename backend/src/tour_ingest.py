@@ -0,0 +1,545 @@
+"""
+Tour API(한국관광공사 국문 관광정보 서비스) 데이터를 tourist_info 테이블로 가져오는 파일임.
+더미 데이터(seed_data.py) 대신 쓰는 진짜 데이터 소스고, 매주 한번 돌리는 용도임.
+
+페이지 -> 항목 -> 정규화된 행 -> 묶음 순서로 제너레이터 이어서 흘려보내서, 전체 건수가 수십만이어도
+메모리엔 페이지 하나 + 묶음 하나만 올라감. 묶음마다:
+- 행마다 수집한 값들 해시(content_hash) 만들어서 DB에 저장된 해시랑 비교함 (새 행/바뀐 행/안 바뀐 행)
+- 새 행/바뀐 행만 content_id 기준 upsert (INSERT ... ON CONFLICT / ON DUPLICATE KEY)
+- 안 바뀐 행은 last_crawled_date만 오늘로 갱신
+- 묶음마다 커밋하고 새 행/바뀐 행을 변경 이벤트(change_events.py)로 내보냄
+  (중간에 실패해도 앞에 쓴건 남고, 다음 실행때 이어서 맞춰짐)
+끝까지 다 받았으면 이번에 안 나온 행(last_crawled_date가 오늘 아닌 행)을 없어진 행으로 보고 지움.
+
+- 일반 관광 정보: areaBasedList2 (축제/행사 타입은 날짜가 없어서 여기선 뺌)
+- 축제/행사: searchFestival2 (행사 시작일/종료일 있음)
+
+실행 방법 (backend 폴더에서, 한번만 돌리기):
+    python -m src.tour_ingest --area 1 --area 6
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.change_events import (
+    CHANGE_CHANGED, CHANGE_NEW, CHANGE_REMOVED, ChangeEventBus, TouristInfoChange, subscribe_cache_invalidation,
+    tourist_info_changes,
+)
+from src.db import SessionLocal, upsert_tourist_info
+from src.openapi import TouristInfo
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+# 테스트할땐 로컬 스텁 서버 주소 넣으면 됨
+TOUR_API_BASE_URL = os.getenv("TOUR_API_BASE_URL", "https://apis.data.go.kr/B551011/KorService2")
+TOUR_API_MOBILE_APP = os.getenv("TOUR_API_MOBILE_APP", "travel-recommender")
+TOUR_INGEST_PAGE_SIZE = int(os.getenv("TOUR_INGEST_PAGE_SIZE", "1000"))
+TOUR_INGEST_BATCH_SIZE = int(os.getenv("TOUR_INGEST_BATCH_SIZE", "500"))
+# 매주 자동 갱신 (1이면 앱 시작할때 스케줄 등록함, TOUR_API_KEY 있어야 함)
+TOUR_INGEST_ENABLED = os.getenv("TOUR_INGEST_ENABLED", "0") != "0"
+TOUR_INGEST_DAY_OF_WEEK = os.getenv("TOUR_INGEST_DAY_OF_WEEK", "mon")
+TOUR_INGEST_HOUR = int(os.getenv("TOUR_INGEST_HOUR", "4"))
+# 축제 목록은 오늘부터 이 기간 전에 시작한 행사까지 가져옴 (이미 시작해서 진행 중인 행사 포함하려고)
+TOUR_INGEST_FESTIVAL_LOOKBACK_DAYS = int(os.getenv("TOUR_INGEST_FESTIVAL_LOOKBACK_DAYS", "60"))
+# 이번 수집에 안 나온 행이 수집 범위 행의 이 비율 넘으면 API 쪽 문제로 보고 안 지움
+TOUR_INGEST_MAX_REMOVE_RATIO = float(os.getenv("TOUR_INGEST_MAX_REMOVE_RATIO", "0.2"))
+
+AREA_BASED_LIST = "areaBasedList2"
+SEARCH_FESTIVAL = "searchFestival2"
+
+# Tour API 지역코드 -> tourist_info.region
+AREA_NAMES = {
+    "1": "서울", "2": "인천", "3": "대전", "4": "대구", "5": "광주", "6": "부산", "7": "울산", "8": "세종",
+    "31": "경기", "32": "강원", "33": "충북", "34": "충남", "35": "경북", "36": "경남", "37": "전북", "38": "전남",
+    "39": "제주",
+}
+
+# Tour API 관광타입 ID -> tourist_info.content_type (verification_cache.CONTENT_TYPE_TTLS 키랑 같음)
+CONTENT_TYPE_NAMES = {
+    "12": "관광지", "14": "문화시설", "15": "축제/행사", "25": "여행코스",
+    "28": "레포츠", "32": "숙박", "38": "쇼핑", "39": "음식점",
+}
+FESTIVAL_CONTENT_TYPE_ID = "15"
+
+# 운영 시간/가격/개최 여부가 자주 바뀌어서 Agent 검증 대상으로 두는 타입
+VARIABLE_CONTENT_TYPES = {"음식점", "축제/행사", "쇼핑", "숙박"}
+
+# content_type -> category_tag 접두어 (db.INTEREST_CATEGORY_PREFIXES랑 맞춤). 관광지는 대분류(cat1)로 자연/문화 나눔.
+CATEGORY_PREFIXES = {
+    "문화시설": "문화", "축제/행사": "축제", "여행코스": "코스", "레포츠": "레포츠",
+    "숙박": "숙박", "쇼핑": "쇼핑", "음식점": "음식",
+}
+
+# content_hash에 들어가는 컬럼들 (last_crawled_date는 매번 바뀌니까 뺌)
+_COMPARE_COLUMNS = [
+    column.name for column in TouristInfo.__table__.columns
+    if column.name not in ("id", "content_id", "last_crawled_date", "content_hash")
+]
+
+_COORD_QUANTUM = Decimal("0.0000001")
+
+
+class TourApiError(RuntimeError):
+    """Tour API가 에러 응답(resultCode) 주거나 JSON 아닌 응답 줬을때 나는 예외."""
+
+
+@dataclass
+class IngestStats:
+    """한번 가져올때 처리 건수랑 걸린 시간."""
+    pages: int = 0
+    fetched: int = 0
+    skipped: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.fetched / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "elapsed_seconds": round(self.elapsed_seconds, 3),
+                "rows_per_second": round(self.rows_per_second, 1)}
+
+
+class TourApiClient:
+    """
+    Tour API 페이지 단위로 불러오는 동기 클라이언트임 (수집은 스레드/CLI에서 돌아서 동기로 씀).
+    네트워크 오류랑 5xx는 `max_retries`번까지 잠깐 쉬고 다시 시도함.
+
+    Args:
+        service_key (str): 공공데이터포털 인증키.
+        base_url (str): 서비스 주소. 테스트할땐 스텁 서버 주소.
+        timeout (float): 요청 하나 타임아웃(초).
+        max_retries (int): 실패했을때 다시 시도할 횟수.
+    """
+
+    def __init__(self, service_key: str, base_url: str = TOUR_API_BASE_URL, timeout: float = 30.0,
+                 max_retries: int = 3, transport: Optional[httpx.BaseTransport] = None):
+        self.service_key = service_key
+        self.max_retries = max_retries
+        self._client = httpx.Client(base_url=base_url, timeout=timeout, transport=transport)
+
+    def close(self) -> None:
+        self._client.close()
+
+    def __enter__(self) -> "TourApiClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def fetch_page(self, operation: str, params: Dict[str, Any], page_no: int, page_size: int) -> Tuple[List[dict], int]:
+        """
+        페이지 하나 불러오는거.
+
+        Returns:
+            Tuple[List[dict], int]: (항목 목록, 전체 건수)
+        """
+        query = {
+            "serviceKey": self.service_key,
+            "MobileOS": "ETC",
+            "MobileApp": TOUR_API_MOBILE_APP,
+            "_type": "json",
+            "numOfRows": page_size,
+            "pageNo": page_no,
+            **params,
+        }
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._client.get(f"/{operation}", params=query)
+            except httpx.TransportError as e:
+                error: Exception = e
+            else:
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return _parse_page(response)
+                error = TourApiError(f"{response.status_code} 응답: {response.text[:200]}")
+            if attempt >= self.max_retries:
+                raise error
+            logger.warning(f"[Ingest] {operation} {page_no}페이지 요청 실패, 다시 시도합니다 ({attempt + 1}/{self.max_retries}): {error}")
+            time.sleep(min(2 ** attempt, 10))
+
+    def iter_items(self, operation: str, params: Dict[str, Any], page_size: int, stats: IngestStats) -> Iterator[dict]:
+        """전체 건수 다 받을때까지 페이지 넘겨가며 항목 하나씩 내보내는거."""
+        page_no = 1
+        while True:
+            items, total_count = self.fetch_page(operation, params, page_no, page_size)
+            stats.pages += 1
+            yield from items
+            if not items or page_no * page_size >= total_count:
+                return
+            page_no += 1
+
+
+def _parse_page(response: httpx.Response) -> Tuple[List[dict], int]:
+    try:
+        payload = response.json()
+    except ValueError:
+        # 인증키 틀리면 _type=json 줘도 XML 에러 응답이 옴
+        raise TourApiError(f"JSON이 아닌 응답을 받았습니다: {response.text[:200]}")
+    body = payload.get("response", {}).get("body")
+    header = payload.get("response", {}).get("header", {})
+    if body is None or header.get("resultCode") not in ("0000", "00"):
+        raise TourApiError(f"Tour API 오류 응답: {header.get('resultCode')} {header.get('resultMsg')}")
+    # 결과 없으면 items가 빈 문자열로, 하나면 item이 리스트 대신 dict로 옴
+    items = body.get("items") or {}
+    item = items.get("item") if isinstance(items, dict) else None
+    if item is None:
+        item = []
+    elif isinstance(item, dict):
+        item = [item]
+    return item, int(body.get("totalCount") or 0)
+
+
+# --- 정규화 ---
+
+def _parse_yyyymmdd(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value)[:8], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def _parse_coord(value: Any) -> Optional[Decimal]:
+    try:
+        coord = Decimal(str(value)).quantize(_COORD_QUANTUM)
+    except (InvalidOperation, ValueError):
+        return None
+    return coord if coord != 0 else None
+
+
+def _category_tag(content_type: str, item: dict) -> str:
+    if content_type == "관광지":
+        prefix = "자연" if item.get("cat1") == "A01" else "문화"
+    else:
+        prefix = CATEGORY_PREFIXES.get(content_type, "기타")
+    return f"{prefix}_{item.get('cat3') or item.get('cat2') or '기타'}"
+
+
+def normalize_item(item: dict, today: date) -> Optional[Dict[str, Any]]:
+    """
+    Tour API 항목 하나를 `TouristInfo` 컬럼 딕셔너리로 바꾸는거 (content_hash 포함).
+    이름/주소/좌표 없거나 모르는 지역/타입이면 None (건너뜀).
+    """
+    content_id = str(item.get("contentid") or "").strip()
+    title = (item.get("title") or "").strip()
+    address = " ".join(part.strip() for part in (item.get("addr1") or "", item.get("addr2") or "") if part and part.strip())
+    latitude, longitude = _parse_coord(item.get("mapy")), _parse_coord(item.get("mapx"))
+    region = AREA_NAMES.get(str(item.get("areacode") or ""))
+    content_type = CONTENT_TYPE_NAMES.get(str(item.get("contenttypeid") or ""))
+    if not (content_id and title and address and region and content_type) or latitude is None or longitude is None:
+        return None
+    row = {
+        "content_id": content_id[:50],
+        "name_ko": title[:255],
+        "region": region,
+        "address": address[:512],
+        "latitude": latitude,
+        "longitude": longitude,
+        "content_type": content_type,
+        "category_tag": _category_tag(content_type, item)[:100],
+        "image_url": (item.get("firstimage") or "")[:1024] or None,
+        "is_variable": content_type in VARIABLE_CONTENT_TYPES,
+        "last_crawled_date": today,
+        "start_date": _parse_yyyymmdd(item.get("eventstartdate")),
+        "end_date": _parse_yyyymmdd(item.get("eventenddate")),
+        # 목록 API엔 운영 시간이 없음 (상세 소개 API 따로 불러야 함)
+        "operating_hours": None,
+    }
+    row["content_hash"] = content_hash(row)
+    return row
+
+
+def _normalize_value(value: Any) -> Any:
+    # DB 종류마다 DECIMAL을 Decimal/float으로 돌려줘서 비교 전에 맞춤
+    if isinstance(value, (Decimal, float)):
+        return Decimal(str(value)).quantize(_COORD_QUANTUM)
+    return value
+
+
+def _canonical(value: Any) -> Any:
+    value = _normalize_value(value)
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (Decimal, date)):
+        return str(value)
+    return value
+
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """비교 컬럼 값들로 sha256 해시 만드는거. DB에서 읽은 행이랑 API에서 만든 행이 값 같으면 해시도 같음."""
+    payload = json.dumps([_canonical(row[name]) for name in _COMPARE_COLUMNS], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _compare_values(row: Dict[str, Any]) -> Dict[str, Any]:
+    """변경 이벤트에 실을 비교 컬럼 값들 (DB에서 읽은 행도 API 행이랑 같은 모양으로 맞춤)."""
+    return {name: _normalize_value(row[name]) for name in _COMPARE_COLUMNS}
+
+
+def _batched(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        # 같은 묶음 안에 같은 content_id 두번 있으면 upsert 한 문장에서 같은 행 두번 건드려서 에러남 (뒤에꺼 씀)
+        batch[row["content_id"]] = row
+        if len(batch) >= size:
+            yield list(batch.values())
+            batch = {}
+    if batch:
+        yield list(batch.values())
+
+
+# --- DB 쓰기 ---
+
+def write_batch(db: Session, rows: List[Dict[str, Any]], today: date, stats: IngestStats) -> List[TouristInfoChange]:
+    """
+    묶음 하나를 새 행/바뀐 행/안 바뀐 행으로 나눠서 새 행/바뀐 행만 upsert하고, 안 바뀐 행은 last_crawled_date만 갱신하는거.
+    DB엔 content_id랑 content_hash만 읽고, 바뀐 행만 이벤트에 실을 이전 값 따로 읽음.
+    커밋이랑 이벤트 내보내기는 부르는 쪽에서 함.
+
+    Returns:
+        List[TouristInfoChange]: 새 행/바뀐 행 변경 이벤트들.
+    """
+    content_ids = [row["content_id"] for row in rows]
+    stored_hashes = dict(db.execute(
+        select(TouristInfo.content_id, TouristInfo.content_hash).where(TouristInfo.content_id.in_(content_ids))
+    ).all())
+
+    differing = [row["content_id"] for row in rows
+                 if row["content_id"] in stored_hashes and stored_hashes[row["content_id"]] != row["content_hash"]]
+    before_rows = {}
+    if differing:
+        before_rows = {
+            found["content_id"]: _compare_values(found)
+            for found in db.execute(
+                select(TouristInfo.content_id, *(TouristInfo.__table__.c[name] for name in _COMPARE_COLUMNS))
+                .where(TouristInfo.content_id.in_(differing))
+            ).mappings()
+        }
+
+    changes: List[TouristInfoChange] = []
+    writes, unchanged_ids = [], []
+    for row in rows:
+        content_id = row["content_id"]
+        if content_id not in stored_hashes:
+            stats.inserted += 1
+            writes.append(row)
+            changes.append(TouristInfoChange(CHANGE_NEW, content_id, after=_compare_values(row)))
+        elif stored_hashes[content_id] == row["content_hash"]:
+            stats.unchanged += 1
+            unchanged_ids.append(content_id)
+        else:
+            before = before_rows[content_id]
+            writes.append(row)
+            if stored_hashes[content_id] is None and content_hash(before) == row["content_hash"]:
+                # 해시 생기기 전에 들어간 행은 값 같으면 해시만 채우고 바뀐걸로 안 침
+                stats.unchanged += 1
+            else:
+                stats.updated += 1
+                changes.append(TouristInfoChange(CHANGE_CHANGED, content_id, before=before, after=_compare_values(row)))
+
+    upsert_tourist_info(db, writes, batch_size=len(rows))
+    if unchanged_ids:
+        db.query(TouristInfo).filter(
+            TouristInfo.content_id.in_(unchanged_ids), TouristInfo.last_crawled_date != today
+        ).update({TouristInfo.last_crawled_date: today}, synchronize_session=False)
+    return changes
+
+
+def remove_missing_rows(db: Session, area_codes: Optional[Sequence[str]], content_type_ids: Optional[Sequence[str]],
+                        today: date, batch_size: int, stats: IngestStats, bus: ChangeEventBus) -> None:
+    """
+    이번 수집 범위(지역/관광타입) 안에서 이번에 안 나온 행 지우고 없어진 행 이벤트 내보내는거.
+    수집 끝까지 성공했을때만 불러야 함. 너무 많이 없어졌으면(API 쪽 문제일 수 있음) 안 지우고 경고만 남김.
+    """
+    scope = []
+    if area_codes:
+        scope.append(TouristInfo.region.in_([AREA_NAMES[code] for code in area_codes if code in AREA_NAMES]))
+    if content_type_ids:
+        scope.append(TouristInfo.content_type.in_([CONTENT_TYPE_NAMES[type_id] for type_id in content_type_ids
+                                                   if type_id in CONTENT_TYPE_NAMES]))
+    missing = [*scope, TouristInfo.last_crawled_date < today]
+
+    total = db.query(TouristInfo.id).filter(*scope).count()
+    missing_count = db.query(TouristInfo.id).filter(*missing).count()
+    if not missing_count:
+        return
+    if missing_count > total * TOUR_INGEST_MAX_REMOVE_RATIO:
+        logger.warning(f"[Ingest] 이번 수집에 안 나온 행이 너무 많아서({missing_count}/{total}건) 지우지 않습니다.")
+        return
+
+    columns = (TouristInfo.content_id, *(TouristInfo.__table__.c[name] for name in _COMPARE_COLUMNS))
+    while True:
+        found = db.execute(select(*columns).where(*missing).limit(batch_size)).mappings().all()
+        if not found:
+            break
+        try:
+            db.query(TouristInfo).filter(
+                TouristInfo.content_id.in_([row["content_id"] for row in found])
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        stats.removed += len(found)
+        bus.publish([TouristInfoChange(CHANGE_REMOVED, row["content_id"], before=_compare_values(row)) for row in found])
+    logger.info(f"[Ingest] 이번 수집에 안 나온 행 {stats.removed}건을 지웠습니다.")
+
+
+def build_sources(area_codes: Optional[Sequence[str]], content_type_ids: Optional[Sequence[str]],
+                  today: date) -> List[Tuple[str, Dict[str, Any]]]:
+    """(API 이름, 파라미터) 목록 만드는거. 지역 안 주면 전국 한번에 받음."""
+    areas: List[Dict[str, Any]] = [{"areaCode": code} for code in area_codes] if area_codes else [{}]
+    type_ids = list(content_type_ids) if content_type_ids else list(CONTENT_TYPE_NAMES)
+    sources = []
+    for area in areas:
+        for type_id in type_ids:
+            if type_id == FESTIVAL_CONTENT_TYPE_ID:
+                event_start = today - timedelta(days=TOUR_INGEST_FESTIVAL_LOOKBACK_DAYS)
+                sources.append((SEARCH_FESTIVAL, {**area, "eventStartDate": event_start.strftime("%Y%m%d"), "arrange": "C"}))
+            else:
+                sources.append((AREA_BASED_LIST, {**area, "contentTypeId": type_id, "arrange": "C"}))
+    return sources
+
+
+def ingest_tour_data(client: Optional[TourApiClient] = None, session_factory=SessionLocal,
+                     area_codes: Optional[Sequence[str]] = None, content_type_ids: Optional[Sequence[str]] = None,
+                     page_size: int = TOUR_INGEST_PAGE_SIZE, batch_size: int = TOUR_INGEST_BATCH_SIZE,
+                     today: Optional[date] = None, remove_missing: bool = True,
+                     bus: ChangeEventBus = tourist_info_changes) -> IngestStats:
+    """
+    Tour API 전부 받아서 tourist_info에 반영하고 바뀐 행 이벤트 내보내는거.
+
+    Args:
+        client (TourApiClient): 안 주면 TOUR_API_KEY로 만듦.
+        session_factory: DB 세션 만드는 함수.
+        area_codes: 가져올 지역코드들 (None이면 전국).
+        content_type_ids: 가져올 관광타입 ID들 (None이면 전부).
+        page_size (int): 페이지 하나 크기 (numOfRows).
+        batch_size (int): 한번에 비교/upsert/커밋할 행 수.
+        remove_missing (bool): 끝까지 받았을때 이번에 안 나온 행 지울지.
+        bus (ChangeEventBus): 변경 이벤트 보낼 곳.
+
+    Returns:
+        IngestStats: 처리 건수랑 걸린 시간.
+    """
+    today = today or date.today()
+    own_client = client is None
+    if own_client:
+        service_key = os.getenv("TOUR_API_KEY")
+        if not service_key:
+            raise ValueError("TOUR_API_KEY 환경 변수가 설정되지 않았습니다.")
+        client = TourApiClient(service_key)
+
+    stats = IngestStats()
+    started = time.perf_counter()
+
+    def _rows() -> Iterator[Dict[str, Any]]:
+        for operation, params in build_sources(area_codes, content_type_ids, today):
+            for item in client.iter_items(operation, params, page_size, stats):
+                stats.fetched += 1
+                # 축제는 searchFestival2에서 날짜까지 받아서, 목록 API에 섞여 나온건 건너뜀
+                if operation == AREA_BASED_LIST and str(item.get("contenttypeid")) == FESTIVAL_CONTENT_TYPE_ID:
+                    stats.skipped += 1
+                    continue
+                row = normalize_item(item, today)
+                if row is None:
+                    stats.skipped += 1
+                    continue
+                yield row
+
+    logger.info("[Ingest] Tour API 데이터 수집을 시작합니다.")
+    next_progress_log = 50_000
+    db = session_factory()
+    try:
+        for batch in _batched(_rows(), batch_size):
+            try:
+                changes = write_batch(db, batch, today, stats)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            bus.publish(changes)
+            if stats.fetched >= next_progress_log:
+                next_progress_log += 50_000
+                logger.info(f"[Ingest] 진행 중: {stats.fetched}건 ({stats.fetched / (time.perf_counter() - started):.0f}건/초)")
+        if remove_missing:
+            if stats.fetched > stats.skipped:
+                remove_missing_rows(db, area_codes, content_type_ids, today, batch_size, stats, bus)
+            else:
+                logger.warning("[Ingest] 받은 행이 없어서 없어진 행 정리는 건너뜁니다.")
+    finally:
+        db.close()
+        if own_client:
+            client.close()
+        # 중간에 실패했어도 커밋된 묶음 변경은 구독자들이 반영하게 알림
+        bus.complete()
+        stats.elapsed_seconds = time.perf_counter() - started
+
+    logger.info(f"[Ingest] 수집 완료: {stats.as_dict()}")
+    return stats
+
+
+# --- 매주 자동 갱신 ---
+
+async def _run_scheduled_ingest() -> None:
+    # 검증 캐시/공간 인덱스/응답 캐시는 변경 이벤트 받아서 바뀐 것만 고침 (app.py에서 구독 등록)
+    try:
+        await asyncio.to_thread(ingest_tour_data)
+    except Exception as e:
+        logger.error(f"[Ingest] 주간 Tour API 수집 실패: {e}", exc_info=True)
+
+
+def schedule_tour_data_update(run_now: bool = False):
+    """
+    매주 TOUR_INGEST_DAY_OF_WEEK TOUR_INGEST_HOUR시에 Tour API 수집 돌게 현재 이벤트 루프에 등록하는거.
+
+    Returns:
+        AsyncIOScheduler: 앱 꺼질때 `shutdown()` 불러야 함.
+    """
+    # 시작 시간 안 늘리게 실제로 켤때만 import함
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        _run_scheduled_ingest, "cron", day_of_week=TOUR_INGEST_DAY_OF_WEEK, hour=TOUR_INGEST_HOUR,
+        id="tour_ingest", max_instances=1, coalesce=True,
+        **({"next_run_time": datetime.now()} if run_now else {}),
+    )
+    scheduler.start()
+    logger.info(f"[Ingest] Tour API 수집을 매주 {TOUR_INGEST_DAY_OF_WEEK} {TOUR_INGEST_HOUR}시에 돌도록 등록했습니다.")
+    return scheduler
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Tour API 데이터를 tourist_info로 가져오기")
+    parser.add_argument("--area", action="append", help="지역코드 (여러번 줄 수 있음, 안 주면 전국)")
+    parser.add_argument("--content-type", action="append", help="관광타입 ID (여러번 줄 수 있음, 안 주면 전부)")
+    parser.add_argument("--page-size", type=int, default=TOUR_INGEST_PAGE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=TOUR_INGEST_BATCH_SIZE)
+    parser.add_argument("--keep-missing", action="store_true", help="이번에 안 나온 행 안 지움")
+    args = parser.parse_args()
+    # 따로 도는 프로세스라 인메모리 캐시는 없고, DB에 있는 검증 결과 지우는 용도로 구독함
+    subscribe_cache_invalidation()
+    print(ingest_tour_data(area_codes=args.area, content_type_ids=args.content_type, page_size=args.page_size,
+                           batch_size=args.batch_size, remove_missing=not args.keep_missing).as_dict())
@@ -0,0 +1,194 @@
+"""
+요청 하나에서 LLM 토큰/호출 수/웹 검색 수/걸린 시간을 단계별로 모으는 파일임.
+초기 일정 생성, 항목별 검증 Agent 같은 단계마다 LangChain 콜백 붙여서 집계하고,
+요청당 토큰 예산(REQUEST_TOKEN_BUDGET) 넘으면 남은 검증 Agent는 안 돌리거나 도는 중인거 끊음.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.models import RecommendationUsage, StageUsage
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+# 요청 하나가 쓸 수 있는 최대 토큰 수 (0이면 제한 없음)
+REQUEST_TOKEN_BUDGET = int(os.getenv("REQUEST_TOKEN_BUDGET", "0"))
+# 비용 추정용 단가 (USD / 100만 토큰). 기본값은 gpt-5-mini 기준.
+OPENAI_PROMPT_PRICE_PER_1M = float(os.getenv("OPENAI_PROMPT_PRICE_PER_1M", "0.25"))
+OPENAI_COMPLETION_PRICE_PER_1M = float(os.getenv("OPENAI_COMPLETION_PRICE_PER_1M", "2.0"))
+# 프롬프트 캐시에서 읽은 입력 토큰 단가 (보통 입력 단가의 1/10)
+OPENAI_CACHED_PROMPT_PRICE_PER_1M = float(os.getenv("OPENAI_CACHED_PROMPT_PRICE_PER_1M", "0.025"))
+
+# 단계 이름
+STAGE_INITIAL_GROUNDED = "initial:grounded"  # DB 후보로 LLM 한번 불러서 일정 생성
+STAGE_INITIAL_AGENT = "initial:agent"  # Agent(웹 검색)로 일정 생성
+STAGE_INITIAL_STRUCTURED = "initial:structured"  # 정해진 횟수만 웹 검색하고 구조화 출력 한번으로 일정 생성
+STAGE_VERIFY_PREFIX = "verify:"  # 뒤에 장소 이름 붙음
+STAGE_VERIFY_BATCH_PREFIX = "verify_batch:"  # 뒤에 같이 검증한 장소 이름들 붙음
+
+
+class TokenBudgetExceeded(Exception):
+    """요청 토큰 예산 넘었는데 LLM 또 부르려고 할때 나는 예외."""
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int, cached_prompt_tokens: int = 0) -> float:
+    """토큰 수로 대략적인 비용(USD) 계산하는거. `cached_prompt_tokens`는 `prompt_tokens`에 포함된 캐시 토큰 수."""
+    return ((prompt_tokens - cached_prompt_tokens) * OPENAI_PROMPT_PRICE_PER_1M
+            + cached_prompt_tokens * OPENAI_CACHED_PROMPT_PRICE_PER_1M
+            + completion_tokens * OPENAI_COMPLETION_PRICE_PER_1M) / 1_000_000
+
+
+def _token_usage(response: LLMResult) -> Dict[str, int]:
+    """
+    LLM 응답에서 토큰 사용량 꺼내는거. 메시지의 usage_metadata 먼저 보고 없으면 llm_output 봄.
+    프롬프트 캐시에서 읽은 입력 토큰 수(cached_prompt_tokens)도 같이 꺼냄 (prompt_tokens에 포함된 값).
+    """
+    prompt_tokens = completion_tokens = cached_prompt_tokens = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+                cached_prompt_tokens += (usage.get("input_token_details") or {}).get("cache_read") or 0
+                found = True
+    if not found:
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = token_usage.get("prompt_tokens", 0)
+        completion_tokens = token_usage.get("completion_tokens", 0)
+        cached_prompt_tokens = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "cached_prompt_tokens": cached_prompt_tokens}
+
+
+@dataclass
+class _StageStats:
+    name: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    llm_calls: int = 0
+    tool_calls: int = 0
+    wall_seconds: float = 0.0
+    aborted: bool = False
+
+    def to_model(self) -> StageUsage:
+        return StageUsage(
+            name=self.name,
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            cached_prompt_tokens=self.cached_prompt_tokens,
+            total_tokens=self.prompt_tokens + self.completion_tokens,
+            llm_calls=self.llm_calls,
+            tool_calls=self.tool_calls,
+            wall_seconds=round(self.wall_seconds, 3),
+            aborted=self.aborted,
+        )
+
+
+class StageUsageCallbackHandler(AsyncCallbackHandler):
+    """
+    단계 하나에 붙이는 LangChain 콜백. LLM 응답마다 토큰 더하고, 도구 호출 수 셈.
+    예산 넘은 상태에서 LLM 또 부르려고 하면 TokenBudgetExceeded 던져서 Agent 실행 끊음.
+    """
+
+    raise_error = True
+
+    def __init__(self, tracker: "UsageTracker", stats: _StageStats):
+        self._tracker = tracker
+        self._stats = stats
+
+    def _check_budget(self) -> None:
+        if self._tracker.budget_exceeded:
+            self._stats.aborted = True
+            raise TokenBudgetExceeded(f"요청 토큰 예산 {self._tracker.budget}을 넘었습니다.")
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._check_budget()
+
+    async def on_llm_start(self, serialized: Dict[str, Any], prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._check_budget()
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        usage = _token_usage(response)
+        self._stats.llm_calls += 1
+        self._stats.prompt_tokens += usage["prompt_tokens"]
+        self._stats.completion_tokens += usage["completion_tokens"]
+        self._stats.cached_prompt_tokens += usage["cached_prompt_tokens"]
+
+    async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._stats.tool_calls += 1
+
+
+class UsageTracker:
+    """
+    요청 하나의 단계별 사용량 모으는거. 요청마다 새로 만들어서 넘겨줌.
+
+    Args:
+        budget (int): 요청당 최대 토큰 수. 0이면 제한 없음.
+    """
+
+    def __init__(self, budget: int = REQUEST_TOKEN_BUDGET):
+        self.budget = budget
+        self._stages: List[_StageStats] = []
+        self._started_at = time.perf_counter()
+        self.skipped_verifications = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(stage.prompt_tokens + stage.completion_tokens for stage in self._stages)
+
+    @property
+    def budget_exceeded(self) -> bool:
+        return self.budget > 0 and self.total_tokens >= self.budget
+
+    @contextmanager
+    def track(self, stage_name: str) -> Iterator[StageUsageCallbackHandler]:
+        """
+        단계 하나 시간 재면서 그 단계용 콜백 돌려주는거.
+
+        사용 예:
+            with usage.track(STAGE_INITIAL_GROUNDED) as callback:
+                await llm.ainvoke(prompt, config={"callbacks": [callback]})
+        """
+        stats = _StageStats(name=stage_name)
+        self._stages.append(stats)
+        started = time.perf_counter()
+        try:
+            yield StageUsageCallbackHandler(self, stats)
+        finally:
+            stats.wall_seconds += time.perf_counter() - started
+
+    def skip_verification(self, item_name: str) -> None:
+        """예산 넘어서 검증 Agent 안 돌린 항목 세는거."""
+        self.skipped_verifications += 1
+        logger.warning(f"[Usage] 토큰 예산({self.budget}) 초과로 {item_name} 검증을 건너뜁니다.")
+
+    def summary(self) -> RecommendationUsage:
+        """지금까지 모은 사용량 응답 모델로 만드는거."""
+        prompt_tokens = sum(stage.prompt_tokens for stage in self._stages)
+        completion_tokens = sum(stage.completion_tokens for stage in self._stages)
+        cached_prompt_tokens = sum(stage.cached_prompt_tokens for stage in self._stages)
+        return RecommendationUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            cached_prompt_tokens=cached_prompt_tokens,
+            llm_calls=sum(stage.llm_calls for stage in self._stages),
+            tool_calls=sum(stage.tool_calls for stage in self._stages),
+            wall_seconds=round(time.perf_counter() - self._started_at, 3),
+            estimated_cost_usd=round(estimate_cost(prompt_tokens, completion_tokens, cached_prompt_tokens), 6),
+            budget=self.budget or None,
+            budget_exceeded=self.budget_exceeded,
+            skipped_verifications=self.skipped_verifications,
+            stages=[stage.to_model() for stage in self._stages],
+        )
@@ -0,0 +1,277 @@
+"""
+Agent 실시간 검증 결과 캐시하는 파일임.
+프로세스 안의 LRU 캐시 -> DB(verification_cache 테이블) 순서로 찾아보고,
+오래된 결과는 일단 바로 돌려준 다음 백그라운드에서 다시 검증함 (stale-while-revalidate).
+"""
+
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from src.cache import TTLCache, normalize_text
+from src.change_events import TouristInfoChange
+from src.db import SessionLocal
+from src.models import VerificationDetails
+from src.openapi import VerificationCache
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+# 콘텐츠 종류별로 검증 결과 믿을 수 있는 기간. 축제는 금방 바뀌고 박물관 같은건 잘 안 바뀜.
+CONTENT_TYPE_TTLS: Dict[str, timedelta] = {
+    "축제/행사": timedelta(hours=6),
+    "음식점": timedelta(days=3),
+    "쇼핑": timedelta(days=3),
+    "숙박": timedelta(days=3),
+    "레포츠": timedelta(days=7),
+    "관광지": timedelta(days=14),
+    "문화시설": timedelta(days=30),
+}
+DEFAULT_TTL = timedelta(days=3)
+
+# TTL 지나고도 이 기간까지는 오래된 결과 먼저 돌려주고 백그라운드에서 갱신함
+MAX_STALE = timedelta(days=7)
+
+# tourist_info에서 이 컬럼들이 바뀌면 검증 결과 다시 받아야 함 (이미지/카테고리 같은건 검증이랑 상관없음)
+VERIFIED_COLUMNS = ("name_ko", "address", "content_type", "start_date", "end_date", "operating_hours")
+
+Verifier = Callable[[], Awaitable[Optional[VerificationDetails]]]
+
+
+def make_verification_key(item_name: str, start_date: Optional[date], end_date: Optional[date], operating_hours: Optional[str]) -> str:
+    """정규화된 이름 + 시작일 + 종료일 + 운영시간으로 캐시 키 만드는거."""
+    raw = "|".join([
+        normalize_text(item_name),
+        start_date.isoformat() if start_date else "",
+        end_date.isoformat() if end_date else "",
+        normalize_text(operating_hours or ""),
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def infer_content_type(start_date: Optional[date], end_date: Optional[date]) -> Optional[str]:
+    """콘텐츠 종류 모를때 날짜 있으면 축제/행사로 보는거."""
+    if start_date or end_date:
+        return "축제/행사"
+    return None
+
+
+def ttl_for(content_type: Optional[str]) -> timedelta:
+    """콘텐츠 종류별 TTL 돌려주는거."""
+    return CONTENT_TYPE_TTLS.get(content_type or "", DEFAULT_TTL)
+
+
+@dataclass(frozen=True)
+class CachedVerification:
+    """캐시에 들어가는 검증 결과 한 건."""
+    details: VerificationDetails
+    verified_at: datetime
+    expires_at: datetime
+
+    def is_fresh(self, now: datetime) -> bool:
+        return now < self.expires_at
+
+    def is_servable(self, now: datetime) -> bool:
+        return now < self.expires_at + MAX_STALE
+
+
+class VerificationResultCache:
+    """
+    검증 결과 2단 캐시임 (인메모리 LRU -> DB).
+
+    Args:
+        session_factory: DB 세션 만드는 함수. 기본은 db.py의 SessionLocal.
+        maxsize (int): 인메모리 LRU 최대 항목 수.
+    """
+
+    def __init__(self, session_factory=SessionLocal, maxsize: int = 2048):
+        self._session_factory = session_factory
+        self._lru = TTLCache(maxsize=maxsize, ttl=(DEFAULT_TTL + MAX_STALE).total_seconds())
+        self._refreshing: Set[str] = set()
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    # --- DB 접근 (동기 세션이라 스레드에서 돌림) ---
+
+    def _load_from_db(self, key: str) -> Optional[CachedVerification]:
+        db = self._session_factory()
+        try:
+            row = db.get(VerificationCache, key)
+            if row is None:
+                return None
+            return CachedVerification(
+                details=VerificationDetails(**row.details_json),
+                verified_at=row.verified_at,
+                expires_at=row.expires_at,
+            )
+        finally:
+            db.close()
+
+    def _save_to_db(self, key: str, item_name: str, content_type: Optional[str], start_date: Optional[date],
+                    end_date: Optional[date], operating_hours: Optional[str], entry: CachedVerification,
+                    content_id: Optional[str] = None) -> None:
+        row = dict(
+            cache_key=key,
+            item_name=item_name,
+            content_type=content_type,
+            start_date=start_date,
+            end_date=end_date,
+            operating_hours=operating_hours,
+            details_json=entry.details.model_dump(),
+            verified_at=entry.verified_at,
+            expires_at=entry.expires_at,
+        )
+        if content_id is not None:
+            # 요청 중에 검증한 결과(content_id 모름)가 덮어써도 미리 검증할때 넣은 content_id는 남게 있을때만 넣음
+            row["content_id"] = content_id
+        db = self._session_factory()
+        try:
+            try:
+                db.merge(VerificationCache(**row))
+                db.commit()
+            except IntegrityError:
+                # 같은 키를 다른 요청이 방금 넣었으면 (merge가 SELECT 후 INSERT라 생김) 한번 더 하면 UPDATE로 감
+                db.rollback()
+                db.merge(VerificationCache(**row))
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # --- 캐시 조회/저장 ---
+
+    async def get(self, key: str) -> Optional[CachedVerification]:
+        """LRU 먼저 보고 없으면 DB에서 찾는거. 너무 오래된 결과는 없는걸로 침."""
+        now = datetime.now()
+        entry = self._lru.get(key)
+        if entry is None:
+            try:
+                entry = await asyncio.to_thread(self._load_from_db, key)
+            except Exception as e:
+                logger.error(f"[VerifyCache] DB 조회 중 오류 발생: {e}")
+                return None
+            if entry is None:
+                return None
+        if not entry.is_servable(now):
+            self._lru.pop(key)
+            return None
+        self._lru.set(key, entry, ttl=(entry.expires_at + MAX_STALE - now).total_seconds())
+        return entry
+
+    async def put(self, key: str, item_name: str, content_type: Optional[str], start_date: Optional[date],
+                  end_date: Optional[date], operating_hours: Optional[str], details: VerificationDetails,
+                  content_id: Optional[str] = None) -> CachedVerification:
+        """검증 결과 LRU랑 DB에 저장하는거. DB 저장 실패해도 LRU엔 남김. `content_id`는 tourist_info 행에서 온 항목일때만 줌."""
+        now = datetime.now()
+        entry = CachedVerification(details=details, verified_at=now, expires_at=now + ttl_for(content_type))
+        self._lru.set(key, entry, ttl=(entry.expires_at + MAX_STALE - now).total_seconds())
+        try:
+            await asyncio.to_thread(self._save_to_db, key, item_name, content_type, start_date, end_date, operating_hours, entry, content_id)
+        except Exception as e:
+            logger.error(f"[VerifyCache] DB 저장 중 오류 발생 ({item_name}): {e}")
+        return entry
+
+    def invalidate(self, key: str) -> None:
+        """인메모리 항목 지우는거."""
+        self._lru.pop(key)
+
+    def invalidate_tourist_info(self, changes: Sequence[TouristInfoChange]) -> int:
+        """
+        바뀌거나 없어진 tourist_info 행 검증 결과 LRU랑 DB에서 지우는거 (change_events 구독용).
+        수집 스레드에서 동기로 불림. 이름/주소/날짜/운영시간/종류 안 바뀐 행(이미지만 바뀐 행 등)은 그대로 둠.
+        요청 중에 검증한 결과는 바뀌기 전 값으로 만든 키로, 미리 검증한 결과는 content_id로 찾음.
+
+        Returns:
+            int: DB에서 지운 행 수.
+        """
+        keys, content_ids = set(), set()
+        for change in changes:
+            if change.before is None or not change.touches(VERIFIED_COLUMNS):
+                continue
+            before = change.before
+            keys.add(make_verification_key(before["name_ko"], before["start_date"], before["end_date"], before["operating_hours"]))
+            content_ids.add(change.content_id)
+        if not keys:
+            return 0
+
+        db = self._session_factory()
+        try:
+            keys.update(db.scalars(select(VerificationCache.cache_key).where(VerificationCache.content_id.in_(content_ids))))
+            deleted = db.query(VerificationCache).filter(VerificationCache.cache_key.in_(keys)).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+            for key in keys:
+                self._lru.pop(key)
+        if deleted:
+            logger.info(f"[VerifyCache] 관광 정보가 바뀐 항목 검증 결과 {deleted}건을 지웠습니다.")
+        return deleted
+
+    async def get_or_verify(
+        self,
+        item_name: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        operating_hours: Optional[str],
+        verify: Verifier,
+        content_type: Optional[str] = None,
+    ) -> Tuple[Optional[VerificationDetails], str]:
+        """
+        캐시에 있으면 바로 돌려주고, 없으면 `verify` 불러서 검증한 다음 저장하는거.
+
+        Args:
+            verify: 실제 검증 돌리는 코루틴 함수. 캐시하면 안되는 결과(에러 등)면 None 반환해야 함.
+
+        Returns:
+            Tuple[Optional[VerificationDetails], str]: (검증 결과, 캐시 상태 "hit" | "stale" | "miss")
+        """
+        content_type = content_type or infer_content_type(start_date, end_date)
+        key = make_verification_key(item_name, start_date, end_date, operating_hours)
+
+        entry = await self.get(key)
+        if entry is not None:
+            if entry.is_fresh(datetime.now()):
+                return entry.details, "hit"
+            self._schedule_refresh(key, item_name, content_type, start_date, end_date, operating_hours, verify)
+            return entry.details, "stale"
+
+        details = await verify()
+        if details is not None:
+            await self.put(key, item_name, content_type, start_date, end_date, operating_hours, details)
+        return details, "miss"
+
+    def _schedule_refresh(self, key: str, item_name: str, content_type: Optional[str], start_date: Optional[date],
+                          end_date: Optional[date], operating_hours: Optional[str], verify: Verifier) -> None:
+        """오래된 항목 백그라운드에서 다시 검증하는거. 같은 키는 한번만 돌림."""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def _refresh():
+            try:
+                details = await verify()
+                if details is not None:
+                    await self.put(key, item_name, content_type, start_date, end_date, operating_hours, details)
+                    logger.info(f"[VerifyCache] {item_name} 백그라운드 재검증 완료.")
+            except Exception as e:
+                logger.error(f"[VerifyCache] {item_name} 백그라운드 재검증 중 오류 발생: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(_refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+
+# 프로세스 전체에서 같이 쓰는 캐시 인스턴스
+verification_cache = VerificationResultCache()
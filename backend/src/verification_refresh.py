@@ -0,0 +1,339 @@
+"""
+`is_variable` 관광 정보랑 다가오는 축제/행사를 백그라운드에서 미리 검증해두는 파일임.
+검증을 사용자 요청 안에서만 하다보니 처음 보는 항목마다 요청이 Agent 기다려야 했는데,
+APScheduler로 주기적으로 돌면서 검증 결과 캐시(verification_cache)를 미리 채워둠.
+/recommend는 DB 후보 항목을 검증할때 같은 캐시 키로 찾아서 Agent 안 띄우고 저장된 결과 씀.
+
+- 대상: `is_variable=True` 행 + VERIFICATION_REFRESH_EVENT_HORIZON_DAYS일 안에 시작하는 축제/행사 (끝난 행사는 뺌)
+- 순서: 검증 결과 없는거 먼저, 그 안에서 축제/행사 먼저 + 시작일 빠른 순, 그 다음 오래된 순
+- 곧 만료될 결과(VERIFICATION_REFRESH_AHEAD_MINUTES 안)도 미리 다시 검증함
+- 한번 돌때 최대 항목 수 + 토큰 예산 넘으면 멈춤. 검증 스케줄러에 PRIORITY_BACKGROUND로 넣어서 사용자 요청이 먼저 돎
+- upstream 레이트 리밋(rate_limit.py)은 사용자 요청이랑 같이 씀
+
+실행 방법 (backend 폴더에서, 한번만 돌리기):
+    python -m src.verification_refresh
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, or_, select
+from sqlalchemy.orm import Session
+
+from src.db import SessionLocal
+from src.llm import (
+    VERIFICATION_BATCH_SIZE,
+    VERIFICATION_TIMEOUT_SECONDS,
+    _interpret_verification_result,
+    verify_items_batch,
+    verify_recommendation_with_agent,
+)
+from src.models import RecommendationItem, VerificationDetails
+from src.openapi import TouristInfo, VerificationCache
+from src.usage import STAGE_VERIFY_BATCH_PREFIX, STAGE_VERIFY_PREFIX, UsageTracker
+from src.verification_cache import make_verification_key, verification_cache
+from src.verification_scheduler import PRIORITY_BACKGROUND, verification_scheduler
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+# 돈 드는 작업이라 기본은 꺼둠 (1이면 앱 시작할때 스케줄 등록함)
+VERIFICATION_REFRESH_ENABLED = os.getenv("VERIFICATION_REFRESH_ENABLED", "0") != "0"
+VERIFICATION_REFRESH_INTERVAL_MINUTES = float(os.getenv("VERIFICATION_REFRESH_INTERVAL_MINUTES", "60"))
+# 한번 돌때 검증할 최대 항목 수랑 토큰 예산 (0이면 토큰 예산 없음)
+VERIFICATION_REFRESH_MAX_ITEMS = int(os.getenv("VERIFICATION_REFRESH_MAX_ITEMS", "40"))
+VERIFICATION_REFRESH_TOKEN_BUDGET = int(os.getenv("VERIFICATION_REFRESH_TOKEN_BUDGET", "300000"))
+VERIFICATION_REFRESH_EVENT_HORIZON_DAYS = int(os.getenv("VERIFICATION_REFRESH_EVENT_HORIZON_DAYS", "30"))
+# 이 시간 안에 만료될 결과도 미리 다시 검증함 (다음 실행 전에 만료돼서 요청이 Agent 띄우는거 막으려고 기본은 실행 간격의 2배)
+VERIFICATION_REFRESH_AHEAD_MINUTES = float(
+    os.getenv("VERIFICATION_REFRESH_AHEAD_MINUTES", str(VERIFICATION_REFRESH_INTERVAL_MINUTES * 2))
+)
+
+
+@dataclass(frozen=True)
+class RefreshTarget:
+    """미리 검증할 관광 정보 한 건."""
+    content_id: str
+    content_type: str
+    item: RecommendationItem
+    cache_key: str
+    expires_at: Optional[datetime]
+
+    @property
+    def is_event(self) -> bool:
+        return bool(self.item.start_date or self.item.end_date)
+
+    def sort_key(self):
+        return (
+            self.expires_at is not None,
+            not self.is_event,
+            self.item.start_date or date.max,
+            self.expires_at or datetime.min,
+        )
+
+
+# 대상 찾을때 읽는 컬럼 (ORM 객체 전체 안 만듦)
+_TARGET_COLUMNS = (
+    TouristInfo.content_id, TouristInfo.name_ko, TouristInfo.address, TouristInfo.latitude, TouristInfo.longitude,
+    TouristInfo.image_url, TouristInfo.start_date, TouristInfo.end_date, TouristInfo.operating_hours, TouristInfo.content_type,
+)
+# 대상 후보 행 한번에 읽는 개수 (이만큼씩 캐시 만료 시각 조회함)
+REFRESH_SCAN_PAGE_SIZE = 500
+
+
+def _to_item(row) -> RecommendationItem:
+    return RecommendationItem(
+        name=row.name_ko,
+        description="",
+        activity="",
+        address=row.address,
+        latitude=float(row.latitude),
+        longitude=float(row.longitude),
+        image_url=row.image_url,
+        start_date=row.start_date,
+        end_date=row.end_date,
+        operating_hours=row.operating_hours,
+        content_type=row.content_type,
+    )
+
+
+def find_refresh_targets(db, now: datetime, limit: int) -> List[RefreshTarget]:
+    """
+    검증 결과가 없거나 곧 만료되는 대상 행 찾아서 순서대로 `limit`개 돌려주는거.
+    캐시 키가 이름/날짜/운영시간으로 만들어져서, 운영시간 바뀐 행은 예전 결과 있어도 새로 검증함.
+
+    캐시 키는 파이썬에서 만들어서 DB에서 바로 조인이 안 되니까, 대상 행을 검증 결과 없을때 순서
+    (축제/행사 먼저, 시작일 빠른 순)로 정렬해서 필요한 컬럼만 REFRESH_SCAN_PAGE_SIZE개씩 흘려 읽고 묶음마다 만료 시각 조회함.
+    검증 결과 없는 행이 `limit`개 모이면 거기서 멈추고, 곧 만료되는 행은 `limit`개까지만 들고 있음.
+    """
+    if limit <= 0:
+        return []
+    today = now.date()
+    is_event = or_(TouristInfo.start_date.isnot(None), TouristInfo.end_date.isnot(None))
+    stmt = (
+        select(*_TARGET_COLUMNS)
+        .where(
+            or_(TouristInfo.is_variable.is_(True), TouristInfo.start_date.isnot(None)),
+            or_(TouristInfo.end_date.is_(None), TouristInfo.end_date >= today),
+            or_(TouristInfo.start_date.is_(None), TouristInfo.start_date <= today + timedelta(days=VERIFICATION_REFRESH_EVENT_HORIZON_DAYS)),
+        )
+        .order_by(case((is_event, 0), else_=1), TouristInfo.start_date.is_(None), TouristInfo.start_date, TouristInfo.id)
+    )
+
+    refresh_before = now + timedelta(minutes=VERIFICATION_REFRESH_AHEAD_MINUTES)
+    missing: List[RefreshTarget] = []
+    expiring: List[RefreshTarget] = []
+    # 대상 행은 흘려 읽는 중이라 (MySQL은 서버 커서) 만료 시각은 다른 커넥션으로 조회함
+    lookup = Session(bind=db.get_bind())
+    try:
+        result = db.execute(stmt.execution_options(yield_per=REFRESH_SCAN_PAGE_SIZE))
+        for rows in result.partitions():
+            keys = [make_verification_key(row.name_ko, row.start_date, row.end_date, row.operating_hours) for row in rows]
+            expirations: Dict[str, datetime] = dict(lookup.execute(
+                select(VerificationCache.cache_key, VerificationCache.expires_at).where(VerificationCache.cache_key.in_(set(keys)))
+            ).all())
+            for row, cache_key in zip(rows, keys):
+                expires_at = expirations.get(cache_key)
+                if expires_at is None:
+                    missing.append(RefreshTarget(row.content_id, row.content_type, _to_item(row), cache_key, None))
+                elif expires_at <= refresh_before:
+                    expiring.append(RefreshTarget(row.content_id, row.content_type, _to_item(row), cache_key, expires_at))
+            expiring = heapq.nsmallest(limit, expiring, key=RefreshTarget.sort_key)
+            if len(missing) >= limit:
+                result.close()
+                break
+    finally:
+        lookup.close()
+    # 검증 결과 없는건 이미 정렬 순서대로 모였음 (sort_key에서 만료 시각 없는게 먼저라 곧 만료되는건 그 뒤)
+    return (missing + expiring)[:limit]
+
+
+def _load_targets(limit: int) -> List[RefreshTarget]:
+    db = SessionLocal()
+    try:
+        return find_refresh_targets(db, datetime.now(), limit)
+    finally:
+        db.close()
+
+
+class VerificationRefresher:
+    """
+    미리 검증하는 작업 주기적으로 돌리는거. `start()` 하면 AsyncIOScheduler에 등록되고,
+    `run_once()`는 스케줄 없이 한번만 돌릴때 씀 (실행 중이면 겹쳐서 안 돌림).
+
+    Args:
+        max_items (int): 한번 돌때 검증할 최대 항목 수.
+        token_budget (int): 한번 돌때 쓸 수 있는 토큰 수 (0이면 제한 없음).
+    """
+
+    def __init__(self, max_items: int = VERIFICATION_REFRESH_MAX_ITEMS, token_budget: int = VERIFICATION_REFRESH_TOKEN_BUDGET):
+        self.max_items = max_items
+        self.token_budget = token_budget
+        self._scheduler = None
+        self._current: Optional[asyncio.Task] = None
+        # 지표
+        self.runs = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.skipped_budget = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration_seconds = 0.0
+        self.last_targets = 0
+        self.last_tokens = 0
+
+    def start(self, interval_minutes: float = VERIFICATION_REFRESH_INTERVAL_MINUTES) -> None:
+        """현재 이벤트 루프에 주기 작업 등록하는거. 첫 실행은 바로 함."""
+        # 시작 시간 안 늘리게 실제로 켤때만 import함
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        self._scheduler = AsyncIOScheduler()
+        self._scheduler.add_job(
+            self.run_once, "interval", minutes=interval_minutes, id="verification_refresh",
+            max_instances=1, coalesce=True, next_run_time=datetime.now(),
+        )
+        self._scheduler.start()
+        logger.info(f"[Refresh] 미리 검증 작업을 {interval_minutes:g}분마다 돌도록 등록했습니다.")
+
+    async def aclose(self) -> None:
+        """스케줄 멈추고 돌던 작업 취소하는거."""
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+        if self._current is not None and not self._current.done():
+            self._current.cancel()
+            await asyncio.gather(self._current, return_exceptions=True)
+
+    async def run_once(self) -> Dict[str, int]:
+        """
+        대상 찾아서 검증하고 캐시에 저장하는거.
+
+        Returns:
+            Dict[str, int]: 대상 수, 검증 성공 수, 실패 수, 예산 넘어서 못한 수.
+        """
+        if self._current is not None and not self._current.done():
+            logger.info("[Refresh] 이전 미리 검증 작업이 아직 돌고 있어서 건너뜁니다.")
+            return {"targets": 0, "refreshed": 0, "failed": 0, "skipped": 0}
+        self._current = asyncio.current_task()
+        started = time.perf_counter()
+        self.runs += 1
+        self.last_run_at = datetime.now()
+        try:
+            targets = await asyncio.to_thread(_load_targets, self.max_items)
+            self.last_targets = len(targets)
+            if not targets:
+                return {"targets": 0, "refreshed": 0, "failed": 0, "skipped": 0}
+            logger.info(f"[Refresh] 미리 검증할 항목 {len(targets)}개를 찾았습니다.")
+            result = await self._refresh(targets)
+            logger.info(f"[Refresh] 미리 검증 완료 (성공 {result['refreshed']}, 실패 {result['failed']}, "
+                        f"예산 초과로 못함 {result['skipped']}, {time.perf_counter() - started:.1f}초).")
+            return result
+        except Exception as e:
+            logger.error(f"[Refresh] 미리 검증 중 오류 발생: {e}", exc_info=True)
+            return {"targets": self.last_targets, "refreshed": 0, "failed": self.last_targets, "skipped": 0}
+        finally:
+            self.last_duration_seconds = time.perf_counter() - started
+            self._current = None
+
+    async def _refresh(self, targets: List[RefreshTarget]) -> Dict[str, int]:
+        usage = UsageTracker(budget=self.token_budget)
+        counts = {"targets": len(targets), "refreshed": 0, "failed": 0, "skipped": 0}
+        group_size = max(VERIFICATION_BATCH_SIZE, 1)
+        # 묶음 하나씩 차례로 돌려서 백그라운드 작업이 검증 스케줄러 워커 다 안 잡게 함
+        for start in range(0, len(targets), group_size):
+            group = targets[start:start + group_size]
+            if usage.budget_exceeded:
+                counts["skipped"] += len(group)
+                continue
+            resolved = await self._verify_group(group, usage)
+            for target in group:
+                details = resolved.get(target.cache_key)
+                if details is None:
+                    counts["failed"] += 1
+                    continue
+                item = target.item
+                await verification_cache.put(target.cache_key, item.name, target.content_type, item.start_date,
+                                             item.end_date, item.operating_hours, details, content_id=target.content_id)
+                counts["refreshed"] += 1
+
+        self.refreshed += counts["refreshed"]
+        self.failed += counts["failed"]
+        self.skipped_budget += counts["skipped"]
+        self.last_tokens = usage.total_tokens
+        return counts
+
+    async def _verify_group(self, group: List[RefreshTarget], usage: UsageTracker) -> Dict[str, VerificationDetails]:
+        """묶음 검증 먼저 하고, 못 찾은 항목만 항목별 Agent로 검증하는거. {캐시 키: 검증 결과} 돌려줌."""
+        resolved: Dict[str, VerificationDetails] = {}
+        if len(group) > 1:
+            items = [target.item for target in group]
+
+            async def _run_batch() -> Dict[int, VerificationDetails]:
+                with usage.track(STAGE_VERIFY_BATCH_PREFIX + ", ".join(item.name for item in items)) as callback:
+                    return await asyncio.wait_for(verify_items_batch(items, [callback]), timeout=VERIFICATION_TIMEOUT_SECONDS)
+
+            try:
+                # 사용자 요청 묶음 검증이랑 키 형식 같아서, 같은 묶음 돌고 있으면 그 결과 같이 받음
+                batch = await verification_scheduler.submit(
+                    "batch:" + "|".join(target.cache_key for target in group), _run_batch, priority=PRIORITY_BACKGROUND
+                )
+                resolved.update({group[index].cache_key: details for index, details in batch.items()})
+            except Exception as e:
+                logger.warning(f"[Refresh] 묶음 검증 실패, 항목별로 검증합니다: {e}")
+
+        async def _verify_one(target: RefreshTarget) -> None:
+            if usage.budget_exceeded:
+                return
+            item = target.item
+
+            async def _agent_run() -> str:
+                with usage.track(f"{STAGE_VERIFY_PREFIX}{item.name}") as callback:
+                    return await verify_recommendation_with_agent(
+                        item.name,
+                        item.start_date.isoformat() if item.start_date else None,
+                        item.end_date.isoformat() if item.end_date else None,
+                        item.operating_hours,
+                        callbacks=[callback],
+                    )
+
+            # 사용자 요청 항목별 검증이랑 같은 키라 동시에 돌면 한번만 돎
+            result = await verification_scheduler.submit(target.cache_key, _agent_run, priority=PRIORITY_BACKGROUND)
+            outcome = _interpret_verification_result(item.name, result)
+            if outcome.cacheable:
+                resolved[target.cache_key] = outcome.details
+
+        await asyncio.gather(*(_verify_one(target) for target in group if target.cache_key not in resolved))
+        return resolved
+
+    def stats(self) -> Dict[str, Any]:
+        """실행 횟수, 누적 성공/실패 수, 마지막 실행 정보 돌려주는거."""
+        return {
+            "enabled": self._scheduler is not None,
+            "running": self._current is not None,
+            "runs": self.runs,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "skipped_budget": self.skipped_budget,
+            "last_targets": self.last_targets,
+            "last_tokens": self.last_tokens,
+            "last_duration_seconds": round(self.last_duration_seconds, 3),
+        }
+
+
+# 프로세스 전체에서 같이 쓰는 인스턴스
+verification_refresher = VerificationRefresher()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    async def _main():
+        print(await verification_refresher.run_once())
+        await verification_scheduler.aclose()
+
+    asyncio.run(_main())
@@ -0,0 +1,192 @@
+"""
+Agent 검증 작업을 프로세스 전체에서 줄 세워서 돌리는 스케줄러 파일임.
+요청마다 항목 수만큼 Agent를 한꺼번에 띄우던걸, 정해진 수의 워커만 돌리게 바꿈.
+
+- 동시에 도는 검증 수 제한 (VERIFICATION_MAX_CONCURRENCY)
+- 우선순위 큐: 축제/행사(날짜 있는 항목) 먼저, 그 다음 나머지 변동 항목
+- 같은 키(같은 장소/날짜/운영시간) 검증이 이미 줄 서있거나 도는 중이면 새로 안 띄우고 그 결과 같이 씀
+  (줄 서있는 작업보다 우선순위 높은 요청이 오면 같은 결과를 받는 작업을 그 우선순위로 한번 더 줄 세움)
+- 큐 길이, 대기 시간 같은 지표 `stats()`로 확인 가능
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+# 로거 설정하는거
+logger = logging.getLogger(__name__)
+
+VERIFICATION_MAX_CONCURRENCY = int(os.getenv("VERIFICATION_MAX_CONCURRENCY", "4"))
+
+# 우선순위 (숫자 작을수록 먼저)
+PRIORITY_EVENT = 0  # 축제/행사: 금방 끝나거나 취소될 수 있어서 제일 먼저 확인함
+PRIORITY_VARIABLE = 1  # 운영 시간/가격 바뀔 수 있는 일반 항목
+PRIORITY_BACKGROUND = 2  # 캐시 갱신 같은 급하지 않은 작업
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    sequence: int
+    key: str = field(compare=False)
+    run: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class VerificationScheduler:
+    """
+    우선순위 큐 + 고정 워커 수로 검증 작업 돌리는 스케줄러임.
+    워커는 처음 작업 들어올때 현재 이벤트 루프에 만들어짐.
+
+    Args:
+        max_concurrency (int): 동시에 돌릴 검증 작업 수.
+    """
+
+    def __init__(self, max_concurrency: int = VERIFICATION_MAX_CONCURRENCY):
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency는 1 이상이어야 합니다.")
+        self.max_concurrency = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: list = []
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._queued_priority: Dict[str, int] = {}  # 아직 시작 안 한 키 -> 제일 높은 우선순위
+        self._started: Set[asyncio.Future] = set()
+        self._sequence = itertools.count()
+        self._running = 0
+        # 지표
+        self.submitted = 0
+        self.deduplicated = 0
+        self.promoted = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        # 이벤트 루프 바뀌었으면(테스트, 재시작 등) 큐랑 워커 새로 만듦
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        self._inflight.clear()
+        self._queued_priority.clear()
+        self._started.clear()
+        self._running = 0
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    async def _worker(self) -> None:
+        while True:
+            job: _Job = await self._queue.get()
+            # 우선순위 올리면서 한번 더 넣은 작업은 먼저 꺼낸 쪽만 돌림
+            if job.future.done() or job.future in self._started:
+                self._queue.task_done()
+                continue
+            self._started.add(job.future)
+            if self._inflight.get(job.key) is job.future:
+                self._queued_priority.pop(job.key, None)
+            try:
+                wait = time.monotonic() - job.enqueued_at
+                self.total_wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+                self._running += 1
+                try:
+                    result = await job.run()
+                except asyncio.CancelledError:
+                    job.future.cancel()
+                    raise
+                except Exception as e:
+                    self.failed += 1
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                        # 기다리는 쪽이 다 떠났을 수도 있어서 예외 확인한걸로 표시해둠
+                        job.future.exception()
+                else:
+                    self.completed += 1
+                    if not job.future.done():
+                        job.future.set_result(result)
+                finally:
+                    self._running -= 1
+            finally:
+                self._started.discard(job.future)
+                if self._inflight.get(job.key) is job.future:
+                    del self._inflight[job.key]
+                self._queue.task_done()
+
+    async def submit(self, key: str, run: Callable[[], Awaitable[Any]], priority: int = PRIORITY_VARIABLE) -> Any:
+        """
+        검증 작업 줄 세우고 결과 나올때까지 기다리는거.
+        같은 `key` 작업이 이미 있으면 새로 안 만들고 그 결과 같이 받음.
+        아직 줄 서있는 작업인데 이번 `priority`가 더 높으면 같은 결과 받는 작업을 이 우선순위로 한번 더 넣음.
+
+        Args:
+            key (str): 중복 판단용 키 (검증 캐시 키랑 같은거 씀).
+            run: 실제 작업 돌리는 코루틴 함수.
+            priority (int): 우선순위 (PRIORITY_EVENT, PRIORITY_VARIABLE, PRIORITY_BACKGROUND).
+
+        Returns:
+            `run()`이 돌려준 값.
+        """
+        self._ensure_workers()
+        future = self._inflight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            logger.info("[Scheduler] 같은 항목 검증이 이미 진행 중이라 결과를 같이 받습니다.")
+            queued_priority = self._queued_priority.get(key)
+            if queued_priority is not None and priority < queued_priority:
+                self._queued_priority[key] = priority
+                self._enqueue(_Job(priority, next(self._sequence), key, run, future, time.monotonic()))
+                self.promoted += 1
+        else:
+            future = self._loop.create_future()
+            self._inflight[key] = future
+            self._queued_priority[key] = priority
+            self._enqueue(_Job(priority, next(self._sequence), key, run, future, time.monotonic()))
+            self.submitted += 1
+        # 기다리던 요청 하나가 끊겨도 같은 작업 기다리는 다른 요청엔 영향 없게 shield 씀
+        return await asyncio.shield(future)
+
+    def _enqueue(self, job: _Job) -> None:
+        self._queue.put_nowait(job)
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    def stats(self) -> Dict[str, Any]:
+        """큐 길이, 실행 중인 작업 수, 누적 지표 돌려주는거."""
+        started = self.completed + self.failed
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "inflight_keys": len(self._inflight),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "promoted": self.promoted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_wait_seconds": round(self.total_wait_seconds / started, 3) if started else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+        }
+
+    async def aclose(self) -> None:
+        """워커 전부 멈추는거. 줄 서있던 작업은 취소됨."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for future in self._inflight.values():
+            future.cancel()
+        self._inflight.clear()
+        self._queued_priority.clear()
+        self._started.clear()
+        self._workers = []
+
+
+# 프로세스 전체에서 같이 쓰는 스케줄러
+verification_scheduler = VerificationScheduler()